@@ -0,0 +1,3 @@
+"""
+Performance benchmarks for the orchestrator request path (see run_benchmarks.py).
+"""
@@ -0,0 +1,253 @@
+"""
+In-process stand-ins for Ollama and the Supabase table API.
+
+Both fakes speak the real wire protocol through ``httpx.MockTransport``, so
+the code under test (LLMService, SupabaseAsyncBackend and everything built on
+them) runs unmodified; only the network hop and the remote work are replaced
+by a configurable ``asyncio.sleep``.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+import httpx
+import numpy as np
+
+
+class _Latency:
+    """Simulated service time: a base delay with optional uniform jitter."""
+
+    def __init__(self, jitter: float = 0.0, seed: int = 0):
+        self.jitter = jitter
+        self._random = random.Random(seed)
+
+    async def sleep(self, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        if self.jitter:
+            seconds *= 1 + self._random.uniform(-self.jitter, self.jitter)
+        await asyncio.sleep(seconds)
+
+
+class FakeOllama(_Latency):
+    """Ollama HTTP API stand-in: /api/generate, /api/embed, /api/embeddings and /api/tags."""
+
+    def __init__(
+        self,
+        generate_latency: float = 0.25,
+        embed_latency: float = 0.02,
+        embed_item_latency: float = 0.001,
+        dimensions: int = 768,
+        response_words: int = 60,
+        jitter: float = 0.0,
+        seed: int = 0,
+    ):
+        """
+        Initialize the fake.
+
+        Args:
+            generate_latency: Seconds per /api/generate call
+            embed_latency: Seconds per /api/embed call
+            embed_item_latency: Extra seconds per input text in an embed call
+            dimensions: Embedding size
+            response_words: Words in each generated response
+            jitter: Fractional +/- jitter applied to every delay
+            seed: Seed for jitter
+        """
+        super().__init__(jitter, seed)
+        self.generate_latency = generate_latency
+        self.embed_latency = embed_latency
+        self.embed_item_latency = embed_item_latency
+        self.dimensions = dimensions
+        self.response_words = response_words
+        self.calls: Dict[str, int] = {}
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def embed(self, text: str) -> List[float]:
+        """Deterministic unit vector for a text."""
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dimensions)
+        return (vector / np.linalg.norm(vector)).astype(np.float32).tolist()
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        endpoint = request.url.path.rsplit("/", 1)[-1]
+        self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+        payload = json.loads(request.content) if request.content else {}
+
+        if endpoint == "generate":
+            await self.sleep(self.generate_latency)
+            words = [f"word{i % 17}" for i in range(self.response_words)]
+            usage = {"prompt_eval_count": len(payload.get("prompt", "")) // 4}
+            usage["eval_count"] = len(words)
+            if not payload.get("stream"):
+                body = {"model": payload.get("model"), "response": " ".join(words), "done": True}
+                return httpx.Response(200, json={**body, **usage})
+            lines = [{"response": word + " ", "done": False} for word in words]
+            lines.append({"response": "", "done": True, "done_reason": "stop", **usage})
+            content = "".join(json.dumps(line) + "\n" for line in lines)
+            return httpx.Response(200, content=content.encode())
+
+        if endpoint == "embed":
+            texts = payload.get("input") or []
+            texts = [texts] if isinstance(texts, str) else texts
+            await self.sleep(self.embed_latency + self.embed_item_latency * len(texts))
+            return httpx.Response(200, json={"embeddings": [self.embed(t) for t in texts]})
+
+        if endpoint == "embeddings":
+            await self.sleep(self.embed_latency + self.embed_item_latency)
+            return httpx.Response(200, json={"embedding": self.embed(payload.get("prompt", ""))})
+
+        if endpoint == "tags":
+            return httpx.Response(200, json={"models": []})
+
+        return httpx.Response(404, json={"error": f"unknown endpoint {request.url.path}"})
+
+
+def _pg_text(value: Any) -> str:
+    """Render a stored value the way PostgREST filters compare it."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    return str(value)
+
+
+class FakeSupabase(_Latency):
+    """
+    PostgREST (Supabase table API) stand-in over in-memory tables.
+
+    Supports the subset SupabaseAsyncBackend uses: select with eq filters,
+    order and limit; insert (single or bulk); update and delete by eq
+    filters; and the list_session_summaries function. Inserting into
+    swarm_messages maintains the sessions counters like the database trigger.
+    """
+
+    def __init__(self, latency: float = 0.005, jitter: float = 0.0, seed: int = 0):
+        """
+        Initialize the fake.
+
+        Args:
+            latency: Seconds per request
+            jitter: Fractional +/- jitter applied to every delay
+            seed: Seed for jitter
+        """
+        super().__init__(jitter, seed)
+        self.latency = latency
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self._ids: Dict[str, int] = {}
+        self.calls: Dict[str, int] = {}
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        await self.sleep(self.latency)
+        path = request.url.path.split("/rest/v1/", 1)[-1]
+        key = f"{request.method} {path}"
+        self.calls[key] = self.calls.get(key, 0) + 1
+        params = parse_qsl(request.url.query.decode(), keep_blank_values=True)
+        body = json.loads(request.content) if request.content else None
+
+        if path.startswith("rpc/"):
+            name = path[len("rpc/") :]
+            if name == "list_session_summaries":
+                return httpx.Response(200, json=self._list_session_summaries(body or {}))
+            return httpx.Response(
+                404, json={"code": "PGRST202", "message": f"function {name} not found"}
+            )
+
+        rows = self.tables.setdefault(path, [])
+        filters = [
+            (k, v.split(".", 1))
+            for k, v in params
+            if k not in {"select", "order", "limit", "columns"}
+        ]
+        matches = [row for row in rows if self._matches(row, filters)]
+
+        if request.method == "GET":
+            options = dict(params)
+            if "order" in options:
+                column, _, direction = options["order"].partition(".")
+                matches.sort(
+                    key=lambda row: (row.get(column) is None, row.get(column)),
+                    reverse=direction.startswith("desc"),
+                )
+            if "limit" in options:
+                matches = matches[: int(options["limit"])]
+            columns = options.get("select", "*")
+            if columns != "*":
+                wanted = [c.strip() for c in columns.split(",")]
+                matches = [{c: row.get(c) for c in wanted} for row in matches]
+            return httpx.Response(200, json=matches)
+        if request.method == "POST":
+            records = body if isinstance(body, list) else [body]
+            return httpx.Response(201, json=[self.insert(path, record) for record in records])
+        if request.method == "PATCH":
+            for row in matches:
+                row.update(body or {})
+            return httpx.Response(200, json=matches)
+        if request.method == "DELETE":
+            removed = {id(row) for row in matches}
+            self.tables[path] = [row for row in rows if id(row) not in removed]
+            return httpx.Response(200, json=matches)
+        return httpx.Response(405, json={"message": f"method {request.method} not allowed"})
+
+    def insert(self, table: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a row, assigning its id from the table's sequence."""
+        self._ids[table] = self._ids.get(table, 0) + 1
+        row = {"id": self._ids[table], **record}
+        self.tables.setdefault(table, []).append(row)
+        if table == "sessions":
+            row.setdefault("message_count", 0)
+            row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+            row.setdefault("last_message_at", row["created_at"])
+        elif table == "swarm_messages":
+            for session in self.tables.get("sessions", []):
+                if str(session["id"]) == str(record.get("session_id")):
+                    session["message_count"] = session.get("message_count", 0) + 1
+                    session["last_message_at"] = (
+                        record.get("timestamp") or session["last_message_at"]
+                    )
+                    break
+        return row
+
+    @staticmethod
+    def _matches(row: Dict[str, Any], filters: List[Tuple[str, List[str]]]) -> bool:
+        for column, (operator, value) in filters:
+            if operator != "eq" or _pg_text(row.get(column)) != value:
+                return False
+        return True
+
+    def _list_session_summaries(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        user_id: Optional[str] = params.get("p_user_id")
+        sessions = [
+            s
+            for s in self.tables.get("sessions", [])
+            if user_id is None or s.get("user_id") == user_id
+        ]
+        if params.get("p_before_updated_at") is not None:
+            cursor = (params["p_before_updated_at"], int(params["p_before_id"]))
+            sessions = [s for s in sessions if (s["last_message_at"], s["id"]) < cursor]
+        sessions.sort(key=lambda s: (s["last_message_at"], s["id"]), reverse=True)
+        return [
+            {
+                "id": s["id"],
+                "name": s.get("name"),
+                "description": (s.get("metadata") or {}).get("description", ""),
+                "created_at": s.get("created_at"),
+                "updated_at": s.get("last_message_at"),
+                "user_id": s.get("user_id"),
+                "message_count": s.get("message_count", 0),
+            }
+            for s in sessions[: params.get("p_limit") or 10]
+        ]
+
+
+__all__ = ["FakeOllama", "FakeSupabase"]
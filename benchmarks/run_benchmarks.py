@@ -0,0 +1,380 @@
+"""
+Benchmarks for the orchestrator request path.
+
+Each scenario drives real application code at a fixed concurrency against the
+in-process fakes in benchmarks/fakes.py (no Ollama or Supabase needed) and
+reports throughput and latency percentiles. Per-stage span histograms from
+src/services/metrics_service.py are included for every scenario, so a slow
+scenario can be traced to the stage that regressed.
+
+Scenarios:
+- add_tools_to_prompt: tool catalog section for a synthetic registry
+- get_recent_sessions: SessionService.get_recent_sessions over seeded sessions
+- add_message: DatabaseMessageService.add_message (embedding + insert)
+- process_message: OrchestratorAgent.process_message, one agent per worker
+
+Usage:
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --compare baseline.json --threshold 0.15
+
+With --compare the run exits with status 1 when any scenario's p95 latency
+or throughput is worse than the baseline by more than the threshold.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+from benchmarks.fakes import FakeOllama, FakeSupabase
+from src.db.backends import SupabaseAsyncBackend
+from src.managers.db_manager import DBService
+from src.services.llm_service import LLMService
+from src.services.metrics_service import Histogram, get_metrics_registry
+from src.services.session_service import SessionService
+from src.tools import orchestrator_tools
+from src.tools.registry.tool_registry import ToolRegistry, ToolWrapper
+
+Operation = Callable[[int, int], Awaitable[Any]]  # (worker, iteration) -> result
+
+FAKE_SUPABASE_URL = "http://supabase.benchmark.local"
+
+TOOL_DOMAINS = [
+    ("personal_assistant", "Email, calendar and task management", ["send email", "schedule"]),
+    ("librarian", "Research documents and web pages", ["web search", "summarize"]),
+    ("valet", "Household chores and reminders", ["reminders", "shopping list"]),
+    ("coder", "Write, review and explain code", ["python", "code review"]),
+    ("scheduler", "Plan recurring jobs and timers", ["cron", "timers"]),
+    ("finance", "Budgets, receipts and bank exports", ["budget", "receipts"]),
+]
+
+MESSAGES = [
+    "please send an email to my calendar contacts about friday",
+    "find recent papers on retrieval augmented generation",
+    "remind me to water the plants tomorrow",
+    "review this python function for bugs",
+    "what did I spend on groceries last month",
+    "hello, how are you today?",
+]
+
+
+async def measure(
+    name: str, operation: Operation, requests: int, concurrency: int
+) -> Dict[str, Any]:
+    """
+    Run an operation requests times across concurrency workers.
+
+    Args:
+        name: Scenario name
+        operation: Coroutine function called with (worker, iteration)
+        requests: Total number of calls
+        concurrency: Number of concurrent workers
+
+    Returns:
+        Dict[str, Any]: Throughput, latency percentiles (ms), errors and per-stage spans
+    """
+    metrics = get_metrics_registry()
+    metrics.reset()
+    latencies = Histogram(window=requests)
+    errors: List[str] = []
+    counter = iter(range(requests))
+
+    async def worker(worker_id: int) -> None:
+        for iteration in counter:
+            started = time.perf_counter()
+            try:
+                await operation(worker_id, iteration)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+            latencies.observe(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    summary = latencies.snapshot()
+
+    def to_ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        "scenario": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "duration_s": round(elapsed, 4),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else None,
+        "latency_ms": {key: to_ms(summary[key]) for key in ("mean", "p50", "p95", "p99", "max")},
+        "stages": {
+            f"{entry['labels'].get('span')}:{entry['labels'].get('outcome')}": {
+                "count": entry["count"],
+                "p50_ms": to_ms(entry["p50"]),
+                "p95_ms": to_ms(entry["p95"]),
+            }
+            for entry in metrics.snapshot().get("span_duration_seconds", [])
+        },
+    }
+
+
+def build_tool_registry(data_dir: str, tools: int) -> ToolRegistry:
+    """A registry of synthetic tools, so prompt size does not depend on local discovery."""
+    registry = ToolRegistry(data_dir=data_dir)
+    for i in range(tools):
+        base, description, capabilities = TOOL_DOMAINS[i % len(TOOL_DOMAINS)]
+        name = base if i < len(TOOL_DOMAINS) else f"{base}_{i}"
+
+        def tool(task: str):
+            return task
+
+        tool.__name__ = f"{name}_tool"
+        tool.description = description
+        tool.capabilities = capabilities
+        tool.examples = [f"Ask {name} to {capabilities[0]}"]
+        registry.register_tool(name, ToolWrapper(tool), {"description": description})
+    return registry
+
+
+@contextmanager
+def use_tool_registry(registry: ToolRegistry) -> Iterator[None]:
+    """Point the orchestrator's tool lookups at a registry for the duration of a run."""
+    original = orchestrator_tools.get_registry
+    orchestrator_tools.get_registry = lambda: registry
+    try:
+        yield
+    finally:
+        orchestrator_tools.get_registry = original
+
+
+@contextmanager
+def use_fake_ollama(ollama: FakeOllama) -> Iterator[LLMService]:
+    """Route the shared LLMService through the fake Ollama and bypass its response cache."""
+    service = LLMService()
+    original_client, original_cache = service.client, service.cache
+    service.client = httpx.AsyncClient(transport=ollama.transport())
+    service.cache = None
+    try:
+        yield service
+    finally:
+        service.client, service.cache = original_client, original_cache
+
+
+async def seed_sessions(
+    session_service: SessionService, supabase: FakeSupabase, count: int
+) -> List[str]:
+    """Create sessions through the service with simulated latency switched off."""
+    latency, supabase.latency = supabase.latency, 0.0
+    try:
+        ids = [
+            await session_service.create_session(user_id="developer", name=f"s{i}")
+            for i in range(count)
+        ]
+    finally:
+        supabase.latency = latency
+    return [session_id for session_id in ids if session_id]
+
+
+async def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the selected scenarios and return the report."""
+    from src.services.message_service import DatabaseMessageService  # Imports LLMService wiring
+
+    ollama = FakeOllama(
+        generate_latency=args.llm_latency_ms / 1000,
+        embed_latency=args.embed_latency_ms / 1000,
+        jitter=args.jitter,
+        seed=args.seed,
+    )
+    supabase = FakeSupabase(latency=args.db_latency_ms / 1000, jitter=args.jitter, seed=args.seed)
+    db_service = DBService(
+        backend=SupabaseAsyncBackend(
+            FAKE_SUPABASE_URL, "benchmark-key", transport=supabase.transport()
+        )
+    )
+    db_service.message_manager = DatabaseMessageService(db_service)
+    session_service = SessionService(db_service)
+    results: List[Dict[str, Any]] = []
+
+    def selected(name: str) -> bool:
+        return not args.scenarios or name in args.scenarios
+
+    with tempfile.TemporaryDirectory() as data_dir, use_fake_ollama(ollama):
+        registry = build_tool_registry(data_dir, args.tools)
+        with use_tool_registry(registry):
+            session_ids = await seed_sessions(session_service, supabase, args.sessions)
+
+            if selected("add_tools_to_prompt"):
+
+                async def build_prompt(worker: int, i: int) -> str:
+                    message = f"{MESSAGES[i % len(MESSAGES)]} #{i}"
+                    return await orchestrator_tools.add_tools_to_prompt("base", message=message)
+
+                results.append(
+                    await measure(
+                        "add_tools_to_prompt", build_prompt, args.requests, args.concurrency
+                    )
+                )
+
+            if selected("get_recent_sessions"):
+
+                async def recent_sessions(worker: int, i: int) -> Dict[str, Any]:
+                    return await session_service.get_recent_sessions(limit=10, user_id="developer")
+
+                results.append(
+                    await measure(
+                        "get_recent_sessions", recent_sessions, args.requests, args.concurrency
+                    )
+                )
+
+            if selected("add_message"):
+
+                async def add_message(worker: int, i: int) -> Dict[str, Any]:
+                    return await db_service.message_manager.add_message(
+                        session_id=session_ids[i % len(session_ids)],
+                        role="user",
+                        content=f"{MESSAGES[i % len(MESSAGES)]} #{i}",
+                        metadata={},
+                        user_id="developer",
+                        sender="benchmark.cli",
+                        target="benchmark.orchestrator",
+                    )
+
+                results.append(
+                    await measure("add_message", add_message, args.requests, args.concurrency)
+                )
+
+            if selected("process_message"):
+                results.append(await run_process_message(args, db_service, session_ids))
+
+    await db_service.message_manager.close()
+    await db_service.close()
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {
+                key: value for key, value in vars(args).items() if key not in {"output", "compare"}
+            },
+            "fake_calls": {"ollama": ollama.calls, "supabase": supabase.calls},
+        },
+        "results": results,
+    }
+
+
+async def run_process_message(
+    args: argparse.Namespace, db_service: DBService, session_ids: List[str]
+) -> Dict[str, Any]:
+    """Drive full orchestrator turns: one agent and conversation per worker."""
+    try:
+        from src.agents.orchestrator_agent import OrchestratorAgent
+        from src.config import Configuration
+        from src.state.state_models import MessageState
+    except ImportError as e:
+        return {"scenario": "process_message", "skipped": f"orchestrator not importable: {e}"}
+
+    config = Configuration()
+    sessions = []
+    for worker in range(args.concurrency):
+        agent = OrchestratorAgent(config=config)
+        state = MessageState(
+            session_id=int(session_ids[worker % len(session_ids)]), db_manager=db_service
+        )
+        sessions.append((agent, {"conversation_state": state, "user_id": "developer"}))
+
+    async def turn(worker: int, i: int) -> Dict[str, Any]:
+        agent, session_state = sessions[worker]
+        return await agent.process_message(f"{MESSAGES[i % len(MESSAGES)]} #{i}", session_state)
+
+    return await measure("process_message", turn, args.requests, args.concurrency)
+
+
+def git_commit() -> Optional[str]:
+    """Current commit hash, if running inside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    List scenarios that regressed against a baseline report.
+
+    Args:
+        baseline: Report from an earlier run
+        current: Report from this run
+        threshold: Allowed fractional slowdown, e.g. 0.15 for 15%
+
+    Returns:
+        List[str]: One line per regression (empty when none)
+    """
+    before = {r["scenario"]: r for r in baseline.get("results", []) if "latency_ms" in r}
+    regressions = []
+    for result in current.get("results", []):
+        old = before.get(result["scenario"])
+        if old is None or "latency_ms" not in result:
+            continue
+        old_p95, new_p95 = old["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        if old_p95 and new_p95 > old_p95 * (1 + threshold):
+            regressions.append(f"{result['scenario']}: p95 {old_p95} ms -> {new_p95} ms")
+        old_rps, new_rps = old["throughput_rps"], result["throughput_rps"]
+        if old_rps and new_rps < old_rps * (1 - threshold):
+            regressions.append(f"{result['scenario']}: throughput {old_rps} -> {new_rps} req/s")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the orchestrator request path")
+    parser.add_argument("--scenarios", nargs="*", default=None, help="Subset of scenarios to run")
+    parser.add_argument("--requests", type=int, default=200, help="Calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent workers")
+    parser.add_argument("--sessions", type=int, default=200, help="Sessions seeded before running")
+    parser.add_argument("--tools", type=int, default=12, help="Synthetic tools in the registry")
+    parser.add_argument(
+        "--llm-latency-ms", type=float, default=250.0, help="Fake /api/generate time"
+    )
+    parser.add_argument("--embed-latency-ms", type=float, default=20.0, help="Fake /api/embed time")
+    parser.add_argument(
+        "--db-latency-ms", type=float, default=5.0, help="Fake Supabase request time"
+    )
+    parser.add_argument("--jitter", type=float, default=0.0, help="Fractional +/- latency jitter")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency jitter")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed regression fraction")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run_suite(args))
+    text = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
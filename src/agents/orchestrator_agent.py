@@ -1,28 +1,31 @@
 """Orchestrator Agent - Central coordinator for the agent ecosystem (minimal, no tools, no personality)."""
 
 import asyncio
-import json
-import re
 import uuid
+from contextlib import aclosing
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from src.agents.base_agent import BaseAgent
 from src.agents.personality_agent import PersonalityAgent  # For future use
 from src.config import Configuration
 from src.services.logging_service import get_logger
 from src.services.message_service import log_and_persist_message
+from src.services.metrics_service import request_context, span
 from src.state.state_models import MessageRole, MessageState, MessageType
 from src.tools.initialize_tools import get_registry
 from src.tools.orchestrator_tools import (
     PENDING_TOOL_REQUESTS,
     TOOL_DEFINITIONS,
     add_tools_to_prompt,
-    execute_tool,
     format_completed_tools_prompt,
     format_tool_results,
+    get_tool_executor,
     handle_tool_calls,
+    parse_tool_calls,
+    validate_tool_call,
 )
+from src.tools.tool_call_parser import ToolCall, ToolCallParser
 from src.utils.datetime_utils import get_local_datetime_str
 
 # Initialize logger
@@ -101,9 +104,34 @@ class OrchestratorAgent(BaseAgent):
         )
 
     async def process_message(
-        self, message: str, session_state: Optional[Dict[str, Any]] = None
+        self,
+        message: str,
+        session_state: Optional[Dict[str, Any]] = None,
+        on_token: Optional[Callable[[str], Any]] = None,
     ) -> Dict[str, Any]:
-        """Process an incoming user message (chat only, now with tool support)."""
+        """
+        Process an incoming user message (chat only, now with tool support).
+
+        Args:
+            message: The user's message
+            session_state: Graph state holding the conversation_state MessageState
+            on_token: Optional callback (sync or async) receiving response text as it
+                streams; when given, the result carries "streamed": True if the
+                whole response was already delivered through it
+
+        Returns:
+            Dict with the response text
+        """
+        with request_context(), span("turn"):
+            return await self._process_message(message, session_state, on_token)
+
+    async def _process_message(
+        self,
+        message: str,
+        session_state: Optional[Dict[str, Any]],
+        on_token: Optional[Callable[[str], Any]],
+    ) -> Dict[str, Any]:
+        """Handle one turn inside the request context opened by process_message()."""
         logger.debug("--- ORCHESTRATOR: process_message START ---")
         logger.debug(f"[process_message] User message: '{message}'")
 
@@ -143,7 +171,8 @@ class OrchestratorAgent(BaseAgent):
                 raise  # Re-raise to handle at a higher level
 
         # Build prompt in stages
-        prompt = await self._create_prompt(message)
+        with span("prompt_build"):
+            prompt = await self._create_prompt(message)
         logger.debug(f"[process_message] Base prompt:\n{prompt}")
 
         if session_state and "conversation_state" in session_state:
@@ -165,7 +194,20 @@ class OrchestratorAgent(BaseAgent):
                 raise  # Re-raise to handle at a higher level
 
         logger.debug(f"[process_message] Final prompt to LLM:\n{prompt}")
-        response = await self.query_llm(prompt)
+        with span("llm_call", streamed=on_token is not None):
+            if on_token is None:
+                response = await self.query_llm(prompt)
+                tool_calls = parse_tool_calls(response)
+            else:
+                # Tool calls start as soon as they arrive, while the rest of the response streams
+                parser = ToolCallParser(validate_tool_call)
+                response = await self._stream_llm_response(
+                    prompt,
+                    on_token,
+                    parser,
+                    on_tool_call=lambda call: self._start_tool_call(call, message, session_state),
+                )
+                tool_calls = parser.calls
         logger.debug(f"[process_message] LLM response: {response}")
 
         if session_state and "conversation_state" in session_state:
@@ -196,68 +238,64 @@ class OrchestratorAgent(BaseAgent):
                 )
                 raise  # Re-raise to handle at a higher level
 
-        # Check for tool calls in the LLM response
-        tool_call_pattern = r"`\{[^`]+\}`"
-        matches = list(re.finditer(tool_call_pattern, response))
-        if matches:
-            logger.debug("[process_message] Found tool call in response")
-            # Only handle the first tool call for now (single tool per message)
-            match = matches[0]
-            tool_call_json = match.group(0).strip("`")
-            try:
-                tool_call = json.loads(tool_call_json)
-                logger.debug(f"[process_message] Parsed tool call: {tool_call}")
-            except json.JSONDecodeError as e:
-                logger.error(
-                    f"[process_message] Invalid tool call JSON: {tool_call_json} | Error: {e}"
-                )
+        # Check for tool calls in the LLM response (streamed calls have already started)
+        if tool_calls:
+            logger.debug(f"[process_message] Found {len(tool_calls)} tool call(s) in response")
+            valid_calls = [call for call in tool_calls if not call.error]
+            if not valid_calls:
+                errors = "; ".join(call.error for call in tool_calls)
                 return {
-                    "response": f"Error: Tool call was not valid JSON. Please try again or rephrase your request."
+                    "response": f"Error: Tool call was not valid ({errors}). "
+                    "Please try again or rephrase your request."
                 }
 
-            tool_name = tool_call.get("name")
-            args = tool_call.get("args", {})
-            # Generate a request_id
-            request_id = str(uuid.uuid4())
-            args["request_id"] = request_id
-            logger.debug(f"[process_message] Generated request_id: {request_id}")
-
-            # Log the tool call
-            if session_state and "conversation_state" in session_state:
-                logger.debug("[process_message] Logging tool call")
-                try:
-                    await log_and_persist_message(
-                        session_state["conversation_state"],
-                        MessageRole.TOOL,
-                        f"Tool call: {tool_name} with args: {args}",
-                        metadata={
-                            "tool": tool_name,
-                            "args": args,
-                            "request_id": request_id,
-                        },
-                        sender=f"{self.graph_name}.orchestrator",
-                        target=f"{self.graph_name}.{tool_name}",
-                    )
-                    logger.debug("[process_message] Successfully logged tool call")
-                except Exception as e:
-                    logger.error(
-                        f"[process_message] Failed to log tool call: {str(e)}",
-                        exc_info=True,
-                    )
-                    raise  # Re-raise to handle at a higher level
-
-            # Store the original user query with the request for later use in tool completions
-            PENDING_TOOL_REQUESTS[request_id] = PENDING_TOOL_REQUESTS.get(request_id, {})
-            PENDING_TOOL_REQUESTS[request_id]["original_query"] = message
-
-            # Schedule the tool call (async, don't await result)
-            logger.debug(f"[process_message] Scheduling tool execution: {tool_name}")
-            asyncio.create_task(
-                execute_tool(tool_name, args, request_id, session_state=session_state)
-            )
+            # Start every tool call at once; each result arrives as its own completion
+            scheduled = []
+            for tool_call in valid_calls:
+                self._start_tool_call(tool_call, message, session_state)
+                tool_name, args, request_id = tool_call.name, tool_call.args, tool_call.request_id
+
+                # Log the tool call
+                if session_state and "conversation_state" in session_state:
+                    logger.debug("[process_message] Logging tool call")
+                    try:
+                        await log_and_persist_message(
+                            session_state["conversation_state"],
+                            MessageRole.TOOL,
+                            f"Tool call: {tool_name} with args: {args}",
+                            metadata={
+                                "tool": tool_name,
+                                "args": args,
+                                "request_id": request_id,
+                            },
+                            sender=f"{self.graph_name}.orchestrator",
+                            target=f"{self.graph_name}.{tool_name}",
+                        )
+                        logger.debug("[process_message] Successfully logged tool call")
+                    except Exception as e:
+                        logger.error(
+                            f"[process_message] Failed to log tool call: {str(e)}",
+                            exc_info=True,
+                        )
+                        raise  # Re-raise to handle at a higher level
+
+                scheduled.append(f"[Tool: {tool_name}] Request ID: {request_id}")
+
+            skipped = [
+                f"[Tool: {call.name}] Not run: {call.error}" for call in tool_calls if call.error
+            ]
 
             # Return pending message to CLI
-            pending_msg = f"[Tool: {tool_name}] Your request is being processed asynchronously. Request ID: {request_id}"
+            if len(scheduled) == 1 and not skipped:
+                pending_msg = (
+                    f"[Tool: {tool_name}] Your request is being processed asynchronously. "
+                    f"Request ID: {request_id}"
+                )
+            else:
+                pending_msg = (
+                    f"Your request is being processed asynchronously by {len(scheduled)} tools:\n"
+                    + "\n".join(scheduled + skipped)
+                )
             if session_state and "conversation_state" in session_state:
                 logger.debug("[process_message] Logging pending message")
                 try:
@@ -302,7 +340,89 @@ class OrchestratorAgent(BaseAgent):
 
         self._update_history(message, response)
         logger.debug(f"[process_message] Sending response to CLI: {response}")
-        return {"response": response}
+        return {"response": response, "streamed": on_token is not None}
+
+    async def _stream_llm_response(
+        self,
+        prompt: str,
+        on_token: Callable[[str], Any],
+        parser: Optional[ToolCallParser] = None,
+        on_tool_call: Optional[Callable[[ToolCall], Any]] = None,
+    ) -> str:
+        """
+        Stream the LLM response to on_token and return the full text.
+
+        Tool-call JSON is held back from on_token; each call is passed to
+        on_tool_call as soon as its closing brace arrives, so tools run while
+        the rest of the response is generated. Falls back to a non-streaming
+        query if the stream fails before producing any text.
+
+        Args:
+            prompt: The prompt to send
+            on_token: Callback (sync or async) receiving displayable text
+            parser: Tool-call parser to feed (its calls are read afterwards)
+            on_tool_call: Callback receiving each completed tool call
+
+        Returns:
+            The response text received
+
+        Raises:
+            RuntimeError: If the stream fails after text has been received
+        """
+
+        async def emit(text: str) -> None:
+            if text:
+                result = on_token(text)
+                if asyncio.iscoroutine(result):
+                    await result
+            for call in parser.pop_calls():
+                if on_tool_call is not None:
+                    logger.debug(f"[process_message] Tool call received mid-stream: {call.name}")
+                    on_tool_call(call)
+
+        parser = parser or ToolCallParser(validate_tool_call)
+        chunks: List[str] = []
+        try:
+            async with aclosing(self.llm.stream(prompt)) as stream:
+                async for chunk in stream:
+                    chunks.append(chunk)
+                    await emit(parser.feed(chunk))
+        except Exception as e:
+            logger.error(f"[process_message] Streaming failed: {e}")
+            if chunks:
+                # Never persist or remember a cut-off reply as if it were complete
+                raise RuntimeError(f"The response was cut off mid-stream: {e}") from e
+            response = await self.query_llm(prompt)
+            chunks.append(response)
+            await emit(parser.feed(response))
+        await emit(parser.flush())
+        return "".join(chunks)
+
+    def _start_tool_call(self, tool_call: ToolCall, message: str, session_state=None) -> None:
+        """
+        Start a valid tool call in the background, once.
+
+        Args:
+            tool_call: Parsed call; its request_id is set here
+            message: User message that led to the call
+            session_state: Session state used for logging
+        """
+        if tool_call.error or tool_call.request_id:
+            return
+        request_id = str(uuid.uuid4())
+        tool_call.request_id = request_id
+        tool_call.args["request_id"] = request_id
+        logger.debug(f"[process_message] Generated request_id: {request_id}")
+
+        # Store the original user query with the request for later use in tool completions
+        PENDING_TOOL_REQUESTS[request_id] = PENDING_TOOL_REQUESTS.get(request_id, {})
+        PENDING_TOOL_REQUESTS[request_id]["original_query"] = message
+
+        # Schedule the tool call (async, don't await result)
+        logger.debug(f"[process_message] Scheduling tool execution: {tool_call.name}")
+        get_tool_executor().submit(
+            tool_call.name, tool_call.args, request_id, session_state=session_state
+        )
 
     async def _create_prompt(self, message: str) -> str:
         """Create the prompt for the LLM by combining optional features."""
@@ -372,8 +492,8 @@ class OrchestratorAgent(BaseAgent):
         # 4. Combine base prompt
         base_prompt = "\n\n".join(part for part in prompt_parts if part)
 
-        # 5. Add tool information using add_tools_to_prompt
-        prompt_with_tools = await add_tools_to_prompt(base_prompt)
+        # 5. Add tool information (cached catalog, filtered to relevant tools when large)
+        prompt_with_tools = await add_tools_to_prompt(base_prompt, message=message)
         logger.debug(f"orchestrator_agent:_create_prompt: Tool information added")
 
         # 6. Conversation History (if available)
@@ -99,6 +99,26 @@ class LLMProvidersConfig(BaseModel):
         return self
 
 
+class LLMCacheConfig(BaseModel):
+    """Response cache settings for LLMService.generate (llm.cache in YAML)."""
+
+    enabled: bool = True
+    max_entries: int = Field(default=256, ge=1)
+    ttl_seconds: float = Field(default=3600.0, gt=0)
+    # Cosine similarity for a semantic hit; None keeps lookups exact-only
+    semantic_threshold: Optional[float] = Field(default=None, gt=0, le=1)
+
+
+class LLMEmbeddingConfig(BaseModel):
+    """Batching settings for LLMService.get_embeddings (llm.embeddings in YAML)."""
+
+    batch_size: int = Field(default=64, ge=1)  # Texts per /api/embed request
+    max_concurrency: int = Field(default=4, ge=1)  # Embed requests in flight at once
+    warm_up: bool = True  # Pull and load models at startup, not on first request
+    context_window: int = Field(default=2048, ge=1)  # Tokens the embedding model reads per text
+    tokenizer: Optional[str] = None  # Model's tokenizer.json or hub id; exact chunk token counts
+
+
 class LLMConfig(BaseModel):
     default_provider: str = "ollama"  # Preferred name
     providers: LLMProvidersConfig  # Preferred name
@@ -192,6 +212,49 @@ def get_llm_config(config_path: str = CONFIG_PATH):
     return validated
 
 
+def _load_llm_section(key: str, config_path: str) -> Dict[str, Any]:
+    """Return a subsection of the llm YAML section ({} if missing)."""
+    if not os.path.exists(config_path):
+        return {}
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f) or {}
+    return (config.get("llm") or {}).get(key) or {}
+
+
+def get_llm_cache_config(config_path: str = CONFIG_PATH) -> LLMCacheConfig:
+    """
+    Load the LLM response cache settings.
+
+    Args:
+        config_path (str): Path to YAML config file.
+    Returns:
+        LLMCacheConfig: Validated cache config (defaults if the section is missing).
+    Raises:
+        ValueError: If the cache section is invalid.
+    """
+    try:
+        return LLMCacheConfig(**_load_llm_section("cache", config_path))
+    except ValidationError as e:
+        raise ValueError(f"Invalid LLM cache config: {e}")
+
+
+def get_llm_embedding_config(config_path: str = CONFIG_PATH) -> LLMEmbeddingConfig:
+    """
+    Load the embedding batching settings.
+
+    Args:
+        config_path (str): Path to YAML config file.
+    Returns:
+        LLMEmbeddingConfig: Validated config (defaults if the section is missing).
+    Raises:
+        ValueError: If the embeddings section is invalid.
+    """
+    try:
+        return LLMEmbeddingConfig(**_load_llm_section("embeddings", config_path))
+    except ValidationError as e:
+        raise ValueError(f"Invalid LLM embeddings config: {e}")
+
+
 def get_provider_config(
     provider: Optional[str] = None, config_path: str = CONFIG_PATH
 ) -> Union[OllamaConfig, OpenAIConfig, None]:
@@ -8,7 +8,7 @@ import logging
 import os
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import yaml
 from pydantic import BaseModel, ValidationError
@@ -53,6 +53,18 @@ class LoggingConfig(BaseModel):
     backup_count: int = 5
 
 
+class MetricsConfig(BaseModel):
+    """Latency histograms for hot-path spans (see src/services/metrics_service.py)."""
+
+    enabled: bool = True
+    buckets: List[float] = [
+        0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+    ]  # fmt: skip
+    window: int = 2048  # Recent samples kept per series for p50/p95/p99
+    prometheus_port: Optional[int] = None  # Serve /metrics and /metrics.json when set
+    json_path: Optional[str] = "./logs/metrics.json"  # Snapshot written on shutdown
+
+
 def get_logging_config(
     config_path: str = "src/config/developer_user_config.yaml",
 ) -> LoggingConfig:
@@ -76,6 +88,30 @@ def get_logging_config(
     return LoggingConfig()
 
 
+def get_metrics_config(
+    config_path: str = "src/config/developer_user_config.yaml",
+) -> MetricsConfig:
+    """
+    Load the logging.metrics section from YAML.
+
+    Args:
+        config_path (str): Path to YAML config file.
+    Returns:
+        MetricsConfig: Validated metrics config (defaults when the section is absent).
+    Raises:
+        ValueError: If config is invalid.
+    """
+    if os.path.exists(config_path):
+        with open(config_path, "r") as f:
+            config = yaml.safe_load(f) or {}
+        section = (config.get("logging") or {}).get("metrics") or {}
+        try:
+            return MetricsConfig(**section)
+        except ValidationError as e:
+            raise ValueError(f"Invalid metrics config: {e}")
+    return MetricsConfig()
+
+
 def get_log_config(config=None):
     """
     Get logging configuration, optionally overriding defaults with provided config.
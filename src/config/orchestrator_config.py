@@ -2,6 +2,8 @@
 Orchestrator and agent configuration for the application.
 
 # Most common/preferred: graph_type, max_recursion_depth, max_pending_tasks, task_timeout_seconds, default_thinking_format, agents
+# Tool calls: max_pending_tasks bounds concurrent tool executions overall, max_concurrent_per_tool
+# bounds them per tool, and task_timeout_seconds limits each call
 """
 
 import os
@@ -25,6 +27,7 @@ class OrchestratorConfig(BaseModel):
     max_recursion_depth: int = 3
     max_pending_tasks: int = 10
     task_timeout_seconds: int = 300
+    max_concurrent_per_tool: int = 2
     default_thinking_format: str = "steps"
     agents: AgentConfig = Field(default_factory=AgentConfig)
 
@@ -0,0 +1,476 @@
+"""
+Async database backends for DBService.
+
+Each backend exposes the same small CRUD surface (insert/select/update/delete)
+as awaitable calls that never block the event loop:
+
+- SupabaseAsyncBackend: supabase-py's async client over a bounded httpx pool
+- AsyncpgBackend: direct Postgres access through an asyncpg connection pool
+- SQLiteBackend (src/db/sqlite_backend.py): local file fallback
+
+Filters map a column to a value (equality) or to an ``(operator, value)``
+tuple using the PostgREST operator names in FILTER_OPERATORS, e.g.
+``{"id": ("gt", 100), "content": ("ilike", "%cats%")}``.
+
+Pool size, connection-acquisition timeout and statement timeout come from
+DatabasePoolConfig (``database.pool`` in developer_user_config.yaml).
+"""
+
+import asyncio
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from src.config.database_config import DatabasePoolConfig
+from src.services.logging_service import get_logger
+
+logger = get_logger(__name__)
+
+_IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# PostgREST filter operators and their SQL equivalents
+FILTER_OPERATORS: Dict[str, str] = {
+    "eq": "=",
+    "neq": "<>",
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+    "ilike": "ILIKE",
+}
+
+
+def split_filter(value: Any) -> Tuple[str, Any]:
+    """
+    Split a filter value into its operator and operand.
+
+    Args:
+        value: Plain value (equality) or an ``(operator, value)`` tuple
+
+    Returns:
+        (operator, operand) with operator a key of FILTER_OPERATORS
+    """
+    if isinstance(value, tuple) and len(value) == 2 and value[0] in FILTER_OPERATORS:
+        return value
+    return "eq", value
+
+
+class DBBackend(ABC):
+    """Interface implemented by every DBService backend."""
+
+    def __init__(self, pool_config: Optional[DatabasePoolConfig] = None):
+        self.pool_config = pool_config or DatabasePoolConfig()
+
+    @abstractmethod
+    async def insert(self, table_name: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Insert a record and return the inserted rows."""
+
+    @abstractmethod
+    async def insert_many(
+        self, table_name: str, records: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Insert several records in one statement and return the inserted rows."""
+
+    @abstractmethod
+    async def select(
+        self,
+        table_name: str,
+        columns: str = "*",
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        order_desc: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Select rows matching filters (equality or ``(operator, value)`` tuples)."""
+
+    @abstractmethod
+    async def update(
+        self,
+        table_name: str,
+        data: Dict[str, Any],
+        filters: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        """Update rows matching filters and return them."""
+
+    @abstractmethod
+    async def delete(self, table_name: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Delete rows matching filters and return them."""
+
+    @abstractmethod
+    async def rpc(self, function_name: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Call a database function and return its rows."""
+
+    async def close(self) -> None:
+        """Release pooled connections."""
+
+
+class SupabaseAsyncBackend(DBBackend):
+    """Backend using supabase-py's AsyncClient (PostgREST over HTTP)."""
+
+    def __init__(
+        self,
+        url: str,
+        key: str,
+        pool_config: Optional[DatabasePoolConfig] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        super().__init__(pool_config)
+        self.url = url
+        self.key = key
+        self.transport = transport  # e.g. an in-process PostgREST stand-in for benchmarks
+        self._client = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._client_lock = asyncio.Lock()
+
+    async def _get_client(self):
+        """Create the async client on first use (it must be built inside a running loop)."""
+        if self._client is not None:
+            return self._client
+        async with self._client_lock:
+            if self._client is None:
+                from supabase import AsyncClientOptions, acreate_client
+
+                cfg = self.pool_config
+                self._http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=cfg.pool_size,
+                        max_keepalive_connections=cfg.pool_size,
+                    ),
+                    timeout=httpx.Timeout(cfg.statement_timeout, pool=cfg.acquire_timeout),
+                    transport=self.transport,
+                )
+                self._client = await acreate_client(
+                    self.url,
+                    self.key,
+                    options=AsyncClientOptions(
+                        postgrest_client_timeout=cfg.statement_timeout,
+                        httpx_client=self._http_client,
+                    ),
+                )
+                logger.debug(
+                    f"Created Supabase async client (pool_size={cfg.pool_size}, "
+                    f"acquire_timeout={cfg.acquire_timeout}s, "
+                    f"statement_timeout={cfg.statement_timeout}s)"
+                )
+        return self._client
+
+    @staticmethod
+    def _filter(query, filters: Optional[Dict[str, Any]]):
+        for column, value in (filters or {}).items():
+            operator, operand = split_filter(value)
+            query = getattr(query, operator)(column, operand)
+        return query
+
+    async def _execute(self, query) -> List[Dict[str, Any]]:
+        try:
+            response = await query.execute()
+        except httpx.PoolTimeout as e:
+            raise TimeoutError(
+                f"Timed out after {self.pool_config.acquire_timeout}s waiting for a DB connection"
+            ) from e
+        except httpx.TimeoutException as e:
+            raise TimeoutError(
+                f"Statement exceeded {self.pool_config.statement_timeout}s timeout"
+            ) from e
+        return response.data or []
+
+    async def insert(self, table_name: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        client = await self._get_client()
+        return await self._execute(client.table(table_name).insert(data))
+
+    async def insert_many(
+        self, table_name: str, records: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        client = await self._get_client()
+        return await self._execute(client.table(table_name).insert(records))
+
+    async def select(
+        self,
+        table_name: str,
+        columns: str = "*",
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        order_desc: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        client = await self._get_client()
+        query = self._filter(client.table(table_name).select(columns), filters)
+        if order_by:
+            query = query.order(order_by, desc=order_desc)
+        if limit:
+            query = query.limit(limit)
+        return await self._execute(query)
+
+    async def update(
+        self,
+        table_name: str,
+        data: Dict[str, Any],
+        filters: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        client = await self._get_client()
+        return await self._execute(self._filter(client.table(table_name).update(data), filters))
+
+    async def delete(self, table_name: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        client = await self._get_client()
+        return await self._execute(self._filter(client.table(table_name).delete(), filters))
+
+    async def rpc(self, function_name: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        client = await self._get_client()
+        return await self._execute(client.rpc(function_name, params))
+
+    async def close(self) -> None:
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._client = None
+        self._http_client = None
+
+
+def quote_identifier(name: str) -> str:
+    """
+    Quote a table or column name for direct SQL.
+
+    Args:
+        name: Identifier as used by the PostgREST API
+
+    Returns:
+        Double-quoted identifier
+
+    Raises:
+        ValueError: If the name is not a plain identifier
+    """
+    if not _IDENTIFIER_RE.match(name):
+        raise ValueError(f"Invalid SQL identifier: {name!r}")
+    return f'"{name}"'
+
+
+def _column_list(columns: str) -> str:
+    if columns.strip() == "*":
+        return "*"
+    return ", ".join(quote_identifier(c.strip()) for c in columns.split(",") if c.strip())
+
+
+def _where_clause(filters: Optional[Dict[str, Any]], start: int = 1) -> Tuple[str, List[Any]]:
+    if not filters:
+        return "", []
+    parts = []
+    args = []
+    for i, (column, value) in enumerate(filters.items(), start=start):
+        operator, operand = split_filter(value)
+        parts.append(f"{quote_identifier(column)} {FILTER_OPERATORS[operator]} ${i}")
+        args.append(operand)
+    return " WHERE " + " AND ".join(parts), args
+
+
+def build_insert(table_name: str, data: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """Build a parameterized INSERT ... RETURNING * statement."""
+    columns = list(data.keys())
+    placeholders = ", ".join(f"${i}" for i in range(1, len(columns) + 1))
+    sql = (
+        f"INSERT INTO {quote_identifier(table_name)} "
+        f"({', '.join(quote_identifier(c) for c in columns)}) "
+        f"VALUES ({placeholders}) RETURNING *"
+    )
+    return sql, [data[c] for c in columns]
+
+
+def build_insert_many(table_name: str, records: List[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+    """
+    Build a multi-row INSERT ... RETURNING * statement.
+
+    Columns are the ordered union of all record keys; a record missing a
+    column gets DEFAULT for it rather than NULL.
+    """
+    columns: List[str] = []
+    for record in records:
+        for column in record:
+            if column not in columns:
+                columns.append(column)
+    args: List[Any] = []
+    rows = []
+    for record in records:
+        values = []
+        for column in columns:
+            if column in record:
+                args.append(record[column])
+                values.append(f"${len(args)}")
+            else:
+                values.append("DEFAULT")
+        rows.append(f"({', '.join(values)})")
+    sql = (
+        f"INSERT INTO {quote_identifier(table_name)} "
+        f"({', '.join(quote_identifier(c) for c in columns)}) "
+        f"VALUES {', '.join(rows)} RETURNING *"
+    )
+    return sql, args
+
+
+def build_select(
+    table_name: str,
+    columns: str = "*",
+    filters: Optional[Dict[str, Any]] = None,
+    order_by: Optional[str] = None,
+    order_desc: bool = False,
+    limit: Optional[int] = None,
+) -> Tuple[str, List[Any]]:
+    """Build a parameterized SELECT statement."""
+    where, args = _where_clause(filters)
+    sql = f"SELECT {_column_list(columns)} FROM {quote_identifier(table_name)}{where}"
+    if order_by:
+        sql += f" ORDER BY {quote_identifier(order_by)} {'DESC' if order_desc else 'ASC'}"
+    if limit:
+        args.append(int(limit))
+        sql += f" LIMIT ${len(args)}"
+    return sql, args
+
+
+def build_update(
+    table_name: str, data: Dict[str, Any], filters: Dict[str, Any]
+) -> Tuple[str, List[Any]]:
+    """Build a parameterized UPDATE ... RETURNING * statement."""
+    columns = list(data.keys())
+    assignments = ", ".join(f"{quote_identifier(c)} = ${i}" for i, c in enumerate(columns, 1))
+    where, where_args = _where_clause(filters, start=len(columns) + 1)
+    sql = f"UPDATE {quote_identifier(table_name)} SET {assignments}{where} RETURNING *"
+    return sql, [data[c] for c in columns] + where_args
+
+
+def build_delete(table_name: str, filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """Build a parameterized DELETE ... RETURNING * statement."""
+    where, args = _where_clause(filters)
+    return f"DELETE FROM {quote_identifier(table_name)}{where} RETURNING *", args
+
+
+def build_rpc(function_name: str, params: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """Build a SELECT over a set-returning function using named arguments."""
+    names = list(params.keys())
+    named_args = ", ".join(f"{quote_identifier(n)} => ${i}" for i, n in enumerate(names, 1))
+    return (
+        f"SELECT * FROM {quote_identifier(function_name)}({named_args})",
+        [params[n] for n in names],
+    )
+
+
+class AsyncpgBackend(DBBackend):
+    """Backend talking to Postgres directly through an asyncpg pool."""
+
+    def __init__(self, dsn: str, pool_config: Optional[DatabasePoolConfig] = None):
+        super().__init__(pool_config)
+        self.dsn = dsn
+        self._pool = None
+        self._pool_lock = asyncio.Lock()
+
+    async def _init_connection(self, conn) -> None:
+        """Register JSON and pgvector codecs on each new pooled connection."""
+        for typename in ("json", "jsonb"):
+            await conn.set_type_codec(
+                typename, encoder=json.dumps, decoder=json.loads, schema="pg_catalog"
+            )
+        try:
+            from pgvector.asyncpg import register_vector
+
+            await register_vector(conn)
+        except Exception as e:
+            logger.debug(f"pgvector codec not registered: {e}")
+
+    async def _get_pool(self):
+        if self._pool is not None:
+            return self._pool
+        async with self._pool_lock:
+            if self._pool is None:
+                try:
+                    import asyncpg
+                except ImportError as e:
+                    raise RuntimeError(
+                        "The postgres database provider requires asyncpg (pip install asyncpg)"
+                    ) from e
+
+                cfg = self.pool_config
+                self._pool = await asyncpg.create_pool(
+                    self.dsn,
+                    min_size=1,
+                    max_size=cfg.pool_size,
+                    command_timeout=cfg.statement_timeout,
+                    server_settings={"statement_timeout": str(int(cfg.statement_timeout * 1000))},
+                    init=self._init_connection,
+                )
+                logger.debug(f"Created asyncpg pool (max_size={cfg.pool_size})")
+        return self._pool
+
+    async def _fetch(self, sql: str, args: List[Any]) -> List[Dict[str, Any]]:
+        pool = await self._get_pool()
+        try:
+            async with pool.acquire(timeout=self.pool_config.acquire_timeout) as conn:
+                rows = await conn.fetch(sql, *args)
+        except asyncio.TimeoutError as e:
+            raise TimeoutError(f"DB operation timed out: {sql.split(' ', 1)[0]}") from e
+        return [dict(row) for row in rows]
+
+    async def insert(self, table_name: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await self._fetch(*build_insert(table_name, data))
+
+    async def insert_many(
+        self, table_name: str, records: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        return await self._fetch(*build_insert_many(table_name, records))
+
+    async def select(
+        self,
+        table_name: str,
+        columns: str = "*",
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        order_desc: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        return await self._fetch(
+            *build_select(table_name, columns, filters, order_by, order_desc, limit)
+        )
+
+    async def update(
+        self,
+        table_name: str,
+        data: Dict[str, Any],
+        filters: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        return await self._fetch(*build_update(table_name, data, filters))
+
+    async def delete(self, table_name: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await self._fetch(*build_delete(table_name, filters))
+
+    async def rpc(self, function_name: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await self._fetch(*build_rpc(function_name, params))
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+def create_backend(pool_config: Optional[DatabasePoolConfig] = None) -> DBBackend:
+    """
+    Pick a backend from the environment.
+
+    DATABASE_URL selects the asyncpg backend for a postgres:// DSN or the SQLite
+    fallback for sqlite:///path; otherwise SUPABASE_URL and
+    SUPABASE_SERVICE_ROLE_KEY select the Supabase async client.
+
+    Raises:
+        ValueError: If no database credentials are configured
+    """
+    dsn = os.getenv("DATABASE_URL")
+    if dsn and dsn.startswith(("postgres://", "postgresql://")):
+        return AsyncpgBackend(dsn, pool_config)
+    if dsn and dsn.startswith("sqlite:///"):
+        from src.db.sqlite_backend import SQLiteBackend
+
+        return SQLiteBackend(dsn[len("sqlite:///") :], pool_config)
+
+    url = os.getenv("SUPABASE_URL")
+    service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    if not (url and service_role_key):
+        raise ValueError("url and service_role_key must be set")
+    return SupabaseAsyncBackend(url, service_role_key, pool_config)
@@ -0,0 +1,49 @@
+-- Migration 002: One-query session summaries with keyset pagination
+-- Replaces the per-session first/latest message lookups in SessionService.
+-- The SQLite fallback mirrors this function in src/db/sqlite_backend.py.
+
+CREATE INDEX IF NOT EXISTS idx_swarm_messages_session_ts
+    ON public.swarm_messages(session_id, "timestamp");
+
+-- Sessions ordered by latest activity. Pass the last row's (updated_at, id)
+-- as p_before_updated_at/p_before_id to fetch the next page.
+CREATE OR REPLACE FUNCTION public.list_session_summaries(
+    p_user_id TEXT DEFAULT NULL,
+    p_limit INTEGER DEFAULT 10,
+    p_before_updated_at TEXT DEFAULT NULL,
+    p_before_id BIGINT DEFAULT NULL
+)
+RETURNS TABLE (
+    id BIGINT,
+    name TEXT,
+    description TEXT,
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    user_id TEXT
+)
+LANGUAGE sql STABLE AS $$
+    WITH bounds AS (
+        SELECT m.session_id,
+               min(m."timestamp")::timestamptz AS created_at,
+               max(m."timestamp")::timestamptz AS updated_at
+        FROM public.swarm_messages m
+        GROUP BY m.session_id
+    ), firsts AS (
+        SELECT DISTINCT ON (m.session_id) m.session_id, m.metadata::jsonb AS metadata, m.user_id
+        FROM public.swarm_messages m
+        ORDER BY m.session_id, m."timestamp", m.id
+    )
+    SELECT b.session_id::bigint,
+           f.metadata->>'title',
+           coalesce(f.metadata->>'description', ''),
+           b.created_at,
+           b.updated_at,
+           coalesce(f.metadata->>'user_id', f.user_id)::text
+    FROM bounds b
+    JOIN firsts f ON f.session_id = b.session_id
+    WHERE (p_user_id IS NULL OR coalesce(f.metadata->>'user_id', f.user_id) = p_user_id)
+      AND (p_before_updated_at IS NULL
+           OR (b.updated_at, b.session_id) < (p_before_updated_at::timestamptz, p_before_id))
+    ORDER BY b.updated_at DESC, b.session_id DESC
+    LIMIT coalesce(p_limit, 10)
+$$;
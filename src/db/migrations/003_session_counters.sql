@@ -0,0 +1,95 @@
+-- Migration 003: Sessions table as the source of session ids and activity
+-- Session ids come from the sessions.id sequence instead of max(session_id) + 1
+-- over swarm_messages, and last_message_at/message_count are kept current by a
+-- statement-level trigger so listings never aggregate over messages.
+
+ALTER TABLE public.sessions ADD COLUMN IF NOT EXISTS message_count BIGINT NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_sessions_user_last_message
+    ON public.sessions(user_id, last_message_at DESC, id DESC);
+
+-- Adopt sessions that so far only exist as swarm_messages rows
+INSERT INTO public.sessions (id, name, user_id, metadata, created_at, last_message_at, message_count)
+SELECT b.session_id,
+       f.metadata->>'title',
+       coalesce(f.metadata->>'user_id', f.user_id),
+       f.metadata,
+       b.created_at,
+       b.last_message_at,
+       b.message_count
+FROM (
+    SELECT session_id,
+           min("timestamp")::timestamptz AS created_at,
+           max("timestamp")::timestamptz AS last_message_at,
+           count(*) AS message_count
+    FROM public.swarm_messages
+    GROUP BY session_id
+) b
+JOIN (
+    SELECT DISTINCT ON (session_id) session_id, metadata::jsonb AS metadata, user_id
+    FROM public.swarm_messages
+    ORDER BY session_id, "timestamp", id
+) f ON f.session_id = b.session_id
+ON CONFLICT (id) DO NOTHING;
+
+SELECT setval(
+    pg_get_serial_sequence('public.sessions', 'id'),
+    greatest((SELECT coalesce(max(id), 0) FROM public.sessions), 1)
+);
+
+-- One UPDATE per INSERT statement, so batched message writes stay batched
+CREATE OR REPLACE FUNCTION public.bump_session_activity()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE public.sessions s
+    SET last_message_at = greatest(s.last_message_at, n.last_message_at),
+        message_count = s.message_count + n.message_count
+    FROM (
+        SELECT session_id, max("timestamp")::timestamptz AS last_message_at, count(*) AS message_count
+        FROM new_rows
+        GROUP BY session_id
+    ) n
+    WHERE s.id = n.session_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS bump_session_activity ON public.swarm_messages;
+CREATE TRIGGER bump_session_activity
+    AFTER INSERT ON public.swarm_messages
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION public.bump_session_activity();
+
+-- Session summaries now read one row per session
+DROP FUNCTION IF EXISTS public.list_session_summaries(TEXT, INTEGER, TEXT, BIGINT);
+CREATE FUNCTION public.list_session_summaries(
+    p_user_id TEXT DEFAULT NULL,
+    p_limit INTEGER DEFAULT 10,
+    p_before_updated_at TEXT DEFAULT NULL,
+    p_before_id BIGINT DEFAULT NULL
+)
+RETURNS TABLE (
+    id BIGINT,
+    name TEXT,
+    description TEXT,
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    user_id TEXT,
+    message_count BIGINT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT s.id,
+           s.name,
+           coalesce(s.metadata->>'description', ''),
+           s.created_at,
+           s.last_message_at,
+           s.user_id,
+           s.message_count
+    FROM public.sessions s
+    WHERE (p_user_id IS NULL OR s.user_id = p_user_id)
+      AND (p_before_updated_at IS NULL
+           OR (s.last_message_at, s.id) < (p_before_updated_at::timestamptz, p_before_id))
+    ORDER BY s.last_message_at DESC, s.id DESC
+    LIMIT coalesce(p_limit, 10)
+$$;
@@ -0,0 +1,23 @@
+-- Migration 004: Documents table for vectorize_and_store_tool
+-- One row per chunk. (document_id, chunk_index) identifies a chunk, so a
+-- resumed ingestion task can tell which chunks are already stored.
+
+CREATE EXTENSION IF NOT EXISTS vector;
+
+CREATE TABLE IF NOT EXISTS public.documents (
+    id BIGSERIAL PRIMARY KEY,
+    task_id TEXT,
+    document_id TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    title TEXT,
+    content TEXT NOT NULL,
+    metadata JSONB DEFAULT '{}'::jsonb,
+    source_name TEXT,
+    source_url TEXT,
+    embedding_nomic vector(768),
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_documents_document_chunk
+    ON public.documents(document_id, chunk_index);
+CREATE INDEX IF NOT EXISTS idx_documents_source_name ON public.documents(source_name);
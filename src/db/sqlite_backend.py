@@ -0,0 +1,193 @@
+"""
+SQLite backend for DBService.
+
+A local fallback for running without Supabase or Postgres: select it with
+``DATABASE_URL=sqlite:///path/to/file.db``. Statements run on a worker thread
+so the event loop never blocks, the schema below is created on first use, and
+database functions called through ``rpc`` are mapped to equivalent SQL in
+SQLITE_FUNCTIONS (mirroring the Postgres functions in src/db/migrations).
+"""
+
+import asyncio
+import json
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config.database_config import DatabasePoolConfig
+from src.db.backends import DBBackend, build_delete, build_insert, build_select, build_update
+from src.services.logging_service import get_logger
+
+logger = get_logger(__name__)
+
+_PLACEHOLDER_RE = re.compile(r"\$\d+")
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS swarm_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id INTEGER,
+    content TEXT,
+    metadata TEXT DEFAULT '{}',
+    user_id TEXT,
+    "timestamp" TEXT,
+    sender TEXT,
+    target TEXT,
+    request_id TEXT,
+    embedding_nomic TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_swarm_messages_session_ts
+    ON swarm_messages(session_id, "timestamp");
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    metadata TEXT DEFAULT '{}',
+    user_id TEXT,
+    status TEXT DEFAULT 'active',
+    last_message_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    message_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_last_message
+    ON sessions(user_id, last_message_at DESC, id DESC);
+CREATE TRIGGER IF NOT EXISTS bump_session_activity
+    AFTER INSERT ON swarm_messages
+BEGIN
+    UPDATE sessions
+    SET last_message_at = MAX(last_message_at, NEW."timestamp"),
+        message_count = message_count + 1
+    WHERE id = NEW.session_id;
+END;
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id TEXT,
+    document_id TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    title TEXT,
+    content TEXT NOT NULL,
+    metadata TEXT DEFAULT '{}',
+    source_name TEXT,
+    source_url TEXT,
+    embedding_nomic TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+CREATE INDEX IF NOT EXISTS idx_documents_document_chunk
+    ON documents(document_id, chunk_index);
+"""
+
+# SQLite equivalents of the Postgres functions called through rpc().
+# Parameters are bound by name; omitted parameters are bound as NULL.
+SQLITE_FUNCTIONS: Dict[str, str] = {
+    # Mirrors public.list_session_summaries in 003_session_counters.sql
+    "list_session_summaries": """
+        SELECT id,
+               name,
+               COALESCE(json_extract(metadata, '$.description'), '') AS description,
+               created_at,
+               last_message_at AS updated_at,
+               user_id,
+               message_count
+        FROM sessions
+        WHERE (:p_user_id IS NULL OR user_id = :p_user_id)
+          AND (:p_before_updated_at IS NULL
+               OR (last_message_at, id) < (:p_before_updated_at, :p_before_id))
+        ORDER BY last_message_at DESC, id DESC
+        LIMIT COALESCE(:p_limit, 10)
+    """,
+}
+
+
+def _to_sqlite(sql: str, args: List[Any]) -> Tuple[str, List[Any]]:
+    """Convert a $n-parameterized statement to SQLite placeholders and values."""
+    values = [json.dumps(v, default=str) if isinstance(v, (dict, list)) else v for v in args]
+    # SQLite's LIKE is already case-insensitive for ASCII
+    sql = sql.replace(" ILIKE $", " LIKE $")
+    return _PLACEHOLDER_RE.sub("?", sql), values
+
+
+class SQLiteBackend(DBBackend):
+    """Backend storing data in a local SQLite file."""
+
+    def __init__(self, path: str, pool_config: Optional[DatabasePoolConfig] = None):
+        super().__init__(pool_config)
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = asyncio.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self.pool_config.acquire_timeout,
+                check_same_thread=False,
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SQLITE_SCHEMA)
+            self._conn = conn
+            logger.debug(f"Opened SQLite database at {self.path}")
+        return self._conn
+
+    def _run(self, statements: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+        """Execute statements in one transaction and collect the returned rows."""
+        conn = self._connect()
+        rows: List[Dict[str, Any]] = []
+        with conn:
+            for sql, params in statements:
+                rows.extend(dict(row) for row in conn.execute(sql, params).fetchall())
+        return rows
+
+    async def _execute(self, statements: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+        async with self._lock:
+            return await asyncio.to_thread(self._run, statements)
+
+    async def insert(self, table_name: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await self._execute([_to_sqlite(*build_insert(table_name, data))])
+
+    async def insert_many(
+        self, table_name: str, records: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        # SQLite has no DEFAULT inside multi-row VALUES; one transaction instead
+        return await self._execute(
+            [_to_sqlite(*build_insert(table_name, record)) for record in records]
+        )
+
+    async def select(
+        self,
+        table_name: str,
+        columns: str = "*",
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        order_desc: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        return await self._execute(
+            [_to_sqlite(*build_select(table_name, columns, filters, order_by, order_desc, limit))]
+        )
+
+    async def update(
+        self,
+        table_name: str,
+        data: Dict[str, Any],
+        filters: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        return await self._execute([_to_sqlite(*build_update(table_name, data, filters))])
+
+    async def delete(self, table_name: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await self._execute([_to_sqlite(*build_delete(table_name, filters))])
+
+    async def rpc(self, function_name: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        sql = SQLITE_FUNCTIONS.get(function_name)
+        if sql is None:
+            raise ValueError(f"No SQLite equivalent for database function {function_name}")
+        bound = {name: None for name in re.findall(r":(\w+)", sql)}
+        bound.update(params)
+        return await self._execute([(sql, bound)])
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
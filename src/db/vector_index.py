@@ -0,0 +1,609 @@
+"""
+Local approximate-nearest-neighbour index for vector search.
+
+A drop-in for the Supabase ``match_documents`` RPC on a single node: the
+same parameters, rows returned with a ``similarity`` column, no network hop
+and no database needed once the index is on disk.
+
+Each (table, embedding column) pair gets an IVF-flat index: vectors are
+unit-normalized, and once enough exist they are clustered with spherical
+k-means so a query scores only the ``nprobe`` closest cells. Small indexes
+are searched exactly. Rows can be added, replaced and deleted
+incrementally; metadata filters are answered from an inverted index of
+field values and scored exactly over the matching rows.
+
+Indexes persist as ``<table>.<column>.npz`` (vectors, centroids, cell
+assignments) plus ``.json`` (ids and row data). Rebuild one from the
+database with::
+
+    python -m src.db.vector_index rebuild --table swarm_messages
+"""
+
+import asyncio
+import json
+import math
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.config.database_config import VectorIndexConfig
+from src.services.logging_service import get_logger
+from src.utils.embedding_utils import normalize_rows, top_k_similar
+
+logger = get_logger(__name__)
+
+
+def _parse_vector(value: Any) -> Optional[np.ndarray]:
+    """Decode an embedding column value (list, or pgvector/JSON text)."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    return np.asarray(value, dtype=np.float32)
+
+
+_MAX_TERM_LENGTH = 128  # Longer values (e.g. message content) are matched by scanning
+
+
+def _term(key: str, value: Any) -> Optional[Tuple[str, str]]:
+    """Inverted-index term for a short scalar field value, else None."""
+    if isinstance(value, str) and len(value) > _MAX_TERM_LENGTH:
+        return None
+    if value is not None and not isinstance(value, (str, int, float, bool)):
+        return None
+    return key, json.dumps(value)
+
+
+def _fields(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fields a row can be filtered on.
+
+    Top-level fields and the keys of a ``metadata`` object both count, so a
+    filter behaves like the jsonb containment used by match_documents.
+    """
+    fields = dict(row)
+    metadata = row.get("metadata")
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except ValueError:
+            metadata = None
+    if isinstance(metadata, dict):
+        for key, value in metadata.items():
+            fields.setdefault(key, value)
+    return fields
+
+
+def _filter_terms(row: Dict[str, Any]) -> Set[Tuple[str, str]]:
+    """Inverted-index terms for a row's filterable fields."""
+    terms = (_term(key, value) for key, value in _fields(row).items())
+    return {term for term in terms if term is not None}
+
+
+class VectorIndex:
+    """IVF-flat index over unit vectors with ids, row data and filters."""
+
+    def __init__(self, config: Optional[VectorIndexConfig] = None):
+        """
+        Initialize an empty index.
+
+        Args:
+            config: Cell count, probe count and training threshold
+        """
+        self.config = config or VectorIndexConfig()
+        self.dim: Optional[int] = None
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._live = np.empty(0, dtype=bool)
+        self._cells = np.empty(0, dtype=np.int32)
+        self._size = 0  # Slots used, including deleted ones
+        self._ids: List[Any] = []
+        self._rows: List[Optional[Dict[str, Any]]] = []
+        self._slot_of: Dict[Any, int] = {}
+        self._postings: Dict[Tuple[str, str], Set[int]] = {}
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    @property
+    def trained(self) -> bool:
+        """Whether queries probe IVF cells rather than scanning every vector."""
+        return self.centroids is not None
+
+    def add(
+        self,
+        ids: List[Any],
+        vectors: Any,
+        rows: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """
+        Add or replace vectors.
+
+        Args:
+            ids: Record ids; an existing id is replaced
+            vectors: (n, d) vectors, normalized here
+            rows: Optional row data returned with matches and used by filters
+
+        Raises:
+            ValueError: If the dimensions or lengths do not match
+        """
+        if not ids:
+            return
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1))
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self._vectors = np.empty((0, self.dim), dtype=np.float32)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+        rows = rows or [{} for _ in ids]
+        if len(rows) != len(ids):
+            raise ValueError("ids and rows must have the same length")
+
+        self.delete(ids)
+        start, end = self._size, self._size + len(ids)
+        self._reserve(end)
+        self._vectors[start:end] = vectors
+        self._live[start:end] = True
+        self._size = end
+        for slot, (record_id, row) in enumerate(zip(ids, rows), start):
+            self._ids.append(record_id)
+            self._rows.append(row)
+            self._slot_of[record_id] = slot
+            for term in _filter_terms(row):
+                self._postings.setdefault(term, set()).add(slot)
+
+        if not self.trained:
+            if len(self) >= self.config.train_threshold:
+                self.train()
+        elif len(self) > 4 * self._trained_size:
+            self.train()  # Re-balance cells after the index has grown a lot
+        else:
+            self._assign(np.arange(start, end))
+
+    def delete(self, ids: Iterable[Any]) -> int:
+        """
+        Remove vectors by id.
+
+        Args:
+            ids: Record ids; unknown ids are ignored
+
+        Returns:
+            int: Number of vectors removed
+        """
+        removed = 0
+        for record_id in ids:
+            slot = self._slot_of.pop(record_id, None)
+            if slot is None:
+                continue
+            self._live[slot] = False
+            for term in _filter_terms(self._rows[slot]):
+                self._postings.get(term, set()).discard(slot)
+            self._rows[slot] = None
+            removed += 1
+        return removed
+
+    def train(self, iterations: int = 10, seed: int = 0) -> None:
+        """
+        Cluster the live vectors with spherical k-means and rebuild the cells.
+
+        Deleted slots are compacted away first.
+        """
+        self._compact()
+        n = self._size
+        if n == 0:
+            self.centroids = None
+            return
+        nlist = min(n, self.config.nlist or max(1, int(math.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        sample_size = min(n, nlist * 32)
+        sample = self._vectors[rng.choice(n, sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]  # Keep empty cells where they were
+            centroids = normalize_rows(sums)
+        self.centroids = centroids
+        self._lists = [[] for _ in range(nlist)]
+        self._assign(np.arange(n))
+        self._trained_size = n
+        logger.debug(f"Trained vector index: {n} vectors in {nlist} cells")
+
+    def search(
+        self,
+        query: Any,
+        match_count: int = 10,
+        match_threshold: float = 0.0,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[Any, float, Dict[str, Any]]]:
+        """
+        Find the vectors most similar to a query.
+
+        Args:
+            query: Query vector
+            match_count: Maximum number of matches
+            match_threshold: Minimum cosine similarity
+            filters: Field values every match must have
+
+        Returns:
+            List of (id, similarity, row) tuples, most similar first
+
+        Raises:
+            ValueError: If the query dimension does not match the index
+        """
+        if not len(self):
+            return []
+        query = np.asarray(query, dtype=np.float32).ravel()
+        if query.shape[0] != self.dim:
+            raise ValueError(f"Expected a {self.dim}-dimensional query, got {query.shape[0]}")
+
+        if filters:
+            # Filtered searches are exact over the (usually small) matching set
+            indexed = {k: _term(k, v) for k, v in filters.items()}
+            if any(term is not None for term in indexed.values()):
+                postings = [self._postings.get(t, set()) for t in indexed.values() if t is not None]
+                candidates = set.intersection(*sorted(postings, key=len))
+            else:
+                candidates = set(self._slot_of.values())
+            scanned = {k: v for k, v in filters.items() if indexed[k] is None}
+            if scanned:
+                candidates = {
+                    slot
+                    for slot in candidates
+                    if all(_fields(self._rows[slot]).get(k) == v for k, v in scanned.items())
+                }
+            slots = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        elif self.trained:
+            cell_scores = self.centroids @ (query / (np.linalg.norm(query) or 1.0))
+            nprobe = min(self.config.nprobe, len(self._lists))
+            probe = np.argpartition(cell_scores, -nprobe)[-nprobe:]
+            slots = np.fromiter(
+                (slot for cell in probe for slot in self._lists[cell]), dtype=np.int64
+            )
+            slots = slots[self._live[slots]]
+        else:
+            slots = np.flatnonzero(self._live[: self._size])
+        if slots.size == 0:
+            return []
+
+        positions, scores = top_k_similar(
+            query, self._vectors[slots], top_k=match_count, normalized=True
+        )
+        return [
+            (self._ids[slots[p]], float(score), self._rows[slots[p]])
+            for p, score in zip(positions, scores)
+            if score >= match_threshold
+        ]
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to ``<path>.npz`` and ``<path>.json`` atomically.
+
+        Args:
+            path: File path without extension
+        """
+        self._compact()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "vectors": self._vectors[: self._size],
+            "cells": self._cells[: self._size],
+            "centroids": self.centroids if self.trained else np.empty((0, self.dim or 0)),
+        }
+        with open(f"{path}.npz.tmp", "wb") as f:
+            np.savez(f, **arrays)
+        with open(f"{path}.json.tmp", "w") as f:
+            json.dump(
+                {"ids": self._ids, "rows": self._rows, "trained_size": self._trained_size},
+                f,
+                default=str,
+            )
+        os.replace(f"{path}.npz.tmp", f"{path}.npz")
+        os.replace(f"{path}.json.tmp", f"{path}.json")
+
+    @classmethod
+    def load(cls, path: str, config: Optional[VectorIndexConfig] = None) -> "VectorIndex":
+        """
+        Load an index written by save().
+
+        Args:
+            path: File path without extension
+            config: Settings for further adds and searches
+
+        Returns:
+            VectorIndex: The loaded index
+        """
+        index = cls(config)
+        with np.load(f"{path}.npz") as arrays:
+            vectors = arrays["vectors"]
+            cells = arrays["cells"]
+            centroids = arrays["centroids"]
+        with open(f"{path}.json", "r") as f:
+            meta = json.load(f)
+        n = vectors.shape[0]
+        index.dim = vectors.shape[1] if n else None
+        index._vectors = vectors.astype(np.float32, copy=False)
+        index._live = np.ones(n, dtype=bool)
+        index._cells = cells.astype(np.int32, copy=False)
+        index._size = n
+        index._ids = meta["ids"]
+        index._rows = meta["rows"]
+        index._trained_size = meta.get("trained_size", 0)
+        for slot, (record_id, row) in enumerate(zip(index._ids, index._rows)):
+            index._slot_of[record_id] = slot
+            for term in _filter_terms(row):
+                index._postings.setdefault(term, set()).add(slot)
+        if centroids.shape[0]:
+            index.centroids = centroids.astype(np.float32, copy=False)
+            index._lists = [[] for _ in range(centroids.shape[0])]
+            for slot, cell in enumerate(index._cells.tolist()):
+                index._lists[cell].append(slot)
+        return index
+
+    def _reserve(self, size: int) -> None:
+        """Grow the slot arrays geometrically."""
+        capacity = self._vectors.shape[0]
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, 1024)
+        vectors = np.empty((capacity, self.dim), dtype=np.float32)
+        vectors[: self._size] = self._vectors[: self._size]
+        live = np.zeros(capacity, dtype=bool)
+        live[: self._size] = self._live[: self._size]
+        cells = np.zeros(capacity, dtype=np.int32)
+        cells[: self._size] = self._cells[: self._size]
+        self._vectors, self._live, self._cells = vectors, live, cells
+
+    def _assign(self, slots: np.ndarray) -> None:
+        """Put slots into their nearest cell."""
+        for start in range(0, len(slots), 65536):
+            chunk = slots[start : start + 65536]
+            cells = np.argmax(self._vectors[chunk] @ self.centroids.T, axis=1)
+            self._cells[chunk] = cells
+            for slot, cell in zip(chunk.tolist(), cells.tolist()):
+                self._lists[cell].append(slot)
+
+    def _compact(self) -> None:
+        """Drop deleted slots and renumber the rest."""
+        keep = np.flatnonzero(self._live[: self._size])
+        if keep.size == self._size:
+            return
+        self._vectors = self._vectors[keep]
+        self._cells = self._cells[keep]
+        self._live = np.ones(keep.size, dtype=bool)
+        self._ids = [self._ids[i] for i in keep]
+        self._rows = [self._rows[i] for i in keep]
+        self._size = keep.size
+        self._slot_of = {record_id: slot for slot, record_id in enumerate(self._ids)}
+        self._postings = {}
+        for slot, row in enumerate(self._rows):
+            for term in _filter_terms(row):
+                self._postings.setdefault(term, set()).add(slot)
+        if self.trained:
+            self._lists = [[] for _ in range(self.centroids.shape[0])]
+            for slot, cell in enumerate(self._cells.tolist()):
+                self._lists[cell].append(slot)
+
+
+class LocalVectorStore:
+    """Directory of VectorIndex files answering match_documents queries."""
+
+    def __init__(self, config: Optional[VectorIndexConfig] = None):
+        """
+        Initialize the store.
+
+        Args:
+            config: Index directory and IVF settings
+        """
+        self.config = config or VectorIndexConfig()
+        self._indexes: Dict[Tuple[str, str], VectorIndex] = {}
+        # Indexes are updated from worker threads (see DBService); searches wait for updates
+        self._lock = threading.RLock()
+
+    def _path(self, table_name: str, embedding_column: str) -> str:
+        return os.path.join(self.config.path, f"{table_name}.{embedding_column}")
+
+    def get_index(self, table_name: str, embedding_column: str = "embedding_nomic") -> VectorIndex:
+        """
+        Return the index for a table column, loading it from disk on first use.
+
+        Args:
+            table_name: Table the vectors come from
+            embedding_column: Column holding the vectors
+
+        Returns:
+            VectorIndex: Loaded or new empty index
+        """
+        key = (table_name, embedding_column)
+        with self._lock:
+            return self._get_index(key)
+
+    def _get_index(self, key: Tuple[str, str]) -> VectorIndex:
+        if key not in self._indexes:
+            path = self._path(*key)
+            if os.path.exists(f"{path}.npz"):
+                self._indexes[key] = VectorIndex.load(path, self.config)
+                logger.debug(f"Loaded vector index {path} ({len(self._indexes[key])} vectors)")
+            else:
+                self._indexes[key] = VectorIndex(self.config)
+        return self._indexes[key]
+
+    def add_records(
+        self,
+        table_name: str,
+        records: List[Dict[str, Any]],
+        embedding_column: str = "embedding_nomic",
+    ) -> int:
+        """
+        Index rows that carry an embedding; rows without one are skipped.
+
+        Args:
+            table_name: Table the rows belong to
+            records: Rows with an ``id`` and the embedding column
+            embedding_column: Column holding the vectors
+
+        Returns:
+            int: Number of rows indexed
+        """
+        ids, vectors, rows = [], [], []
+        for record in records:
+            vector = _parse_vector(record.get(embedding_column))
+            if vector is None or record.get("id") is None:
+                continue
+            ids.append(record["id"])
+            vectors.append(vector)
+            rows.append({k: v for k, v in record.items() if k != embedding_column})
+        if ids:
+            with self._lock:
+                self.get_index(table_name, embedding_column).add(ids, np.stack(vectors), rows)
+        return len(ids)
+
+    def delete_records(
+        self, table_name: str, ids: List[Any], embedding_column: str = "embedding_nomic"
+    ) -> int:
+        """Remove rows from a table's index by id."""
+        key = (table_name, embedding_column)
+        with self._lock:
+            if key not in self._indexes and not os.path.exists(f"{self._path(*key)}.npz"):
+                return 0  # Table is not indexed; don't create an empty index for it
+            return self._get_index(key).delete(ids)
+
+    async def match_documents(
+        self,
+        query_embedding: List[float],
+        match_threshold: float = 0.0,
+        match_count: int = 10,
+        table_name: str = "swarm_messages",
+        embedding_column: str = "embedding_nomic",
+        filter_object: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Same parameters and result shape as the match_documents RPC.
+
+        Returns:
+            List of matching rows with a ``similarity`` key, most similar first
+        """
+        matches = await asyncio.to_thread(
+            self._search,
+            (table_name, embedding_column),
+            query_embedding,
+            match_count,
+            match_threshold,
+            filter_object,
+        )
+        return [{**row, "id": record_id, "similarity": score} for record_id, score, row in matches]
+
+    def _search(self, key: Tuple[str, str], *args: Any) -> List[Tuple[Any, float, Dict[str, Any]]]:
+        with self._lock:
+            return self._get_index(key).search(*args)
+
+    def save(self) -> None:
+        """Persist every loaded index."""
+        with self._lock:
+            for (table_name, embedding_column), index in self._indexes.items():
+                index.save(self._path(table_name, embedding_column))
+
+    async def rebuild(
+        self,
+        db_service: Any,
+        table_name: str,
+        embedding_column: str = "embedding_nomic",
+        row_columns: Optional[List[str]] = None,
+    ) -> int:
+        """
+        Replace a table's index with the rows currently in the database.
+
+        The table is read in pages of ``rebuild_page_size`` rows ordered by
+        id (keyset pagination), so tables larger than the PostgREST row cap
+        are indexed completely. Searches see the index fill in meanwhile.
+
+        Args:
+            db_service: DBService to read rows from
+            table_name: Table to index
+            embedding_column: Column holding the vectors
+            row_columns: Columns kept with each vector (defaults to the config's)
+
+        Returns:
+            int: Number of rows indexed
+        """
+        key = (table_name, embedding_column)
+        columns = ["id", embedding_column] + list(
+            self.config.row_columns if row_columns is None else row_columns
+        )
+        page_size = self.config.rebuild_page_size
+        with self._lock:
+            self._indexes[key] = VectorIndex(self.config)
+        count = 0
+        last_id = None
+        while True:
+            rows = await db_service.select(
+                table_name,
+                columns=", ".join(columns),
+                filters=None if last_id is None else {"id": ("gt", last_id)},
+                order_by="id",
+                limit=page_size,
+            )
+            if rows:
+                count += await asyncio.to_thread(
+                    self.add_records, table_name, rows, embedding_column
+                )
+                last_id = rows[-1]["id"]
+            if len(rows) < page_size:
+                break
+        await asyncio.to_thread(self._save_index, key)
+        logger.debug(f"Rebuilt vector index for {table_name}.{embedding_column}: {count} rows")
+        return count
+
+    def _save_index(self, key: Tuple[str, str]) -> None:
+        with self._lock:
+            self._indexes[key].save(self._path(*key))
+
+
+async def _rebuild(
+    table_name: str, embedding_column: str, row_columns: Optional[List[str]] = None
+) -> int:
+    from src.config.database_config import get_database_config
+    from src.managers.db_manager import DBService
+
+    db_config = get_database_config()
+    db_service = DBService(pool_config=db_config.pool)
+    try:
+        store = LocalVectorStore(db_config.vector_index)
+        return await store.rebuild(db_service, table_name, embedding_column, row_columns)
+    finally:
+        await db_service.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Rebuild a local vector index from the database."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain the local vector index")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--table", default="swarm_messages")
+    parser.add_argument("--column", default="embedding_nomic")
+    parser.add_argument(
+        "--columns", help="Comma-separated columns to keep with each vector (default from config)"
+    )
+    args = parser.parse_args(argv)
+    row_columns = (
+        [c.strip() for c in args.columns.split(",") if c.strip()] if args.columns else None
+    )
+    try:
+        count = asyncio.run(_rebuild(args.table, args.column, row_columns))
+    except Exception as e:
+        logger.error(f"Error rebuilding vector index: {e}")
+        return 1
+    print(f"Indexed {count} rows from {args.table}.{args.column}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
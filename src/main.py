@@ -18,13 +18,21 @@ from src.agents.llm_query_agent import LLMQueryAgent
 from src.agents.orchestrator_agent import OrchestratorAgent
 from src.agents.personality_agent import PersonalityAgent
 from src.config import Configuration
+from src.config.database_config import get_database_config
+from src.db.vector_index import LocalVectorStore
 from src.managers.db_manager import DBService
 from src.managers.session_manager import SessionManager
+from src.services.embedding_service import EmbeddingWorker
+from src.services.llm_service import LLMService
 from src.services.logging_service import get_logger
 from src.services.message_service import DatabaseMessageService, log_and_persist_message
+from src.services.metrics_service import get_metrics_registry, start_metrics_server
+from src.services.record_service import DatabaseRecordService
 from src.services.session_service import SessionService
+from src.services.write_behind_service import WriteBehindQueue
 from src.state.state_models import MessageState
 from src.tools.initialize_tools import get_registry, initialize_tools
+from src.tools.vectorize_and_store_tool import configure_vectorize_services, resume_vectorize_tasks
 from src.ui.cli.interface import CLIInterface
 
 logger = get_logger(__name__)
@@ -165,16 +173,47 @@ async def run_with_interface(
         else:
             logger.debug("No tools were initialized")
 
+        # Pull and load models now rather than on the first request
+        llm_service = LLMService()
+        if llm_service.embedding_config.warm_up:
+            await llm_service.warm_up()
+
+        # Per-stage latency histograms, optionally scraped over HTTP
+        metrics = get_metrics_registry()
+        metrics_server = None
+        if metrics.enabled and metrics.config.prometheus_port:
+            metrics_server = await start_metrics_server(metrics.config.prometheus_port)
+
         # Initialize core components
         personality_path = find_personality_file(config, personality_file)
         agent, llm_agent = initialize_agents(config, personality_path)
 
         # Initialize database and session services
-        db_service = DBService()
+        db_config = get_database_config()
+        db_service = DBService(pool_config=db_config.pool)
+        # Answer vector searches from a local index that every insert keeps current
+        vector_store = None
+        if db_config.vector_index.enabled:
+            vector_store = LocalVectorStore(db_config.vector_index)
+            db_service.vector_store = vector_store
+        db_service.record_manager = DatabaseRecordService(db_service, vector_store=vector_store)
+        # Queue swarm_messages rows for batched background inserts
+        write_behind = None
+        if db_config.write_behind.enabled:
+            write_behind = WriteBehindQueue(db_service, "swarm_messages", db_config.write_behind)
+        # Embed messages in the background, skipping roles that never need a vector
+        embedding_worker = None
+        if db_config.embeddings.enabled:
+            embedding_worker = EmbeddingWorker(llm_service, db_service, db_config.embeddings)
         # Initialize message service and assign to db_service.message_manager
-        db_message_service = DatabaseMessageService(db_service)
+        db_message_service = DatabaseMessageService(
+            db_service, write_behind=write_behind, embedding_worker=embedding_worker
+        )
         db_service.message_manager = db_message_service
         logger.debug("Initialized database and message services")
+        # Let vectorize_and_store_tool share these services and pick up interrupted tasks
+        configure_vectorize_services(db_service, llm_service, db_config.ingestion)
+        resume_vectorize_tasks()
         session_service = SessionService(db_service)
         session_manager = SessionManager(session_service)
 
@@ -196,8 +235,23 @@ async def run_with_interface(
             logger.warning(f"Interface '{interface_type}' not supported, using CLI")
         interface = CLIInterface(agent, session_manager)
 
-        # Start the interface
-        await interface.start()
+        # Start the interface; shut down in reverse start order however it exits
+        try:
+            await interface.start()
+        finally:
+            if metrics_server is not None:
+                metrics_server.close()
+            if metrics.enabled and metrics.config.json_path:
+                metrics.dump_json(metrics.config.json_path)
+            # Embedding worker first (its jobs feed the write-behind queue), then the queue
+            if embedding_worker is not None:
+                await embedding_worker.close()
+            if write_behind is not None:
+                await write_behind.close()
+            # Closing the database service applies the last queued vector index updates
+            await db_service.close()
+            if vector_store is not None:
+                vector_store.save()
         return 0
 
     except Exception as e:
@@ -1,9 +1,10 @@
-import os
-from typing import Any, Dict, List, Optional, Union
-
-from supabase import Client, create_client
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Union
 
+from src.config.database_config import DatabasePoolConfig
+from src.db.backends import DBBackend, create_backend
 from src.services.logging_service import get_logger
+from src.services.metrics_service import span
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -13,16 +14,69 @@ logger = get_logger(__name__)
 class DBService:
     """Service for interacting with the database."""
 
-    def __init__(self):
-        """Initialize the database service."""
-        url = os.getenv("SUPABASE_URL")  # Preferred: url
-        anon_key = os.getenv("SUPABASE_ANON_KEY")  # Preferred: anon_key
-        service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")  # Preferred: service_role_key
-        if not (url and service_role_key):
-            raise ValueError("url and service_role_key must be set")
+    def __init__(
+        self,
+        backend: Optional[DBBackend] = None,
+        pool_config: Optional[DatabasePoolConfig] = None,
+    ):
+        """
+        Initialize the database service.
+
+        Args:
+            backend: Optional async backend; chosen from the environment when omitted
+                (DATABASE_URL for asyncpg, SUPABASE_URL/SUPABASE_SERVICE_ROLE_KEY for Supabase)
+            pool_config: Optional pool size and timeout settings for the default backend
 
-        self.client: Client = create_client(url, service_role_key)
+        Raises:
+            ValueError: If no database credentials are configured
+        """
+        self.backend: DBBackend = backend or create_backend(pool_config)
         self.message_manager = None  # Will be set in main.py
+        self.record_manager = None  # Will be set in main.py
+        # Optional LocalVectorStore kept in step with writes (set in main.py when enabled)
+        self.vector_store = None
+        # Index updates run in write order on one background task, each in a thread, so
+        # normalizing and k-means training never hold up a write or the event loop
+        self._index_queue: asyncio.Queue = asyncio.Queue()
+        self._index_task: Optional[asyncio.Task] = None
+
+    async def close(self) -> None:
+        """Finish pending index updates and release the backend's pooled connections."""
+        await self.flush_index()
+        if self._index_task is not None:
+            self._index_task.cancel()
+            await asyncio.gather(self._index_task, return_exceptions=True)
+            self._index_task = None
+        await self.backend.close()
+
+    async def flush_index(self) -> None:
+        """Wait until every queued vector index update has been applied."""
+        if self._index_task is not None:
+            await self._index_queue.join()
+
+    def _index(self, table_name: str, rows: List[Dict[str, Any]]) -> None:
+        """Queue written rows that carry an embedding for the local vector index."""
+        if self.vector_store is None or not rows:
+            return
+        # Copies, so callers may modify the returned rows before the update runs
+        self._queue_index(self.vector_store.add_records, table_name, [dict(r) for r in rows])
+
+    def _queue_index(self, func: Callable[..., Any], table_name: str, *args: Any) -> None:
+        if self._index_task is None or self._index_task.done():
+            self._index_task = asyncio.create_task(self._run_index())
+        self._index_queue.put_nowait((func, table_name, args))
+
+    async def _run_index(self) -> None:
+        """Apply queued index updates one at a time, off the event loop."""
+        while True:
+            func, table_name, args = await self._index_queue.get()
+            try:
+                await asyncio.to_thread(func, table_name, *args)
+            except Exception as e:
+                # The write itself succeeded; the index catches up on the next rebuild
+                logger.error(f"Error updating the local vector index for {table_name}: {e}")
+            finally:
+                self._index_queue.task_done()
 
     async def insert(self, table_name: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -36,14 +90,40 @@ class DBService:
             RuntimeError: If insert fails
         """
         try:
-            response = self.client.table(table_name).insert(data).execute()
-            if not response.data:
+            with span("db_insert", table=table_name):
+                rows = await self.backend.insert(table_name, data)
+            if not rows:
                 raise RuntimeError(f"Insert operation returned no data")
-            return response.data[0]
+            self._index(table_name, rows)
+            return rows[0]
         except Exception as e:
             logger.error(f"Error inserting record into {table_name}: {e}")
             raise RuntimeError(f"Error inserting record into {table_name}: {e}")
 
+    async def insert_many(
+        self, table_name: str, records: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Insert several records into a table with a single bulk statement.
+        Args:
+            table_name: Name of the table
+            records: Records to insert
+        Returns:
+            Inserted records
+        Raises:
+            RuntimeError: If insert fails
+        """
+        if not records:
+            return []
+        try:
+            with span("db_insert_many", table=table_name):
+                rows = await self.backend.insert_many(table_name, records)
+        except Exception as e:
+            logger.error(f"Error bulk inserting {len(records)} records into {table_name}: {e}")
+            raise RuntimeError(f"Error bulk inserting records into {table_name}: {e}")
+        self._index(table_name, rows)
+        return rows
+
     async def select(
         self,
         table_name: str,
@@ -58,7 +138,8 @@ class DBService:
         Args:
             table_name: Name of the table
             columns: Columns to select
-            filters: Optional dictionary of filter conditions
+            filters: Optional dictionary of filter conditions; a value may be an
+                ``(operator, value)`` tuple such as ``("gt", 10)`` or ``("ilike", "%a%")``
             order_by: Optional column to order by
             order_desc: Whether to order in descending order
             limit: Maximum number of records to return
@@ -68,16 +149,14 @@ class DBService:
             RuntimeError: If select fails
         """
         try:
-            query = self.client.table(table_name).select(columns)
-            if filters:
-                for column, value in filters.items():
-                    query = query.eq(column, value)
-            if order_by:
-                query = query.order(order_by, desc=order_desc)
-            if limit:
-                query = query.limit(limit)
-            response = query.execute()
-            return response.data or []
+            return await self.backend.select(
+                table_name,
+                columns=columns,
+                filters=filters,
+                order_by=order_by,
+                order_desc=order_desc,
+                limit=limit,
+            )
         except Exception as e:
             logger.error(f"Error selecting records from {table_name}: {e}")
             raise RuntimeError(f"Error selecting records from {table_name}: {e}")
@@ -102,10 +181,11 @@ class DBService:
             RuntimeError: If update fails
         """
         try:
-            response = self.client.table(table_name).update(data).eq(id_column, record_id).execute()
-            if not response.data:
+            rows = await self.backend.update(table_name, data, {id_column: record_id})
+            if not rows:
                 raise RuntimeError(f"Update operation returned no data")
-            return response.data[0]
+            self._index(table_name, rows)
+            return rows[0]
         except Exception as e:
             logger.error(f"Error updating record {record_id} in {table_name}: {e}")
             raise RuntimeError(f"Error updating record {record_id} in {table_name}: {e}")
@@ -122,11 +202,29 @@ class DBService:
             RuntimeError: If delete fails
         """
         try:
-            query = self.client.table(table_name).delete()
-            for column, value in filters.items():
-                query = query.eq(column, value)
-            response = query.execute()
-            return response.data or []
+            rows = await self.backend.delete(table_name, filters)
         except Exception as e:
             logger.error(f"Error deleting records from {table_name}: {e}")
             raise RuntimeError(f"Error deleting records from {table_name}: {e}")
+        if self.vector_store is not None and rows:
+            self._queue_index(
+                self.vector_store.delete_records, table_name, [row.get("id") for row in rows]
+            )
+        return rows
+
+    async def rpc(self, function_name: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Call a database function (Supabase RPC / Postgres function).
+        Args:
+            function_name: Name of the database function
+            params: Named function arguments
+        Returns:
+            List of rows returned by the function
+        Raises:
+            RuntimeError: If the call fails
+        """
+        try:
+            return await self.backend.rpc(function_name, params)
+        except Exception as e:
+            logger.error(f"Error calling database function {function_name}: {e}")
+            raise RuntimeError(f"Error calling database function {function_name}: {e}")
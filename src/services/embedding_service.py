@@ -0,0 +1,253 @@
+"""
+Background embedding worker for message ingestion.
+
+Embedding every message inline adds an Ollama round trip to each turn, and
+the orchestrator logs the same multi-kilobyte system prompt on every turn.
+This worker takes embedding off the hot path:
+
+- texts are deduplicated by SHA-256 content hash, both against requests
+  already in flight and against a small LRU cache of recent vectors;
+- pending texts are batched into a single /api/embed call by a small pool
+  of worker tasks;
+- vectors are attached to queued rows or backfilled onto persisted rows
+  asynchronously, and a per-role policy skips roles that never need one.
+"""
+
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Union
+
+from src.config.database_config import MessageEmbeddingConfig
+from src.services.logging_service import get_logger
+
+logger = get_logger(__name__)
+
+_STOP = object()  # Sentinel telling a worker task to exit
+
+
+def content_hash(text: str) -> str:
+    """Return the SHA-256 hex digest used to deduplicate texts."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingWorker:
+    """Pool of tasks that embed texts in deduplicated batches."""
+
+    def __init__(
+        self,
+        llm_service: Any,
+        db_service: Any = None,
+        config: Optional[MessageEmbeddingConfig] = None,
+        column: str = "embedding_nomic",
+    ):
+        """
+        Initialize the embedding worker.
+
+        Args:
+            llm_service: Service exposing async get_embeddings(texts)
+            db_service: Database service used for backfilling persisted rows
+            config: Batch size, flush interval, pool size, cache size and skip policy
+            column: Column the vector is stored in
+        """
+        self.llm_service = llm_service
+        self.db_service = db_service
+        self.config = config or MessageEmbeddingConfig()
+        self.column = column
+        self.skip_roles: Set[str] = {r.lower() for r in self.config.skip_roles}
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._texts: Dict[str, str] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._workers: List[asyncio.Task] = []
+        self._jobs: Set[asyncio.Task] = set()
+        self._closing = False  # No new background jobs
+        self._closed = False  # Worker tasks stopped
+        self.stats = {"requested": 0, "deduplicated": 0, "embedded": 0, "batches": 0, "failed": 0}
+
+    def should_embed(self, role: Union[str, Any]) -> bool:
+        """
+        Check the per-role policy.
+
+        Args:
+            role: Message role (MessageRole or plain string)
+
+        Returns:
+            bool: False for roles configured to be stored without an embedding
+        """
+        return str(getattr(role, "value", role)).lower() not in self.skip_roles
+
+    def start(self) -> None:
+        """Start the worker tasks if they are not already running."""
+        self._workers = [t for t in self._workers if not t.done()]
+        for _ in range(self.config.workers - len(self._workers)):
+            self._workers.append(asyncio.create_task(self._run()))
+
+    async def embed(self, text: str) -> List[float]:
+        """
+        Embed a text, sharing work with identical texts already queued or cached.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            List[float]: Embedding vector
+
+        Raises:
+            RuntimeError: If the worker is closed or the embedding call fails
+        """
+        if self._closed:
+            raise RuntimeError("Embedding worker is closed")
+        self.stats["requested"] += 1
+        key = content_hash(text)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.stats["deduplicated"] += 1
+            return self._cache[key]
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["deduplicated"] += 1
+        else:
+            self.start()
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            self._texts[key] = text
+            self._queue.put_nowait(key)
+        return await asyncio.shield(future)
+
+    def attach(
+        self,
+        record: Dict[str, Any],
+        text: str,
+        sink: Callable[[Dict[str, Any]], Awaitable[Any]],
+    ) -> None:
+        """
+        Embed a not-yet-persisted row in the background, then hand it to sink.
+
+        The row is passed on even if embedding fails, so persistence never
+        depends on the embedding model being available.
+
+        Args:
+            record: Row to receive the vector
+            text: Text to embed
+            sink: Coroutine function that persists the row (e.g. a write-behind enqueue)
+        """
+
+        async def job():
+            try:
+                record[self.column] = await self.embed(text)
+            except Exception as e:
+                logger.error(f"Embedding failed, persisting row without {self.column}: {e}")
+            await sink(record)
+
+        self._track(job())
+
+    def backfill(self, table_name: str, record_id: Union[int, str], text: str) -> None:
+        """
+        Embed a persisted row in the background and update its vector column.
+
+        Args:
+            table_name: Table holding the row
+            record_id: Row id
+            text: Text to embed
+        """
+
+        async def job():
+            try:
+                embedding = await self.embed(text)
+                await self.db_service.update(table_name, record_id, {self.column: embedding})
+            except Exception as e:
+                logger.error(
+                    f"Error backfilling {self.column} for {table_name} row {record_id}: {e}"
+                )
+
+        self._track(job())
+
+    async def close(self) -> None:
+        """Finish queued and scheduled work, then stop the worker tasks."""
+        if self._closing:
+            return
+        self._closing = True
+        while self._jobs:
+            await asyncio.gather(*list(self._jobs), return_exceptions=True)
+        self._closed = True
+        for _ in self._workers:
+            self._queue.put_nowait(_STOP)
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def _track(self, coro: Awaitable[Any]) -> None:
+        """Run a background job and keep a reference until it finishes."""
+        if self._closing:
+            raise RuntimeError("Embedding worker is closed")
+        task = asyncio.ensure_future(coro)
+        self._jobs.add(task)
+        task.add_done_callback(self._jobs.discard)
+
+    async def _run(self) -> None:
+        """Worker loop: gather a batch of content hashes and embed them together."""
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            if first is _STOP:
+                return
+            keys = [first]
+            stopping = False
+            deadline = loop.time() + self.config.flush_interval
+            while len(keys) < self.config.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    key = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                if key is _STOP:
+                    stopping = True
+                    break
+                keys.append(key)
+            try:
+                await self._embed_batch(keys)
+            except Exception as e:
+                # A failed batch must not take the worker down with it
+                logger.error(f"Embedding worker error: {e}")
+            if stopping:
+                return
+
+    async def _embed_batch(self, keys: List[str]) -> None:
+        """Embed one batch and resolve (or fail) the futures waiting on it."""
+        error: Exception = RuntimeError("Embedding batch did not complete")
+        try:
+            texts = [self._texts.pop(key) for key in keys]
+            embeddings = await self.llm_service.get_embeddings(texts)
+            if len(embeddings) != len(keys):
+                raise RuntimeError(
+                    f"Embedding service returned {len(embeddings)} vectors for {len(keys)} texts"
+                )
+            self.stats["batches"] += 1
+            self.stats["embedded"] += len(keys)
+            for key, embedding in zip(keys, embeddings):
+                if self.config.cache_size:
+                    self._cache[key] = embedding
+                    if len(self._cache) > self.config.cache_size:
+                        self._cache.popitem(last=False)
+                future = self._inflight.pop(key)
+                if not future.done():
+                    future.set_result(embedding)
+        except Exception as e:
+            error = e
+            logger.error(f"Error embedding a batch of {len(keys)} texts: {e}")
+        finally:
+            # Never leave a caller waiting: fail whatever this batch did not resolve,
+            # including when the worker is cancelled mid-batch
+            unresolved = [key for key in keys if key in self._inflight]
+            if unresolved:
+                self.stats["failed"] += len(unresolved)
+                for key in unresolved:
+                    self._texts.pop(key, None)
+                    future = self._inflight.pop(key)
+                    if not future.done():
+                        future.set_exception(error)
+
+
+__all__ = ["EmbeddingWorker", "content_hash"]
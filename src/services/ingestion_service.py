@@ -0,0 +1,363 @@
+"""
+Streaming document ingestion: clean -> chunk -> embed -> store.
+
+Each stage runs its own pool of workers connected by bounded queues, so a
+large dump never sits in memory at once and the slowest stage (normally the
+embedding model) sets the pace:
+
+- chunk workers split and clean documents on worker threads;
+- embed workers send batches of chunks to the embedding model;
+- store workers bulk insert embedded chunks.
+
+Before work starts the task's input is written to a checkpoint directory,
+and every stored batch is appended to a progress journal. A task that was
+interrupted can be resumed from those files and skips the chunks that were
+already stored; at worst the batch in flight at the crash is stored twice.
+The checkpoint is also kept after embed or store errors (which a later run
+may get past), but only for one resume: a task that fails again, or that
+failed only on documents that cannot be chunked, is finished for good.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from src.config.database_config import IngestionConfig
+from src.services.logging_service import get_logger
+from src.utils.text_processing import (
+    Tokenizer,
+    chunk_text_by_tokens,
+    clean_text,
+    generate_chunk_metadata,
+)
+
+logger = get_logger(__name__)
+
+_STOP = object()  # Sentinel telling a stage worker to exit
+
+EmbedFn = Callable[[List[str]], Awaitable[List[List[float]]]]
+StoreFn = Callable[[List[Dict[str, Any]]], Awaitable[Any]]
+
+
+class IngestionPipeline:
+    """Bounded producer/consumer pipeline for one ingestion task."""
+
+    def __init__(
+        self,
+        task_id: str,
+        embed_fn: EmbedFn,
+        store_fn: StoreFn,
+        config: Optional[IngestionConfig] = None,
+        column: str = "embedding_nomic",
+        max_tokens: Optional[int] = None,
+        tokenizer: Optional[Tokenizer] = None,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            task_id: Identifier of the task, also naming its checkpoint files
+            embed_fn: Coroutine function embedding a list of texts in order
+            store_fn: Coroutine function bulk inserting a list of rows
+            config: Queue bound, worker counts, batch sizes and checkpoint directory
+            column: Column the vectors are stored in
+            max_tokens: Embedding model context window; chunks never exceed it
+            tokenizer: Embedding model's tokenizer for exact counts (approximate by default)
+        """
+        self.task_id = task_id
+        self.embed_fn = embed_fn
+        self.store_fn = store_fn
+        self.config = config or IngestionConfig()
+        self.column = column
+        self.max_tokens = max_tokens
+        self.tokenizer = tokenizer
+        checkpoint_dir = Path(self.config.checkpoint_dir)
+        self.input_path = checkpoint_dir / f"{task_id}.json"
+        self.journal_path = checkpoint_dir / f"{task_id}.progress"
+        self._retryable_errors = 0  # Embed/store failures, which a resume may get past
+        self._journal_lock = threading.Lock()  # Store workers append from worker threads
+        self.progress: Dict[str, Any] = {
+            "task_id": task_id,
+            "status": "pending",
+            "stages": {
+                "clean": {"done": 0, "total": 0},
+                "chunk": {"done": 0},
+                "embed": {"done": 0},
+                "store": {"done": 0},
+            },
+            "skipped_chunks": 0,
+            "errors": [],
+            "resumable": False,
+            "started_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def save_input(self, spec: Dict[str, Any]) -> None:
+        """Write the task input so the task can be resumed after a crash."""
+        self.input_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.input_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(spec, f)
+        os.replace(tmp_path, self.input_path)
+
+    def load_input(self) -> Dict[str, Any]:
+        """Read the task input saved by save_input()."""
+        with open(self.input_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def stored_keys(self) -> Set[Tuple[str, int]]:
+        """(document_id, chunk_index) pairs already stored according to the journal."""
+        if not self.journal_path.exists():
+            return set()
+        keys = set()
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    document_id, chunk_index = json.loads(line)
+                except ValueError:
+                    continue  # Torn final line from a crash
+                keys.add((document_id, chunk_index))
+        return keys
+
+    async def run(self, spec: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Run (or resume) the task to completion.
+
+        Args:
+            spec: Task input (items, source_name, source_url, chunk_size,
+                chunk_overlap, metadata); loaded from the checkpoint when omitted
+
+        Returns:
+            Dict[str, Any]: Final progress, with status "completed",
+            "completed_with_errors" or "failed" (a worker died and the rest were
+            cancelled); "resumable" is True when the checkpoint was kept for
+            another attempt (embed/store errors or a failure on a first run)
+        """
+        resuming = spec is None
+        if resuming:
+            spec = self.load_input()
+        else:
+            self.save_input(spec)
+        done = self.stored_keys()
+        self.progress.update(
+            {"status": "running", "source_name": spec.get("source_name"), "resumed": bool(done)}
+        )
+        self.progress["stages"]["clean"]["total"] = len(spec["items"])
+
+        size = self.config.queue_size
+        documents: asyncio.Queue = asyncio.Queue(maxsize=size)
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=size)
+        embedded: asyncio.Queue = asyncio.Queue(maxsize=size)
+        stages = [
+            (self._chunk_worker, documents, chunks, self.config.chunk_workers, (spec, done)),
+            (self._embed_worker, chunks, embedded, self.config.embed_workers, ()),
+            (self._store_worker, embedded, None, self.config.store_workers, ()),
+        ]
+        pools = [
+            [asyncio.create_task(worker(inbox, outbox, *args)) for _ in range(count)]
+            for worker, inbox, outbox, count, args in stages
+        ]
+
+        workers = [task for pool in pools for task in pool]
+        feeder = asyncio.create_task(self._feed(spec["items"], stages, pools))
+        await asyncio.wait([feeder, *workers], return_when=asyncio.FIRST_EXCEPTION)
+        failed = not feeder.done() or feeder.exception() is not None
+        if failed:
+            # A dead worker leaves the stages around it blocked on their queues
+            for task in [feeder, *workers]:
+                task.cancel()
+            await asyncio.gather(feeder, *workers, return_exceptions=True)
+            for task in [feeder, *workers]:
+                if not task.cancelled() and task.exception() is not None:
+                    self._error(f"Ingestion worker failed: {task.exception()}")
+
+        errors = self.progress["errors"]
+        if failed:
+            self.progress["status"] = "failed"
+        else:
+            self.progress["status"] = "completed_with_errors" if errors else "completed"
+        self.progress["completed_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        # One resume per task, so a chunk that always fails cannot re-run it on every start
+        self.progress["resumable"] = bool(self._retryable_errors) and not resuming
+        if not self.progress["resumable"]:
+            self.input_path.unlink(missing_ok=True)
+            self.journal_path.unlink(missing_ok=True)
+        logger.debug(
+            f"Ingestion task {self.task_id} {self.progress['status']}: "
+            f"{self.progress['stages']['store']['done']} chunks stored"
+        )
+        return self.progress
+
+    async def _feed(
+        self, items: List[Dict[str, Any]], stages: List[Tuple], pools: List[List[asyncio.Task]]
+    ) -> None:
+        """Queue the documents, then stop each stage once the one feeding it has finished."""
+        for item in items:
+            await stages[0][1].put(item)
+        for (_, inbox, _, count, _), pool in zip(stages, pools):
+            for _ in range(count):
+                await inbox.put(_STOP)
+            await asyncio.gather(*pool)
+
+    def _chunk_document(self, item: Dict[str, Any], spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Clean and chunk one document into rows awaiting their vectors (worker thread)."""
+        document_id = str(item["id"])
+        title = item.get("title") or spec.get("source_name", "")
+        # Chunk before cleaning: cleaning collapses the newlines chunking splits on
+        pieces = chunk_text_by_tokens(
+            item.get("content", ""),
+            chunk_size=spec.get("chunk_size", 1000),
+            chunk_overlap=spec.get("chunk_overlap", 200),
+            tokenizer=self.tokenizer,
+            max_tokens=self.max_tokens,
+        )
+        pieces = [piece for piece in map(clean_text, pieces) if piece]
+        extra = {**(spec.get("metadata") or {}), **(item.get("metadata") or {})}
+        if spec.get("source_url"):
+            extra.setdefault("source_url", spec["source_url"])
+        return [
+            {
+                "task_id": self.task_id,
+                "document_id": document_id,
+                "chunk_index": index,
+                "title": title,
+                "content": piece,
+                "metadata": generate_chunk_metadata(
+                    piece,
+                    chunk_id=f"{document_id}-chunk-{index}",
+                    document_id=document_id,
+                    document_name=title,
+                    chunk_index=index,
+                    total_chunks=len(pieces),
+                    additional_metadata=extra,
+                ),
+                "source_name": spec.get("source_name"),
+                "source_url": spec.get("source_url"),
+            }
+            for index, piece in enumerate(pieces)
+        ]
+
+    async def _chunk_worker(
+        self,
+        inbox: asyncio.Queue,
+        outbox: asyncio.Queue,
+        spec: Dict[str, Any],
+        done: Set[Tuple[str, int]],
+    ) -> None:
+        stages = self.progress["stages"]
+        while True:
+            item = await inbox.get()
+            if item is _STOP:
+                return
+            try:
+                rows = await asyncio.to_thread(self._chunk_document, item, spec)
+            except Exception as e:
+                self._error(f"Error chunking document {item.get('id')}: {e}", retryable=False)
+                continue
+            stages["clean"]["done"] += 1
+            for row in rows:
+                stages["chunk"]["done"] += 1
+                if (row["document_id"], row["chunk_index"]) in done:
+                    self.progress["skipped_chunks"] += 1
+                    continue
+                await outbox.put(row)
+
+    async def _embed_worker(self, inbox: asyncio.Queue, outbox: asyncio.Queue) -> None:
+        while True:
+            batch, stopping = await self._next_batch(inbox, self.config.embed_batch_size)
+            if batch:
+                try:
+                    vectors = await self.embed_fn([row["content"] for row in batch])
+                except Exception as e:
+                    self._error(f"Error embedding {len(batch)} chunks: {e}")
+                else:
+                    if len(vectors) != len(batch):
+                        self._error(
+                            f"Error embedding {len(batch)} chunks: got {len(vectors)} vectors"
+                        )
+                    else:
+                        for row, vector in zip(batch, vectors):
+                            row[self.column] = vector
+                            await outbox.put(row)
+                        self.progress["stages"]["embed"]["done"] += len(batch)
+            if stopping:
+                return
+
+    async def _store_worker(self, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue]) -> None:
+        while True:
+            batch, stopping = await self._next_batch(inbox, self.config.store_batch_size)
+            if batch:
+                try:
+                    await self.store_fn(batch)
+                except Exception as e:
+                    self._error(f"Error storing {len(batch)} chunks: {e}")
+                else:
+                    self.progress["stages"]["store"]["done"] += len(batch)
+                    try:
+                        await asyncio.to_thread(self._journal, batch)
+                    except OSError as e:
+                        # The rows are stored; resuming would only store them again
+                        self._error(
+                            f"Error journaling {len(batch)} stored chunks: {e}", retryable=False
+                        )
+            if stopping:
+                return
+
+    def _journal(self, batch: List[Dict[str, Any]]) -> None:
+        """Append stored (document_id, chunk_index) pairs to the journal (worker thread)."""
+        with self._journal_lock, open(self.journal_path, "a", encoding="utf-8") as f:
+            f.writelines(
+                json.dumps([row["document_id"], row["chunk_index"]]) + "\n" for row in batch
+            )
+
+    async def _next_batch(self, inbox: asyncio.Queue, batch_size: int) -> Tuple[List[Any], bool]:
+        """Wait for one row, then up to flush_interval for more, up to batch_size."""
+        first = await inbox.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.flush_interval
+        while len(batch) < batch_size:
+            try:
+                row = inbox.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(inbox.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+            if row is _STOP:
+                return batch, True
+            batch.append(row)
+        return batch, False
+
+    def _error(self, message: str, retryable: bool = True) -> None:
+        logger.error(message)
+        self.progress["errors"].append(message)
+        if retryable:
+            self._retryable_errors += 1
+
+
+def pending_task_ids(config: Optional[IngestionConfig] = None) -> List[str]:
+    """
+    List tasks whose checkpoint shows they never completed.
+
+    Args:
+        config: Ingestion config naming the checkpoint directory
+
+    Returns:
+        List[str]: Task ids that can be resumed
+    """
+    checkpoint_dir = Path((config or IngestionConfig()).checkpoint_dir)
+    if not checkpoint_dir.exists():
+        return []
+    return sorted(path.stem for path in checkpoint_dir.glob("*.json"))
+
+
+__all__ = ["IngestionPipeline", "pending_task_ids"]
@@ -0,0 +1,221 @@
+"""
+Response cache for LLM generation.
+
+Identical prompts (e.g. repeated completed-tool summaries) otherwise cost a
+full Ollama round trip each time. Entries are keyed on a SHA-256 of the
+whitespace-normalized prompt together with the model and every sampling
+parameter, so a change of model or temperature never returns a stale answer.
+
+- Exact lookups are a dictionary hit.
+- With a semantic threshold and an embedding function, a miss falls back to
+  the most similar cached prompt for the same model and parameters.
+- Entries expire after a TTL, and the least recently used entry is evicted
+  once the cache is full.
+- Counters report hits, semantic hits, misses and the generation latency
+  saved by serving from the cache.
+"""
+
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.config.llm_config import LLMCacheConfig
+from src.services.logging_service import get_logger
+
+logger = get_logger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse runs of whitespace so formatting-only differences share a key."""
+    return _WHITESPACE_RE.sub(" ", prompt).strip()
+
+
+@dataclass
+class CacheEntry:
+    """A cached response and what it cost to produce."""
+
+    response: str
+    scope: str
+    created_at: float
+    latency: float
+    embedding: Optional[np.ndarray] = None
+
+
+class LLMResponseCache:
+    """LRU/TTL cache of LLM responses with optional semantic lookup."""
+
+    def __init__(
+        self,
+        config: Optional[LLMCacheConfig] = None,
+        embed_fn: Optional[Callable[[str], Awaitable[List[float]]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the response cache.
+
+        Args:
+            config: Size, TTL and semantic threshold settings
+            embed_fn: Coroutine function embedding a prompt; required for semantic lookup
+            clock: Time source used for TTL checks
+        """
+        self.config = config or LLMCacheConfig()
+        self.embed_fn = embed_fn
+        self.clock = clock
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._last_embedding: Optional[tuple] = None  # (text, vector) shared by get and put
+        self.stats = {"hits": 0, "semantic_hits": 0, "misses": 0, "saved_latency": 0.0}
+
+    @property
+    def semantic(self) -> bool:
+        """Whether misses fall back to embedding similarity."""
+        return self.config.semantic_threshold is not None and self.embed_fn is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_scope(model: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Identify the model and sampling parameters an answer is valid for."""
+        return json.dumps({"model": model, **(params or {})}, sort_keys=True, default=str)
+
+    @staticmethod
+    def make_key(prompt: str, scope: str) -> str:
+        """Return the exact-match key for a prompt within a scope."""
+        digest = hashlib.sha256(scope.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalize_prompt(prompt).encode("utf-8"))
+        return digest.hexdigest()
+
+    async def get(
+        self, prompt: str, model: str, params: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            prompt: The input prompt
+            model: Model the response must come from
+            params: Sampling parameters the response must have been generated with
+
+        Returns:
+            Optional[str]: Cached response, or None on a miss
+        """
+        scope = self.make_scope(model, params)
+        self._expire()
+        key = self.make_key(prompt, scope)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            self.stats["saved_latency"] += entry.latency
+            return entry.response
+
+        if self.semantic:
+            match = await self._semantic_lookup(prompt, scope)
+            if match is not None:
+                self._entries.move_to_end(match)
+                entry = self._entries[match]
+                self.stats["semantic_hits"] += 1
+                self.stats["saved_latency"] += entry.latency
+                return entry.response
+
+        self.stats["misses"] += 1
+        return None
+
+    async def put(
+        self,
+        prompt: str,
+        model: str,
+        response: str,
+        params: Optional[Dict[str, Any]] = None,
+        latency: float = 0.0,
+    ) -> None:
+        """
+        Store a response.
+
+        Args:
+            prompt: The input prompt
+            model: Model that produced the response
+            response: Generated text
+            params: Sampling parameters used
+            latency: Seconds the generation took, credited to later hits
+        """
+        scope = self.make_scope(model, params)
+        embedding = None
+        if self.semantic:
+            embedding = await self._embed(prompt)
+        key = self.make_key(prompt, scope)
+        self._entries[key] = CacheEntry(response, scope, self.clock(), latency, embedding)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.config.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict[str, Any]: Hits, semantic hits, misses, hit rate, saved latency and size
+        """
+        lookups = self.stats["hits"] + self.stats["semantic_hits"] + self.stats["misses"]
+        served = self.stats["hits"] + self.stats["semantic_hits"]
+        return {
+            **self.stats,
+            "hit_rate": served / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
+
+    def _expire(self) -> None:
+        """Remove entries older than the TTL."""
+        cutoff = self.clock() - self.config.ttl_seconds
+        for key in [k for k, e in self._entries.items() if e.created_at <= cutoff]:
+            del self._entries[key]
+
+    async def _embed(self, prompt: str) -> Optional[np.ndarray]:
+        """Embed a prompt as a unit vector; failures only disable the semantic path."""
+        text = normalize_prompt(prompt)
+        if self._last_embedding is not None and self._last_embedding[0] == text:
+            return self._last_embedding[1]
+        try:
+            vector = np.asarray(await self.embed_fn(text), dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Error embedding prompt for response cache: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        unit = vector / norm if norm else None
+        self._last_embedding = (text, unit)
+        return unit
+
+    async def _semantic_lookup(self, prompt: str, scope: str) -> Optional[str]:
+        """Return the key of the most similar cached prompt above the threshold."""
+        candidates = [
+            (key, entry.embedding)
+            for key, entry in self._entries.items()
+            if entry.scope == scope and entry.embedding is not None
+        ]
+        if not candidates:
+            return None
+        query = await self._embed(prompt)
+        if query is None:
+            return None
+        scores = np.stack([embedding for _, embedding in candidates]) @ query
+        best = int(np.argmax(scores))
+        if scores[best] >= self.config.semantic_threshold:
+            logger.debug(f"Semantic cache hit with similarity {scores[best]:.3f}")
+            return candidates[best][0]
+        return None
+
+
+__all__ = ["CacheEntry", "LLMResponseCache", "normalize_prompt"]
@@ -16,11 +16,11 @@ The key distinction of this being a service (vs a manager) is that it:
 
 """
 
+import asyncio
 import json
 import os
-import traceback
-import uuid
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import httpx
 import ollama
@@ -28,8 +28,10 @@ import ollama
 # Import OllamaClient for embeddings
 from ollama import Client as OllamaClient
 
-from src.config.llm_config import get_default_model
+from src.config.llm_config import get_default_model, get_llm_cache_config, get_llm_embedding_config
+from src.services.llm_cache_service import LLMResponseCache
 from src.services.logging_service import get_logger
+from src.services.metrics_service import span
 from src.state.state_models import MessageRole, MessageState, TaskStatus
 from src.tools.orchestrator_tools import format_completed_tools_prompt
 
@@ -82,6 +84,14 @@ class LLMService:
         self.api_url = api_url
         self.model = model
         self.client = httpx.AsyncClient()
+        self.embedding_config = get_llm_embedding_config()
+        self._embed_semaphore: Optional[tuple] = None  # (event loop, Semaphore)
+        cache_config = get_llm_cache_config()
+        self.cache: Optional[LLMResponseCache] = (
+            LLMResponseCache(cache_config, embed_fn=self._embed_prompt)
+            if cache_config.enabled
+            else None
+        )
 
         logger.debug(f"LLM Service initialized with API URL: {self.api_url}")
         logger.debug("Created async HTTP client")
@@ -100,6 +110,24 @@ class LLMService:
         """Close the HTTP client."""
         await self.client.aclose()
 
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get response cache statistics.
+
+        Returns:
+            Dict[str, Any]: Hits, semantic hits, misses, hit rate, saved latency
+            (seconds) and current size; empty counters if caching is disabled
+        """
+        if self.cache is None:
+            return {"enabled": False, "size": 0}
+        return {"enabled": True, **self.cache.get_stats()}
+
+    async def clear_cache(self) -> None:
+        """Clear the response cache."""
+        if self.cache is not None:
+            self.cache.clear()
+            logger.debug("Cleared LLM cache")
+
     def _format_json(self, data: Dict[Any, Any]) -> str:
         """Format JSON data for logging with consistent indentation."""
         return json.dumps(data, indent=2)
@@ -136,13 +164,49 @@ class LLMService:
         logger.debug(f"\nResponse details:\n{self._format_json(cleaned_response)}")
         logger.debug("-" * 80)
 
-    async def generate(self, prompt: str, model: Optional[str] = None) -> str:
+    async def _embed_prompt(self, prompt: str) -> List[float]:
+        """Embed a prompt for semantic response-cache lookups."""
+        return (await self.get_embeddings([prompt]))[0]
+
+    def _generation_options(self, temperature: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Ollama options shared by generate() and stream().
+
+        Args:
+            temperature: Optional override of the configured temperature
+
+        Returns:
+            Dict with ``temperature`` and ``num_ctx`` (context window)
+        """
+        from src.config.llm_config import get_llm_config
+
+        llm_config = get_llm_config()
+        configured = getattr(llm_config, "temperature", 0.1)
+        context_window = getattr(llm_config, "context_window", 16384)
+        # Try to get per-model settings if available
+        if hasattr(llm_config, "models") and "conversation" in llm_config.models:
+            conversation_cfg = llm_config.models["conversation"]
+            configured = conversation_cfg.get("temperature", configured)
+            context_window = conversation_cfg.get("context_window", context_window)
+        return {
+            "temperature": configured if temperature is None else temperature,
+            "num_ctx": context_window,
+        }
+
+    async def generate(
+        self, prompt: str, model: Optional[str] = None, use_cache: bool = True
+    ) -> str:
         """
         Generate text using local LLM via Ollama.
 
+        Responses are served from and stored in the response cache, keyed on
+        the normalized prompt, model, temperature and context window. Failed
+        (empty) generations are never cached.
+
         Args:
             prompt: The input prompt
             model: Optional model override (defaults to instance model)
+            use_cache: Set False to always call the model, e.g. for sampling variety
 
         Returns:
             Generated text response
@@ -150,17 +214,7 @@ class LLMService:
         try:
             # Log request details
             target_model = model or self.model
-            # Get temperature and context_window from config if available
-            from src.config.llm_config import get_llm_config
-
-            llm_config = get_llm_config()
-            temperature = getattr(llm_config, "temperature", 0.1)
-            context_window = getattr(llm_config, "context_window", 16384)
-            # Try to get per-model settings if available
-            if hasattr(llm_config, "models") and "conversation" in llm_config.models:
-                conversation_cfg = llm_config.models["conversation"]
-                temperature = conversation_cfg.get("temperature", temperature)
-                context_window = conversation_cfg.get("context_window", context_window)
+            options = self._generation_options()
             if not self.api_url.rstrip("/").endswith("/api"):
                 endpoint = f"{self.api_url.rstrip('/')}/api/generate"
             else:
@@ -169,9 +223,18 @@ class LLMService:
                 "model": target_model,
                 "prompt": prompt,
                 "stream": False,
-                "temperature": temperature,
-                "context_window": context_window,
+                "options": options,
             }
+            cache = self.cache if use_cache else None
+            cache_params = {
+                "temperature": options["temperature"],
+                "context_window": options["num_ctx"],
+            }
+            if cache is not None:
+                cached = await cache.get(prompt, target_model, cache_params)
+                if cached is not None:
+                    logger.debug("Serving LLM response from cache")
+                    return cached
 
             # Enhanced request logging
             logger.debug("=== LLM Request Details ===")
@@ -186,9 +249,11 @@ class LLMService:
             # Make the request
             try:
                 logger.debug("Sending request to Ollama...")
-                response = await self.client.post(
-                    endpoint, json=payload, timeout=30.0  # Add explicit timeout
-                )
+                started = time.perf_counter()
+                with span("llm_generate", model=target_model):
+                    response = await self.client.post(
+                        endpoint, json=payload, timeout=30.0  # Add explicit timeout
+                    )
 
                 # Log response details immediately
                 logger.debug(f"Response status: {response.status_code}")
@@ -214,7 +279,16 @@ class LLMService:
                 logger.debug("=== Parsed Response ===")
                 logger.debug(json.dumps(log_response, indent=2))
 
-                return response_json["response"]
+                text = response_json["response"]
+                if cache is not None and text:
+                    await cache.put(
+                        prompt,
+                        target_model,
+                        text,
+                        cache_params,
+                        latency=time.perf_counter() - started,
+                    )
+                return text
 
             except httpx.TimeoutException:
                 error_msg = "Request to Ollama timed out after 30 seconds"
@@ -232,6 +306,72 @@ class LLMService:
                 logger.error(f"HTTP Error details: {str(e)}")
             return ""
 
+    async def stream(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream generated text from Ollama as it is produced.
+
+        Reads the NDJSON stream of /api/generate and yields each non-empty
+        ``response`` fragment. Only connecting and the gap between chunks are
+        time-limited, so long generations are not cut off. Closing the
+        generator early (e.g. once a tool call has been read) closes the
+        connection, which stops generation on the server.
+
+        Args:
+            prompt: The input prompt
+            model: Optional model override (defaults to instance model)
+            temperature: Optional sampling temperature (defaults to the configured one)
+            max_tokens: Optional cap on generated tokens (Ollama num_predict)
+            stop: Optional stop sequences
+
+        Yields:
+            str: Generated text fragments in order
+
+        Raises:
+            RuntimeError: If the request fails or Ollama reports an error
+        """
+        target_model = model or self.model
+        base = self.api_url.rstrip("/")
+        endpoint = f"{base}/generate" if base.endswith("/api") else f"{base}/api/generate"
+        options = self._generation_options(temperature)
+        if max_tokens is not None:
+            options["num_predict"] = max_tokens
+        if stop:
+            options["stop"] = stop
+        payload: Dict[str, Any] = {
+            "model": target_model,
+            "prompt": prompt,
+            "stream": True,
+            "options": options,
+        }
+
+        logger.debug(f"Streaming from {endpoint} with model {target_model}")
+        try:
+            async with self.client.stream(
+                "POST", endpoint, json=payload, timeout=httpx.Timeout(120.0, connect=10.0)
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise RuntimeError(chunk["error"])
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        logger.debug(f"Stream finished: {chunk.get('done_reason')}")
+                        break
+        except (httpx.HTTPError, json.JSONDecodeError) as e:
+            logger.error(f"Error streaming from LLM: {e}")
+            raise RuntimeError(f"Error streaming from LLM: {e}")
+
     async def get_response(
         self, system_prompt: str = "", conversation_history: List[Dict[str, str]] = None
     ) -> str:
@@ -282,6 +422,19 @@ class LLMService:
         logger.debug(f"LLMService.generate: Prompt received:\n{prompt}")
         return await self.generate(prompt)
 
+    def _endpoint(self, name: str) -> str:
+        """Build an Ollama API endpoint URL whether or not api_url ends in /api."""
+        base = self.api_url.rstrip("/")
+        return f"{base}/{name}" if base.endswith("/api") else f"{base}/api/{name}"
+
+    def _embed_limiter(self) -> asyncio.Semaphore:
+        """Semaphore capping concurrent embed requests, one per event loop."""
+        loop = asyncio.get_running_loop()
+        if self._embed_semaphore is None or self._embed_semaphore[0] is not loop:
+            semaphore = asyncio.Semaphore(self.embedding_config.max_concurrency)
+            self._embed_semaphore = (loop, semaphore)
+        return self._embed_semaphore[1]
+
     async def get_embedding(self, text: str, model: Optional[str] = None) -> List[float]:
         """
         Calculate text embedding.
@@ -292,103 +445,113 @@ class LLMService:
 
         Returns:
             List[float]: Embedding vector
+
+        Raises:
+            RuntimeError: If embedding fails
         """
-        request_id = str(uuid.uuid4())
-        logger.debug(
-            f"[EMBED] [{request_id}] Embedding request for text: '{text[:50]}'... (len={len(text)}) model={model}"
-        )
+        return (await self.get_embeddings([text], model))[0]
+
+    async def get_embeddings(
+        self, texts: List[str], model: Optional[str] = None
+    ) -> List[List[float]]:
+        """
+        Calculate embeddings for many texts with batched Ollama /api/embed calls.
+
+        Texts are split into chunks of ``llm.embeddings.batch_size``; at most
+        ``max_concurrency`` chunks are in flight at once. Models are pulled
+        and loaded by warm_up() at startup, not here.
+
+        Args:
+            texts: Texts to embed
+            model: Optional model override
+
+        Returns:
+            List[List[float]]: One embedding per input text, in input order
+
+        Raises:
+            RuntimeError: If a request fails or returns the wrong number of vectors
+        """
+        if not texts:
+            return []
+        embedding_model = model or get_default_model(get_llm_provider(), "embedding")
+        size = self.embedding_config.batch_size
+        batches = [texts[i : i + size] for i in range(0, len(texts), size)]
+        limiter = self._embed_limiter()
+
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            async with limiter:
+                return await self._embed_batch(batch, embedding_model)
+
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        return [embedding for batch in results for embedding in batch]
+
+    async def _embed_batch(self, texts: List[str], embedding_model: str) -> List[List[float]]:
+        """Embed one chunk with a single /api/embed request."""
         try:
-            # Use provider for all get_default_model calls
-            provider = get_llm_provider()
-            embedding_model = model or get_default_model(provider, "embedding")
-            logger.debug(
-                f"[EMBED] [{request_id}] Generating embedding using model: {embedding_model}"
-            )
-            try:
-                if not self.api_url.rstrip("/").endswith("/api"):
-                    endpoint = f"{self.api_url.rstrip('/')}/api/embeddings"
-                else:
-                    endpoint = f"{self.api_url.rstrip('/')}/embeddings"
-                logger.debug(f"[EMBED] [{request_id}] Using embeddings endpoint: {endpoint}")
+            with span("embedding", model=embedding_model):
                 response = await self.client.post(
-                    endpoint, json={"model": embedding_model, "prompt": text}
-                )
-                logger.debug(
-                    f"[EMBED] [{request_id}] Embedding response status: {response.status_code}"
+                    self._endpoint("embed"),
+                    json={"model": embedding_model, "input": texts},
+                    timeout=120.0,
                 )
-                response.raise_for_status()
-                data = response.json()
-                if "embedding" in data:
-                    embedding = data["embedding"]
-                    logger.debug(
-                        f"[EMBED] [{request_id}] Successfully generated embedding of length: {len(embedding)}. First 5 values: {embedding[:5]}"
+            response.raise_for_status()
+            embeddings = response.json().get("embeddings") or []
+        except Exception as e:
+            logger.error(f"[EMBED] Batch embedding of {len(texts)} texts failed: {e}")
+            raise RuntimeError(f"Batch embedding generation failed: {e}")
+        if len(embeddings) != len(texts):
+            raise RuntimeError(
+                f"Batch embedding returned {len(embeddings)} vectors for {len(texts)} texts"
+            )
+        logger.debug(f"[EMBED] Embedded batch of {len(texts)} texts with {embedding_model}")
+        return embeddings
+
+    async def warm_up(self, models: Optional[List[str]] = None) -> Dict[str, bool]:
+        """
+        Pull missing models and load them into memory; call once at startup.
+
+        Failures are logged rather than raised so the application can still
+        start (and report errors per request) when Ollama is unavailable.
+
+        Args:
+            models: Generation models to load (defaults to the instance model);
+                the default embedding model is always included
+
+        Returns:
+            Dict[str, bool]: Whether each model is ready
+        """
+        embedding_model = get_default_model(get_llm_provider(), "embedding")
+        generation_models = models or [self.model]
+        try:
+            response = await self.client.get(self._endpoint("tags"), timeout=10.0)
+            response.raise_for_status()
+            installed = {m.get("name") for m in response.json().get("models", [])}
+        except Exception as e:
+            logger.error(f"Could not reach Ollama to warm up models: {e}")
+            return {name: False for name in [*generation_models, embedding_model]}
+
+        async def prepare(name: str, load: Dict[str, Any], endpoint: str) -> bool:
+            try:
+                if name not in installed and f"{name}:latest" not in installed:
+                    logger.info(f"Pulling model {name}...")
+                    pulled = await self.client.post(
+                        self._endpoint("pull"), json={"name": name, "stream": False}, timeout=None
                     )
-                    return embedding
-                else:
-                    raise ValueError("No embedding in response")
-            except Exception as embed_error:
-                logger.error(
-                    f"[EMBED] [{request_id}] Error during embedding generation: {embed_error}"
-                )
-                logger.error(
-                    f"[EMBED] [{request_id}] This might indicate the embedding model is not properly loaded"
-                )
-                logger.error(f"[EMBED] [{request_id}] Stack trace:\n{traceback.format_exc()}")
-                logger.debug(
-                    f"[EMBED] [{request_id}] Attempting to pull model {embedding_model}..."
+                    pulled.raise_for_status()
+                loaded = await self.client.post(
+                    self._endpoint(endpoint), json={"model": name, **load}, timeout=120.0
                 )
-                try:
-                    if not self.api_url.rstrip("/").endswith("/api"):
-                        pull_endpoint = f"{self.api_url.rstrip('/')}/api/pull"
-                    else:
-                        pull_endpoint = f"{self.api_url.rstrip('/')}/pull"
-                    pull_response = await self.client.post(
-                        pull_endpoint, json={"name": embedding_model}
-                    )
-                    logger.debug(
-                        f"[EMBED] [{request_id}] Pull response status: {pull_response.status_code}"
-                    )
-                    logger.debug(
-                        f"[EMBED] [{request_id}] Pull response content: {pull_response.text}"
-                    )
-                    pull_response.raise_for_status()
-                    logger.debug(
-                        f"[EMBED] [{request_id}] Successfully pulled {embedding_model}, retrying embedding..."
-                    )
-                    response = await self.client.post(
-                        endpoint, json={"model": embedding_model, "prompt": text}
-                    )
-                    logger.debug(
-                        f"[EMBED] [{request_id}] Retry embedding response status: {response.status_code}"
-                    )
-                    response.raise_for_status()
-                    data = response.json()
-                    if "embedding" in data:
-                        logger.debug(
-                            f"[EMBED] [{request_id}] Successfully generated embedding on retry."
-                        )
-                        return data["embedding"]
-                    else:
-                        logger.error(
-                            f"[EMBED] [{request_id}] Invalid embedding response after pull: {data}"
-                        )
-                        raise ValueError("No embedding in response after pull")
-                except Exception as pull_error:
-                    logger.error(f"[EMBED] [{request_id}] Error pulling model: {pull_error}")
-                    logger.error(
-                        f"[EMBED] [{request_id}] Pull response content: {getattr(pull_error, 'response', None)}"
-                    )
-                    logger.error(
-                        f"[EMBED] [{request_id}] Stack trace (pull):\n{traceback.format_exc()}"
-                    )
-                    raise RuntimeError(
-                        f"Failed to pull embedding model {embedding_model}: {pull_error}"
-                    )
-        except Exception as e:
-            logger.error(f"[EMBED] [{request_id}] Error calculating embedding: {e}")
-            logger.error(f"[EMBED] [{request_id}] Stack trace (outer):\n{traceback.format_exc()}")
-            logger.error("Falling back to zero vector and raising exception")
-            raise RuntimeError(f"Embedding generation failed: {e}")
+                loaded.raise_for_status()
+                logger.debug(f"Model {name} is loaded")
+                return True
+            except Exception as e:
+                logger.error(f"Error warming up model {name}: {e}")
+                return False
+
+        jobs = {name: prepare(name, {"prompt": ""}, "generate") for name in generation_models}
+        jobs[embedding_model] = prepare(embedding_model, {"input": "warm up"}, "embed")
+        ready = await asyncio.gather(*jobs.values())
+        return dict(zip(jobs, ready))
 
     async def format_messages(
         self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None
@@ -479,27 +642,3 @@ async def process_completed_tool(
     # Update task status
     session.current_task_status = TaskStatus.COMPLETED
     return session
-
-
-def get_stats(self) -> Dict[str, Any]:
-    """
-    Get current LLM usage statistics.
-
-    Returns:
-        Dict[str, Any]: Current stats
-    """
-    return {
-        "total_requests": self.stats.total_requests,
-        "total_tokens": self.stats.total_tokens,
-        "total_errors": self.stats.total_errors,
-        "last_request": self.stats.last_request,
-        "average_latency": self.stats.average_latency,
-        "cache_size": len(self.cache),
-    }
-
-
-async def clear_cache(self) -> None:
-    """Clear the response and embedding cache."""
-    async with self.lock:
-        self.cache.clear()
-        logger.debug("Cleared LLM cache")
@@ -19,8 +19,10 @@ import requests
 from dotenv import load_dotenv
 from supabase import Client, create_client
 
+from src.config.database_config import get_request_store_config
 from src.services.db_services.query_service import execute_query
 from src.services.logging_service import get_logger
+from src.services.request_store_service import RequestStore
 
 # Add project path for imports
 project_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
@@ -30,8 +32,8 @@ if project_path not in sys.path:
 # Configure logging
 logger = get_logger(__name__)
 
-# Dictionary to store pending MCP requests
-PENDING_MCP_REQUESTS = {}
+# Pending MCP requests (bounded; finished ones expire after the configured TTL)
+PENDING_MCP_REQUESTS = RequestStore("mcp_requests", get_request_store_config())
 
 
 class MCPAdapter:
@@ -384,7 +386,4 @@ def check_mcp_status(task_id: str) -> Dict[str, Any]:
 
     result = PENDING_MCP_REQUESTS[task_id]
 
-    # If the task is completed, we could remove it from the dictionary
-    # after a certain time period to keep memory usage down
-
     return result
@@ -8,8 +8,11 @@ from dotenv import load_dotenv
 from supabase import Client, create_client
 
 from src.managers.db_manager import DBService
+from src.services.embedding_service import EmbeddingWorker
 from src.services.llm_service import LLMService
 from src.services.logging_service import get_logger
+from src.services.metrics_service import span
+from src.services.write_behind_service import WriteBehindQueue
 from src.state.state_models import MessageRole
 from src.utils.datetime_utils import format_datetime, now, parse_datetime, timestamp
 
@@ -21,14 +24,26 @@ class DatabaseMessageService:
     Service for managing messages in the database.
     """
 
-    def __init__(self, db_service: DBService):
+    def __init__(
+        self,
+        db_service: DBService,
+        write_behind: Optional[WriteBehindQueue] = None,
+        embedding_worker: Optional[EmbeddingWorker] = None,
+    ):
         """
         Initialize the message service.
 
         Args:
             db_service: Database service instance
+            write_behind: Optional queue; when set, add_message enqueues rows for
+                batched background inserts instead of awaiting each insert
+            embedding_worker: Optional worker; when set, embeddings are computed in
+                the background (and skipped for roles its policy excludes) instead
+                of inline
         """
         self.db_service = db_service
+        self.write_behind = write_behind
+        self.embedding_worker = embedding_worker
         self._error_count = 0
         self._pending_messages: Dict[str, Dict[str, Any]] = {}
         self.llm_service = LLMService()  # Initialize LLM service for embeddings
@@ -65,7 +80,8 @@ class DatabaseMessageService:
             target: Target identifier (required)
             request_id: Optional request ID (for tool requests)
         Returns:
-            The inserted record dict
+            The inserted record dict (the queued record, without a database id,
+            when write-behind is enabled)
         Raises:
             RuntimeError if insert fails
         """
@@ -73,14 +89,6 @@ class DatabaseMessageService:
             f"add_message called with: session_id={session_id}, role={role}, content={content}, metadata={metadata}, user_id={user_id}, sender={sender}, target={target}, request_id={request_id}"
         )
         try:
-            # Generate embedding from content using LLM service
-            try:
-                embedding = await self.llm_service.get_embedding(content)
-                logger.debug(f"Generated embedding for message: {len(embedding)} dimensions")
-            except Exception as e:
-                logger.error(f"Error generating embedding, using default: {e}")
-                embedding = [0.0] * 768  # Fallback to default if embedding generation fails
-
             # Add user_id and character_name to metadata
             metadata = metadata.copy() if metadata else {}
             metadata["user_id"] = user_id
@@ -97,13 +105,33 @@ class DatabaseMessageService:
                 "timestamp": datetime.now().isoformat(),
                 "sender": sender,
                 "target": target,
-                "embedding_nomic": embedding,
             }
             if request_id is not None:
                 record["request_id"] = request_id
+
+            worker = self.embedding_worker
+            if worker is None:
+                # Generate embedding from content using LLM service
+                try:
+                    embedding = await self.llm_service.get_embedding(content)
+                    logger.debug(f"Generated embedding for message: {len(embedding)} dimensions")
+                except Exception as e:
+                    logger.error(f"Error generating embedding, using default: {e}")
+                    embedding = [0.0] * 768  # Fallback to default if embedding generation fails
+                record["embedding_nomic"] = embedding
+            embed_later = worker is not None and worker.should_embed(role)
+
             # logger.debug(f"add_message payload: {record}")
+            if self.write_behind is not None:
+                if embed_later:
+                    worker.attach(record, content, self.write_behind.enqueue)
+                else:
+                    await self.write_behind.enqueue(record)
+                return record
             result = await self.db_service.insert("swarm_messages", record)
             logger.debug(f"add_message DB response: {result}")
+            if embed_later and result.get("id") is not None:
+                worker.backfill("swarm_messages", result["id"], content)
             # logger.debug(f"Inserted message into swarm_messages: {result}")
             return result
         except Exception as e:
@@ -111,6 +139,13 @@ class DatabaseMessageService:
             logger.debug(f"add_message exception details:", exc_info=True)
             raise
 
+    async def close(self) -> None:
+        """Finish pending embeddings, then flush any queued messages."""
+        if self.embedding_worker is not None:
+            await self.embedding_worker.close()
+        if self.write_behind is not None:
+            await self.write_behind.close()
+
     async def get_messages(
         self, session_id: Union[str, int], user_id: str = "developer"
     ) -> List[Dict[str, Any]]:
@@ -270,13 +305,14 @@ async def log_and_persist_message(
         logger.debug(f"[log_and_persist_message] Calling add_message on MessageState")
 
         # Use the add_message method directly on the MessageState object
-        await session_state.add_message(
-            role=role,
-            content=content,
-            metadata=metadata or {},
-            sender=sender,
-            target=target,
-        )
+        with span("persist_message", role=role.value if hasattr(role, "value") else role):
+            await session_state.add_message(
+                role=role,
+                content=content,
+                metadata=metadata or {},
+                sender=sender,
+                target=target,
+            )
         logger.debug("[log_and_persist_message] Successfully added message")
 
     except Exception as e:
@@ -0,0 +1,313 @@
+"""
+Latency instrumentation for the orchestrator hot path.
+
+Stages of a turn (prompt build, LLM call, embedding, DB insert, tool
+execution) are wrapped in spans timed with the monotonic clock. Every span
+is recorded in an in-process histogram registry under the metric
+``span_duration_seconds`` with ``span`` and ``outcome`` labels, so per-stage
+p50/p95/p99 can be read without an external collector:
+
+- ``request_context()`` tags everything a turn does (including tasks it
+  spawns, which inherit the context) with one request ID;
+- ``MetricsRegistry.snapshot()`` / ``dump_json()`` give count, sum and
+  quantiles per series;
+- ``MetricsRegistry.to_prometheus()`` renders the Prometheus text format,
+  served by ``start_metrics_server()`` at /metrics (and JSON at /metrics.json).
+
+Histogram buckets are cumulative counters as Prometheus expects; quantiles in
+the JSON snapshot are exact over a bounded window of recent samples.
+"""
+
+import asyncio
+import json
+import math
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.config.logging_config import MetricsConfig, get_metrics_config
+from src.services.logging_service import get_logger
+
+logger = get_logger(__name__)
+
+SPAN_METRIC = "span_duration_seconds"
+DEFAULT_BUCKETS = tuple(MetricsConfig().buckets)
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def get_request_id() -> Optional[str]:
+    """Return the request ID of the current context, if any."""
+    return _request_id.get()
+
+
+@contextmanager
+def request_context(request_id: Optional[str] = None) -> Iterator[str]:
+    """
+    Tag the enclosed work (and tasks created inside it) with a request ID.
+
+    Args:
+        request_id: ID to use; a new one is generated when omitted
+
+    Yields:
+        str: The active request ID
+    """
+    token = _request_id.set(request_id or uuid.uuid4().hex[:16])
+    try:
+        yield _request_id.get()
+    finally:
+        _request_id.reset(token)
+
+
+class Histogram:
+    """Cumulative bucket counts plus a window of recent samples for quantiles."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, window: int = 2048):
+        """
+        Initialize the histogram.
+
+        Args:
+            buckets: Upper bounds in seconds (an implicit +Inf bucket is added)
+            window: Number of recent samples kept for quantile estimates
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        """Record one sample."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self._recent.append(value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Nearest-rank quantile over the recent window, or None when empty."""
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Count, sum, mean and p50/p95/p99/max of the recent window."""
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": max(self._recent) if self._recent else None,
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe collection of labelled histograms."""
+
+    def __init__(self, config: Optional[MetricsConfig] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            config: Enable switch, bucket bounds and quantile window
+        """
+        self.config = config or MetricsConfig()
+        self._histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.enabled
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Record a sample in the histogram for a metric name and label set.
+
+        Args:
+            name: Metric name
+            value: Observed value (seconds for latencies)
+            labels: Label names and values identifying the series
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted((k, str(v)) for k, v in (labels or {}).items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = Histogram(self.config.buckets, self.config.window)
+                self._histograms[key] = histogram
+            histogram.observe(value)
+
+    def histogram(self, name: str, labels: Optional[Dict[str, Any]] = None) -> Optional[Histogram]:
+        """Return the histogram for an exact label set, if it has samples."""
+        key = (name, tuple(sorted((k, str(v)) for k, v in (labels or {}).items())))
+        return self._histograms.get(key)
+
+    def reset(self) -> None:
+        """Drop every series."""
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Summarize every series.
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Per metric name, one entry per label
+            set with its labels, count, sum, mean and quantiles
+        """
+        with self._lock:
+            items = sorted(self._histograms.items())
+            result: Dict[str, List[Dict[str, Any]]] = {}
+            for (name, labels), histogram in items:
+                result.setdefault(name, []).append({"labels": dict(labels), **histogram.snapshot()})
+        return result
+
+    def dump_json(self, path: str) -> None:
+        """Write snapshot() to a JSON file."""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(self.snapshot(), indent=2), encoding="utf-8")
+
+    def to_prometheus(self) -> str:
+        """Render every series in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            items = sorted(self._histograms.items())
+            current = None
+            for (name, labels), histogram in items:
+                if name != current:
+                    lines.append(f"# TYPE {name} histogram")
+                    current = name
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(
+                        f"{name}_bucket{_format_labels(labels, ('le', repr(bound)))} {cumulative}"
+                    )
+                lines.append(
+                    f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.count}"
+                )
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    """Render a Prometheus label set, escaping values."""
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (
+        f'{k}="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Return the process-wide registry, created from the metrics config on first use."""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry(get_metrics_config())
+    return _registry
+
+
+@contextmanager
+def span(name: str, registry: Optional[MetricsRegistry] = None, **labels: Any) -> Iterator[None]:
+    """
+    Time the enclosed block and record it as one stage sample.
+
+    Works around awaits as well (``with span("llm_call"): await ...``); the
+    outcome label is "error" when the block raises or is cancelled.
+
+    Args:
+        name: Stage name, e.g. "prompt_build" or "llm_call"
+        registry: Registry to record into (the process-wide one by default)
+        **labels: Extra labels such as model, table or tool
+    """
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        (registry or get_metrics_registry()).observe(
+            SPAN_METRIC, elapsed, {"span": name, "outcome": outcome, **labels}
+        )
+        logger.debug(
+            f"[span] {name} {outcome} in {elapsed * 1000:.1f} ms (request {get_request_id()})"
+        )
+
+
+async def start_metrics_server(
+    port: int, host: str = "127.0.0.1", registry: Optional[MetricsRegistry] = None
+) -> asyncio.AbstractServer:
+    """
+    Serve /metrics (Prometheus text) and /metrics.json over plain HTTP.
+
+    Args:
+        port: Port to listen on
+        host: Interface to bind
+        registry: Registry to expose (the process-wide one by default)
+
+    Returns:
+        asyncio.AbstractServer: The running server; close() it on shutdown
+    """
+    registry = registry or get_metrics_registry()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # Headers are not needed
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?", 1)[0] if len(parts) > 1 else "/"
+            if path == "/metrics.json":
+                status, content_type = "200 OK", "application/json"
+                body = json.dumps(registry.snapshot()).encode()
+            elif path == "/metrics":
+                status, content_type = "200 OK", "text/plain; version=0.0.4"
+                body = registry.to_prometheus().encode()
+            else:
+                status, content_type, body = "404 Not Found", "text/plain", b"not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.error(f"Error serving metrics request: {e}")
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.debug(f"Metrics available at http://{host}:{port}/metrics")
+    return server
+
+
+__all__ = [
+    "Histogram",
+    "MetricsRegistry",
+    "get_metrics_registry",
+    "get_request_id",
+    "request_context",
+    "span",
+    "start_metrics_server",
+]
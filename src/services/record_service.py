@@ -14,23 +14,26 @@ logger = get_logger(__name__)
 
 class DatabaseRecordService:
 
-    def __init__(self, db_service: DBService):
+    def __init__(self, db_service: DBService, vector_store: Optional[Any] = None):
         """
         Initialize database service.
 
         Args:
-            url: Optional Supabase URL
-            key: Optional Supabase key
-
-        Raises:
-            ValueError: If Supabase credentials are missing
+            db_service: Database service used for all queries
+            vector_store: Optional LocalVectorStore answering vector_search locally
+                instead of the match_documents RPC
         """
         self.db_service = db_service
+        self.vector_store = vector_store
 
     async def get_next_id(self, column_name: str, table_name: str) -> int:
         """
         Get next available ID for a column.
 
+        Reads only the current maximum (an index-ordered LIMIT 1 query). The
+        result is not reserved, so concurrent writers can receive the same
+        value; prefer a sequence-backed column (e.g. sessions.id) for ids.
+
         Args:
             column_name: Name of the ID column
             table_name: Name of the table
@@ -42,20 +45,17 @@ class DatabaseRecordService:
             RuntimeError: If operation fails
         """
         try:
-            response = self.supabase.from_(table_name).select(column_name).execute()
-
-            max_val = 0
-            if response.data:
-                for item in response.data:
-                    val = item.get(column_name, 0)
-                    if val is None:
-                        continue
-                    if isinstance(val, str) and val.isdigit():
-                        val = int(val)
-                    if isinstance(val, int) and val > max_val:
-                        max_val = val
-
-            return max_val + 1
+            rows = await self.db_service.select(
+                table_name,
+                columns=column_name,
+                order_by=column_name,
+                order_desc=True,
+                limit=1,
+            )
+            max_val = rows[0].get(column_name) if rows else None
+            if isinstance(max_val, str) and max_val.isdigit():
+                max_val = int(max_val)
+            return (max_val if isinstance(max_val, int) else 0) + 1
 
         except Exception as e:
             error_msg = f"Error getting next ID for {table_name}.{column_name}: {e}"
@@ -77,12 +77,7 @@ class DatabaseRecordService:
             RuntimeError: If insert fails
         """
         try:
-            response = self.supabase.table(table_name).insert(data).execute()
-
-            if not response.data:
-                raise RuntimeError(f"Insert operation returned no data")
-
-            return response.data[0]
+            return await self.db_service.insert(table_name, data)
 
         except Exception as e:
             error_msg = f"Error inserting record into {table_name}: {e}"
@@ -116,24 +111,14 @@ class DatabaseRecordService:
             RuntimeError: If select fails
         """
         try:
-            query = self.supabase.table(table_name).select(columns)
-
-            # Apply filters
-            if filters:
-                for column, value in filters.items():
-                    query = query.eq(column, value)
-
-            # Apply order
-            if order_by:
-                query = query.order(order_by, desc=order_desc)
-
-            # Apply limit
-            if limit:
-                query = query.limit(limit)
-
-            # Execute query
-            response = query.execute()
-            return response.data or []
+            return await self.db_service.select(
+                table_name,
+                columns=columns,
+                filters=filters,
+                order_by=order_by,
+                order_desc=order_desc,
+                limit=limit,
+            )
 
         except Exception as e:
             error_msg = f"Error selecting records from {table_name}: {e}"
@@ -163,15 +148,10 @@ class DatabaseRecordService:
             RuntimeError: If update fails
         """
         try:
-            response = (
-                self.supabase.table(table_name).update(data).eq(id_column, record_id).execute()
+            return await self.db_service.update(
+                table_name, record_id=record_id, data=data, id_column=id_column
             )
 
-            if not response.data:
-                raise RuntimeError(f"Update operation returned no data")
-
-            return response.data[0]
-
         except Exception as e:
             error_msg = f"Error updating record {record_id} in {table_name}: {e}"
             logger.error(error_msg)
@@ -194,15 +174,7 @@ class DatabaseRecordService:
             RuntimeError: If delete fails
         """
         try:
-            query = self.supabase.table(table_name).delete()
-
-            # Apply filters
-            for column, value in filters.items():
-                query = query.eq(column, value)
-
-            # Execute query
-            response = query.execute()
-            return response.data or []
+            return await self.db_service.delete(table_name, filters)
 
         except Exception as e:
             error_msg = f"Error deleting records from {table_name}: {e}"
@@ -234,18 +206,13 @@ class DatabaseRecordService:
             RuntimeError: If search fails
         """
         try:
-            query = (
-                self.supabase.table(table_name)
-                .select(columns)
-                .ilike(search_column, f"%{search_query}%")
+            return await self.db_service.select(
+                table_name,
+                columns=columns,
+                filters={search_column: ("ilike", f"%{search_query}%")},
+                limit=limit,
             )
 
-            if limit:
-                query = query.limit(limit)
-
-            response = query.execute()
-            return response.data or []
-
         except Exception as e:
             error_msg = f"Error searching records in {table_name}: {e}"
             logger.error(error_msg)
@@ -291,13 +258,11 @@ class DatabaseRecordService:
             if filters:
                 params["filter_object"] = filters
 
-            # Call the vector similarity search RPC function
-            response = self.supabase.rpc("match_documents", params).execute()
+            if self.vector_store is not None:
+                return await self.vector_store.match_documents(**params)
 
-            if response.error:
-                raise RuntimeError(f"Vector search RPC error: {response.error}")
-
-            return response.data or []
+            # Call the vector similarity search RPC function
+            return await self.db_service.rpc("match_documents", params)
 
         except Exception as e:
             error_msg = f"Error performing vector search on {table_name}: {e}"
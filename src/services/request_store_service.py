@@ -0,0 +1,395 @@
+"""
+Bounded tracking of in-flight requests (tool calls, MCP tasks, vectorization).
+
+RequestStore replaces the module-level PENDING_* dicts, which grew without
+limit whenever a caller never cleaned up after itself. It still behaves like
+a dict of dicts, so ``store[request_id]["status"] = "completed"`` keeps
+working, and it also:
+
+- indexes request IDs by status, so finding completed requests does not
+  require scanning every request;
+- evicts requests that have not been touched for ``ttl_seconds``, and once
+  there are more than ``max_entries``, drops the oldest finished requests
+  first;
+- optionally writes every change through to SQLite and reloads it on start,
+  so requests survive a restart.
+
+Changes to nested dicts (e.g. progress counters inside a request) refresh
+the request's TTL, so a long task that only updates its counters is not
+expired while it runs; they are persisted along with the next top-level
+change to that request.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.config.database_config import RequestStoreConfig
+from src.services.logging_service import get_logger
+
+logger = get_logger(__name__)
+
+TERMINAL_STATUSES = frozenset(
+    {"completed", "completed_with_errors", "success", "error", "cancelled", "interrupted"}
+)
+
+
+def _track(entry: "RequestEntry", value: Any) -> Any:
+    """Wrap plain dicts stored in a request so changes to them keep it alive."""
+    if type(value) is dict or (isinstance(value, _NestedDict) and value._entry is not entry):
+        return _NestedDict(entry, value)
+    return value
+
+
+class _NestedDict(dict):
+    """Dict inside a request's data; any change refreshes the request's TTL."""
+
+    def __init__(self, entry: "RequestEntry", data: Dict[str, Any]):
+        super().__init__({key: _track(entry, value) for key, value in data.items()})
+        self._entry = entry
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, _track(self._entry, value))
+        self._entry._keep_alive()
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self._entry._keep_alive()
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            super().__setitem__(key, _track(self._entry, value))
+        self._entry._keep_alive()
+
+    def pop(self, key: str, *default: Any) -> Any:
+        value = super().pop(key, *default)
+        self._entry._keep_alive()
+        return value
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        self[key] = default
+        return self[key]
+
+
+class RequestEntry(dict):
+    """One request's data; notifies its store whenever a top-level key changes."""
+
+    def __init__(self, store: "RequestStore", request_id: str, data: Dict[str, Any]):
+        super().__init__({key: _track(self, value) for key, value in data.items()})
+        self._store: Optional["RequestStore"] = store
+        self._request_id = request_id
+        self._indexed_status: Optional[str] = None
+
+    def _changed(self) -> None:
+        if self._store is not None:
+            self._store._touch(self._request_id, self)
+
+    def _keep_alive(self) -> None:
+        if self._store is not None:
+            self._store._keep_alive(self._request_id, self)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, _track(self, value))
+        self._changed()
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self._changed()
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            super().__setitem__(key, _track(self, value))
+        self._changed()
+
+    def pop(self, key: str, *default: Any) -> Any:
+        value = super().pop(key, *default)
+        self._changed()
+        return value
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        self[key] = default
+        return self[key]
+
+
+class RequestStore(MutableMapping):
+    """Dict-like store of request data with TTL/size eviction and a status index."""
+
+    def __init__(
+        self,
+        name: str,
+        config: Optional[RequestStoreConfig] = None,
+        persist: bool = False,
+    ):
+        """
+        Initialize the store, reloading persisted requests if enabled.
+
+        Args:
+            name: Store name; also keys its rows in the shared SQLite file
+            config: Size limit, TTL and SQLite path
+            persist: Write changes through to config.persist_path (when set)
+        """
+        self.name = name
+        self.config = config or RequestStoreConfig()
+        self._entries: Dict[str, RequestEntry] = {}
+        self._updated: "OrderedDict[str, float]" = OrderedDict()  # Least recently touched first
+        self._by_status: Dict[Optional[str], "OrderedDict[str, None]"] = {}
+        self._lock = threading.RLock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.stats = {"evicted_ttl": 0, "evicted_size": 0, "restored": 0}
+        if persist and self.config.persist_path:
+            self._open(self.config.persist_path)
+
+    # --- Mapping interface ---
+
+    def __getitem__(self, request_id: str) -> RequestEntry:
+        with self._lock:
+            self._expire(request_id)
+            return self._entries[request_id]
+
+    def __setitem__(self, request_id: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            if (
+                isinstance(data, RequestEntry)
+                and data._store is self
+                and data._request_id == request_id
+            ):
+                entry = data
+            else:
+                entry = RequestEntry(self, request_id, data)
+                if request_id in self._entries:
+                    self._remove(request_id)
+                self._entries[request_id] = entry
+            self._touch(request_id, entry)
+            self._evict()
+
+    def __delitem__(self, request_id: str) -> None:
+        with self._lock:
+            self._remove(request_id)
+            if self._db is not None:
+                self._db.execute(
+                    "DELETE FROM requests WHERE store = ? AND request_id = ?",
+                    (self.name, request_id),
+                )
+
+    def __contains__(self, request_id: object) -> bool:
+        with self._lock:
+            self._expire(request_id)
+            return request_id in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in self._entries.values():
+                entry._store = None
+            self._entries.clear()
+            self._updated.clear()
+            self._by_status.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM requests WHERE store = ?", (self.name,))
+
+    # --- Status index ---
+
+    def ids_with_status(self, *statuses: Optional[str]) -> List[str]:
+        """
+        Request IDs currently in any of the given statuses.
+
+        Args:
+            *statuses: Status values to match
+
+        Returns:
+            List[str]: Matching IDs, oldest first within each status
+        """
+        with self._lock:
+            self.sweep()
+            return [rid for status in statuses for rid in self._by_status.get(status, ())]
+
+    def status_counts(self) -> Dict[Optional[str], int]:
+        """Number of requests per status."""
+        with self._lock:
+            return {status: len(ids) for status, ids in self._by_status.items() if ids}
+
+    # --- Eviction ---
+
+    def sweep(self) -> int:
+        """
+        Evict every request untouched for longer than the TTL.
+
+        Returns:
+            int: Number of requests evicted
+        """
+        with self._lock:
+            cutoff = time.time() - self.config.ttl_seconds
+            evicted = 0
+            while self._updated:
+                request_id, updated_at = next(iter(self._updated.items()))
+                if updated_at > cutoff:
+                    break
+                self._drop(request_id)
+                evicted += 1
+            self.stats["evicted_ttl"] += evicted
+            return evicted
+
+    def _evict(self) -> None:
+        """Apply the TTL, then the size limit (finished requests go first)."""
+        self.sweep()
+        while len(self._entries) > self.config.max_entries:
+            victim = self._oldest_finished()
+            if victim is None:
+                victim = next(iter(self._updated))
+                logger.warning(
+                    f"Request store {self.name} is full of unfinished requests; "
+                    f"evicting {victim}"
+                )
+            self._drop(victim)
+            self.stats["evicted_size"] += 1
+
+    def _oldest_finished(self) -> Optional[str]:
+        oldest_id, oldest_at = None, None
+        for status in TERMINAL_STATUSES:
+            ids = self._by_status.get(status)
+            if ids:
+                request_id = next(iter(ids))
+                updated_at = self._updated[request_id]
+                if oldest_at is None or updated_at < oldest_at:
+                    oldest_id, oldest_at = request_id, updated_at
+        return oldest_id
+
+    def _expire(self, request_id: object) -> None:
+        updated_at = self._updated.get(request_id)
+        if updated_at is not None and updated_at <= time.time() - self.config.ttl_seconds:
+            self._drop(request_id)
+            self.stats["evicted_ttl"] += 1
+
+    def _drop(self, request_id: str) -> None:
+        """Evict a request from memory and from the SQLite file."""
+        self._remove(request_id)
+        if self._db is not None:
+            self._db.execute(
+                "DELETE FROM requests WHERE store = ? AND request_id = ?", (self.name, request_id)
+            )
+
+    # --- Bookkeeping ---
+
+    def _remove(self, request_id: str) -> None:
+        entry = self._entries.pop(request_id)
+        entry._store = None
+        self._updated.pop(request_id, None)
+        ids = self._by_status.get(entry._indexed_status)
+        if ids is not None:
+            ids.pop(request_id, None)
+
+    def _reindex(self, request_id: str, entry: RequestEntry) -> None:
+        """Move a request to the index of its current status."""
+        status = entry.get("status")
+        if request_id in self._by_status.get(status, ()):
+            return
+        ids = self._by_status.get(entry._indexed_status)
+        if ids is not None:
+            ids.pop(request_id, None)
+        self._by_status.setdefault(status, OrderedDict())[request_id] = None
+        entry._indexed_status = status
+
+    def _touch(self, request_id: str, entry: RequestEntry) -> None:
+        """Record a change: refresh the TTL, re-index the status and persist."""
+        with self._lock:
+            if self._entries.get(request_id) is not entry:
+                return
+            self._reindex(request_id, entry)
+            self._updated[request_id] = time.time()
+            self._updated.move_to_end(request_id)
+            if self._db is not None:
+                self._save(request_id, entry)
+
+    def _keep_alive(self, request_id: str, entry: RequestEntry) -> None:
+        """Refresh the TTL after a nested change (persisted with the next top-level one)."""
+        with self._lock:
+            if self._entries.get(request_id) is not entry:
+                return
+            self._updated[request_id] = time.time()
+            self._updated.move_to_end(request_id)
+
+    # --- Persistence ---
+
+    def _open(self, path: str) -> None:
+        """Open (or create) the SQLite file and reload this store's requests."""
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS requests ("
+                "store TEXT NOT NULL, request_id TEXT NOT NULL, status TEXT, "
+                "updated_at REAL NOT NULL, data TEXT NOT NULL, "
+                "PRIMARY KEY (store, request_id))"
+            )
+            rows = db.execute(
+                "SELECT request_id, updated_at, data FROM requests WHERE store = ? "
+                "ORDER BY updated_at",
+                (self.name,),
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error opening request store {self.name} at {path}: {e}")
+            raise RuntimeError(f"Failed to open request store {self.name}: {e}")
+        for request_id, updated_at, data in rows:
+            entry = RequestEntry(self, request_id, json.loads(data))
+            self._entries[request_id] = entry
+            self._reindex(request_id, entry)
+            self._updated[request_id] = updated_at
+        self._db = db
+        self.sweep()
+        self.stats["restored"] = len(self._entries)
+        logger.debug(
+            f"Request store {self.name} restored {len(self._entries)} requests from {path}"
+        )
+
+    def _save(self, request_id: str, entry: RequestEntry) -> None:
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO requests (store, request_id, status, updated_at, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    self.name,
+                    request_id,
+                    entry.get("status"),
+                    self._updated[request_id],
+                    json.dumps(entry, default=str),
+                ),
+            )
+        except sqlite3.Error as e:
+            # The in-memory copy is still authoritative; persistence is best effort
+            logger.error(f"Error persisting request {request_id} in {self.name}: {e}")
+
+    def unfinished_ids(self) -> List[str]:
+        """IDs of requests not in a terminal status (e.g. cut off by a restart)."""
+        with self._lock:
+            return [
+                rid
+                for rid, entry in self._entries.items()
+                if entry.get("status") not in TERMINAL_STATUSES
+            ]
+
+    def close(self) -> None:
+        """Close the SQLite file, if any."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+__all__ = ["RequestEntry", "RequestStore", "TERMINAL_STATUSES"]
@@ -38,6 +38,83 @@ class SessionService:
         self.db_service = db_service
         self.current_session: Optional[SessionState] = None
 
+    def _format_session_summary(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a sessions row or summary row to the session dict used by callers.
+
+        Args:
+            row: Row with id, name, created_at, updated_at and user_id
+
+        Returns:
+            Dict[str, Any]: Session metadata with timezone-naive datetimes
+        """
+        metadata = row.get("metadata") or {}
+        if isinstance(metadata, str):
+            try:
+                metadata = json.loads(metadata)
+            except json.JSONDecodeError:
+                metadata = {}
+        created_at = parse_datetime(row.get("created_at"))
+        updated_at = parse_datetime(row.get("updated_at")) if row.get("updated_at") else created_at
+        # Make sure they're timezone-naive
+        if created_at and created_at.tzinfo:
+            created_at = created_at.replace(tzinfo=None)
+        if updated_at and updated_at.tzinfo:
+            updated_at = updated_at.replace(tzinfo=None)
+        return {
+            "id": row.get("id"),
+            "name": row.get("name"),
+            "description": row.get("description") or metadata.get("description", ""),
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "user_id": row.get("user_id") or "developer",
+            "message_count": row.get("message_count", 0),
+        }
+
+    async def list_session_summaries(
+        self,
+        user_id: Optional[str] = "developer",
+        limit: int = 10,
+        cursor: Optional[Tuple[Any, int]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, int]]]:
+        """
+        Get one page of session summaries, most recently active first.
+
+        Reads one sessions row per session through the list_session_summaries
+        database function (or its SQLite equivalent); last_message_at and
+        message_count are maintained by a trigger on swarm_messages inserts.
+
+        Args:
+            user_id: User ID to filter sessions by (None for all users)
+            limit: Maximum number of sessions to return
+            cursor: (updated_at, id) of the last session on the previous page
+
+        Returns:
+            Tuple of (sessions, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            RuntimeError: If the query fails
+        """
+        params: Dict[str, Any] = {"p_user_id": user_id, "p_limit": limit}
+        if cursor is not None:
+            updated_at, last_id = cursor
+            if isinstance(updated_at, datetime):
+                updated_at = updated_at.isoformat()
+            params["p_before_updated_at"] = updated_at
+            params["p_before_id"] = int(last_id)
+        rows = await self.db_service.rpc("list_session_summaries", params)
+
+        sessions = [self._format_session_summary(row) for row in rows]
+
+        next_cursor = None
+        if len(rows) == limit and rows:
+            last = rows[-1]
+            last_updated = last.get("updated_at")
+            if isinstance(last_updated, datetime):
+                last_updated = last_updated.isoformat()
+            next_cursor = (last_updated, last.get("id"))
+        return sessions, next_cursor
+
     async def get_recent_sessions(
         self, limit: int = 10, user_id: str = "developer"
     ) -> Dict[str, Dict[str, Any]]:
@@ -52,103 +129,8 @@ class SessionService:
             Dict[str, Dict[str, Any]]: Dictionary mapping session IDs to session metadata
         """
         try:
-            # Query all system messages to find session starts
-            response = await self.db_service.select(
-                table_name="swarm_messages",
-                columns="session_id, metadata, timestamp, user_id",
-                order_by="timestamp",
-                order_desc=True,
-            )
-
-            sessions = {}
-            # First pass - collect all unique session IDs
-            unique_sessions = set()
-            for item in response:
-                session_id = item.get("session_id")
-                if session_id and session_id not in unique_sessions:
-                    unique_sessions.add(session_id)
-
-                    if len(unique_sessions) >= limit:
-                        break
-
-            # Process each unique session
-            for session_id in unique_sessions:
-                # Find the first message (likely system) for this session
-                init_message = await self.db_service.select(
-                    table_name="swarm_messages",
-                    columns="metadata, timestamp, user_id",
-                    filters={"session_id": session_id},
-                    order_by="timestamp",
-                    limit=1,
-                )
-
-                if not init_message:
-                    continue
-
-                item = init_message[0]
-
-                # Get metadata
-                metadata_str = item.get("metadata", "{}")
-                try:
-                    metadata = (
-                        json.loads(metadata_str) if isinstance(metadata_str, str) else metadata_str
-                    )
-                except json.JSONDecodeError:
-                    metadata = {}
-
-                # Get title from metadata
-                name = metadata.get("title")
-
-                # Get created timestamp
-                timestamp_str = item.get("timestamp")
-                created_at = parse_datetime(timestamp_str)
-
-                # Make sure it's timezone-naive
-                if created_at and created_at.tzinfo:
-                    created_at = created_at.replace(tzinfo=None)
-
-                # Find the most recent message for this session_id
-                latest_message = await self.db_service.select(
-                    table_name="swarm_messages",
-                    columns="timestamp",
-                    filters={"session_id": session_id},
-                    order_by="timestamp",
-                    order_desc=True,
-                    limit=1,
-                )
-
-                # Set updated_at to the latest message timestamp or created_at as fallback
-                if latest_message:
-                    updated_at = parse_datetime(latest_message[0].get("timestamp"))
-                    # Make sure it's timezone-naive
-                    if updated_at and updated_at.tzinfo:
-                        updated_at = updated_at.replace(tzinfo=None)
-                else:
-                    updated_at = created_at
-
-                # Get user ID from item or metadata
-                item_user_id = item.get("user_id", "developer")
-                metadata_user_id = metadata.get("user_id")
-                session_user_id = metadata_user_id or item_user_id
-
-                # Skip if filtering by user_id and this session doesn't belong to the user
-                if user_id and session_user_id != user_id:
-                    continue
-
-                sessions[str(session_id)] = {
-                    "id": session_id,
-                    "name": name,
-                    "description": metadata.get("description", ""),
-                    "created_at": created_at,
-                    "updated_at": updated_at,
-                    "user_id": session_user_id,
-                }
-
-                # Log for debugging
-                logger.debug(
-                    f"Found session: ID={session_id}, Name={name}, User={session_user_id}, Updated={updated_at}"
-                )
-
+            summaries, _ = await self.list_session_summaries(user_id=user_id or None, limit=limit)
+            sessions = {str(session["id"]): session for session in summaries}
             user_filter_msg = f" for user '{user_id}'" if user_id else ""
             logger.debug(f"Retrieved {len(sessions)} sessions{user_filter_msg}")
             return sessions
@@ -160,17 +142,15 @@ class SessionService:
     async def list_sessions(self, user_id: str) -> Dict[str, Any]:
         """List last 10 sessions for a user."""
         try:
-            response = await self.db_service.select_records(
-                "sessions", filters={"user_id": user_id}
-            )
-            return {str(session["id"]): session for session in response} if response else {}
+            summaries, _ = await self.list_session_summaries(user_id=user_id, limit=10)
+            return {str(session["id"]): session for session in summaries}
         except Exception as e:
             logger.error(f"Error listing sessions: {e}")
             return {}
 
     async def create_session(self, user_id: str, name: Optional[str] = None) -> Optional[str]:
         """
-        Create a new session with initial system message.
+        Create a new sessions row and its initial system message.
 
         Args:
             user_id: The user ID for this session
@@ -183,18 +163,23 @@ class SessionService:
             if not user_id:
                 user_id = "developer"
 
-            # Get the next session ID by finding the max and adding 1
-            response = await self.db_service.select(
-                table_name="swarm_messages",
-                columns="session_id",
-                order_by="session_id",
-                order_desc=True,
-                limit=1,
+            now_str = timestamp()
+            # The id comes from the sessions.id sequence, so concurrent front-ends
+            # (CLI, API, MCP) never collide and no table scan is needed
+            session_row = await self.db_service.insert(
+                "sessions",
+                {
+                    "name": name,
+                    "user_id": user_id,
+                    "metadata": {"title": name},
+                    "status": "active",
+                    "created_at": now_str,
+                    "last_message_at": now_str,
+                },
             )
-            next_session_id = (response[0].get("session_id", 0) + 1) if response else 1
-            logger.debug(f"Generated next session ID: {next_session_id}")
+            next_session_id = session_row["id"]
+            logger.debug(f"Allocated session ID: {next_session_id}")
 
-            now_str = timestamp()
             default_embedding = [0.0] * 768
             metadata = {
                 "title": name,
@@ -247,9 +232,9 @@ class SessionService:
                 except ValueError:
                     pass  # Keep as string if not convertible
 
-            # Get session details from recent sessions
-            sessions = await self.get_recent_sessions(user_id=user_id)
-            session = sessions.get(str(session_id))
+            session = await self.get_session(session_id)
+            if session and user_id and session.get("user_id") != user_id:
+                session = {}
 
             if not session:
                 logger.error(f"Session {session_id} not found or not accessible by user {user_id}")
@@ -314,9 +299,14 @@ class SessionService:
                 except ValueError:
                     pass  # Keep as string if not convertible
 
-            # Use get_recent_sessions but filter for just this ID
-            sessions = await self.get_recent_sessions()
-            return sessions.get(str(session_id), {})
+            rows = await self.db_service.select(
+                table_name="sessions", filters={"id": session_id}, limit=1
+            )
+            if not rows:
+                return {}
+            return self._format_session_summary(
+                {**rows[0], "updated_at": rows[0].get("last_message_at")}
+            )
         except Exception as e:
             logger.error(f"Error getting session: {e}")
             return {}
@@ -423,6 +413,9 @@ class SessionService:
                     data={"metadata": json.dumps(current_metadata, cls=DateTimeEncoder)},
                     id_column="id",
                 )
+                await self.db_service.update(
+                    table_name="sessions", record_id=session_id, data={"name": new_name}
+                )
                 # Update session state
                 self.current_session.name = new_name
                 self.current_session.updated_at = now()
@@ -476,6 +469,7 @@ class SessionService:
             await self.db_service.delete(
                 table_name="swarm_messages", filters={"session_id": session_id}
             )
+            await self.db_service.delete(table_name="sessions", filters={"id": session_id})
             # Clear current session
             self.current_session = None
             logger.debug(f"Deleted session and all messages with ID: {session_id}")
@@ -0,0 +1,209 @@
+"""
+Write-behind persistence for high-volume tables such as swarm_messages.
+
+Producers enqueue rows and return immediately; a background task coalesces
+them into bulk inserts that flush when a batch fills or the flush interval
+elapses. The queue is bounded, so producers block (backpressure) instead of
+growing memory without limit when the database falls behind. Batches that
+cannot be written are appended to a local JSONL spill file and replayed after
+the next successful flush or on startup, so a database outage never loses
+conversation history.
+"""
+
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config.database_config import WriteBehindConfig
+from src.managers.db_manager import DBService
+from src.services.logging_service import get_logger
+
+logger = get_logger(__name__)
+
+_STOP = object()  # Sentinel telling the flush loop to drain and exit
+
+
+class WriteBehindQueue:
+    """Bounded queue that persists rows to one table with batched inserts."""
+
+    def __init__(
+        self,
+        db_service: DBService,
+        table_name: str = "swarm_messages",
+        config: Optional[WriteBehindConfig] = None,
+    ):
+        """
+        Initialize the write-behind queue.
+
+        Args:
+            db_service: Database service used for bulk inserts
+            table_name: Table the queued rows belong to
+            config: Batch size, flush interval, queue bound and spill path
+        """
+        self.db_service = db_service
+        self.table_name = table_name
+        self.config = config or WriteBehindConfig()
+        self.spill_path = Path(self.config.spill_path)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.config.max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.stats = {"enqueued": 0, "flushed": 0, "batches": 0, "spilled": 0, "replayed": 0}
+
+    def start(self) -> None:
+        """Start the background flush task if it is not already running."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def enqueue(self, record: Dict[str, Any]) -> None:
+        """
+        Queue a row for persistence, waiting while the queue is full.
+
+        Args:
+            record: Row to insert
+
+        Raises:
+            RuntimeError: If the queue has been closed
+        """
+        if self._closed:
+            raise RuntimeError(f"Write-behind queue for {self.table_name} is closed")
+        self.start()
+        await self._queue.put(record)
+        self.stats["enqueued"] += 1
+
+    async def flush(self) -> None:
+        """Wait until every row queued so far has been written or spilled."""
+        if self._task is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Drain the queue, stop the flush task and refuse further rows."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    @property
+    def pending(self) -> int:
+        """Number of rows waiting to be flushed."""
+        return self._queue.qsize()
+
+    async def _run(self) -> None:
+        """Flush loop: collect a batch, write it, repeat until stopped."""
+        try:
+            await self._replay_spill()
+        except Exception as e:
+            logger.error(f"Error replaying spilled {self.table_name} rows: {e}")
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._next_batch()
+            if batch:
+                try:
+                    await self._write(batch)
+                except Exception as e:
+                    # Only reached if the spill file itself cannot be written
+                    logger.error(f"Dropping {len(batch)} {self.table_name} rows: {e}")
+            for _ in range(len(batch) + (1 if stopping else 0)):
+                self._queue.task_done()
+
+    async def _next_batch(self) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Collect up to batch_size rows, waiting at most flush_interval after the first.
+
+        Returns:
+            The collected rows and whether the stop sentinel was seen
+        """
+        first = await self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.flush_interval
+        while len(batch) < self.config.batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """Insert a batch, spilling it to disk if the database is unavailable."""
+        try:
+            await self.db_service.insert_many(self.table_name, batch)
+        except Exception as e:
+            logger.error(
+                f"Write-behind flush to {self.table_name} failed, spilling {len(batch)} rows: {e}"
+            )
+            await asyncio.to_thread(self._append_spill, batch)
+            self.stats["spilled"] += len(batch)
+            return
+        self.stats["flushed"] += len(batch)
+        self.stats["batches"] += 1
+        await self._replay_spill()
+
+    def _append_spill(self, batch: List[Dict[str, Any]]) -> None:
+        """Append rows to the spill file as JSON lines."""
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.spill_path, "a", encoding="utf-8") as f:
+            for record in batch:
+                f.write(json.dumps(record, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_spill(self) -> List[Dict[str, Any]]:
+        """Read spilled rows, skipping any line truncated by a crash."""
+        records = []
+        with open(self.spill_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt line in {self.spill_path}")
+        return records
+
+    async def _replay_spill(self) -> None:
+        """Re-insert spilled rows; rows that still fail stay in the spill file."""
+        if not self.spill_path.exists():
+            return
+        records = await asyncio.to_thread(self._read_spill)
+        remaining: List[Dict[str, Any]] = []
+        size = self.config.batch_size
+        for start in range(0, len(records), size):
+            chunk = records[start : start + size]
+            if remaining:
+                remaining.extend(chunk)
+                continue
+            try:
+                await self.db_service.insert_many(self.table_name, chunk)
+                self.stats["replayed"] += len(chunk)
+            except Exception as e:
+                logger.warning(f"Replay of spilled {self.table_name} rows deferred: {e}")
+                remaining.extend(chunk)
+        await asyncio.to_thread(self._rewrite_spill, remaining)
+        if records and not remaining:
+            logger.info(f"Replayed {len(records)} spilled rows into {self.table_name}")
+
+    def _rewrite_spill(self, records: List[Dict[str, Any]]) -> None:
+        """Atomically replace the spill file with the rows still unwritten."""
+        if not records:
+            self.spill_path.unlink(missing_ok=True)
+            return
+        tmp_path = self.spill_path.with_suffix(self.spill_path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+        os.replace(tmp_path, self.spill_path)
+
+
+__all__ = ["WriteBehindQueue"]
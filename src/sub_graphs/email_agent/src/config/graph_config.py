@@ -18,6 +18,9 @@ class GoogleConfig:
 
     credentials_file: str = os.getenv("GOOGLE_CREDENTIALS_FILE", "")
     token_file: str = os.getenv("GOOGLE_TOKEN_FILE", "")
+    batch_size: int = int(os.getenv("GOOGLE_BATCH_SIZE", "50"))  # Calls per batch API request
+    # Bytes per Drive upload/download request (uploads round down to 256 KiB multiples)
+    transfer_chunk_size: int = int(os.getenv("DRIVE_CHUNK_SIZE", str(8 * 1024 * 1024)))
     scopes: list = None
 
     def __post_init__(self):
@@ -35,6 +38,7 @@ class GmailConfig:
     credentials_path: str = os.getenv("GMAIL_CREDENTIALS_PATH", "")
     token_path: str = os.getenv("GMAIL_TOKEN_PATH", "token.pickle")
     user_id: str = os.getenv("GMAIL_USER_ID", "me")
+    sync_db_path: str = os.getenv("GMAIL_SYNC_DB", "data/gmail_mirror.db")  # Local mailbox mirror
     scopes: list = None
 
     def __post_init__(self):
@@ -151,6 +155,7 @@ class PersonalAssistantConfig:
             "google": {
                 "credentials_file": self.google.credentials_file,
                 "token_file": self.google.token_file,
+                "batch_size": self.google.batch_size,
                 "scopes": self.google.scopes,
             },
             "gmail": {
@@ -159,6 +164,7 @@ class PersonalAssistantConfig:
                 ),
                 "token_path": (self.gmail_config.token_path if self.gmail_config else None),
                 "user_id": self.gmail_config.user_id if self.gmail_config else None,
+                "sync_db_path": self.gmail_config.sync_db_path if self.gmail_config else None,
                 "scopes": self.gmail_config.scopes if self.gmail_config else None,
             },
             "url": self.url,
@@ -0,0 +1,307 @@
+"""
+Async execution of Google API calls.
+
+googleapiclient is blocking: every ``.execute()`` holds the calling thread
+for a full HTTPS round trip, and the tools were called straight from async
+sub-graph code, stalling the orchestrator's event loop. This module provides:
+
+- GoogleExecutor: runs Google calls in a bounded thread pool and retries
+  429/5xx responses and connection errors with exponential backoff and
+  jitter, so ``await executor.execute(request)`` never blocks the loop;
+  a request it executes itself is sent once per attempt, so there is one
+  retry layer and no thread sleeps in backoff. Tool functions run through
+  ``run()`` keep their requests' own retries, since they usually catch
+  errors and return them instead of letting the executor see them;
+- get_service(): one service per API, version and worker thread, sharing
+  a discovery document that is loaded once and cached on disk, and keeping
+  its authorized HTTP transport (httplib2 is not thread-safe, so transports
+  are per thread rather than shared) for reuse by later calls.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import google_auth_httplib2
+import httplib2
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import DISCOVERY_URI, V2_DISCOVERY_URI, build_from_document
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest, build_http
+
+from .credentials import get_credentials
+from .google_batch import RETRYABLE_STATUSES
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_MAX_WORKERS = int(os.getenv("GOOGLE_MAX_WORKERS", "8"))
+DISCOVERY_CACHE_DIR = os.getenv("GOOGLE_DISCOVERY_CACHE", "data/google_discovery")
+DISCOVERY_MAX_AGE = 24 * 3600  # Seconds before a downloaded discovery document is refetched
+HTTP_TIMEOUT = 60
+# Retries of a 429/5xx or connection error for reads made through get_service() services
+GOOGLE_NUM_RETRIES = int(os.getenv("GOOGLE_NUM_RETRIES", "5"))
+# Only these are retried automatically: replaying e.g. a messages.send POST after a
+# timeout could repeat a call the server already carried out
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+
+_documents: Dict[Tuple[str, str], str] = {}
+_documents_lock = threading.Lock()
+_local = threading.local()
+
+
+def discovery_document(api: str, version: str) -> str:
+    """
+    Discovery document of an API, loaded once per process.
+
+    Documents bundled with googleapiclient are used directly; others are
+    downloaded and cached in DISCOVERY_CACHE_DIR for DISCOVERY_MAX_AGE.
+
+    Args:
+        api: API name, e.g. "calendar"
+        version: API version, e.g. "v3"
+
+    Returns:
+        The discovery document as JSON text
+    """
+    key = (api, version)
+    with _documents_lock:
+        if key in _documents:
+            return _documents[key]
+
+        document = discovery_cache.get_static_doc(api, version)
+        if document is None:
+            path = Path(DISCOVERY_CACHE_DIR) / f"{api}.{version}.json"
+            if path.exists() and time.time() - path.stat().st_mtime < DISCOVERY_MAX_AGE:
+                document = path.read_text()
+            else:
+                document = _download_discovery_document(api, version)
+                try:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    path.write_text(document)
+                except OSError as e:
+                    logger.warning(f"Could not cache discovery document for {api} {version}: {e}")
+        _documents[key] = document
+        return document
+
+
+def _download_discovery_document(api: str, version: str) -> str:
+    http = httplib2.Http(timeout=HTTP_TIMEOUT)
+    for uri in (DISCOVERY_URI, V2_DISCOVERY_URI):
+        response, content = http.request(uri.format(api=api, apiVersion=version))
+        if response.status < 400:
+            return content.decode("utf-8")
+    raise RuntimeError(f"No discovery document found for Google API {api} {version}")
+
+
+def request_retries() -> int:
+    """
+    Retries for a request made by a tool function.
+
+    Returns:
+        GOOGLE_NUM_RETRIES (GoogleExecutor.execute() sends its requests with none)
+    """
+    return GOOGLE_NUM_RETRIES
+
+
+class RetryingHttpRequest(HttpRequest):
+    """HttpRequest that retries idempotent calls on 429/5xx and connection errors."""
+
+    def execute(self, http=None, num_retries=None):
+        if num_retries is None:
+            num_retries = request_retries() if self.method in IDEMPOTENT_METHODS else 0
+        return super().execute(http=http, num_retries=num_retries)
+
+
+def default_credentials():
+    """Credentials of the shared CredentialsHandler (loaded once, refreshed in the background)."""
+    return get_credentials()
+
+
+def thread_http(credentials) -> google_auth_httplib2.AuthorizedHttp:
+    """Authorized HTTP transport of the calling thread for these credentials, reused."""
+    transports = _local.__dict__.setdefault("transports", {})
+    # The transport references the credentials, so their id() stays unique while cached
+    key = id(credentials)
+    if key not in transports:
+        # build_http() does not follow 308, which resumable uploads use for "continue"
+        transports[key] = google_auth_httplib2.AuthorizedHttp(credentials, http=build_http())
+    return transports[key]
+
+
+def get_service(api: str, version: str, credentials=None):
+    """
+    Service for the calling thread, built once and reused.
+
+    Args:
+        api: API name, e.g. "drive"
+        version: API version, e.g. "v3"
+        credentials: OAuth credentials; defaults to default_credentials()
+
+    Returns:
+        The discovery-based service, with its own authorized HTTP transport;
+        its GET requests retry 429/5xx responses (see request_retries())
+    """
+    credentials = credentials or default_credentials()
+    services = _local.__dict__.setdefault("services", {})
+    key = (api, version, id(credentials))
+    if key not in services:
+        services[key] = build_from_document(
+            discovery_document(api, version),
+            http=thread_http(credentials),
+            requestBuilder=RetryingHttpRequest,
+        )
+        logger.debug(f"Built Google {api} {version} service for {threading.current_thread().name}")
+    return services[key]
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a failed Google call is worth retrying (429, 5xx or a connection error)."""
+    if isinstance(error, HttpError):
+        return error.resp.status in RETRYABLE_STATUSES
+    return isinstance(error, (socket.timeout, ConnectionError, httplib2.HttpLib2Error))
+
+
+def _execute_on_thread_http(request) -> Any:
+    """Execute a request on the worker thread's own transport, wherever it was built."""
+    # GoogleExecutor does the retrying, without holding a worker thread while it waits
+    credentials = getattr(request.http, "credentials", None)
+    http = thread_http(credentials) if credentials is not None else request.http
+    return request.execute(http=http, num_retries=0)
+
+
+class GoogleExecutor:
+    """Runs blocking Google API calls in a bounded thread pool, with retry and backoff."""
+
+    def __init__(
+        self,
+        max_workers: int = GOOGLE_MAX_WORKERS,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 32.0,
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers: Threads (and so concurrent Google calls) at most
+            max_retries: Retries of a retryable failure before giving up
+            base_delay: Delay before the first retry; doubles per retry
+            max_delay: Upper bound of a single delay
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="google")
+        self.stats = {"calls": 0, "retries": 0, "failures": 0}
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number attempt (0-based), with full jitter."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking callable in the pool, retrying retryable Google errors.
+
+        func is called again after a retryable error, so it must be safe to
+        repeat; use run_once() for calls such as sending a message. Requests
+        made inside func keep their own retries (see request_retries()).
+
+        Args:
+            func: Callable doing Google I/O (e.g. an existing tool function)
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            What func returns
+
+        Raises:
+            Exception: The last error once retries are exhausted or it is not retryable
+        """
+        return await self._run(func, args, kwargs, self.max_retries)
+
+    async def run_once(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking callable in the pool without retrying it."""
+        return await self._run(func, args, kwargs, 0)
+
+    async def _run(self, func: Callable[..., Any], args, kwargs, max_retries: int) -> Any:
+        loop = asyncio.get_running_loop()
+        for attempt in range(max_retries + 1):
+            self.stats["calls"] += 1
+            try:
+                return await loop.run_in_executor(
+                    self._pool, functools.partial(func, *args, **kwargs)
+                )
+            except Exception as e:
+                if attempt == max_retries or not is_retryable(e):
+                    self.stats["failures"] += 1
+                    raise
+                delay = self.backoff(attempt)
+                self.stats["retries"] += 1
+                logger.warning(
+                    f"Google call {getattr(func, '__name__', func)} failed ({e}); "
+                    f"retry {attempt + 1}/{max_retries} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def execute(self, request) -> Any:
+        """
+        Execute a googleapiclient request off the event loop.
+
+        Only idempotent (GET/HEAD) requests are retried.
+
+        Args:
+            request: HttpRequest, e.g. service.files().list(...)
+
+        Returns:
+            The deserialized response
+        """
+        retries = self.max_retries if request.method in IDEMPOTENT_METHODS else 0
+        return await self._run(_execute_on_thread_http, (request,), {}, retries)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads."""
+        self._pool.shutdown(wait=wait)
+
+
+_executor: Optional[GoogleExecutor] = None
+
+
+def get_google_executor() -> GoogleExecutor:
+    """Return the process-wide Google executor."""
+    global _executor
+    if _executor is None:
+        _executor = GoogleExecutor()
+    return _executor
+
+
+async def run_google(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking, repeatable Google tool function on the shared executor."""
+    return await get_google_executor().run(func, *args, **kwargs)
+
+
+async def run_google_once(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking Google tool function on the shared executor, without retries."""
+    return await get_google_executor().run_once(func, *args, **kwargs)
+
+
+__all__ = [
+    "GoogleExecutor",
+    "RetryingHttpRequest",
+    "default_credentials",
+    "discovery_document",
+    "get_google_executor",
+    "get_service",
+    "is_retryable",
+    "request_retries",
+    "run_google",
+    "run_google_once",
+    "thread_http",
+]
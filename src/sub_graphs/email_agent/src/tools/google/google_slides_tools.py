@@ -1,21 +1,16 @@
 import os
 import sys
 import time
-from functools import lru_cache
 from typing import Any, Dict, List, Optional, Union
 
-from googleapiclient.discovery import build
-
 # Add the parent directory to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from tools.credentials_handler import get_credentials
+from .google_executor import get_service
 
 
-@lru_cache(maxsize=1)
 def get_slides_service():
-    """Get and cache the Google Slides service."""
-    creds = get_credentials()
-    return build("slides", "v1", credentials=creds)
+    """Get the Google Slides service of the calling thread (built once per thread)."""
+    return get_service("slides", "v1")
 
 
 def create_presentation(title: str) -> str:
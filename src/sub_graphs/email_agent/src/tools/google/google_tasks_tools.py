@@ -6,22 +6,18 @@ import json
 import logging
 import os
 import sys
-from functools import lru_cache
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
-from googleapiclient.discovery import build
-
-from .credentials import CredentialsHandler, get_credentials
+from .google_batch import batch_execute
+from .google_executor import get_service
 
 # Add the parent directory to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
-@lru_cache(maxsize=1)
 def get_tasks_service():
-    """Get and cache the Google Tasks service."""
-    creds = get_credentials()
-    return build("tasks", "v1", credentials=creds)
+    """Get the Google Tasks service of the calling thread (built once per thread)."""
+    return get_service("tasks", "v1")
 
 
 # Task List Functions
@@ -144,43 +140,55 @@ def tasks_insert(tasklist_id: str, title: str, notes: str = "", due: str = None)
         return f"Error creating task: {str(e)}"
 
 
-def tasks_list(tasklist_id: str, max_results: int = 100) -> str:
-    """List tasks in a task list."""
+def _tasks_list_request(service, tasklist_id: str, max_results: int):
+    """Build the tasks().list request for one task list."""
+    return service.tasks().list(
+        tasklist=tasklist_id,
+        maxResults=max_results,
+        showCompleted=True,
+        showDeleted=False,
+        showHidden=True,
+    )
+
+
+def _format_tasks(tasklist_id: str, results: Dict[str, Any]) -> Dict[str, Any]:
+    """Format a tasks().list response so task IDs are prominently displayed."""
+    formatted_tasks = []
+    for index, task in enumerate(results.get("items", []), 1):
+        formatted_tasks.append(
+            {
+                "index": index,
+                "task_id": task["id"],  # Make task ID prominently displayed
+                "title": task.get("title", "No Title"),
+                "notes": task.get("notes", ""),
+                "status": task.get("status", "needsAction"),
+                "due": task.get("due", "Not specified"),
+            }
+        )
+
+    # Return a more structured response
+    return {
+        "tasklist_id": tasklist_id,
+        "task_count": len(formatted_tasks),
+        "tasks": formatted_tasks,
+    }
+
+
+def tasks_list(tasklist_id: Union[str, List[str]], max_results: int = 100) -> str:
+    """List tasks in a task list, or in several task lists fetched in one batch request."""
     try:
         service = get_tasks_service()
-        results = (
-            service.tasks()
-            .list(
-                tasklist=tasklist_id,
-                maxResults=max_results,
-                showCompleted=True,
-                showDeleted=False,
-                showHidden=True,
-            )
-            .execute()
-        )
+        if isinstance(tasklist_id, str):
+            results = _tasks_list_request(service, tasklist_id, max_results).execute()
+            return json.dumps(_format_tasks(tasklist_id, results), indent=2)
 
-        # Format tasks to ensure IDs are prominently displayed
-        formatted_tasks = []
-        for index, task in enumerate(results.get("items", []), 1):
-            formatted_tasks.append(
-                {
-                    "index": index,
-                    "task_id": task["id"],  # Make task ID prominently displayed
-                    "title": task.get("title", "No Title"),
-                    "notes": task.get("notes", ""),
-                    "status": task.get("status", "needsAction"),
-                    "due": task.get("due", "Not specified"),
-                }
-            )
-
-        # Return a more structured response
+        requests = [(tid, _tasks_list_request(service, tid, max_results)) for tid in tasklist_id]
+        results, errors = batch_execute(service, requests)
         response = {
-            "tasklist_id": tasklist_id,
-            "task_count": len(formatted_tasks),
-            "tasks": formatted_tasks,
+            "tasklists": [_format_tasks(tid, results[tid]) for tid in tasklist_id if tid in results]
         }
-
+        if errors:
+            response["failed"] = errors
         return json.dumps(response, indent=2)
     except Exception as e:
         return f"Error listing tasks: {str(e)}"
@@ -1,8 +1,18 @@
-"""Google API credentials handler."""
+"""Google API credentials handler.
+
+Credentials are shared process-wide through CredentialManager, one per token
+file: the token is unpickled once, refreshed in the background shortly
+before it expires (so no tool call waits on an OAuth refresh), refreshed by
+at most one thread at a time, and written back atomically.
+"""
 
 import logging
 import os
 import pickle
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
 from functools import lru_cache
 from typing import List, Optional
 
@@ -12,6 +22,173 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 
 logger = logging.getLogger(__name__)
 
+# Seconds before expiry at which the token is refreshed. It is above google-auth's own
+# 225s threshold, so transports never find the token expired and refresh it themselves.
+REFRESH_MARGIN = int(os.getenv("GOOGLE_TOKEN_REFRESH_MARGIN", "300"))
+REFRESH_RETRY_DELAY = 60  # Seconds before a failed background refresh is retried
+
+
+class CredentialManager:
+    """Process-wide owner of one token file's credentials."""
+
+    def __init__(
+        self,
+        token_path: str,
+        credentials_path: str,
+        refresh_margin: float = REFRESH_MARGIN,
+    ):
+        """Initialize the manager; the token is loaded on first use.
+
+        Args:
+            token_path: Pickled token file
+            credentials_path: OAuth client secrets file, used when no token can be refreshed
+            refresh_margin: Seconds before expiry at which the token is refreshed
+        """
+        self.token_path = token_path
+        self.credentials_path = credentials_path
+        self.refresh_margin = refresh_margin
+        self.credentials: Optional[Credentials] = None
+        self.stats = {"loads": 0, "refreshes": 0, "background_refreshes": 0}
+        # Single flight: one thread loads or refreshes while the others wait for its result
+        self._lock = threading.Lock()
+        self._timer_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._timer_due = 0.0
+
+    def _seconds_left(self, credentials: Credentials) -> float:
+        if not credentials.expiry:
+            return float("inf")
+        now = datetime.now(timezone.utc).replace(tzinfo=None)  # google-auth expiries are naive UTC
+        return (credentials.expiry - now).total_seconds()
+
+    def _fresh(self, credentials: Optional[Credentials]) -> bool:
+        return (
+            credentials is not None
+            and credentials.valid
+            and self._seconds_left(credentials) > self.refresh_margin
+        )
+
+    def get(self, scopes: List[str]) -> Credentials:
+        """Return valid credentials, loading or refreshing them if needed.
+
+        Args:
+            scopes: Scopes to request if a new authorization flow is needed
+
+        Returns:
+            Valid credentials, the same object for every caller
+
+        Raises:
+            RuntimeError: If no valid credentials could be obtained
+        """
+        credentials = self.credentials
+        if self._fresh(credentials):
+            return credentials
+        if credentials is not None and credentials.valid:
+            # Expiring soon but still usable (e.g. the refresh timer was delayed)
+            self._schedule_refresh(0)
+            return credentials
+
+        with self._lock:
+            if self._fresh(self.credentials):
+                return self.credentials
+            try:
+                if self.credentials is None:
+                    self.credentials = self._load()
+                # A still-valid token that expires soon is refreshed by the timer instead
+                if self.credentials is None or not self.credentials.valid:
+                    self._refresh_locked(scopes)
+            except Exception as e:
+                logger.error(f"Error getting credentials from {self.token_path}: {e}")
+                raise RuntimeError(f"Failed to get Google credentials: {e}")
+            self._schedule_refresh()
+            return self.credentials
+
+    def _load(self) -> Optional[Credentials]:
+        if not os.path.exists(self.token_path):
+            return None
+        logger.debug(f"Loading existing token from {self.token_path}")
+        with open(self.token_path, "rb") as token:
+            credentials = pickle.load(token)
+        self.stats["loads"] += 1
+        return credentials
+
+    def _refresh_locked(self, scopes: Optional[List[str]]) -> None:
+        """Refresh or re-authorize the credentials; the caller holds the lock."""
+        credentials = self.credentials
+        if credentials and credentials.refresh_token:
+            logger.debug("Refreshing credentials")
+            credentials.refresh(Request())
+        elif scopes is None:
+            raise RuntimeError("Token cannot be refreshed without a new authorization flow")
+        else:
+            logger.debug(f"Creating new credentials flow with {self.credentials_path}")
+            flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, scopes)
+            self.credentials = flow.run_local_server(port=0)
+        self.stats["refreshes"] += 1
+        self._save()
+
+    def _save(self) -> None:
+        """Write the token to a temporary file and move it into place."""
+        directory = os.path.dirname(os.path.abspath(self.token_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".token-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as token:
+                pickle.dump(self.credentials, token)
+            os.replace(tmp_path, self.token_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        logger.debug(f"Saved credentials to {self.token_path}")
+
+    def _schedule_refresh(self, delay: Optional[float] = None) -> None:
+        """Start the background refresh timer (by default for refresh_margin before expiry)."""
+        credentials = self.credentials
+        if credentials is None or not credentials.refresh_token:
+            return
+        if delay is None:
+            delay = self._seconds_left(credentials) - self.refresh_margin
+            if delay == float("inf"):
+                return
+        delay = max(0.0, delay)
+        with self._timer_lock:
+            if self._timer is not None:
+                if self._timer_due <= time.monotonic() + delay:
+                    return  # An earlier refresh is already scheduled
+                self._timer.cancel()
+            self._timer_due = time.monotonic() + delay
+            self._timer = threading.Timer(delay, self._background_refresh)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _background_refresh(self) -> None:
+        with self._timer_lock:
+            self._timer = None
+        with self._lock:
+            # A caller may have refreshed the token since the timer was set
+            if not self._fresh(self.credentials):
+                try:
+                    self._refresh_locked(scopes=None)
+                    self.stats["background_refreshes"] += 1
+                except Exception as e:
+                    logger.warning(f"Background token refresh failed; retrying: {e}")
+                    self._schedule_refresh(REFRESH_RETRY_DELAY)
+                    return
+        self._schedule_refresh()
+
+    def close(self) -> None:
+        """Stop background refreshing."""
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+
+@lru_cache(maxsize=None)
+def get_credential_manager(token_path: str, credentials_path: str) -> CredentialManager:
+    """Get the shared CredentialManager of a token file."""
+    return CredentialManager(os.path.abspath(token_path), credentials_path)
+
 
 class CredentialsHandler:
     """Handles Google API credentials."""
@@ -41,6 +218,7 @@ class CredentialsHandler:
         if token_dir:
             os.makedirs(token_dir, exist_ok=True)
 
+        self.manager = get_credential_manager(self.token_path, self.credentials_path)
         self.credentials = None
 
     def get_credentials(self, scopes: List[str]) -> Optional[Credentials]:
@@ -53,24 +231,7 @@ class CredentialsHandler:
             Valid credentials or None
         """
         try:
-            if os.path.exists(self.token_path):
-                logger.debug(f"Loading existing token from {self.token_path}")
-                with open(self.token_path, "rb") as token:
-                    self.credentials = pickle.load(token)
-
-            if not self.credentials or not self.credentials.valid:
-                if self.credentials and self.credentials.expired and self.credentials.refresh_token:
-                    logger.debug("Refreshing expired credentials")
-                    self.credentials.refresh(Request())
-                else:
-                    logger.debug(f"Creating new credentials flow with {self.credentials_path}")
-                    flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, scopes)
-                    self.credentials = flow.run_local_server(port=0)
-
-                logger.debug(f"Saving credentials to {self.token_path}")
-                with open(self.token_path, "wb") as token:
-                    pickle.dump(self.credentials, token)
-
+            self.credentials = self.manager.get(scopes)
             return self.credentials
         except Exception as e:
             logger.error(f"Error getting credentials: {e}")
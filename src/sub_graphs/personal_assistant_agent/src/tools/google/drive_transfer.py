@@ -0,0 +1,435 @@
+"""
+Resumable, chunked Google Drive transfers.
+
+upload_file() and download_file() move large files in fixed-size chunks:
+
+- an upload keeps its resumable session URI in TRANSFER_STATE_DIR, so a
+  later call for the same file asks Drive how far it got and continues
+  from there (sessions last a week); a download appends to ``<path>.part``
+  and continues from that file's size;
+- the SHA-256 is computed from the bytes as they are sent or received and
+  checked against Drive's sha256Checksum, so files are read only once
+  (only the part sent before an interruption is read again, to rebuild the
+  hash state when resuming);
+- upload_files() and download_files() run several transfers at once on the
+  shared GoogleExecutor, which also resumes a transfer that failed with a
+  retryable error.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple
+
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaIoBaseUpload
+
+from .google_batch import http_status
+from .google_executor import get_service, is_retryable, request_retries, run_google
+
+logger = logging.getLogger(__name__)
+
+CHUNK_ALIGNMENT = 256 * 1024  # Drive requires upload chunks in multiples of 256 KiB
+DEFAULT_CHUNK_SIZE = int(os.getenv("DRIVE_CHUNK_SIZE", str(8 * 1024 * 1024)))
+TRANSFER_STATE_DIR = os.getenv("DRIVE_TRANSFER_STATE", "data/drive_transfers")
+SESSION_MAX_AGE = 7 * 24 * 3600  # Drive expires resumable upload sessions after a week
+HASH_BLOCK_SIZE = 1024 * 1024
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def align_chunk_size(chunk_size: int) -> int:
+    """Round a chunk size down to a multiple of 256 KiB (at least 256 KiB)."""
+    return max(CHUNK_ALIGNMENT, chunk_size // CHUNK_ALIGNMENT * CHUNK_ALIGNMENT)
+
+
+class HashingReader:
+    """
+    Seekable reader that hashes every byte the first time it is read.
+
+    The upload may seek back to resend a chunk; bytes already hashed are not
+    hashed again. A read that starts past the hashed prefix (a resumed
+    upload) first hashes the skipped range from the file.
+    """
+
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+        self.sha256 = hashlib.sha256()
+        self.hashed = 0
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._stream.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._stream.tell()
+
+    def read(self, size: int = -1) -> bytes:
+        position = self._stream.tell()
+        if position > self.hashed:
+            self.hash_until(position)
+        data = self._stream.read(size)
+        end = position + len(data)
+        if position <= self.hashed < end:
+            self.sha256.update(data[self.hashed - position :])
+            self.hashed = end
+        return data
+
+    def hash_until(self, offset: int) -> None:
+        """Hash the file up to offset, leaving the read position unchanged."""
+        position = self._stream.tell()
+        self._stream.seek(self.hashed)
+        while self.hashed < offset:
+            block = self._stream.read(min(HASH_BLOCK_SIZE, offset - self.hashed))
+            if not block:
+                break
+            self.sha256.update(block)
+            self.hashed += len(block)
+        self._stream.seek(position)
+
+    def hexdigest(self) -> str:
+        return self.sha256.hexdigest()
+
+
+# --- Transfer state ---
+
+
+def _state_path(kind: str, key: str) -> Path:
+    name = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+    return Path(TRANSFER_STATE_DIR) / f"{kind}-{name}.json"
+
+
+def _load_state(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable transfer state {path}: {e}")
+        return None
+
+
+def _save_state(path: Path, state: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def _clear_state(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _prune_states() -> None:
+    """Drop upload sessions Drive has expired."""
+    directory = Path(TRANSFER_STATE_DIR)
+    if not directory.exists():
+        return
+    cutoff = time.time() - SESSION_MAX_AGE
+    for path in directory.glob("upload-*.json"):
+        if path.stat().st_mtime < cutoff:
+            _clear_state(path)
+
+
+# --- Upload ---
+
+
+def upload_file(
+    file_path: str,
+    parent_folder_id: Optional[str] = None,
+    mime_type: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    service=None,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Upload a file to Drive in resumable chunks, continuing an interrupted upload.
+
+    Args:
+        file_path: File to upload
+        parent_folder_id: Optional folder to upload to
+        mime_type: MIME type; guessed from the file name if omitted
+        chunk_size: Bytes per request (rounded down to a multiple of 256 KiB)
+        service: Drive service; defaults to the calling thread's
+        progress: Optional callback(bytes_sent, total_bytes) after each chunk
+
+    Returns:
+        Dict with the file's id, name, size, sha256, whether the upload was
+        resumed, and whether Drive's checksum matched
+
+    Raises:
+        RuntimeError: If Drive's checksum does not match the bytes sent
+    """
+    service = service or get_service("drive", "v3")
+    path = os.path.abspath(file_path)
+    stat = os.stat(path)
+    name = os.path.basename(path)
+    mime_type = mime_type or mimetypes.guess_type(name)[0] or "application/octet-stream"
+    state_path = _state_path(
+        "upload", f"{path}|{stat.st_size}|{stat.st_mtime_ns}|{parent_folder_id}|{mime_type}"
+    )
+    _prune_states()
+    state = _load_state(state_path)
+
+    body = {"name": name}
+    if parent_folder_id:
+        body["parents"] = [parent_folder_id]
+
+    with open(path, "rb") as f:
+        reader = HashingReader(f)
+        media = MediaIoBaseUpload(
+            reader, mimetype=mime_type, chunksize=align_chunk_size(chunk_size), resumable=True
+        )
+        request = service.files().create(
+            body=body, media_body=media, fields="id, name, size, sha256Checksum"
+        )
+        resumed = state is not None
+        if resumed:
+            request.resumable_uri = state["resumable_uri"]
+            # Ask Drive for the received range before sending, as next_chunk does after an error
+            request._in_error_state = True
+            logger.info(f"Resuming upload of {name}")
+
+        response = None
+        while response is None:
+            try:
+                status, response = request.next_chunk(num_retries=request_retries())
+            except HttpError as e:
+                if not resumed or http_status(e) not in (404, 410):
+                    raise
+                logger.info(f"Upload session for {name} expired; starting over")
+                _clear_state(state_path)
+                return upload_file(
+                    file_path, parent_folder_id, mime_type, chunk_size, service, progress
+                )
+            if state is None and request.resumable_uri:
+                state = {"resumable_uri": request.resumable_uri, "path": path}
+                _save_state(state_path, state)
+            if status is not None and progress:
+                progress(status.resumable_progress, stat.st_size)
+
+        # Drive may confirm the upload without rereading the tail (e.g. completed before a crash)
+        reader.hash_until(stat.st_size)
+
+    _clear_state(state_path)
+    sha256 = reader.hexdigest()
+    remote = response.get("sha256Checksum")
+    if remote and remote != sha256:
+        logger.error(f"Checksum mismatch uploading {name}: local {sha256}, Drive {remote}")
+        raise RuntimeError(f"Upload of {name} is corrupt: SHA-256 does not match")
+    if progress:
+        progress(stat.st_size, stat.st_size)
+    return {
+        "id": response.get("id"),
+        "name": response.get("name", name),
+        "size": stat.st_size,
+        "sha256": sha256,
+        "resumed": resumed,
+        "verified": bool(remote),
+    }
+
+
+# --- Download ---
+
+
+def _fetch_range(request, start: int, end: int) -> bytes:
+    """GET bytes start..end (inclusive) of a media request, retrying 429/5xx."""
+    headers = dict(request.headers, range=f"bytes={start}-{end}")
+    num_retries = request_retries()
+    for attempt in range(num_retries + 1):
+        try:
+            response, content = request.http.request(request.uri, "GET", headers=headers)
+            if response.status in (200, 206):
+                return content
+            raise HttpError(response, content, uri=request.uri)
+        except Exception as e:
+            if attempt == num_retries or not is_retryable(e):
+                raise
+            time.sleep(min(32.0, 2**attempt))
+
+
+def download_file(
+    file_id: str,
+    output_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    service=None,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Download a Drive file in chunks, continuing an interrupted download.
+
+    Args:
+        file_id: ID of the file to download
+        output_path: Where to save the file
+        chunk_size: Bytes per range request
+        service: Drive service; defaults to the calling thread's
+        progress: Optional callback(bytes_received, total_bytes) after each chunk
+
+    Returns:
+        Dict with the file's id, name, path, size, sha256, the offset it was
+        resumed from, and whether Drive's checksum matched
+
+    Raises:
+        RuntimeError: If the file is Google-native (e.g. a Doc) and has no content
+            to download, or the downloaded bytes do not match Drive's checksum
+    """
+    service = service or get_service("drive", "v3")
+    meta = (
+        service.files()
+        .get(fileId=file_id, fields="id, name, size, sha256Checksum, modifiedTime, mimeType")
+        .execute()
+    )
+    if "size" not in meta:
+        # Docs, Sheets, Slides etc. have no stored bytes; they can only be exported
+        logger.error(f"Cannot download {file_id} ({meta.get('mimeType')}): it has no content")
+        raise RuntimeError(
+            f"{meta.get('name')} is a {meta.get('mimeType')} file with no downloadable content; "
+            "export it with files().export instead"
+        )
+    size = int(meta["size"])
+    output_path = os.path.abspath(output_path)
+    part_path = f"{output_path}.part"
+    state_path = _state_path("download", f"{file_id}|{output_path}")
+    state = _load_state(state_path)
+
+    # A partial file is only continued if the Drive file has not changed since
+    offset = 0
+    if state and state.get("modified") == meta.get("modifiedTime") and os.path.exists(part_path):
+        offset = min(os.path.getsize(part_path), size)
+    else:
+        _save_state(state_path, {"modified": meta.get("modifiedTime"), "path": output_path})
+
+    sha256 = hashlib.sha256()
+    request = service.files().get_media(fileId=file_id)
+    with open(part_path, "r+b" if offset else "wb") as f:
+        # Rebuild the hash state from the part already on disk
+        while f.tell() < offset:
+            sha256.update(f.read(min(HASH_BLOCK_SIZE, offset - f.tell())))
+        f.truncate(offset)
+        if offset:
+            logger.info(f"Resuming download of {meta.get('name')} at byte {offset}")
+
+        position = offset
+        while position < size:
+            end = min(position + chunk_size, size) - 1
+            content = _fetch_range(request, position, end)
+            if not content:
+                # An empty 200/206 would never advance position
+                raise RuntimeError(
+                    f"Drive returned no data for {meta.get('name')} at byte {position} of {size}"
+                )
+            f.write(content)
+            sha256.update(content)
+            position += len(content)
+            if progress:
+                progress(position, size)
+
+    digest = sha256.hexdigest()
+    remote = meta.get("sha256Checksum")
+    if remote and remote != digest:
+        os.unlink(part_path)
+        _clear_state(state_path)
+        logger.error(f"Checksum mismatch downloading {file_id}: local {digest}, Drive {remote}")
+        raise RuntimeError(f"Download of {meta.get('name')} is corrupt: SHA-256 does not match")
+    os.replace(part_path, output_path)
+    _clear_state(state_path)
+    return {
+        "id": file_id,
+        "name": meta.get("name"),
+        "path": output_path,
+        "size": size,
+        "sha256": digest,
+        "resumed_from": offset,
+        "verified": bool(remote),
+    }
+
+
+# --- Concurrent transfers ---
+
+
+async def _run_all(calls: Sequence[Tuple[str, Callable[..., Any], Dict[str, Any]]]):
+    results = await asyncio.gather(
+        *(run_google(func, **kwargs) for _, func, kwargs in calls), return_exceptions=True
+    )
+    outcomes = []
+    for (label, _, _), result in zip(calls, results):
+        if isinstance(result, Exception):
+            logger.error(f"Drive transfer of {label} failed: {result}")
+            outcomes.append({"source": label, "error": str(result)})
+        else:
+            outcomes.append(result)
+    return outcomes
+
+
+async def upload_files(
+    file_paths: Sequence[str],
+    parent_folder_id: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[Dict[str, Any]]:
+    """
+    Upload several files at once on the shared Google executor.
+
+    Args:
+        file_paths: Files to upload
+        parent_folder_id: Optional folder to upload to
+        chunk_size: Bytes per request
+
+    Returns:
+        One result per file, in order; failed uploads have an "error" key
+    """
+    return await _run_all(
+        [
+            (
+                path,
+                upload_file,
+                {"file_path": path, "parent_folder_id": parent_folder_id, "chunk_size": chunk_size},
+            )
+            for path in file_paths
+        ]
+    )
+
+
+async def download_files(
+    files: Sequence[Tuple[str, str]], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> List[Dict[str, Any]]:
+    """
+    Download several files at once on the shared Google executor.
+
+    Args:
+        files: (file ID, output path) pairs
+        chunk_size: Bytes per range request
+
+    Returns:
+        One result per file, in order; failed downloads have an "error" key
+    """
+    return await _run_all(
+        [
+            (
+                file_id,
+                download_file,
+                {"file_id": file_id, "output_path": output_path, "chunk_size": chunk_size},
+            )
+            for file_id, output_path in files
+        ]
+    )
+
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "HashingReader",
+    "align_chunk_size",
+    "download_file",
+    "download_files",
+    "upload_file",
+    "upload_files",
+]
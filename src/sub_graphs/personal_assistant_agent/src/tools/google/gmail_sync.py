@@ -0,0 +1,448 @@
+"""
+Incremental Gmail mirror.
+
+Instead of re-listing the inbox for every email request, GmailMirror keeps a
+local SQLite copy of message headers, labels and snippets and brings it up
+to date with users.history.list from the last stored historyId:
+
+- the first sync (or one after the historyId has expired, which Gmail
+  reports as 404) lists the mailbox and fetches headers in batch requests;
+- later syncs fetch only the history since the stored historyId, plus the
+  headers of newly added messages;
+- listings are answered from the local index, and unread counts from
+  Gmail's own per-label counts, refreshed by every sync that saw changes
+  (the mirror holds only the newest max_messages messages).
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .google_batch import (
+    DEFAULT_BATCH_SIZE,
+    METADATA_HEADERS,
+    RETRYABLE_STATUSES,
+    batch_execute,
+    http_status,
+    summarize_message,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYNC_DB = os.getenv("GMAIL_SYNC_DB", "data/gmail_mirror.db")
+HISTORY_TYPES = ["messageAdded", "messageDeleted", "labelAdded", "labelRemoved"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    thread_id TEXT,
+    subject TEXT,
+    sender TEXT,
+    date TEXT,
+    snippet TEXT,
+    internal_date INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS message_labels (
+    message_id TEXT NOT NULL,
+    label TEXT NOT NULL,
+    PRIMARY KEY (label, message_id)
+);
+CREATE INDEX IF NOT EXISTS message_labels_by_message ON message_labels (message_id);
+CREATE INDEX IF NOT EXISTS messages_by_date ON messages (internal_date DESC);
+CREATE TABLE IF NOT EXISTS label_counts (
+    label TEXT PRIMARY KEY,
+    unread INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+class GmailMirror:
+    """Local message-header index of a Gmail mailbox, kept current via historyId."""
+
+    def __init__(
+        self,
+        service,
+        db_path: str = DEFAULT_SYNC_DB,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_messages: int = 500,
+        min_sync_interval: float = 0.0,
+    ):
+        """
+        Initialize the mirror, creating its SQLite file if needed.
+
+        Args:
+            service: Gmail service, or a callable returning the calling thread's service
+            db_path: SQLite file (":memory:" for a throwaway mirror)
+            batch_size: Calls per batch request when fetching headers
+            max_messages: Most recent messages fetched by a full resync
+            min_sync_interval: Seconds during which a repeated sync() is skipped
+        """
+        self._service = service
+        self.batch_size = batch_size
+        self.max_messages = max_messages
+        self.min_sync_interval = min_sync_interval
+        self.last_sync = 0.0
+        self.stats = {"full_syncs": 0, "incremental_syncs": 0, "fetched": 0}
+        self._lock = threading.RLock()
+        try:
+            if db_path != ":memory:":
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+        except sqlite3.Error as e:
+            logger.error(f"Error opening Gmail mirror at {db_path}: {e}")
+            raise RuntimeError(f"Failed to open Gmail mirror: {e}")
+
+    @property
+    def service(self):
+        """Gmail service to use from the calling thread."""
+        return self._service() if callable(self._service) else self._service
+
+    # --- Sync state ---
+
+    @property
+    def history_id(self) -> Optional[str]:
+        """historyId the mirror is current up to, or None before the first sync."""
+        row = self._db.execute("SELECT value FROM sync_state WHERE key = 'history_id'").fetchone()
+        return row[0] if row else None
+
+    def _set_history_id(self, history_id: str) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('history_id', ?)",
+            (str(history_id),),
+        )
+
+    # --- Sync ---
+
+    def sync(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Bring the mirror up to date.
+
+        Args:
+            force: Sync even if the last sync was less than min_sync_interval ago
+
+        Returns:
+            Dict with the sync mode ("full", "incremental" or "skipped") and counts
+        """
+        with self._lock:
+            if not force and time.monotonic() - self.last_sync < self.min_sync_interval:
+                return {"mode": "skipped"}
+            history_id = self.history_id
+            if history_id is None:
+                result = self.full_sync()
+            else:
+                try:
+                    result = self._incremental_sync(history_id)
+                except Exception as e:
+                    if http_status(e) != 404:
+                        raise
+                    logger.info(f"Gmail historyId {history_id} expired; resyncing mailbox")
+                    result = self.full_sync()
+            self.last_sync = time.monotonic()
+            return result
+
+    def full_sync(self) -> Dict[str, Any]:
+        """Replace the mirror with the most recent max_messages messages."""
+        with self._lock:
+            users = self.service.users()
+            # Read the historyId first so changes made while listing are picked up next time
+            history_id = users.getProfile(userId="me").execute()["historyId"]
+            counts = self._fetch_label_counts()
+
+            message_ids: List[str] = []
+            page_token = None
+            while len(message_ids) < self.max_messages:
+                page = (
+                    users.messages()
+                    .list(
+                        userId="me",
+                        maxResults=min(500, self.max_messages - len(message_ids)),
+                        pageToken=page_token,
+                    )
+                    .execute()
+                )
+                message_ids.extend(msg["id"] for msg in page.get("messages", []))
+                page_token = page.get("nextPageToken")
+                if not page_token:
+                    break
+
+            rows, failed, _ = self._fetch(message_ids)
+            self._db.execute("BEGIN")
+            try:
+                self._db.execute("DELETE FROM messages")
+                self._db.execute("DELETE FROM message_labels")
+                self._store(rows)
+                self._store_label_counts(counts)
+                self._set_history_id(history_id)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self.stats["full_syncs"] += 1
+            logger.debug(f"Gmail mirror resynced {len(rows)} messages at history {history_id}")
+            return {"mode": "full", "stored": len(rows), "failed": failed}
+
+    def _incremental_sync(self, start_history_id: str) -> Dict[str, Any]:
+        """Apply the history since start_history_id; raises HttpError 404 if it expired."""
+        history = self.service.users().history()
+        to_fetch: Dict[str, None] = {}
+        deleted: Dict[str, None] = {}
+        labels: Dict[str, List[str]] = {}
+        latest = start_history_id
+        page_token = None
+        while True:
+            page = history.list(
+                userId="me",
+                startHistoryId=start_history_id,
+                historyTypes=HISTORY_TYPES,
+                pageToken=page_token,
+            ).execute()
+            for record in page.get("history", []):
+                for added in record.get("messagesAdded", []):
+                    message_id = added["message"]["id"]
+                    deleted.pop(message_id, None)
+                    to_fetch[message_id] = None
+                for removed in record.get("messagesDeleted", []):
+                    message_id = removed["message"]["id"]
+                    to_fetch.pop(message_id, None)
+                    labels.pop(message_id, None)
+                    deleted[message_id] = None
+                for change in record.get("labelsAdded", []) + record.get("labelsRemoved", []):
+                    message = change["message"]
+                    labels[message["id"]] = message.get("labelIds", [])
+            latest = page.get("historyId", latest)
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                break
+
+        rows, failed, retryable = self._fetch(list(to_fetch))
+        counts = self._fetch_label_counts() if to_fetch or deleted or labels else None
+        self._db.execute("BEGIN")
+        try:
+            self._delete(deleted)
+            self._store(rows)
+            trimmed = self._trim()
+            self._store_label_counts(counts)
+            for message_id, label_ids in labels.items():
+                # Messages outside the mirror (older than the last full sync) are not tracked
+                if message_id not in to_fetch and self._contains(message_id):
+                    self._set_labels(message_id, label_ids)
+            # Retryable fetch failures keep the old historyId so the next sync refetches them;
+            # others (e.g. 403) would fail again on every sync, so they are skipped
+            if not retryable:
+                self._set_history_id(latest)
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        self.stats["incremental_syncs"] += 1
+        return {
+            "mode": "incremental",
+            "added": len(rows),
+            "deleted": len(deleted),
+            "relabeled": len(labels),
+            "trimmed": trimmed,
+            "failed": failed,
+        }
+
+    def _fetch(self, message_ids: List[str]):
+        """
+        Fetch message metadata in batches; messages deleted meanwhile are skipped.
+
+        Returns:
+            Tuple of the messages in order, the errors of failed IDs, and the
+            failed IDs worth fetching again (throttled, server or connection errors)
+        """
+        messages = self.service.users().messages()
+        requests = [
+            (
+                message_id,
+                messages.get(
+                    userId="me",
+                    id=message_id,
+                    format="metadata",
+                    metadataHeaders=METADATA_HEADERS,
+                ),
+            )
+            for message_id in message_ids
+        ]
+        statuses: Dict[str, Optional[int]] = {}
+        results, failed = batch_execute(
+            self.service,
+            requests,
+            self.batch_size,
+            ignore_statuses=(404,),
+            error_statuses=statuses,
+        )
+        self.stats["fetched"] += len(results)
+        # A failed batch request with no HTTP status (e.g. a dropped connection) is transient too
+        retryable = [
+            mid
+            for mid, status in statuses.items()
+            if status is None or status in RETRYABLE_STATUSES
+        ]
+        return [results[mid] for mid in message_ids if mid in results], failed, retryable
+
+    def _fetch_label_counts(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Gmail's unread and total message counts of every label.
+
+        labels.list returns only label IDs and names, so the counts come from
+        labels.get calls sent as batch requests.
+
+        Returns:
+            Labels by ID, or None if they could not be fetched (the stored
+            counts are then kept)
+        """
+        try:
+            labels = self.service.users().labels()
+            listed = labels.list(userId="me").execute().get("labels", [])
+            requests = [(label["id"], labels.get(userId="me", id=label["id"])) for label in listed]
+            results, failed = batch_execute(
+                self.service, requests, self.batch_size, ignore_statuses=(404,)
+            )
+        except Exception as e:
+            logger.warning(f"Could not refresh Gmail label counts: {e}")
+            return None
+        if failed:
+            logger.warning(f"Could not refresh the counts of {len(failed)} Gmail labels")
+        return results
+
+    # --- Storage ---
+
+    def _store(self, messages: Iterable[Dict[str, Any]]) -> None:
+        for message in messages:
+            summary = summarize_message(message)
+            self._db.execute(
+                "INSERT OR REPLACE INTO messages "
+                "(id, thread_id, subject, sender, date, snippet, internal_date) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    summary["id"],
+                    summary["thread_id"],
+                    summary["subject"],
+                    summary["from"],
+                    summary["date"],
+                    summary["snippet"],
+                    int(message.get("internalDate", 0)),
+                ),
+            )
+            self._set_labels(summary["id"], message.get("labelIds", []))
+
+    def _store_label_counts(self, counts: Optional[Dict[str, Dict[str, Any]]]) -> None:
+        if counts is None:
+            return
+        self._db.executemany(
+            "INSERT OR REPLACE INTO label_counts (label, unread, total) VALUES (?, ?, ?)",
+            [
+                (label_id, label.get("messagesUnread", 0), label.get("messagesTotal", 0))
+                for label_id, label in counts.items()
+            ],
+        )
+
+    def _contains(self, message_id: str) -> bool:
+        return (
+            self._db.execute("SELECT 1 FROM messages WHERE id = ?", (message_id,)).fetchone()
+            is not None
+        )
+
+    def _set_labels(self, message_id: str, label_ids: List[str]) -> None:
+        self._db.execute("DELETE FROM message_labels WHERE message_id = ?", (message_id,))
+        self._db.executemany(
+            "INSERT OR IGNORE INTO message_labels (message_id, label) VALUES (?, ?)",
+            [(message_id, label) for label in label_ids],
+        )
+
+    def _delete(self, message_ids: Iterable[str]) -> None:
+        for message_id in message_ids:
+            self._db.execute("DELETE FROM messages WHERE id = ?", (message_id,))
+            self._db.execute("DELETE FROM message_labels WHERE message_id = ?", (message_id,))
+
+    def _trim(self) -> int:
+        """Drop all but the newest max_messages messages; returns how many were dropped."""
+        stale = [
+            row[0]
+            for row in self._db.execute(
+                "SELECT id FROM messages ORDER BY internal_date DESC LIMIT -1 OFFSET ?",
+                (self.max_messages,),
+            )
+        ]
+        self._delete(stale)
+        return len(stale)
+
+    # --- Queries ---
+
+    def list_messages(
+        self, label: str = "INBOX", unread_only: bool = False, limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Most recent mirrored messages with a label.
+
+        Args:
+            label: Label ID to filter on
+            unread_only: Only messages that also carry UNREAD
+            limit: Maximum number of messages
+
+        Returns:
+            List of message summaries, newest first
+        """
+        sql = (
+            "SELECT m.id, m.thread_id, m.subject, m.sender, m.date, m.snippet FROM messages m "
+            "JOIN message_labels l ON l.message_id = m.id AND l.label = ? "
+        )
+        if unread_only:
+            sql += "JOIN message_labels u ON u.message_id = m.id AND u.label = 'UNREAD' "
+        sql += "ORDER BY m.internal_date DESC LIMIT ?"
+        with self._lock:
+            rows = self._db.execute(sql, (label, limit)).fetchall()
+            messages = []
+            for row in rows:
+                message = dict(zip(("id", "thread_id", "subject", "from", "date", "snippet"), row))
+                message["labels"] = [
+                    label_id
+                    for (label_id,) in self._db.execute(
+                        "SELECT label FROM message_labels WHERE message_id = ?", (row[0],)
+                    )
+                ]
+                messages.append(message)
+            return messages
+
+    def unread_count(self, label: str = "INBOX") -> int:
+        """
+        Number of unread messages with a label, as of the last sync.
+
+        Args:
+            label: Label ID
+
+        Returns:
+            Gmail's count for the whole mailbox; if it has not been fetched for
+            this label, the number of unread messages in the mirror
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT unread FROM label_counts WHERE label = ?", (label,)
+            ).fetchone()
+            if row is not None:
+                return row[0]
+            (count,) = self._db.execute(
+                "SELECT COUNT(*) FROM message_labels l "
+                "JOIN message_labels u ON u.message_id = l.message_id AND u.label = 'UNREAD' "
+                "WHERE l.label = ?",
+                (label,),
+            ).fetchone()
+            return count
+
+    def close(self) -> None:
+        """Close the SQLite file."""
+        with self._lock:
+            self._db.close()
+
+
+__all__ = ["DEFAULT_SYNC_DB", "GmailMirror"]
@@ -1,21 +1,22 @@
 import base64
 import json
+import logging
 import os
-import pickle
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
-from functools import lru_cache
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 import pytz
 from dotenv import load_dotenv
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+
+from .credentials import get_credential_manager
+from .google_batch import batch_execute, fetch_message_metadata, fetch_thread_metadata
+from .google_executor import get_service
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 SCOPES = [
     "https://www.googleapis.com/auth/gmail.readonly",
     "https://www.googleapis.com/auth/gmail.send",
@@ -35,9 +36,7 @@ SCOPES = [
 
 
 def get_credentials():
-    """Get Google API credentials."""
-    creds = None
-    token_path = "token.pickle"
+    """Get Google API credentials, shared with other callers of the same token file."""
     client_secret_file = os.getenv("GOOGLE_CLIENT_SECRET_FILE")
 
     if not client_secret_file or not os.path.exists(client_secret_file):
@@ -45,29 +44,15 @@ def get_credentials():
             f"Client secret file not found. Please check GOOGLE_CLIENT_SECRET_FILE in .env"
         )
 
-    if os.path.exists(token_path):
-        with open(token_path, "rb") as token:
-            creds = pickle.load(token)
-
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(client_secret_file, SCOPES)
-            creds = flow.run_local_server(port=0)
-        with open(token_path, "wb") as token:
-            pickle.dump(creds, token)
-
-    return creds
+    return get_credential_manager("token.pickle", client_secret_file).get(SCOPES)
 
 
-@lru_cache(maxsize=1)
 def get_services():
-    """Get Gmail and Calendar services."""
+    """Get the Gmail and Calendar services of the calling thread."""
     creds = get_credentials()
     return {
-        "gmail": build("gmail", "v1", credentials=creds),
-        "calendar": build("calendar", "v3", credentials=creds),
+        "gmail": get_service("gmail", "v1", credentials=creds),
+        "calendar": get_service("calendar", "v3", credentials=creds),
     }
 
 
@@ -82,19 +67,12 @@ def gmail_messages_list(max_results: int = 10) -> str:
             .execute()
         )
 
-        messages = []
-        for msg in results.get("messages", []):
-            message = (
-                service.users()
-                .messages()
-                .get(userId="me", id=msg["id"], format="metadata")
-                .execute()
-            )
-            headers = message["payload"]["headers"]
-            subject = next((h["value"] for h in headers if h["name"] == "Subject"), "No Subject")
-            sender = next((h["value"] for h in headers if h["name"] == "From"), "Unknown")
-            messages.append({"id": msg["id"], "subject": subject, "from": sender})
-
+        # Fetch the headers of all listed messages in batch requests
+        message_ids = [msg["id"] for msg in results.get("messages", [])]
+        messages, errors = fetch_message_metadata(service, message_ids)
+        if errors:
+            # Keep the result a plain list; the unreadable messages are only logged
+            logger.warning(f"Could not fetch metadata for {len(errors)} messages: {errors}")
         return json.dumps(messages, indent=2)
     except Exception as e:
         return f"Error listing messages: {str(e)}"
@@ -516,7 +494,14 @@ def gmail_threads_list(max_results: int = 10) -> str:
     try:
         service = get_services()["gmail"]
         results = service.users().threads().list(userId="me", maxResults=max_results).execute()
-        return json.dumps(results.get("threads", []), indent=2)
+
+        # Add subject, sender and date of each thread, fetched in batch requests
+        thread_ids = [thread["id"] for thread in results.get("threads", [])]
+        threads, errors = fetch_thread_metadata(service, thread_ids)
+        if errors:
+            # Keep the result a plain list; the unreadable threads are only logged
+            logger.warning(f"Could not fetch metadata for {len(errors)} threads: {errors}")
+        return json.dumps(threads, indent=2)
     except Exception as e:
         return f"Error listing threads: {str(e)}"
 
@@ -543,9 +528,8 @@ def gmail_threads_untrash(thread_id: str) -> str:
 
 # Tasks Functions
 def get_tasks_service():
-    """Get Tasks API service."""
-    creds = get_credentials()
-    return build("tasks", "v1", credentials=creds)
+    """Get the Tasks API service of the calling thread."""
+    return get_service("tasks", "v1", credentials=get_credentials())
 
 
 def tasks_tasklists_delete(tasklist_id: str) -> str:
@@ -646,43 +630,55 @@ def tasks_insert(tasklist_id: str, title: str, notes: str = "", due: str = None)
         return f"Error creating task: {str(e)}"
 
 
-def tasks_list(tasklist_id: str, max_results: int = 100) -> str:
-    """List tasks in a task list."""
-    try:
-        service = get_tasks_service()
-        results = (
-            service.tasks()
-            .list(
-                tasklist=tasklist_id,
-                maxResults=max_results,
-                showCompleted=True,
-                showDeleted=False,
-                showHidden=True,
-            )
-            .execute()
+def _tasks_list_request(service, tasklist_id: str, max_results: int):
+    """Build the tasks().list request for one task list."""
+    return service.tasks().list(
+        tasklist=tasklist_id,
+        maxResults=max_results,
+        showCompleted=True,
+        showDeleted=False,
+        showHidden=True,
+    )
+
+
+def _format_tasks(tasklist_id: str, results: Dict[str, Any]) -> Dict[str, Any]:
+    """Format a tasks().list response so task IDs are prominently displayed."""
+    formatted_tasks = []
+    for index, task in enumerate(results.get("items", []), 1):
+        formatted_tasks.append(
+            {
+                "index": index,
+                "task_id": task["id"],  # Make task ID prominently displayed
+                "title": task.get("title", "No Title"),
+                "notes": task.get("notes", ""),
+                "status": task.get("status", "needsAction"),
+                "due": task.get("due", "Not specified"),
+            }
         )
 
-        # Format tasks to ensure IDs are prominently displayed
-        formatted_tasks = []
-        for index, task in enumerate(results.get("items", []), 1):
-            formatted_tasks.append(
-                {
-                    "index": index,
-                    "task_id": task["id"],  # Make task ID prominent
-                    "title": task.get("title", "No Title"),
-                    "notes": task.get("notes", ""),
-                    "status": task.get("status", "needsAction"),
-                    "due": task.get("due", "Not specified"),
-                }
-            )
+    # Return a more structured response
+    return {
+        "tasklist_id": tasklist_id,
+        "task_count": len(formatted_tasks),
+        "tasks": formatted_tasks,
+    }
 
-        # Return a more structured response
+
+def tasks_list(tasklist_id: Union[str, List[str]], max_results: int = 100) -> str:
+    """List tasks in a task list, or in several task lists fetched in one batch request."""
+    try:
+        service = get_tasks_service()
+        if isinstance(tasklist_id, str):
+            results = _tasks_list_request(service, tasklist_id, max_results).execute()
+            return json.dumps(_format_tasks(tasklist_id, results), indent=2)
+
+        requests = [(tid, _tasks_list_request(service, tid, max_results)) for tid in tasklist_id]
+        results, errors = batch_execute(service, requests)
         response = {
-            "tasklist_id": tasklist_id,
-            "task_count": len(formatted_tasks),
-            "tasks": formatted_tasks,
+            "tasklists": [_format_tasks(tid, results[tid]) for tid in tasklist_id if tid in results]
         }
-
+        if errors:
+            response["failed"] = errors
         return json.dumps(response, indent=2)
     except Exception as e:
         return f"Error listing tasks: {str(e)}"
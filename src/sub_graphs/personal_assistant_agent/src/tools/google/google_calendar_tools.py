@@ -11,19 +11,15 @@ from typing import Any, Dict, List, Optional, Union
 
 # Add the parent directory to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from functools import lru_cache
 
 import pytz
-from googleapiclient.discovery import build
 
-from .credentials import CredentialsHandler, get_credentials
+from .google_executor import get_service
 
 
-@lru_cache(maxsize=1)
 def get_calendar_service():
-    """Get and cache the Calendar service."""
-    creds = get_credentials()
-    return build("calendar", "v3", credentials=creds)
+    """Get the Calendar service of the calling thread (built once per thread)."""
+    return get_service("calendar", "v3")
 
 
 def list_events(max_results: int = 10, time_min: Optional[str] = None) -> str:
@@ -2,27 +2,22 @@
 Google Drive API Tools
 """
 
-import io
 import json
 import logging
 import os
 import sys
-from functools import lru_cache
 from typing import Any, Dict, List, Optional, Union
 
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
-
 # Add the parent directory to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from .credentials import CredentialsHandler, get_credentials
+from . import drive_transfer
+from .drive_transfer import DEFAULT_CHUNK_SIZE
+from .google_executor import get_service
 
 
-@lru_cache(maxsize=1)
 def get_drive_service():
-    """Get and cache the Google Drive service."""
-    creds = get_credentials()
-    return build("drive", "v3", credentials=creds)
+    """Get the Google Drive service of the calling thread (built once per thread)."""
+    return get_service("drive", "v3")
 
 
 def list_files(max_results: int = 10, query: str = "", order_by: str = "modifiedTime desc") -> str:
@@ -59,56 +54,50 @@ def upload_file(
     file_path: str,
     parent_folder_id: Optional[str] = None,
     mime_type: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
 ) -> str:
     """
-    Upload a file to Google Drive.
+    Upload a file to Google Drive in resumable chunks.
+
+    Calling it again after an interrupted upload continues where it stopped.
 
     Args:
         file_path: Path to the file to upload
         parent_folder_id: Optional folder ID to upload to
         mime_type: Optional MIME type of the file
+        chunk_size: Bytes per upload request
 
     Returns:
         str: File ID of the uploaded file
     """
     try:
-        service = get_drive_service()
-        file_metadata = {"name": os.path.basename(file_path)}
-
-        if parent_folder_id:
-            file_metadata["parents"] = [parent_folder_id]
-
-        media = MediaFileUpload(file_path, mimetype=mime_type, resumable=True)
-
-        file = service.files().create(body=file_metadata, media_body=media, fields="id").execute()
-
-        return f"File uploaded successfully. File ID: {file.get('id')}"
+        result = drive_transfer.upload_file(
+            file_path, parent_folder_id, mime_type, chunk_size, service=get_drive_service()
+        )
+        return f"File uploaded successfully. File ID: {result['id']} (SHA-256: {result['sha256']})"
     except Exception as e:
         return f"Error uploading file: {str(e)}"
 
 
-def download_file(file_id: str, output_path: str) -> str:
+def download_file(file_id: str, output_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
     """
-    Download a file from Google Drive.
+    Download a file from Google Drive in chunks.
+
+    Calling it again after an interrupted download continues where it stopped.
 
     Args:
         file_id: ID of the file to download
         output_path: Where to save the downloaded file
+        chunk_size: Bytes per download request
 
     Returns:
         str: Success or error message
     """
     try:
-        service = get_drive_service()
-        request = service.files().get_media(fileId=file_id)
-
-        with io.FileIO(output_path, "wb") as fh:
-            downloader = MediaIoBaseDownload(fh, request)
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
-
-        return f"File downloaded successfully to {output_path}"
+        result = drive_transfer.download_file(
+            file_id, output_path, chunk_size, service=get_drive_service()
+        )
+        return f"File downloaded successfully to {result['path']} (SHA-256: {result['sha256']})"
     except Exception as e:
         return f"Error downloading file: {str(e)}"
 
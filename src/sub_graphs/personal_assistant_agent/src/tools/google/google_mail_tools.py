@@ -16,12 +16,12 @@ import logging
 import os
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
-from googleapiclient.discovery import build
-
-from .credentials import CredentialsHandler, get_credentials
+from .credentials import CredentialsHandler
+from .gmail_sync import GmailMirror
+from .google_batch import DEFAULT_BATCH_SIZE, fetch_message_metadata, fetch_thread_metadata
+from .google_executor import get_service, run_google, run_google_once
 from .google_tool_base import GoogleToolBase
 
 logger = logging.getLogger(__name__)
@@ -38,26 +38,54 @@ GMAIL_SCOPES = [
     "https://www.googleapis.com/auth/gmail.settings.sharing",
 ]
 
+# Seconds during which repeated listings reuse the mirror without asking Gmail for changes
+MIRROR_SYNC_INTERVAL = float(os.getenv("GMAIL_SYNC_INTERVAL", "30"))
+
 
 class GmailTools:
     """Gmail API tools implementation."""
 
-    def __init__(self, credentials_handler: CredentialsHandler):
+    def __init__(
+        self,
+        credentials_handler: CredentialsHandler,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        sync_db_path: Optional[str] = None,
+    ):
         """Initialize Gmail tools.
 
         Args:
             credentials_handler: Credentials handler instance
+            batch_size: Calls per batch request when fetching message metadata
+            sync_db_path: SQLite file of the local mailbox mirror; None disables it
         """
         self.credentials_handler = credentials_handler
-        self.service = None
+        self.batch_size = batch_size
+        self.sync_db_path = sync_db_path
+        self.credentials = None
+        self.mirror = None
 
     def _get_service(self):
-        """Get the Gmail service."""
-        if not self.service:
-            creds = self.credentials_handler.get_credentials(GMAIL_SCOPES)
-            if creds:
-                self.service = build("gmail", "v1", credentials=creds)
-        return self.service
+        """Get the Gmail service of the calling thread."""
+        if not self.credentials:
+            self.credentials = self.credentials_handler.get_credentials(GMAIL_SCOPES)
+            if not self.credentials:
+                return None
+        # Not cached on the instance: each pool thread must keep its own transport
+        return get_service("gmail", "v1", credentials=self.credentials)
+
+    def _get_mirror(self) -> Optional[GmailMirror]:
+        """Get the local mailbox mirror, brought up to date, if one is configured."""
+        if not self.sync_db_path:
+            return None
+        if not self.mirror:
+            self.mirror = GmailMirror(
+                self._get_service,
+                self.sync_db_path,
+                batch_size=self.batch_size,
+                min_sync_interval=MIRROR_SYNC_INTERVAL,
+            )
+        self.mirror.sync()
+        return self.mirror
 
     def _create_message(self, to: str, subject: str, body: str) -> Dict[str, Any]:
         """Create a message for an email.
@@ -196,6 +224,14 @@ class GmailTools:
 
     def messages_list(self, max_results: int = 10, query: str = None) -> Dict[str, Any]:
         """List Gmail messages."""
+        if not query:
+            # Inbox listings come from the local mirror, which only fetches the delta
+            try:
+                mirror = self._get_mirror()
+                if mirror:
+                    return {"success": True, "messages": mirror.list_messages(limit=max_results)}
+            except Exception as e:
+                logger.warning(f"Gmail mirror unavailable, listing from the API: {e}")
         try:
             service = self._get_service()
             params = {"userId": "me", "maxResults": max_results, "labelIds": ["INBOX"]}
@@ -204,23 +240,27 @@ class GmailTools:
 
             results = service.users().messages().list(**params).execute()
 
-            messages = []
-            for msg in results.get("messages", []):
-                message = (
-                    service.users()
-                    .messages()
-                    .get(userId="me", id=msg["id"], format="metadata")
-                    .execute()
-                )
-                headers = message["payload"]["headers"]
-                subject = next(
-                    (h["value"] for h in headers if h["name"] == "Subject"),
-                    "No Subject",
-                )
-                sender = next((h["value"] for h in headers if h["name"] == "From"), "Unknown")
-                messages.append({"id": msg["id"], "subject": subject, "from": sender})
+            # Fetch the headers of all listed messages in batch requests
+            message_ids = [msg["id"] for msg in results.get("messages", [])]
+            messages, errors = fetch_message_metadata(
+                service, message_ids, batch_size=self.batch_size
+            )
+            response = {"success": True, "messages": messages}
+            if errors:
+                response["failed"] = errors
+            return response
+        except Exception as e:
+            return {"success": False, "error": str(e)}
 
-            return {"success": True, "messages": messages}
+    def unread_count(self, label: str = "INBOX") -> Dict[str, Any]:
+        """Count unread messages with a label."""
+        try:
+            mirror = self._get_mirror()
+            if mirror:
+                return {"success": True, "label": label, "unread": mirror.unread_count(label)}
+            service = self._get_service()
+            result = service.users().labels().get(userId="me", id=label).execute()
+            return {"success": True, "label": label, "unread": result.get("messagesUnread", 0)}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
@@ -249,11 +289,9 @@ class GmailTools:
             return {"success": False, "error": str(e)}
 
 
-@lru_cache(maxsize=1)
 def get_gmail_service():
-    """Get and cache the Gmail service."""
-    creds = get_credentials()
-    return build("gmail", "v1", credentials=creds)
+    """Get the Gmail service of the calling thread (built once per thread)."""
+    return get_service("gmail", "v1")
 
 
 # Gmail History Functions
@@ -567,7 +605,14 @@ def gmail_threads_list(max_results: int = 10) -> str:
     try:
         service = get_gmail_service()
         results = service.users().threads().list(userId="me", maxResults=max_results).execute()
-        return json.dumps(results.get("threads", []), indent=2)
+
+        # Add subject, sender and date of each thread, fetched in batch requests
+        thread_ids = [thread["id"] for thread in results.get("threads", [])]
+        threads, errors = fetch_thread_metadata(service, thread_ids)
+        if errors:
+            # Keep the result a plain list; the unreadable threads are only logged
+            logger.warning(f"Could not fetch metadata for {len(errors)} threads: {errors}")
+        return json.dumps(threads, indent=2)
     except Exception as e:
         return f"Error listing threads: {str(e)}"
 
@@ -631,11 +676,13 @@ class GmailTool(GoogleToolBase):
                 "token_path": config.token_path,
                 "user_id": config.user_id,
                 "scopes": config.scopes,
+                "sync_db_path": getattr(config, "sync_db_path", None),
             }
         else:
             config_dict = config
 
         super().__init__(config=config_dict, tool_name="gmail")
+        self.sync_db_path = config_dict.get("sync_db_path")
         self.gmail_tools = None
 
     async def initialize(self) -> bool:
@@ -651,7 +698,7 @@ class GmailTool(GoogleToolBase):
 
             # Initialize Gmail tools
             if not self.gmail_tools:
-                self.gmail_tools = GmailTools(self._creds_handler)
+                self.gmail_tools = GmailTools(self._creds_handler, sync_db_path=self.sync_db_path)
 
             self._initialized = True
             return True
@@ -665,7 +712,7 @@ class GmailTool(GoogleToolBase):
 
         Args:
             params: Operation parameters
-                action: The action to perform (send, search, etc)
+                action: The action to perform (send, search, unread_count)
                 Additional parameters based on action
 
         Returns:
@@ -680,19 +727,28 @@ class GmailTool(GoogleToolBase):
 
             action = params.get("action", "").lower()
 
+            # The Gmail calls block on HTTPS; run_google keeps them off the event loop
             if action == "send":
-                return self.gmail_tools.messages_send(
+                # Not retried: a send that timed out may still have gone out
+                return await run_google_once(
+                    self.gmail_tools.messages_send,
                     to=params.get("to", ""),
                     subject=params.get("subject", ""),
                     body=params.get("body", ""),
                 )
 
             elif action == "search":
-                return self.gmail_tools.messages_list(
+                return await run_google(
+                    self.gmail_tools.messages_list,
                     max_results=params.get("max_results", 10),
                     query=params.get("query", ""),
                 )
 
+            elif action == "unread_count":
+                return await run_google(
+                    self.gmail_tools.unread_count, label=params.get("label", "INBOX")
+                )
+
             else:
                 return {"success": False, "error": f"Unsupported action: {action}"}
 
@@ -6,22 +6,17 @@ import json
 import logging
 import os
 import sys
-from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
-from googleapiclient.discovery import build
-
-from .credentials import CredentialsHandler, get_credentials
+from .google_executor import get_service
 
 # Add the parent directory to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
-@lru_cache(maxsize=1)
 def get_people_service():
-    """Get and cache the Google People service."""
-    creds = get_credentials()
-    return build("people", "v1", credentials=creds)
+    """Get the Google People service of the calling thread (built once per thread)."""
+    return get_service("people", "v1")
 
 
 # Contact Management Functions
@@ -8,18 +8,14 @@ import os
 import sys
 from typing import Any, Dict, List, Optional
 
-from googleapiclient.discovery import build
-
 # Add the parent directory to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from .credentials import CredentialsHandler, get_credentials
+from .google_executor import get_service as thread_service
 
 
-@lru_cache(maxsize=1)
 def get_service():
-    """Get and cache the Google Sheets service."""
-    creds = get_credentials()
-    return build("sheets", "v4", credentials=creds)
+    """Get the Google Sheets service of the calling thread (built once per thread)."""
+    return thread_service("sheets", "v4")
 
 
 def create_spreadsheet(title: str) -> str:
@@ -6,6 +6,7 @@ This module implements the manager layer for LLM operations.
 
 import asyncio
 import os
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
@@ -17,6 +18,7 @@ from supabase import Client
 from ..config.base_config import LLMConfig, LLMSettings, ModelConfig, load_config
 from ..services.llm_service import LLMService
 from ..state.state_models import Message, MessageStatus, MessageType
+from ..utils.text_processing import TextProcessor
 from .base_manager import BaseManager, ManagerState
 
 
@@ -50,7 +52,7 @@ class LLMManager(BaseManager[LLMConfig, LLMState]):
         """
         if config is None:
             config = load_config("base_config.yaml").llm
-        super().__init__(config)
+        super().__init__(config, LLMState)
         self.service = LLMService(config)
 
     async def initialize(self) -> None:
@@ -147,6 +149,13 @@ class LLMManager(BaseManager[LLMConfig, LLMState]):
         if len(self._state.stats.request_history) > 1000:
             self._state.stats.request_history = self._state.stats.request_history[-1000:]
 
+    @staticmethod
+    def _completion_tokens(usage: Dict[str, Any], text: str) -> int:
+        """Tokens generated, as Ollama reported for this call, else estimated from the text."""
+        if isinstance(usage.get("completion_tokens"), int):
+            return usage["completion_tokens"]
+        return TextProcessor.estimate_token_count(text)
+
     async def generate_response(
         self, prompt: str, context: Optional[Dict[str, Any]] = None
     ) -> Message:
@@ -174,20 +183,20 @@ class LLMManager(BaseManager[LLMConfig, LLMState]):
             )
 
             # Generate response
-            start_time = datetime.now()
+            start_time = time.perf_counter()
+            usage: Dict[str, Any] = {}  # Per call: the service is shared by concurrent requests
             response_text = await service.generate(
                 prompt=prompt,
                 temperature=self.config.temperature,
                 max_tokens=self.config.max_tokens,
                 stop=self.config.stop_sequences,
+                usage=usage,
             )
-            end_time = datetime.now()
-            latency = (end_time - start_time).total_seconds()
+            latency = time.perf_counter() - start_time
+            tokens = self._completion_tokens(usage, response_text)
 
             # Update stats
-            await self.update_stats(
-                tokens=len(response_text.split()), latency=latency  # Rough estimate
-            )
+            await self.update_stats(tokens=tokens, latency=latency)
 
             # Create response message
             response = self.create_message(
@@ -197,7 +206,7 @@ class LLMManager(BaseManager[LLMConfig, LLMState]):
                 data={
                     "model": self.config.default_model,
                     "latency": latency,
-                    "tokens": len(response_text.split()),
+                    "tokens": tokens,
                 },
             )
             self.update_state(response)
@@ -240,13 +249,15 @@ class LLMManager(BaseManager[LLMConfig, LLMState]):
             )
 
             # Stream response
-            start_time = datetime.now()
+            start_time = time.perf_counter()
             full_response = ""
+            usage: Dict[str, Any] = {}
             async for chunk in service.stream(
                 prompt=prompt,
                 temperature=self.config.temperature,
                 max_tokens=self.config.max_tokens,
                 stop=self.config.stop_sequences,
+                usage=usage,
             ):
                 full_response += chunk
                 yield self.create_message(
@@ -256,13 +267,11 @@ class LLMManager(BaseManager[LLMConfig, LLMState]):
                     data={"model": self.config.default_model, "streaming": True},
                 )
 
-            end_time = datetime.now()
-            latency = (end_time - start_time).total_seconds()
+            latency = time.perf_counter() - start_time
+            tokens = self._completion_tokens(usage, full_response)
 
             # Update stats
-            await self.update_stats(
-                tokens=len(full_response.split()), latency=latency  # Rough estimate
-            )
+            await self.update_stats(tokens=tokens, latency=latency)
 
             # Create final message
             yield self.create_message(
@@ -272,7 +281,7 @@ class LLMManager(BaseManager[LLMConfig, LLMState]):
                 data={
                     "model": self.config.default_model,
                     "latency": latency,
-                    "tokens": len(full_response.split()),
+                    "tokens": tokens,
                 },
             )
 
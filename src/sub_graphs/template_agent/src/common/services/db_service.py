@@ -40,16 +40,24 @@ class DBService:
     7. Health monitoring
     """
 
-    def __init__(self, config: DBServiceConfig, client: Optional[Client] = None):
+    def __init__(
+        self,
+        config: DBServiceConfig,
+        client: Optional[Client] = None,
+        vector_store: Optional[Any] = None,
+    ):
         """
         Initialize the database service.
 
         Args:
             config: Database service configuration
             client: Optional Supabase client (for testing)
+            vector_store: Optional local index with an async match_documents method
+                (e.g. the orchestrator's LocalVectorStore) used instead of the RPC
         """
         try:
             self.config = config
+            self.vector_store = vector_store
 
             # Get Supabase credentials from config
             supabase_url = config.get_merged_config().get("supabase_url")
@@ -416,6 +424,18 @@ class DBService:
             List of similar records
         """
         try:
+            if self.vector_store is not None:
+                results = await self.vector_store.match_documents(
+                    query_embedding=embedding,
+                    match_count=match_count,
+                    table_name=table_name,
+                    embedding_column=embedding_column,
+                    filter_object=filters,
+                )
+                self._query_count += 1
+                self._last_query = datetime.now()
+                return results
+
             # Build query
             query = self.client.rpc(
                 "match_documents",
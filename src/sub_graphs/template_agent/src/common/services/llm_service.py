@@ -19,7 +19,7 @@ import json
 import os
 import traceback
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import httpx
 
@@ -30,6 +30,14 @@ from ..utils.logging_utils import get_logger
 logger = get_logger(__name__)
 
 
+def _usage(response_json: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    """Token counts from a final Ollama /api/generate message."""
+    return {
+        "prompt_tokens": response_json.get("prompt_eval_count"),
+        "completion_tokens": response_json.get("eval_count"),
+    }
+
+
 class LLMService:
     """Service for LLM operations."""
 
@@ -105,13 +113,25 @@ class LLMService:
         logger.debug(f"\nResponse details:\n{self._format_json(cleaned_response)}")
         logger.debug("-" * 80)
 
-    async def generate(self, prompt: str, model: Optional[str] = None) -> str:
+    async def generate(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        usage: Optional[Dict[str, Optional[int]]] = None,
+    ) -> str:
         """
         Generate text using local LLM via Ollama.
 
         Args:
             prompt: The input prompt
             model: Optional model override (defaults to instance model)
+            temperature: Optional sampling temperature (defaults to config)
+            max_tokens: Optional cap on generated tokens (defaults to config)
+            stop: Optional stop sequences (defaults to config)
+            usage: Optional dict filled with this call's prompt/completion token counts
 
         Returns:
             Generated text response
@@ -129,9 +149,9 @@ class LLMService:
                 "model": target_model,
                 "prompt": prompt,
                 "stream": False,
-                "temperature": self.temperature,
-                "max_tokens": self.max_tokens,
-                "stop": self.stop_sequences,
+                "temperature": self.temperature if temperature is None else temperature,
+                "max_tokens": self.max_tokens if max_tokens is None else max_tokens,
+                "stop": self.stop_sequences if stop is None else stop,
             }
 
             # Enhanced request logging
@@ -175,6 +195,8 @@ class LLMService:
                 logger.debug("=== Parsed Response ===")
                 logger.debug(json.dumps(log_response, indent=2))
 
+                if usage is not None:
+                    usage.update(_usage(response_json))
                 return response_json["response"]
 
             except httpx.TimeoutException:
@@ -198,6 +220,69 @@ class LLMService:
             logger.debug(traceback.format_exc())
             raise RuntimeError(error_msg)
 
+    async def stream(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        usage: Optional[Dict[str, Optional[int]]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream generated text from Ollama as it is produced.
+
+        Args:
+            prompt: The input prompt
+            model: Optional model override (defaults to instance model)
+            temperature: Optional sampling temperature (defaults to config)
+            max_tokens: Optional cap on generated tokens (defaults to config)
+            stop: Optional stop sequences (defaults to config)
+            usage: Optional dict filled with this call's token counts once it is done
+
+        Yields:
+            str: Generated text fragments in order
+
+        Raises:
+            RuntimeError: If the request fails or Ollama reports an error
+        """
+        base = self.api_url.rstrip("/")
+        endpoint = f"{base}/generate" if base.endswith("/api") else f"{base}/api/generate"
+        options: Dict[str, Any] = {
+            "temperature": self.temperature if temperature is None else temperature,
+            "num_predict": self.max_tokens if max_tokens is None else max_tokens,
+        }
+        if stop or self.stop_sequences:
+            options["stop"] = stop or self.stop_sequences
+        payload = {
+            "model": model or self.model,
+            "prompt": prompt,
+            "stream": True,
+            "options": options,
+        }
+
+        try:
+            async with self.client.stream(
+                "POST", endpoint, json=payload, timeout=httpx.Timeout(120.0, connect=10.0)
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise RuntimeError(chunk["error"])
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        if usage is not None:
+                            usage.update(_usage(chunk))
+                        break
+        except (httpx.HTTPError, json.JSONDecodeError) as e:
+            error_msg = f"Error streaming text: {str(e)}"
+            logger.error(error_msg)
+            raise RuntimeError(error_msg)
+
     async def get_response(
         self, system_prompt: str = "", conversation_history: List[Message] = None
     ) -> str:
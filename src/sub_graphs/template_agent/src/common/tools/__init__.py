@@ -5,9 +5,18 @@ This package contains tool implementations for the template agent.
 """
 
 from .base_tool import BaseTool
+from .completion_bus import ToolCompletionBus, get_completion_bus
 from .initialize_tools import initialize_tools
 from .tool_processor import ToolProcessor
 from .tool_registry import ToolRegistry
 from .tool_utils import ToolUtils
 
-__all__ = ["BaseTool", "ToolRegistry", "ToolUtils", "ToolProcessor", "initialize_tools"]
+__all__ = [
+    "BaseTool",
+    "ToolRegistry",
+    "ToolUtils",
+    "ToolProcessor",
+    "ToolCompletionBus",
+    "get_completion_bus",
+    "initialize_tools",
+]
@@ -0,0 +1,183 @@
+"""
+Tool completion bus.
+
+execute_tool publishes each finished request here, so interfaces no longer
+poll PENDING_TOOL_REQUESTS on a timer. There are two ways to listen:
+
+- wait_for(request_id): await one request through a per-request future
+  (e.g. an API call waiting for its tool result)
+- subscribe(): an async iterator over every completion, with one queue per
+  subscriber (CLI, API and MCP adapters)
+
+A completion is delivered as soon as it is published, and nothing wakes up
+while no tool is running.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Completion = Dict[str, Any]
+
+
+class CompletionSubscription:
+    """Async iterator over (request_id, completion) pairs published after subscribing."""
+
+    def __init__(self, bus: "ToolCompletionBus", name: str):
+        self.bus = bus
+        self.name = name
+        self._queue: "asyncio.Queue[Tuple[str, Completion]]" = asyncio.Queue()
+
+    def __aiter__(self) -> "CompletionSubscription":
+        return self
+
+    async def __anext__(self) -> Tuple[str, Completion]:
+        return await self._queue.get()
+
+    def close(self) -> None:
+        """Stop receiving completions."""
+        self.bus.unsubscribe(self)
+
+
+class ToolCompletionBus:
+    """Delivers tool completions to per-request waiters and to subscribers."""
+
+    def __init__(self, keep_recent: int = 256):
+        """
+        Initialize the bus.
+
+        Args:
+            keep_recent: Completions remembered so wait_for() on an already
+                finished request returns at once
+        """
+        self.keep_recent = keep_recent
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._subscribers: List[CompletionSubscription] = []
+        self._recent: "OrderedDict[str, Completion]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind(self) -> None:
+        """Remember the event loop listeners run on, for publishes from other threads."""
+        self._loop = asyncio.get_running_loop()
+
+    def subscribe(self, name: str = "subscriber") -> CompletionSubscription:
+        """
+        Receive every completion published from now on.
+
+        Args:
+            name: Label used in logs (e.g. "cli", "mcp")
+
+        Returns:
+            CompletionSubscription: Iterate it with ``async for``; close() when done
+        """
+        self._bind()
+        subscription = CompletionSubscription(self, name)
+        self._subscribers.append(subscription)
+        logger.debug(f"Tool completion subscriber added: {name}")
+        return subscription
+
+    def unsubscribe(self, subscription: CompletionSubscription) -> None:
+        if subscription in self._subscribers:
+            self._subscribers.remove(subscription)
+
+    def is_known(self, request_id: str) -> bool:
+        """Whether a request recently completed or is being waited on."""
+        return request_id in self._recent or request_id in self._waiters
+
+    async def wait_for(self, request_id: str, timeout: Optional[float] = None) -> Completion:
+        """
+        Wait for one request to complete.
+
+        Args:
+            request_id: Request to wait for
+            timeout: Optional limit in seconds
+
+        Returns:
+            Completion: The published completion
+
+        Raises:
+            asyncio.TimeoutError: If the request does not complete in time
+        """
+        if request_id in self._recent:
+            return self._recent[request_id]
+        self._bind()
+        future = self._loop.create_future()
+        self._waiters.setdefault(request_id, []).append(future)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            waiters = self._waiters.get(request_id)
+            if waiters and future in waiters:
+                waiters.remove(future)
+                if not waiters:
+                    del self._waiters[request_id]
+
+    def publish(self, request_id: str, completion: Completion) -> None:
+        """
+        Announce that a request finished; safe to call from any thread.
+
+        Args:
+            request_id: The finished request
+            completion: Tool name, response and original query
+        """
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if self._loop is not None and running is not self._loop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._deliver, request_id, completion)
+        else:
+            self._deliver(request_id, completion)
+
+    def _deliver(self, request_id: str, completion: Completion) -> None:
+        self._recent[request_id] = completion
+        self._recent.move_to_end(request_id)
+        while len(self._recent) > self.keep_recent:
+            self._recent.popitem(last=False)
+        for future in self._waiters.pop(request_id, []):
+            if not future.done():
+                future.set_result(completion)
+        for subscription in list(self._subscribers):
+            subscription._queue.put_nowait((request_id, completion))
+
+
+_bus: Optional[ToolCompletionBus] = None
+
+
+def get_completion_bus() -> ToolCompletionBus:
+    """Return the process-wide completion bus."""
+    global _bus
+    if _bus is None:
+        _bus = ToolCompletionBus()
+    return _bus
+
+
+def complete_request(
+    pending: Dict[str, Completion],
+    request_id: str,
+    result: Any = None,
+    error: Optional[str] = None,
+) -> None:
+    """
+    Mark a pending adapter request completed and publish it on the completion bus.
+
+    Args:
+        pending: The adapter's pending requests (e.g. PENDING_MCP_REQUESTS)
+        request_id: The request that finished; unknown ids are ignored
+        result: Response payload
+        error: Error message if the request failed
+    """
+    request = pending.get(request_id)
+    if request is None:
+        return
+    request["status"] = "completed"
+    request["result"] = result if result is not None else {}
+    if error:
+        request["error"] = error
+    get_completion_bus().publish(request_id, request)
+
+
+__all__ = ["CompletionSubscription", "ToolCompletionBus", "complete_request", "get_completion_bus"]
@@ -12,6 +12,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from .completion_bus import get_completion_bus
+
 # Dictionary to store pending tool requests
 PENDING_TOOL_REQUESTS = {}
 
@@ -77,6 +79,8 @@ def update_tool_request(
     """
     Update a tool request with its result.
 
+    Completed and errored requests are published on the completion bus.
+
     Args:
         request_id: ID of the request to update
         status: New status of the request
@@ -91,6 +95,8 @@ def update_tool_request(
             request["response"] = response
         if error is not None:
             request["error"] = error
+        if status in ("completed", "error"):
+            get_completion_bus().publish(request_id, request)
 
 
 def get_tool_request(request_id: str) -> Optional[Dict[str, Any]]:
@@ -15,6 +15,7 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional, Union
 
 from ..state.state_models import Message, MessageRole, MessageStatus, MessageType
+from .completion_bus import get_completion_bus
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -162,6 +163,7 @@ async def execute_tool(
         # Update request status
         PENDING_TOOL_REQUESTS[request_id]["status"] = result.get("status", "completed")
         PENDING_TOOL_REQUESTS[request_id]["response"] = result
+        _publish_completion(request_id)
 
         # If this is a response to a parent request, use parent's request_id
         if parent_request_id:
@@ -205,6 +207,7 @@ async def execute_tool(
 
         PENDING_TOOL_REQUESTS[request_id]["status"] = "error"
         PENDING_TOOL_REQUESTS[request_id]["response"] = error_result
+        _publish_completion(request_id)
 
         if graph_state:
             try:
@@ -257,10 +260,35 @@ def cleanup_processed_request(request_id: str, agent_name: str = "template_agent
         del PENDING_TOOL_REQUESTS[request_id]
 
 
+def _completion_entry(request_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a finished request the way interfaces consume it."""
+    return {
+        "name": request_data.get("name", "Unknown Tool"),
+        "response": request_data.get("response", request_data),
+        "displayed": False,
+        "original_query": request_data.get("args", {}).get("task", ""),
+        "agent": request_data.get("agent"),
+        "started_at": request_data.get("started_at"),
+        "completed_at": request_data.get("completed_at"),
+    }
+
+
+def _publish_completion(request_id: str) -> None:
+    """Notify completion bus listeners that a request finished."""
+    request_data = PENDING_TOOL_REQUESTS[request_id]
+    request_data["completed_at"] = datetime.utcnow().isoformat()
+    get_completion_bus().publish(request_id, _completion_entry(request_data))
+
+
 def check_completed_tool_requests(
     agent_name: str = "template_agent",
 ) -> Optional[Dict[str, Any]]:
-    """Check for completed tool requests."""
+    """
+    Check for completed tool requests that have not been handled yet.
+
+    Completions are normally pushed to listeners through the completion bus;
+    this lets a listener catch up on anything that finished before it subscribed.
+    """
     completed = {}
 
     for request_id, request_data in list(PENDING_TOOL_REQUESTS.items()):
@@ -274,13 +302,6 @@ def check_completed_tool_requests(
             "success",
         ] and not request_data.get("processed", False):
             PENDING_TOOL_REQUESTS[request_id]["processed"] = True
-            completed[request_id] = {
-                "name": request_data.get("name", "Unknown Tool"),
-                "response": request_data.get("response", request_data),
-                "displayed": False,
-                "original_query": request_data.get("args", {}).get("task", ""),
-                "started_at": request_data.get("started_at"),
-                "completed_at": request_data.get("completed_at"),
-            }
+            completed[request_id] = _completion_entry(request_data)
 
     return completed if completed else None
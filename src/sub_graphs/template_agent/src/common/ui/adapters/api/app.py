@@ -7,20 +7,28 @@ It can be used either way:
 2. Directly: uvicorn.run(app, host="0.0.0.0", port=8000)
 """
 
+import asyncio
 import os
 from typing import Any, Dict, Optional
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 from ....common.agents.template_agent import TemplateAgent
 from ....managers import SessionManager
 from ....routers import mcp_router
 from ....services import DBService, LoggingService
+from ....tools.completion_bus import get_completion_bus
+from ....tools.tool_utils import PENDING_TOOL_REQUESTS
 
 logger = LoggingService.get_logger(__name__)
 
+# Statuses of a tool request without a result yet; execute_tool sets any other
+# (completed, success, error or the tool's own) once it finishes
+RUNNING_STATUSES = {"pending", "in_progress"}
+
 
 # Pydantic models for API
 class ChatRequest(BaseModel):
@@ -35,6 +43,15 @@ class ChatResponse(BaseModel):
     response: str
 
 
+class ToolResultResponse(BaseModel):
+    """Response model for the tool result endpoint."""
+
+    request_id: str
+    status: str
+    name: Optional[str] = None
+    response: Optional[Any] = None
+
+
 class StatusResponse(BaseModel):
     """Response model for status endpoint."""
 
@@ -87,6 +104,39 @@ class APIInterface:
                 logger.error(f"Error processing message: {e}", exc_info=True)
                 raise HTTPException(status_code=500, detail=str(e))
 
+        @self.app.get("/tools/{request_id}", response_model=ToolResultResponse)
+        async def get_tool_result(request_id: str, timeout: float = 30.0):
+            """
+            Long-poll for a tool result.
+
+            Returns as soon as the request completes, or 202 with status
+            "pending" if it is still running after the timeout.
+            """
+            bus = get_completion_bus()
+            request = PENDING_TOOL_REQUESTS.get(request_id)
+            if request is None and not bus.is_known(request_id):
+                raise HTTPException(status_code=404, detail=f"Unknown tool request {request_id}")
+            if request is not None and request.get("status") not in RUNNING_STATUSES:
+                # Already finished; the bus only remembers its most recent completions
+                completion = {"name": request.get("name"), "response": request.get("response")}
+            else:
+                try:
+                    completion = await bus.wait_for(request_id, timeout=min(timeout, 60.0))
+                except asyncio.TimeoutError:
+                    return JSONResponse(
+                        status_code=202, content={"request_id": request_id, "status": "pending"}
+                    )
+            response = completion.get("response")
+            status = (
+                response.get("status", "completed") if isinstance(response, dict) else "completed"
+            )
+            return ToolResultResponse(
+                request_id=request_id,
+                status=status,
+                name=completion.get("name"),
+                response=response,
+            )
+
         @self.app.get("/status", response_model=StatusResponse)
         async def get_status():
             """Get agent status."""
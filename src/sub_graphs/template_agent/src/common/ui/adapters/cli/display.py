@@ -3,7 +3,7 @@
 import os
 import sys
 import uuid
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
 
 from src.sub_graphs.template_agent.src.common.config import Configuration
 
@@ -85,6 +85,26 @@ class CLIDisplay:
             logger.error(f"Error displaying message: {e}")
             print(f"\nError displaying message: {str(e)}\n", flush=True)
 
+    def display_stream_start(self, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Start an assistant message whose content arrives in chunks.
+
+        Args:
+            metadata: Optional message metadata (character_name)
+        """
+        character_name = (metadata or {}).get("character_name", "Assistant")
+        print(f"\n{character_name}: ", end="", flush=True)
+
+    @staticmethod
+    def display_stream_chunk(text: str) -> None:
+        """Print the next chunk of a streaming message without a newline."""
+        print(text, end="", flush=True)
+
+    @staticmethod
+    def display_stream_end() -> None:
+        """Finish a streaming message."""
+        print("\n", flush=True)
+
     def get_user_input(self) -> Dict[str, Any]:
         """Get input from the user."""
         try:
@@ -1,6 +1,7 @@
 """CLI interface implementation."""
 
 import asyncio
+import inspect
 import threading
 import traceback
 import uuid
@@ -30,9 +31,9 @@ class CLIInterface(BaseUserInterface):
         self.session_handler = CLISessionHandler(self.display, session_manager)
         self.command_processor = CLICommandProcessor(self.display, agent)
 
-        # Threading control
+        # Shutdown control; tool completions arrive through a listener task
         self.stop_event = threading.Event()
-        self.tool_checker_thread = None
+        self.tool_listener_task: Optional[asyncio.Task] = None
 
         # Set user_id from agent if available
         if hasattr(agent, "user_id"):
@@ -61,15 +62,9 @@ class CLIInterface(BaseUserInterface):
     async def start(self) -> None:
         """Start the CLI interface."""
         try:
-            # Get the main event loop
-            main_loop = asyncio.get_running_loop()
-
-            # Start tool checker thread
+            # Show tool completions as they are published
             self.stop_event.clear()
-            self.tool_checker_thread = threading.Thread(
-                target=self._tool_checker_loop, args=(main_loop,), daemon=True
-            )
-            self.tool_checker_thread.start()
+            self.tool_listener_task = asyncio.create_task(self.tool_handler.listen())
 
             # Initialize new session
             await self.session_handler.initialize_session()
@@ -98,43 +93,50 @@ class CLIInterface(BaseUserInterface):
     def stop(self) -> None:
         """Stop the CLI interface."""
         self.stop_event.set()
-        if self.tool_checker_thread:
-            self.tool_checker_thread.join(timeout=1.0)
-
-    def _tool_checker_loop(self, main_loop: asyncio.AbstractEventLoop) -> None:
-        """Background thread for checking tool completions."""
-        logger.debug("Starting tool checker loop")
-        while not self.stop_event.is_set():
-            try:
-                # logger.debug("Checking for tool completions")
-                future = asyncio.run_coroutine_threadsafe(
-                    self.tool_handler.check_tool_completions(), main_loop
-                )
-                future.result()  # Wait for completion
-            except Exception as e:
-                logger.error("Error in tool checker: %s", str(e))
-                logger.error("Traceback: %s", traceback.format_exc())
-            self.stop_event.wait(self.tool_handler.tool_check_interval)
+        if self.tool_listener_task:
+            self.tool_listener_task.cancel()
+            self.tool_listener_task = None
 
     async def _process_user_input(self, user_input: Dict[str, Any]) -> None:
         """Process user input and get response from agent."""
+        streaming = {"started": False}
         try:
             # Get response from agent first
             logger.debug(f"Getting response from agent for input: {user_input}")
             input_text = user_input.get("params", {}).get("message", "")
 
+            # Stream tokens to the display when the agent supports it
+            kwargs: Dict[str, Any] = {}
+            if "on_token" in inspect.signature(self.agent.process_message).parameters:
+
+                def on_token(text: str) -> None:
+                    if not streaming["started"]:
+                        self.display.display_stream_start(self._assistant_metadata())
+                        streaming["started"] = True
+                    self.display.display_stream_chunk(text)
+
+                kwargs["on_token"] = on_token
+
             # Pass the agent's graph_state to the process_message method
             # This ensures conversation_state is available for message logging
             response = await self.agent.process_message(
-                input_text, session_state=self.agent.graph_state
+                input_text, session_state=self.agent.graph_state, **kwargs
             )
+            if streaming["started"]:
+                self.display.display_stream_end()
             logger.debug(f"Raw agent response: {response}")
 
+            # Already shown token by token
+            if response.get("streamed"):
+                return
+
             # Process the response
             await self.process_agent_response(response)
 
         except Exception as e:
             logger.error(f"Error processing user input: {str(e)}")
+            if streaming["started"]:
+                self.display.display_stream_end()
             self.display.display_error(str(e))
 
     async def process_agent_response(self, response: Dict[str, Any]) -> None:
@@ -162,10 +164,7 @@ class CLIInterface(BaseUserInterface):
                 )
                 return
 
-            # Get character name from agent if available
-            metadata = {}
-            if hasattr(self.agent, "personality_agent") and self.agent.personality_agent:
-                metadata["character_name"] = self.agent.personality_agent.get_name()
+            metadata = self._assistant_metadata()
 
             # Display the message
             logger.debug("Displaying final response: %s", message)
@@ -179,3 +178,10 @@ class CLIInterface(BaseUserInterface):
             self.display.display_message(
                 {"role": "system", "content": f"Error processing response: {str(e)}"}
             )
+
+    def _assistant_metadata(self) -> Dict[str, Any]:
+        """Get display metadata (character name) for assistant messages."""
+        metadata = {}
+        if hasattr(self.agent, "personality_agent") and self.agent.personality_agent:
+            metadata["character_name"] = self.agent.personality_agent.get_name()
+        return metadata
@@ -19,6 +19,7 @@ import sseclient
 
 from ....services.logging_service import get_logger
 from ....state.state_models import Message, MessageRole, MessageStatus, MessageType
+from ....tools.completion_bus import complete_request, get_completion_bus
 from ...base_interface import BaseInterface
 
 logger = get_logger(__name__)
@@ -55,7 +56,6 @@ class MCPAdapter(BaseInterface):
         """
         super().__init__(config)
         self.running = False
-        self.tool_check_interval = 0.5  # Check every 500ms
         self.displayed_tools: Set[str] = set()  # Track displayed tool results
         self._tool_checker_task = None
         self._sse_client = None
@@ -147,36 +147,46 @@ class MCPAdapter(BaseInterface):
 
     async def _check_tool_completions(self) -> None:
         """
-        Background task that checks for completed tools and processes their results.
-        Uses cooperative multitasking to avoid blocking the main message loop.
+        Background task that processes request results as they are published.
+
+        Waits on the completion bus rather than polling, so it costs nothing
+        while no request is in flight.
         """
-        while self.running:
-            try:
-                # Check for completed MCP requests
-                for task_id, request in list(PENDING_MCP_REQUESTS.items()):
-                    if request["status"] == "completed" and task_id not in self.displayed_tools:
-                        # Process completed request
-                        result = request.get("result", {})
-                        error = request.get("error")
-
-                        if error:
-                            logger.error(f"MCP request {task_id} failed: {error}")
-                        else:
-                            logger.debug(f"MCP request {task_id} completed: {result}")
-
-                        # Mark as displayed
-                        self.displayed_tools.add(task_id)
-
-                        # If agent has a tool completion handler, call it
-                        if hasattr(self.agent, "handle_tool_completion"):
-                            await self.agent.handle_tool_completion(task_id, result)
-
-                await asyncio.sleep(self.tool_check_interval)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in tool checker: {e}", exc_info=True)
-                await asyncio.sleep(1.0)  # Wait longer on error
+        subscription = get_completion_bus().subscribe("mcp")
+        try:
+            # Catch up on requests completed before subscribing
+            for task_id, request in list(PENDING_MCP_REQUESTS.items()):
+                if request["status"] == "completed":
+                    await self._handle_completion(task_id, request)
+            async for task_id, request in subscription:
+                if task_id in PENDING_MCP_REQUESTS:
+                    await self._handle_completion(task_id, request)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            subscription.close()
+
+    async def _handle_completion(self, task_id: str, request: Dict[str, Any]) -> None:
+        """Process one completed request."""
+        if task_id in self.displayed_tools:
+            return
+        try:
+            result = request.get("result", {})
+            error = request.get("error")
+
+            if error:
+                logger.error(f"MCP request {task_id} failed: {error}")
+            else:
+                logger.debug(f"MCP request {task_id} completed: {result}")
+
+            # Mark as displayed
+            self.displayed_tools.add(task_id)
+
+            # If agent has a tool completion handler, call it
+            if hasattr(self.agent, "handle_tool_completion"):
+                await self.agent.handle_tool_completion(task_id, result)
+        except Exception as e:
+            logger.error(f"Error handling completion {task_id}: {e}", exc_info=True)
 
     async def send_message(self, message: Message) -> bool:
         """
@@ -232,8 +242,7 @@ class MCPAdapter(BaseInterface):
                     if response.status != 200:
                         raise Exception(f"HTTP request failed: {response.status}")
                     result = await response.json()
-                    PENDING_MCP_REQUESTS[task_id]["status"] = "completed"
-                    PENDING_MCP_REQUESTS[task_id]["result"] = result
+                    complete_request(PENDING_MCP_REQUESTS, task_id, result)
             else:
                 # Send via stdio
                 print(json.dumps(mcp_request))
@@ -16,6 +16,7 @@ from typing import Any, Dict, List, Optional, Set
 
 from ....services.logging_service import get_logger
 from ....state.state_models import Message, MessageRole, MessageStatus, MessageType
+from ....tools.completion_bus import get_completion_bus
 from ...base_interface import BaseInterface
 
 logger = get_logger(__name__)
@@ -36,7 +37,6 @@ class TemplateAgentAdapter(BaseInterface):
         """
         super().__init__(config)
         self.running = False
-        self.tool_check_interval = 0.5  # Check every 500ms
         self.displayed_tools: Set[str] = set()  # Track displayed tool results
         self._tool_checker_task = None
         self._setup_template_agent()
@@ -78,36 +78,47 @@ class TemplateAgentAdapter(BaseInterface):
 
     async def _check_tool_completions(self) -> None:
         """
-        Background task that checks for completed tools and processes their results.
-        Uses cooperative multitasking to avoid blocking the main message loop.
+        Background task that processes request results as they are published.
+
+        Waits on the completion bus rather than polling, so it costs nothing
+        while no request is in flight. Whatever finishes a request reports it
+        with completion_bus.complete_request(PENDING_TEMPLATE_REQUESTS, task_id, result).
         """
-        while self.running:
-            try:
-                # Check for completed template agent requests
-                for task_id, request in list(PENDING_TEMPLATE_REQUESTS.items()):
-                    if request["status"] == "completed" and task_id not in self.displayed_tools:
-                        # Process completed request
-                        result = request.get("result", {})
-                        error = request.get("error")
-
-                        if error:
-                            logger.error(f"Template agent request {task_id} failed: {error}")
-                        else:
-                            logger.debug(f"Template agent request {task_id} completed: {result}")
-
-                        # Mark as displayed
-                        self.displayed_tools.add(task_id)
-
-                        # If agent has a tool completion handler, call it
-                        if hasattr(self.agent, "handle_tool_completion"):
-                            await self.agent.handle_tool_completion(task_id, result)
-
-                await asyncio.sleep(self.tool_check_interval)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in tool checker: {e}", exc_info=True)
-                await asyncio.sleep(1.0)  # Wait longer on error
+        subscription = get_completion_bus().subscribe("template_agent")
+        try:
+            # Catch up on requests completed before subscribing
+            for task_id, request in list(PENDING_TEMPLATE_REQUESTS.items()):
+                if request["status"] == "completed":
+                    await self._handle_completion(task_id, request)
+            async for task_id, request in subscription:
+                if task_id in PENDING_TEMPLATE_REQUESTS:
+                    await self._handle_completion(task_id, request)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            subscription.close()
+
+    async def _handle_completion(self, task_id: str, request: Dict[str, Any]) -> None:
+        """Process one completed request."""
+        if task_id in self.displayed_tools:
+            return
+        try:
+            result = request.get("result", {})
+            error = request.get("error")
+
+            if error:
+                logger.error(f"Template agent request {task_id} failed: {error}")
+            else:
+                logger.debug(f"Template agent request {task_id} completed: {result}")
+
+            # Mark as displayed
+            self.displayed_tools.add(task_id)
+
+            # If agent has a tool completion handler, call it
+            if hasattr(self.agent, "handle_tool_completion"):
+                await self.agent.handle_tool_completion(task_id, result)
+        except Exception as e:
+            logger.error(f"Error handling completion {task_id}: {e}", exc_info=True)
 
     async def send_message(self, message: Message) -> bool:
         """
@@ -12,7 +12,7 @@ This module tests the LLM Manager functionality, including:
 import asyncio
 from datetime import datetime
 from typing import Any, Dict, List, Optional
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, create_autospec, patch
 
 import pytest
 
@@ -272,6 +272,47 @@ async def test_generate_response_success(llm_manager):
     assert llm_manager.state.stats.total_tokens > 0
 
 
+@pytest.mark.asyncio
+async def test_generate_response_calls_service_signature():
+    """generate_response passes only arguments LLMService.generate accepts."""
+    config = MagicMock(
+        default_model="llama2", temperature=0.2, max_tokens=50, stop_sequences=["User:"]
+    )
+    with patch("src.common.managers.llm_manager.LLMService"):
+        manager = LLMManager(config)
+    # Keep the test on the service call, not on message construction
+    manager.create_message = MagicMock()
+    manager.create_error_message = MagicMock()
+    manager.update_state = MagicMock()
+
+    # Autospec checks each call against the real generate() signature
+    service = create_autospec(LLMService, instance=True)
+
+    async def generate(prompt, usage=None, **kwargs):
+        usage.update({"prompt_tokens": 3, "completion_tokens": 4})
+        return "Stubbed reply"
+
+    service.generate.side_effect = generate
+
+    with patch.object(manager, "get_service_for_query", AsyncMock(return_value=service)):
+        response = await manager.generate_response("Test prompt")
+
+    assert response is manager.create_message.return_value
+    manager.create_error_message.assert_not_called()
+    service.generate.assert_awaited_once_with(
+        prompt="Test prompt",
+        temperature=0.2,
+        max_tokens=50,
+        stop=["User:"],
+        usage={"prompt_tokens": 3, "completion_tokens": 4},
+    )
+    reply = manager.create_message.call_args_list[-1].kwargs
+    assert reply["content"] == "Stubbed reply"
+    assert reply["status"] == MessageStatus.SUCCESS
+    assert reply["data"]["tokens"] == 4
+    assert manager._state.stats.total_tokens == 4
+
+
 @pytest.mark.asyncio
 async def test_generate_response_error(llm_manager):
     """Test error handling in response generation."""
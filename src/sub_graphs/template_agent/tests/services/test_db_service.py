@@ -243,6 +243,28 @@ async def test_semantic_message_search(db_service: DBService):
     )
 
 
+@pytest.mark.asyncio
+async def test_vector_search_with_local_store(config: DBServiceConfig, mocker):
+    """Test that the local store is asked about the requested table and column."""
+    vector_store = mocker.Mock()
+    vector_store.match_documents = mocker.AsyncMock(return_value=[{"id": 1, "similarity": 0.9}])
+    db_service = DBService(config, mocker.Mock(), vector_store=vector_store)
+
+    results = await db_service.vector_search(
+        "documents", [0.1, 0.2], embedding_column="embedding_small", match_count=3
+    )
+    assert results == [{"id": 1, "similarity": 0.9}]
+
+    vector_store.match_documents.assert_awaited_once_with(
+        query_embedding=[0.1, 0.2],
+        match_count=3,
+        table_name="documents",
+        embedding_column="embedding_small",
+        filter_object=None,
+    )
+    db_service.client.rpc.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_health_check(db_service: DBService):
     """Test health check."""
@@ -74,6 +74,44 @@ async def test_generate(llm_service: LLMService, mocker):
     assert call_args["json"]["stop"] == ["\n", "Human:", "Assistant:"]
 
 
+@pytest.mark.asyncio
+async def test_generate_overrides(llm_service: LLMService, mocker):
+    """Per-call sampling settings replace the configured ones for that request only."""
+    mock_response = mocker.Mock()
+    mock_response.json.return_value = {"response": "Test response"}
+    llm_service.client = mocker.Mock(post=mocker.AsyncMock(return_value=mock_response))
+
+    await llm_service.generate("Test prompt", temperature=0.0, max_tokens=10, stop=["END"])
+
+    payload = llm_service.client.post.call_args[1]["json"]
+    assert payload["temperature"] == 0.0
+    assert payload["max_tokens"] == 10
+    assert payload["stop"] == ["END"]
+    assert llm_service.temperature == 0.7
+
+
+@pytest.mark.asyncio
+async def test_generate_reports_usage_per_call(llm_service: LLMService, mocker):
+    """Token counts go to the dict each call passed in, not to shared service state."""
+    responses = [
+        {"response": "a", "prompt_eval_count": 5, "eval_count": 1},
+        {"response": "bb", "prompt_eval_count": 6, "eval_count": 2},
+    ]
+
+    async def post(endpoint, json, timeout):
+        response = mocker.Mock()
+        response.json.return_value = responses.pop(0)
+        return response
+
+    llm_service.client = mocker.Mock(post=post)
+    first, second = {}, {}
+    await llm_service.generate("one", usage=first)
+    await llm_service.generate("two", usage=second)
+
+    assert first == {"prompt_tokens": 5, "completion_tokens": 1}
+    assert second == {"prompt_tokens": 6, "completion_tokens": 2}
+
+
 @pytest.mark.asyncio
 async def test_get_response(llm_service: LLMService, mocker):
     """Test getting response with conversation history."""
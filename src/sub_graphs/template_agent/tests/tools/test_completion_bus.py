@@ -0,0 +1,101 @@
+"""
+Tests for the tool completion bus.
+"""
+
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.common.tools.completion_bus import ToolCompletionBus, complete_request, get_completion_bus
+
+
+@pytest.mark.asyncio
+async def test_wait_for_wakes_on_publish():
+    """A waiter resolves as soon as its request is published."""
+    bus = ToolCompletionBus()
+    waiter = asyncio.create_task(bus.wait_for("req-1", timeout=1.0))
+    await asyncio.sleep(0)
+
+    bus.publish("req-1", {"name": "test_tool", "response": {"status": "success"}})
+
+    completion = await waiter
+    assert completion["name"] == "test_tool"
+    # Already finished requests are returned without waiting
+    assert (await bus.wait_for("req-1", timeout=0.01))["name"] == "test_tool"
+
+
+@pytest.mark.asyncio
+async def test_wait_for_times_out():
+    """An unfinished request raises TimeoutError and leaves no waiter behind."""
+    bus = ToolCompletionBus()
+    with pytest.raises(asyncio.TimeoutError):
+        await bus.wait_for("missing", timeout=0.01)
+    assert not bus.is_known("missing")
+
+
+@pytest.mark.asyncio
+async def test_subscribers_receive_publishes_from_other_threads():
+    """Each subscriber gets every completion, including ones published off-loop."""
+    bus = ToolCompletionBus()
+    first = bus.subscribe("first")
+    second = bus.subscribe("second")
+
+    thread = threading.Thread(target=bus.publish, args=("req-2", {"name": "threaded"}))
+    thread.start()
+    thread.join()
+
+    for subscription in (first, second):
+        request_id, completion = await asyncio.wait_for(subscription.__anext__(), 1.0)
+        assert request_id == "req-2"
+        assert completion["name"] == "threaded"
+
+    first.close()
+    bus.publish("req-3", {"name": "after_close"})
+    assert (await asyncio.wait_for(second.__anext__(), 1.0))[0] == "req-3"
+    assert first._queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_complete_request_marks_and_publishes_pending_requests():
+    """An adapter's pending entry is marked completed and published; unknown ids are ignored."""
+    pending = {"task-1": {"task_id": "task-1", "status": "pending"}}
+    subscription = get_completion_bus().subscribe("test")
+
+    complete_request(pending, "unknown", {"ok": True})
+    complete_request(pending, "task-1", {"ok": True})
+
+    request_id, completion = await asyncio.wait_for(subscription.__anext__(), 1.0)
+    subscription.close()
+    assert request_id == "task-1"
+    assert completion is pending["task-1"]
+    assert completion["status"] == "completed" and completion["result"] == {"ok": True}
+
+
+@pytest.mark.asyncio
+async def test_cli_handles_only_its_own_tool_completions():
+    """MCP and parent-graph completions on the shared bus are not shown by the CLI."""
+    from src.common.tools import template_tools
+    from src.common.ui.adapters.cli.tool_handler import CLIToolHandler
+
+    handler = CLIToolHandler(display_handler=MagicMock(), agent=object())
+    handled = []
+
+    async def handle_completion(request_id, completion):
+        handled.append(request_id)
+
+    handler.handle_completion = handle_completion
+    listener = asyncio.create_task(handler.listen())
+    await asyncio.sleep(0)
+
+    mcp_request = {"task_id": "mcp-1", "status": "pending"}
+    complete_request({"mcp-1": mcp_request}, "mcp-1", {"ok": True})
+    request_id = template_tools.create_tool_request("test_tool", {})
+    template_tools.update_tool_request(request_id, "completed", {"message": "done"})
+    await asyncio.sleep(0.01)
+    listener.cancel()
+    template_tools.cleanup_processed_request(request_id)
+
+    assert handled == [request_id]
+    assert "displayed" not in mcp_request
@@ -3,6 +3,7 @@
 Allows users to upload and process files for analysis.
 """
 
+import codecs
 import hashlib
 import logging
 import os
@@ -16,6 +17,42 @@ from .base_tool import BaseTool
 # Setup logging
 logger = logging.getLogger(__name__)
 
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class _TokenCounter:
+    """Word and character counts of UTF-8 text fed in chunks."""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.words = 0
+        self.chars = 0
+        self.failed = False  # Set when the bytes are not valid UTF-8
+        self._in_word = False
+
+    def update(self, data: bytes, final: bool = False) -> None:
+        if self.failed:
+            return
+        try:
+            text = self._decoder.decode(data, final)
+        except UnicodeDecodeError:
+            self.failed = True
+            return
+        if not text:
+            return
+        words = len(text.split())
+        # A word split across two chunks is counted once
+        if words and self._in_word and not text[0].isspace():
+            words -= 1
+        self.words += words
+        self.chars += len(text)
+        self._in_word = not text[-1].isspace()
+
+    def estimate(self) -> int:
+        # Word-based (avg 1.3 tokens per word) and char-based (avg 4 chars per token)
+        # estimates; the larger one is used to be conservative
+        return max(int(self.words * 1.3), int(self.chars / 4))
+
 
 class FileUploadTool(BaseTool):
     """Tool for handling file uploads and making them available for analysis."""
@@ -46,19 +83,22 @@ class FileUploadTool(BaseTool):
         ".sql",
     }
 
-    def __init__(self, upload_dir: Optional[str] = None):
+    def __init__(self, upload_dir: Optional[str] = None, chunk_size: int = COPY_CHUNK_SIZE):
         """
         Initialize the file upload tool.
 
         Args:
             upload_dir: Optional custom upload directory path. If not provided,
                       defaults to './uploads' in the project directory.
+            chunk_size: Bytes read per step when copying and hashing files
         """
         super().__init__(
             name="file_upload",
             description="Upload and process files for analysis by the orchestrator",
         )
 
+        self.chunk_size = chunk_size
+
         # Set up upload directory
         self.upload_dir = upload_dir or os.path.join(os.getcwd(), "uploads")
         os.makedirs(self.upload_dir, exist_ok=True)
@@ -85,51 +125,56 @@ class FileUploadTool(BaseTool):
         with open(self.metadata_file, "w") as f:
             json.dump(self.metadata, f, indent=2)
 
-    def _calculate_file_hash(self, file_path: str) -> str:
-        """Calculate SHA-256 hash of file."""
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
-
-    def _estimate_tokens(self, file_path: str) -> Tuple[Optional[int], str]:
+    def _process_file(
+        self, file_path: str, target_path: Optional[str] = None
+    ) -> Tuple[str, Optional[int], str]:
         """
-        Estimate the number of tokens in a file.
+        Hash a file, and optionally copy it, in a single streaming pass.
+
+        The token estimate of text files is computed from the same bytes, so
+        the file is read only once.
 
         Args:
             file_path: Path to the file
+            target_path: Where to copy the file, if anywhere
 
         Returns:
-            Tuple of (estimated token count or None, estimation method used)
+            Tuple of (SHA-256 hash, estimated token count or None, estimation method used)
         """
-        # Check if it's a text file
+        sha256_hash = hashlib.sha256()
         ext = os.path.splitext(file_path)[1].lower()
-        if ext not in self.TEXT_EXTENSIONS:
-            return None, "non-text file"
+        counter = _TokenCounter() if ext in self.TEXT_EXTENSIONS else None
+        partial_path = f"{target_path}.part" if target_path else None
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            # Simple word-based estimation (avg 1.3 tokens per word)
-            word_count = len(content.split())
-            estimated_tokens = int(word_count * 1.3)
-
-            # Character-based backup estimation (avg 4 chars per token)
-            char_count = len(content)
-            char_based_estimate = int(char_count / 4)
-
-            # Use the larger of the two estimates to be conservative
-            final_estimate = max(estimated_tokens, char_based_estimate)
-
-            return final_estimate, "word/char estimation"
-
-        except UnicodeDecodeError:
-            return None, "non-text encoding"
-        except Exception as e:
-            logger.warning(f"Error estimating tokens: {e}")
-            return None, f"error: {str(e)}"
+            with open(file_path, "rb") as source:
+                target = open(partial_path, "wb") if partial_path else None
+                try:
+                    for block in iter(lambda: source.read(self.chunk_size), b""):
+                        sha256_hash.update(block)
+                        if target:
+                            target.write(block)
+                        if counter:
+                            counter.update(block)
+                    if counter:
+                        counter.update(b"", final=True)
+                finally:
+                    if target:
+                        target.close()
+        except Exception:
+            if partial_path and os.path.exists(partial_path):
+                os.unlink(partial_path)
+            raise
+
+        if partial_path:
+            shutil.copystat(file_path, partial_path)
+            os.replace(partial_path, target_path)
+
+        if counter is None:
+            return sha256_hash.hexdigest(), None, "non-text file"
+        if counter.failed:
+            return sha256_hash.hexdigest(), None, "non-text encoding"
+        return sha256_hash.hexdigest(), counter.estimate(), "word/char estimation"
 
     async def execute(self, file_path: str, move_file: bool = False, **kwargs) -> Dict[str, Any]:
         """
@@ -151,10 +196,6 @@ class FileUploadTool(BaseTool):
             # Get file info
             file_name = os.path.basename(file_path)
             file_size = os.path.getsize(file_path)
-            file_hash = self._calculate_file_hash(file_path)
-
-            # Estimate tokens
-            estimated_tokens, estimation_method = self._estimate_tokens(file_path)
 
             # Generate unique filename if needed
             target_path = os.path.join(self.upload_dir, file_name)
@@ -164,11 +205,22 @@ class FileUploadTool(BaseTool):
                 file_name = f"{base}_{timestamp}{ext}"
                 target_path = os.path.join(self.upload_dir, file_name)
 
-            # Copy or move file
+            # Copy or move the file, hashing and estimating tokens while it is read
             if move_file:
-                shutil.move(file_path, target_path)
+                try:
+                    # Same filesystem: a rename moves no bytes, so only the hash pass reads it
+                    os.replace(file_path, target_path)
+                    renamed = True
+                except OSError:
+                    renamed = False
+                if renamed:
+                    result = self._process_file(target_path)
+                else:
+                    result = self._process_file(file_path, target_path)
+                    os.unlink(file_path)
             else:
-                shutil.copy2(file_path, target_path)
+                result = self._process_file(file_path, target_path)
+            file_hash, estimated_tokens, estimation_method = result
 
             # Store metadata
             metadata = {
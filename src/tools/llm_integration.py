@@ -1,10 +1,10 @@
 """LLM integration utilities for tools."""
 
 import json
-import re
 from typing import Any, Dict, List, Optional
 
 from .initialize_tools import initialize_tools
+from .tool_call_parser import ToolCallParser
 from .tool_registry import ToolRegistry
 
 
@@ -25,54 +25,22 @@ class ToolParser:
         """
         Extract tool calls from LLM response text.
 
+        Calls use the same backtick-JSON format as the orchestrator,
+        e.g. `{"name": "search", "args": {"query": "x"}}`; calls to tools
+        that are not registered are skipped.
+
         Args:
             llm_response: The text response from the LLM
 
         Returns:
             List of dictionaries containing tool call information
         """
-        # Pattern to match tool calls in format: tool_name(param1="value1", param2="value2")
-        # or tool_name(param1='value1', param2='value2')
-        # or tool_name(param1=value1, param2=value2) for non-string values
-        pattern = r"(\w+)\s*\(\s*(.*?)\s*\)"
-
-        tool_calls = []
-        matches = re.finditer(pattern, llm_response)
-
-        for match in matches:
-            tool_name = match.group(1)
-            params_str = match.group(2)
-
-            # Skip if not a valid tool
-            if not self.registry.get_tool(tool_name):
-                continue
-
-            # Parse parameters
-            params = {}
-            if params_str.strip():
-                # Replace quotes for consistent parsing
-                normalized_params = params_str.replace("'", '"')
-
-                # Try to parse as JSON first
-                try:
-                    params_dict = f"{{{normalized_params}}}"
-                    params = json.loads(params_dict)
-                except json.JSONDecodeError:
-                    # Fall back to regex parsing
-                    param_pattern = r'(\w+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^,\s]*))'
-                    param_matches = re.finditer(param_pattern, params_str)
-
-                    for param_match in param_matches:
-                        param_name = param_match.group(1)
-                        # Find the non-None value among groups 2, 3, and 4
-                        param_value = next(
-                            (v for v in param_match.groups()[1:] if v is not None), ""
-                        )
-                        params[param_name] = param_value
-
-            tool_calls.append({"name": tool_name, "parameters": params})
-
-        return tool_calls
+
+        def validate(name: str, args: Dict[str, Any]) -> Optional[str]:
+            return None if self.registry.get_tool(name) else f"Unknown tool '{name}'"
+
+        calls, _ = ToolCallParser.parse(llm_response, validate)
+        return [{"name": call.name, "parameters": call.args} for call in calls if not call.error]
 
     def execute_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
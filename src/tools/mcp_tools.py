@@ -257,12 +257,13 @@ def check_completed_mcp_requests():
     from src.tools.orchestrator_tools import PENDING_TOOL_REQUESTS
 
     try:
-        # Look for completed MCP requests
-        for task_id, response in list(PENDING_MCP_REQUESTS.items()):
+        # The status index avoids scanning MCP requests that are still running
+        for task_id in PENDING_MCP_REQUESTS.ids_with_status("completed", "error"):
+            response = PENDING_MCP_REQUESTS[task_id]
             status = response.get("status")
 
             # Only process completed or error requests that haven't been processed yet
-            if status in ["completed", "error"] and task_id in PENDING_TOOL_REQUESTS:
+            if task_id in PENDING_TOOL_REQUESTS:
                 # Skip if already marked as completed in PENDING_TOOL_REQUESTS
                 if PENDING_TOOL_REQUESTS[task_id].get("status") in [
                     "completed",
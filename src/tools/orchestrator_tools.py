@@ -5,18 +5,36 @@ import json
 import logging
 import re
 import uuid
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
+from src.config.database_config import get_request_store_config
+from src.config.orchestrator_config import get_orchestrator_config
+from src.services.metrics_service import span
+from src.services.request_store_service import RequestStore
 from src.state.state_models import MessageRole
 from src.tools.initialize_tools import get_registry
+from src.tools.tool_call_parser import (
+    DEFAULT_PARAMETER_SCHEMA,
+    ToolCall,
+    ToolCallParser,
+    validate_arguments,
+)
+from src.utils.text_processing import estimate_token_count
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
-# Centralized tool request tracking
-TOOL_REQUESTS = {"pending": {}}
+# Centralized tool request tracking (bounded; see database.request_store for TTL and persistence)
+TOOL_REQUESTS = {"pending": RequestStore("tool_requests", get_request_store_config(), persist=True)}
 PENDING_TOOL_REQUESTS = TOOL_REQUESTS["pending"]
 
+# Requests still running when the process stopped will never finish; report them as failed
+for _request_id in PENDING_TOOL_REQUESTS.unfinished_ids():
+    PENDING_TOOL_REQUESTS[_request_id].update(
+        status="interrupted",
+        response={"status": "error", "message": "Interrupted by a restart before it finished"},
+    )
+
 # Dynamic tool definitions - will be populated during initialization
 TOOL_DEFINITIONS = {}
 
@@ -66,87 +84,231 @@ async def initialize_tool_definitions():
     return TOOL_DEFINITIONS
 
 
-async def add_tools_to_prompt(prompt: str) -> str:
-    """Add tool definitions to prompt."""
-    # Get tools directly from registry instead of reinitializing
-    registry = get_registry()
-    tool_names = registry.list_tools()
+TOOLS_PROMPT_HEADER = (
+    "\n\n# AVAILABLE TOOLS\n\n"
+    "IMPORTANT: You have access to the following tools.\n"
+    "If the user request requires a tool call, you MUST output a tool call "
+    "in the required backtick-JSON format below.\n"
+    "You MUST ensure the tool call is valid JSON (no trailing commas, correct syntax).\n"
+    "If you do not use the tool call, the user will not receive real results.\n"
+    "If you do not see a relevant tool, reply: 'No tool available for this request.'\n\n"
+    "To use a tool, output a JSON object in backticks with the following format:\n"
+    '`{"name": "tool_name", "args": {"task": "user request here", "parameters": {}, '
+    '"request_id": "auto-generated"}}`\n\n'
+)
+
+TOOLS_PROMPT_FOOTER = (
+    "\nIMPORTANT: When using tools:\n"
+    "1. Always include the task parameter with a clear description "
+    "of what you want the tool to do\n"
+    "2. The request_id will be automatically generated\n"
+    "3. Use the exact tool name as shown above\n"
+    "4. Ensure your tool call is valid JSON (no trailing commas, correct syntax)\n"
+)
+
+# Above this many tools, add_tools_to_prompt only includes the most relevant ones
+TOOLS_PROMPT_TOP_K = 8
+# Token budget for the tool entries of the relevance-filtered section
+TOOLS_PROMPT_MAX_TOKENS = 2000
+
+# Rendered catalog, rebuilt only when the registry version changes
+_TOOL_CATALOG_CACHE: Dict[str, Any] = {
+    "registry": None,
+    "version": None,
+    "entries": {},
+    "terms": {},
+    "section": "",
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _terms(text: str) -> set:
+    """Lowercase word set used for tool relevance scoring."""
+    return {w for w in _WORD_RE.findall(text.lower()) if len(w) > 2}
+
+
+def _render_tool_entry(tool_name: str, tool_wrapper: Any, tool_config: dict) -> str:
+    """Render the prompt entry for one registered tool."""
+    # Get description from config (which was copied from the function during discovery)
+    description = tool_config.get("description", f"Tool for {tool_name}")
+    capabilities = tool_config.get("capabilities", [])
+
+    # Format tool description
+    entry = f"## {tool_name}\n{description}\n\n"
+
+    # Add capabilities if available
+    if capabilities:
+        entry += "Capabilities:\n"
+        for cap in capabilities:
+            entry += f"- {cap}\n"
+        entry += "\n"
+
+    # Prefer usage examples set directly on the function
+    usage_examples = getattr(tool_wrapper.func, "usage_examples", None) or []
+    if usage_examples:
+        entry += "Examples:\n"
+        for example in usage_examples[:3]:  # Limit to 3 examples to keep prompt size reasonable
+            entry += f"- {example}\n"
+        entry += "\n"
+    else:
+        # Fallback to example from config if no usage examples found
+        example = tool_config.get("example")
+        if example:
+            entry += f"Example: {example}\n\n"
+
+    # Add standard tool usage format
+    entry += (
+        "To use this tool, format your response as:\n"
+        f'`{{"name": "{tool_name}", "args": {{"task": "your task here", "parameters": {{}}, '
+        '"request_id": "auto-generated"}}`\n\n'
+    )
+    return entry
 
-    if not tool_names:
-        logger.warning("No tools available in registry")
-        return prompt + "\n\nNo tools available at this time."
 
-    tools_desc = "\n\n# AVAILABLE TOOLS\n\n"
-    tools_desc += (
-        "IMPORTANT: You have access to the following tools.\n"
-        "If the user request requires a tool call, you MUST output a tool call in the required backtick-JSON format below.\n"
-        "You MUST ensure the tool call is valid JSON (no trailing commas, correct syntax).\n"
-        "If you do not use the tool call, the user will not receive real results.\n"
-        "If you do not see a relevant tool, reply: 'No tool available for this request.'\n\n"
-        "To use a tool, output a JSON object in backticks with the following format:\n"
-        '`{"name": "tool_name", "args": {"task": "user request here", "parameters": {}, "request_id": "auto-generated"}}`\n\n'
-    )
+def get_tool_catalog() -> Dict[str, Any]:
+    """
+    Get the rendered tool catalog, rebuilding it only when the registry changed.
 
-    # Build tool descriptions from registry information
-    for tool_name in tool_names:
-        # Get both tool wrapper and config
+    Returns:
+        Dict with "entries" (tool name -> rendered entry), "terms" (tool name ->
+        relevance terms) and "section" (the full AVAILABLE TOOLS section)
+    """
+    registry = get_registry()
+    if (
+        _TOOL_CATALOG_CACHE["registry"] is registry
+        and _TOOL_CATALOG_CACHE["version"] == registry.version
+    ):
+        return _TOOL_CATALOG_CACHE
+
+    entries: Dict[str, str] = {}
+    terms: Dict[str, set] = {}
+    for tool_name in registry.list_tools():
         tool_wrapper = registry.get_tool(tool_name)
         tool_config = registry.get_config(tool_name)
-
         if not tool_wrapper or not tool_config:
             logger.warning(f"Tool {tool_name} missing wrapper or config")
             continue
+        entries[tool_name] = _render_tool_entry(tool_name, tool_wrapper, tool_config)
+        terms[tool_name] = _terms(
+            " ".join(
+                [tool_name.replace("_", " "), tool_config.get("description", "")]
+                + [str(c) for c in tool_config.get("capabilities", [])]
+            )
+        )
 
-        # Log what we're getting to help diagnose issues
-        logger.debug(f"Tool {tool_name} config: {tool_config}")
+    _TOOL_CATALOG_CACHE.update(
+        registry=registry,
+        version=registry.version,
+        entries=entries,
+        terms=terms,
+        section=TOOLS_PROMPT_HEADER + "".join(entries.values()) + TOOLS_PROMPT_FOOTER,
+    )
+    logger.debug(f"Rendered tool catalog for {len(entries)} tools (registry v{registry.version})")
+    return _TOOL_CATALOG_CACHE
 
-        # Get description from config (which was copied from the function during discovery)
-        description = tool_config.get("description", f"Tool for {tool_name}")
-        capabilities = tool_config.get("capabilities", [])
 
-        # Format tool description
-        tools_desc += f"## {tool_name}\n{description}\n\n"
+def select_relevant_tools(
+    message: str, top_k: int = TOOLS_PROMPT_TOP_K, max_tokens: int = TOOLS_PROMPT_MAX_TOKENS
+) -> List[str]:
+    """
+    Pick the tools most relevant to a message that fit in a token budget.
 
-        # Add capabilities if available
-        if capabilities:
-            tools_desc += "Capabilities:\n"
-            for cap in capabilities:
-                tools_desc += f"- {cap}\n"
-            tools_desc += "\n"
+    Tools are ranked by how many of their name/description/capability words
+    appear in the message (ties keep registry order).
 
-        # Try to get usage examples directly from the function
-        func = tool_wrapper.func
-        usage_examples = []
+    Args:
+        message: The current user message
+        top_k: Maximum number of tools to include
+        max_tokens: Token budget for the included tool entries
+
+    Returns:
+        Tool names in rank order
+    """
+    catalog = get_tool_catalog()
+    message_terms = _terms(message)
+    ranked = sorted(
+        catalog["entries"],
+        key=lambda name: len(catalog["terms"][name] & message_terms),
+        reverse=True,
+    )
+    selected, used = [], 0
+    for name in ranked[:top_k]:
+        cost = estimate_token_count(catalog["entries"][name])
+        if selected and used + cost > max_tokens:
+            break
+        selected.append(name)
+        used += cost
+    return selected
+
+
+async def add_tools_to_prompt(
+    prompt: str,
+    message: Optional[str] = None,
+    top_k: int = TOOLS_PROMPT_TOP_K,
+    max_tokens: int = TOOLS_PROMPT_MAX_TOKENS,
+) -> str:
+    """
+    Add tool definitions to prompt.
+
+    The full catalog is cached per registry version. When a message is given
+    and the full catalog exceeds top_k tools or max_tokens, only the tools
+    most relevant to the message are included.
+
+    Args:
+        prompt: Prompt to extend
+        message: Optional current user message used for relevance filtering
+        top_k: Maximum number of tools in the filtered section
+        max_tokens: Token budget for the tool entries in the filtered section
+
+    Returns:
+        Prompt with the AVAILABLE TOOLS section appended
+    """
+    catalog = get_tool_catalog()
+    entries = catalog["entries"]
+
+    if not entries:
+        logger.warning("No tools available in registry")
+        return prompt + "\n\nNo tools available at this time."
+
+    if message is None or (
+        len(entries) <= top_k and estimate_token_count(catalog["section"]) <= max_tokens
+    ):
+        return prompt + catalog["section"]
+
+    selected = select_relevant_tools(message, top_k, max_tokens)
+    logger.debug(f"Including {len(selected)} of {len(entries)} tools in prompt: {selected}")
+    return (
+        prompt
+        + TOOLS_PROMPT_HEADER
+        + "".join(entries[name] for name in selected)
+        + TOOLS_PROMPT_FOOTER
+    )
 
-        # Check if usage_examples is set on the function
-        if hasattr(func, "usage_examples") and func.usage_examples:
-            usage_examples = func.usage_examples
-            logger.debug(f"Found {len(usage_examples)} usage examples on {tool_name} function")
-
-        # Add usage examples if available
-        if usage_examples:
-            tools_desc += "Examples:\n"
-            for example in usage_examples[:3]:  # Limit to 3 examples to keep prompt size reasonable
-                tools_desc += f"- {example}\n"
-            tools_desc += "\n"
-        else:
-            # Fallback to example from config if no usage examples found
-            example = tool_config.get("example")
-            if example:
-                tools_desc += f"Example: {example}\n\n"
-
-        # Add standard tool usage format
-        tools_desc += f'To use this tool, format your response as:\n`{{"name": "{tool_name}", "args": {{"task": "your task here", "parameters": {{}}, "request_id": "auto-generated"}}}}`\n\n'
-
-    tools_desc += "\nIMPORTANT: When using tools:\n"
-    tools_desc += "1. Always include the task parameter with a clear description of what you want the tool to do\n"
-    tools_desc += "2. The request_id will be automatically generated\n"
-    tools_desc += "3. Use the exact tool name as shown above\n"
-    tools_desc += "4. Ensure your tool call is valid JSON (no trailing commas, correct syntax)\n"
-
-    full_prompt = prompt + tools_desc
-    logger.debug(f"Added tool descriptions for {len(tool_names)} tools to prompt")
-    return full_prompt
+
+def validate_tool_call(tool_name: str, args: Dict[str, Any]) -> Optional[str]:
+    """
+    Check a parsed tool call against the registry.
+
+    Args:
+        tool_name: Name the model asked for
+        args: Arguments the model supplied
+
+    Returns:
+        Optional[str]: Error message, or None if the call can run
+    """
+    registry = get_registry()
+    if not registry.get_tool(tool_name):
+        return f"Unknown tool '{tool_name}'"
+    get_schema = getattr(registry, "get_parameter_schema", None)
+    schema = get_schema(tool_name) if get_schema else None
+    return validate_arguments(args, schema or DEFAULT_PARAMETER_SCHEMA)
+
+
+def parse_tool_calls(response_text: str) -> List[ToolCall]:
+    """Extract and validate every tool call in a complete response."""
+    calls, _ = ToolCallParser.parse(response_text, validate_tool_call)
+    return calls
 
 
 async def handle_tool_calls(
@@ -167,33 +329,21 @@ async def handle_tool_calls(
                 f"[handle_tool_calls] Conversation state type: {type(session_state['conversation_state'])}"
             )
 
-    tool_call_pattern = r"`\{[^`]+\}`"
-    matches = re.finditer(tool_call_pattern, response_text)
     execution_results = []
 
-    for match in matches:
+    for tool_call in parse_tool_calls(response_text):
         try:
-            tool_call_json = match.group(0).strip("`")
-            tool_call = json.loads(tool_call_json)
-            logger.debug(f"[handle_tool_calls] Processing tool call: {tool_call}")
-
-            if "name" not in tool_call or "args" not in tool_call:
-                logger.warning(f"[handle_tool_calls] Invalid tool call format: {tool_call}")
-                continue
+            logger.debug(f"[handle_tool_calls] Processing tool call: {tool_call.raw}")
+            tool_name = tool_call.name
+            args = tool_call.args
 
-            tool_name = tool_call["name"]
-            args = tool_call["args"]
-
-            if tool_name not in TOOL_DEFINITIONS:
-                logger.warning(f"[handle_tool_calls] Unknown tool: {tool_name}")
+            if tool_call.error:
+                logger.warning(f"[handle_tool_calls] Invalid tool call: {tool_call.error}")
                 execution_results.append(
                     {
                         "name": tool_name,
                         "args": args,
-                        "result": {
-                            "status": "error",
-                            "message": f"Unknown tool '{tool_name}'",
-                        },
+                        "result": {"status": "error", "message": tool_call.error},
                         "request_id": None,
                     }
                 )
@@ -232,12 +382,11 @@ async def handle_tool_calls(
                         exc_info=True,
                     )
 
-            result = await execute_tool(tool_name, args, request_id, session_state=session_state)
             execution_results.append(
                 {
                     "name": tool_name,
                     "args": args,
-                    "result": result,
+                    "result": None,
                     "request_id": request_id,
                 }
             )
@@ -256,6 +405,19 @@ async def handle_tool_calls(
                 }
             )
 
+    # Run every valid call at once; the turn takes as long as the slowest tool
+    scheduled = [entry for entry in execution_results if entry["result"] is None]
+    if scheduled:
+        executor = get_tool_executor()
+        results = await asyncio.gather(
+            *(
+                executor.run(entry["name"], entry["args"], entry["request_id"], session_state)
+                for entry in scheduled
+            )
+        )
+        for entry, result in zip(scheduled, results):
+            entry["result"] = result
+
     return {"execution_results": execution_results}
 
 
@@ -326,7 +488,8 @@ async def execute_tool(
         logger.debug(f"[execute_tool] Executing tool {tool_name} with args: {args}")
 
         # Execute tool
-        result = await tool.execute(args)
+        with span("tool_execution", tool=tool_name):
+            result = await tool.execute(args)
         logger.debug(f"[execute_tool] Tool execution result: {result}")
 
         if request_id:
@@ -390,6 +553,148 @@ async def execute_tool(
         return {"status": "error", "message": str(e)}
 
 
+class ToolExecutor:
+    """
+    Runs tool calls concurrently under a global and a per-tool limit.
+
+    Each call is bounded by a timeout and can be cancelled by request ID.
+    Timed-out and cancelled calls are recorded in PENDING_TOOL_REQUESTS like
+    any other failure, so completion handling reports them to the user.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 10,
+        max_concurrent_per_tool: int = 2,
+        timeout: Optional[float] = 300,
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            max_concurrent: Tool calls running at once across all tools
+            max_concurrent_per_tool: Tool calls running at once for one tool
+            timeout: Seconds before a call is abandoned (None for no limit)
+        """
+        self.max_concurrent = max_concurrent
+        self.max_concurrent_per_tool = max_concurrent_per_tool
+        self.timeout = timeout
+        self._global = asyncio.Semaphore(max_concurrent)
+        self._per_tool: Dict[str, asyncio.Semaphore] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def run(
+        self,
+        tool_name: str,
+        task: Dict[str, Any],
+        request_id: Optional[str] = None,
+        session_state=None,
+    ) -> Dict[str, Any]:
+        """
+        Execute one tool call within the limits and wait for its result.
+
+        Args:
+            tool_name: Registered tool name
+            task: Tool arguments
+            request_id: Request to track the call under
+            session_state: Session state used for logging
+
+        Returns:
+            Dict[str, Any]: The tool result, or an error result on timeout or cancellation
+        """
+        request_id = request_id or get_next_request_id()
+        call = asyncio.ensure_future(self._run(tool_name, task, request_id, session_state))
+        self._tasks[request_id] = call
+        call.add_done_callback(lambda _: self._tasks.pop(request_id, None))
+        try:
+            return await asyncio.shield(call)
+        except asyncio.CancelledError:
+            # Cancelling the caller cancels the call too
+            call.cancel()
+            raise
+
+    def submit(
+        self,
+        tool_name: str,
+        task: Dict[str, Any],
+        request_id: str,
+        session_state=None,
+    ) -> asyncio.Task:
+        """Start a tool call in the background; its result lands in PENDING_TOOL_REQUESTS."""
+        return asyncio.create_task(self.run(tool_name, task, request_id, session_state))
+
+    def cancel(self, request_id: str) -> bool:
+        """
+        Cancel a running or queued tool call.
+
+        Args:
+            request_id: Request to cancel
+
+        Returns:
+            bool: True if a call was cancelled
+        """
+        call = self._tasks.get(request_id)
+        if call is None or call.done():
+            return False
+        return call.cancel()
+
+    def running(self) -> List[str]:
+        """Request IDs of calls that have not finished."""
+        return [rid for rid, call in self._tasks.items() if not call.done()]
+
+    async def _run(
+        self, tool_name: str, task: Dict[str, Any], request_id: str, session_state
+    ) -> Dict[str, Any]:
+        per_tool = self._per_tool.setdefault(
+            tool_name, asyncio.Semaphore(self.max_concurrent_per_tool)
+        )
+        try:
+            # Wait for the tool's own slot first so a busy tool does not hold global slots
+            async with per_tool, self._global:
+                return await asyncio.wait_for(
+                    execute_tool(tool_name, task, request_id, session_state=session_state),
+                    self.timeout,
+                )
+        except asyncio.TimeoutError:
+            message = f"Tool '{tool_name}' timed out after {self.timeout} seconds"
+            logger.error(f"[ToolExecutor] {message} (request {request_id})")
+            return self._fail(request_id, "error", message)
+        except asyncio.CancelledError:
+            logger.debug(f"[ToolExecutor] Cancelled {tool_name} (request {request_id})")
+            return self._fail(request_id, "cancelled", f"Tool '{tool_name}' was cancelled")
+
+    @staticmethod
+    def _fail(request_id: str, status: str, message: str) -> Dict[str, Any]:
+        result = {"status": status, "message": message}
+        if request_id in PENDING_TOOL_REQUESTS:
+            PENDING_TOOL_REQUESTS[request_id].update(status=status, response=result)
+        return result
+
+
+_executor: Optional[ToolExecutor] = None
+_executor_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_tool_executor() -> ToolExecutor:
+    """Return the executor for the running event loop, built from the orchestrator config."""
+    global _executor, _executor_loop
+    loop = asyncio.get_running_loop()
+    if _executor is None or _executor_loop is not loop:
+        config = get_orchestrator_config()
+        _executor = ToolExecutor(
+            max_concurrent=config.max_pending_tasks,
+            max_concurrent_per_tool=config.max_concurrent_per_tool,
+            timeout=config.task_timeout_seconds,
+        )
+        _executor_loop = loop
+    return _executor
+
+
+def cancel_tool_request(request_id: str) -> bool:
+    """Cancel a tool call started through the executor; True if it was still running."""
+    return _executor is not None and _executor.cancel(request_id)
+
+
 def format_tool_results(processing_result: Dict[str, Any]) -> str:
     """Format tool results for display to user."""
     if not processing_result.get("execution_results"):
@@ -439,13 +744,12 @@ def check_completed_tool_requests() -> Optional[Dict[str, Any]]:
     """
     completed = {}
 
-    for request_id, request_data in list(PENDING_TOOL_REQUESTS.items()):
-        # Check if the request is completed or has an error status
-        if request_data.get("status") in [
-            "completed",
-            "error",
-            "success",
-        ] and not request_data.get("processed", False):
+    # The status index avoids scanning requests that are still running
+    for request_id in PENDING_TOOL_REQUESTS.ids_with_status(
+        "completed", "error", "success", "cancelled", "interrupted"
+    ):
+        request_data = PENDING_TOOL_REQUESTS[request_id]
+        if not request_data.get("processed", False):
             # Mark as processed
             PENDING_TOOL_REQUESTS[request_id]["processed"] = True
             # Add to completed dict
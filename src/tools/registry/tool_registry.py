@@ -8,6 +8,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from src.tools.tool_call_parser import DEFAULT_PARAMETER_SCHEMA
+
 logger = logging.getLogger(__name__)
 
 
@@ -72,6 +74,9 @@ class ToolRegistry:
         """
         self.tools: Dict[str, Any] = {}
         self.tool_configs: Dict[str, dict] = {}
+        # Bumped whenever the registered tool set changes, so derived data
+        # (e.g. the rendered tool-catalog prompt section) can be cached
+        self.version = 0
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
 
@@ -143,15 +148,13 @@ class ToolRegistry:
                                 "capabilities": getattr(tool_func, "capabilities", []),
                                 "example": get_tool_example(tool_func, tool_name),
                             }
+                            if hasattr(tool_func, "parameters"):
+                                tool_info["parameters"] = tool_func.parameters
 
                             logger.debug(f"Created tool info for {tool_name}: {tool_info}")
 
-                            # Create wrapper instance
-                            tool_class = ToolWrapper(tool_func)
-
-                            # Store tool info and instance
-                            self.tool_configs[tool_name] = tool_info
-                            self.tools[tool_name] = tool_class
+                            # Create wrapper instance and store it with its info
+                            self.register_tool(tool_name, ToolWrapper(tool_func), tool_info)
                             discovered_tools.append(tool_name)
                             break  # Found the tool, no need to check other paths
                     except Exception as e:
@@ -163,6 +166,8 @@ class ToolRegistry:
             # Persist the updated state
             self._persist_state()
 
+        self.version += 1
+
         if discovered_tools:
             logger.debug(
                 f"Discovered and registered {len(discovered_tools)} tools: {', '.join(discovered_tools)}"
@@ -170,6 +175,31 @@ class ToolRegistry:
         else:
             logger.debug("No tools discovered")
 
+    def register_tool(self, name: str, tool: Any, config: Optional[dict] = None) -> None:
+        """
+        Register (or replace) a tool and bump the registry version.
+
+        Args:
+            name: Name of the tool
+            tool: Tool wrapper instance
+            config: Tool configuration (description, capabilities, example, ...)
+        """
+        self.tools[name] = tool
+        self.tool_configs[name] = config or {}
+        self.version += 1
+
+    def unregister_tool(self, name: str) -> None:
+        """
+        Remove a tool and bump the registry version.
+
+        Args:
+            name: Name of the tool
+        """
+        removed_tool = self.tools.pop(name, None)
+        removed_config = self.tool_configs.pop(name, None)
+        if removed_tool is not None or removed_config is not None:
+            self.version += 1
+
     def get_tool(self, name: str) -> Optional[Any]:
         """
         Get a tool class by name.
@@ -194,6 +224,25 @@ class ToolRegistry:
         """
         return self.tool_configs.get(name)
 
+    def get_parameter_schema(self, name: str) -> Optional[dict]:
+        """
+        Get the schema a tool's call arguments are validated against.
+
+        Tools declare one with a ``parameters`` attribute (JSON Schema subset:
+        required, properties with type, additionalProperties); others accept
+        the default task contract.
+
+        Args:
+            name: Name of the tool
+
+        Returns:
+            Parameter schema, or None if the tool is not registered
+        """
+        if name not in self.tools:
+            return None
+        config = self.tool_configs.get(name) or {}
+        return config.get("parameters") or DEFAULT_PARAMETER_SCHEMA
+
     def list_tools(self) -> List[str]:
         """
         List all registered tool names.
@@ -0,0 +1,255 @@
+"""
+One-pass parser for backtick-JSON tool calls in LLM output.
+
+The model is prompted to call tools as ``{"name": ..., "args": {...}}``
+wrapped in backticks. ToolCallParser scans the text once, either all at once
+or fed in chunks while the response streams:
+
+- ordinary text (including inline code such as `ls`) is returned for
+  display as soon as it is known not to start a tool call;
+- from a backtick followed by "{", text is held back and tracked brace by
+  brace, honouring JSON strings, so nested objects and backticks or braces
+  inside string values do not end the call early;
+- a call is emitted the moment its closing brace arrives, so it can start
+  running before the rest of the response is generated;
+- each call is checked against the registry's parameter schema, so
+  malformed or unknown calls are reported once instead of being looked up
+  and failing later.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.services.logging_service import get_logger
+
+logger = get_logger(__name__)
+
+# Returns an error message, or None when the call is valid
+Validator = Callable[[str, Dict[str, Any]], Optional[str]]
+
+# Parameter schema for tools that do not declare one: the task contract used in the prompt
+DEFAULT_PARAMETER_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "required": ["task"],
+    "properties": {
+        "task": {"type": "string"},
+        "parameters": {"type": "object"},
+        "request_id": {"type": "string"},
+    },
+}
+
+_JSON_TYPES = {
+    "string": str,
+    "object": dict,
+    "array": list,
+    "boolean": bool,
+    "integer": int,
+    "number": (int, float),
+}
+
+_TEXT, _OPEN, _CALL, _AFTER = range(4)
+
+
+@dataclass
+class ToolCall:
+    """A tool call found in the response."""
+
+    name: str
+    args: Dict[str, Any]
+    raw: str  # The JSON text, without backticks
+    error: Optional[str] = None  # Why the call is invalid; None when it can run
+    request_id: Optional[str] = None  # Set once the call has been started
+
+
+def validate_arguments(args: Dict[str, Any], schema: Dict[str, Any]) -> Optional[str]:
+    """
+    Check tool arguments against a (JSON-Schema subset) parameter schema.
+
+    Supports required keys, per-property "type" and additionalProperties: false.
+
+    Args:
+        args: Arguments from the tool call
+        schema: Parameter schema of the tool
+
+    Returns:
+        Optional[str]: Error message, or None if the arguments are valid
+    """
+    missing = [key for key in schema.get("required", []) if key not in args]
+    if missing:
+        return f"missing required argument(s): {', '.join(missing)}"
+    properties = schema.get("properties", {})
+    for key, value in args.items():
+        spec = properties.get(key)
+        if spec is None:
+            if schema.get("additionalProperties", True) is False:
+                return f"unexpected argument '{key}'"
+            continue
+        expected = _JSON_TYPES.get(spec.get("type"))
+        # bool is an int subclass; only accept it where a boolean is expected
+        if expected and (
+            not isinstance(value, expected)
+            or (isinstance(value, bool) and spec.get("type") != "boolean")
+        ):
+            return f"argument '{key}' must be of type {spec['type']}"
+    if "task" in args and isinstance(args["task"], str) and not args["task"].strip():
+        return "argument 'task' must not be empty"
+    return None
+
+
+class ToolCallParser:
+    """Incremental backtick-JSON tool-call scanner (feed chunks, or call parse())."""
+
+    def __init__(self, validate: Optional[Validator] = None):
+        """
+        Initialize the parser.
+
+        Args:
+            validate: Checks a call's name and args; returns an error message or None
+        """
+        self.validate = validate
+        self.calls: List[ToolCall] = []
+        self._new = 0  # Index of the first call not yet returned by pop_calls()
+        self._state = _TEXT
+        self._held: List[str] = []  # Backtick plus call text held back from display
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @classmethod
+    def parse(cls, text: str, validate: Optional[Validator] = None) -> Tuple[List[ToolCall], str]:
+        """
+        Parse a complete response.
+
+        Args:
+            text: LLM response
+            validate: Optional call validator
+
+        Returns:
+            Tuple[List[ToolCall], str]: The calls in order, and the text without them
+        """
+        parser = cls(validate)
+        shown = parser.feed(text) + parser.flush()
+        return parser.calls, shown
+
+    @property
+    def complete(self) -> bool:
+        """Whether at least one tool call has been received."""
+        return bool(self.calls)
+
+    def pop_calls(self) -> List[ToolCall]:
+        """Calls completed since the previous pop_calls()."""
+        new, self._new = self.calls[self._new :], len(self.calls)
+        return new
+
+    def feed(self, chunk: str) -> str:
+        """
+        Scan the next fragment of the response.
+
+        Args:
+            chunk: Next text fragment from the LLM
+
+        Returns:
+            Text that is safe to display now
+        """
+        out: List[str] = []
+        i, n = 0, len(chunk)
+        while i < n:
+            if self._state == _TEXT:
+                tick = chunk.find("`", i)
+                if tick == -1:
+                    out.append(chunk[i:])
+                    break
+                out.append(chunk[i:tick])
+                self._held = ["`"]
+                self._state = _OPEN
+                i = tick + 1
+                continue
+
+            char = chunk[i]
+            i += 1
+            if self._state == _AFTER:
+                # Swallow the closing backtick of a call; anything else is plain text
+                self._state = _TEXT
+                if char != "`":
+                    i -= 1
+            elif self._state == _OPEN:
+                if char == "{":
+                    self._held.append(char)
+                    self._state, self._depth = _CALL, 1
+                    self._in_string = self._escape = False
+                elif char == "`":
+                    # The earlier backtick is plain text; this one may still open a call
+                    out.append("`")
+                else:
+                    # Inline code or a stray backtick: show it and rescan this character
+                    out.append("`")
+                    self._held, self._state = [], _TEXT
+                    i -= 1
+            else:
+                self._held.append(char)
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif char == "\\":
+                        self._escape = True
+                    elif char == '"':
+                        self._in_string = False
+                elif char == '"':
+                    self._in_string = True
+                elif char == "{":
+                    self._depth += 1
+                elif char == "}":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        out.append(self._finish())
+        return "".join(out)
+
+    def flush(self) -> str:
+        """
+        Release held-back text once the response has ended.
+
+        Returns:
+            Remaining displayable text (an unterminated call is shown as text)
+        """
+        text = "".join(self._held) if self._state in (_OPEN, _CALL) else ""
+        self._held, self._state = [], _TEXT
+        return text
+
+    def _finish(self) -> str:
+        """Turn the held text into a call; return it for display if it is not one."""
+        held = "".join(self._held)
+        self._held = []
+        raw = held[1:]
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            data = None
+        if not (isinstance(data, dict) and isinstance(data.get("name"), str) and "args" in data):
+            # JSON-looking text that is not a tool call
+            self._state = _TEXT
+            return held
+
+        args = data["args"]
+        error = None
+        if not isinstance(args, dict):
+            error = "'args' must be an object"
+        elif self.validate:
+            error = self.validate(data["name"], args)
+        if error:
+            logger.warning(f"Invalid tool call {data['name']}: {error}")
+        self.calls.append(
+            ToolCall(
+                name=data["name"], args=args if isinstance(args, dict) else {}, raw=raw, error=error
+            )
+        )
+        self._state = _AFTER
+        return ""
+
+
+__all__ = [
+    "DEFAULT_PARAMETER_SCHEMA",
+    "ToolCall",
+    "ToolCallParser",
+    "validate_arguments",
+]
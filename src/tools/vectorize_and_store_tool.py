@@ -5,176 +5,128 @@ This tool processes text content, generates vector embeddings, and stores both
 the content and embeddings in the database for later retrieval via semantic search.
 """
 
+import asyncio
 import logging
 import os
 import sys
-import threading
-import time
 import uuid
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Set, Union
 
 # Add project path for imports
 project_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 if project_path not in sys.path:
     sys.path.insert(0, project_path)
 
-from src.utils.embedding_utils import batch_get_embeddings, get_embedding
-
-# Import utilities
-from src.utils.text_processing import chunk_text_by_tokens, clean_text, generate_chunk_metadata
+from src.config.database_config import (
+    IngestionConfig,
+    get_database_config,
+    get_request_store_config,
+)
+from src.config.llm_config import get_llm_embedding_config
+from src.services.ingestion_service import IngestionPipeline, pending_task_ids
+from src.services.request_store_service import RequestStore
+from src.utils.text_processing import load_tokenizer
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# Dictionary to store pending vectorization tasks
-PENDING_VECTORIZE_REQUESTS = {}
+# Live progress of running pipelines (bounded; interrupted tasks resume from their checkpoints)
+PENDING_VECTORIZE_REQUESTS = RequestStore("vectorize_requests", get_request_store_config())
 
+# Services used by the pipeline; set by configure_vectorize_services or created on first use
+_SERVICES: Dict[str, Any] = {}
+# References to running pipeline tasks so they are not garbage collected
+_RUNNING: Set[asyncio.Task] = set()
 
-def _process_vectorization(
-    task_id: str,
-    content: Union[str, List[Dict[str, Any]]],
-    source_name: str,
-    source_url: Optional[str] = None,
-    chunk_size: int = 1000,
-    chunk_overlap: int = 200,
-    metadata: Optional[Dict[str, Any]] = None,
-) -> Dict[str, Any]:
+
+def configure_vectorize_services(
+    db_service: Any = None,
+    llm_service: Any = None,
+    config: Optional[IngestionConfig] = None,
+) -> None:
     """
-    Process the vectorization task in a background thread.
+    Share the application's services with the vectorization pipeline.
 
     Args:
-        task_id: Unique identifier for this vectorization task
-        content: Text content or list of content objects to vectorize
-        source_name: Name of the source (e.g., "Documentation", "GitHub Repo")
-        source_url: URL of the content source
-        chunk_size: Size of text chunks in tokens
-        chunk_overlap: Overlap between chunks in tokens
-        metadata: Additional metadata to store with the vectors
-
-    Returns:
-        Dictionary containing vectorization results
+        db_service: DBService used for bulk inserts
+        llm_service: LLMService used for batched embeddings
+        config: Pipeline settings (database.ingestion by default)
     """
-    try:
-        logger.debug(f"Starting vectorization task {task_id} for {source_name}")
-
-        # Initialize results
-        chunks_processed = 0
-        chunks_stored = 0
-        errors = []
-        all_chunks = []
-
-        # Process time simulation base (will be increased based on content size)
-        base_processing_time = 2.0
-
-        # Normalize the content to a list of content objects
-        content_list = []
-        if isinstance(content, str):
-            # Single text string provided
-            content_list = [
-                {
-                    "id": "chunk-0",
-                    "title": source_name,
-                    "content": content,
-                    "metadata": metadata or {},
-                }
-            ]
-            processing_time = base_processing_time + (len(content) / 5000)
-        elif isinstance(content, list):
-            # List of content objects provided
-            content_list = content
-            processing_time = base_processing_time + (len(content) * 0.5)
-
-        # Simulate processing time
-        time.sleep(min(processing_time, 10.0))  # Cap at 10 seconds for simulation
-
-        # Process each content object
-        for idx, content_obj in enumerate(content_list):
-            try:
-                text = content_obj.get("content", "")
-                if not text:
-                    continue
-
-                title = content_obj.get("title", f"Content {idx+1}")
-                item_id = content_obj.get("id", str(uuid.uuid4()))
-                item_metadata = content_obj.get("metadata", {})
-
-                # Clean the text
-                cleaned_text = clean_text(text)
-
-                # Chunk the text
-                chunks = chunk_text_by_tokens(
-                    cleaned_text, chunk_size=chunk_size, chunk_overlap=chunk_overlap
-                )
-
-                # Process each chunk
-                for chunk_idx, chunk in enumerate(chunks):
-                    # Generate chunk metadata
-                    chunk_metadata = generate_chunk_metadata(
-                        chunk,
-                        source_name=source_name,
-                        title=title,
-                        chunk_index=chunk_idx,
-                        source_url=source_url,
-                        **item_metadata,
-                    )
-
-                    # Generate embedding for the chunk
-                    # Note: In a real implementation, this would call the embedding model
-                    embedding = get_embedding(chunk)
-
-                    # Store in database (simulated)
-                    # In real implementation, would call database storage method
-
-                    # Add to results
-                    all_chunks.append(
-                        {
-                            "id": f"{item_id}-chunk-{chunk_idx}",
-                            "text": chunk[:100] + "..." if len(chunk) > 100 else chunk,
-                            "embedding_length": len(embedding),
-                            "metadata": chunk_metadata,
-                        }
-                    )
-
-                    chunks_processed += 1
-                    chunks_stored += 1
-
-            except Exception as e:
-                error_msg = f"Error processing content {idx}: {str(e)}"
-                logger.error(error_msg)
-                errors.append(error_msg)
-
-        # Prepare the result
-        result = {
-            "task_id": task_id,
-            "status": "completed",
-            "source_name": source_name,
-            "source_url": source_url,
-            "total_content_objects": len(content_list),
-            "chunks_processed": chunks_processed,
-            "chunks_stored": chunks_stored,
-            "errors": errors,
-            "sample_chunks": all_chunks[:5] if all_chunks else [],
-            "started_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "completed_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-        }
-
-        logger.debug(f"Completed vectorization task {task_id}: processed {chunks_processed} chunks")
-        PENDING_VECTORIZE_REQUESTS[task_id] = result
-        return result
-
-    except Exception as e:
-        error_msg = f"Error in vectorization task: {str(e)}"
-        logger.error(error_msg)
-        PENDING_VECTORIZE_REQUESTS[task_id] = {
-            "task_id": task_id,
-            "status": "error",
-            "error": error_msg,
-        }
-        return PENDING_VECTORIZE_REQUESTS[task_id]
-
-
-def vectorize_and_store_tool(
+    _SERVICES.update(
+        {k: v for k, v in [("db", db_service), ("llm", llm_service), ("config", config)] if v}
+    )
+
+
+def _get_services():
+    """Return (db_service, llm_service, config), creating defaults on first use."""
+    if "config" not in _SERVICES or "db" not in _SERVICES:
+        db_config = get_database_config()
+        _SERVICES.setdefault("config", db_config.ingestion)
+        if "db" not in _SERVICES:
+            from src.managers.db_manager import DBService
+
+            _SERVICES["db"] = DBService(pool_config=db_config.pool)
+    if "llm" not in _SERVICES:
+        from src.services.llm_service import LLMService
+
+        _SERVICES["llm"] = LLMService.get_instance()
+    return _SERVICES["db"], _SERVICES["llm"], _SERVICES["config"]
+
+
+async def _get_tokenizer():
+    """Return the embedding model's tokenizer, loaded once off the event loop."""
+    if "tokenizer" not in _SERVICES:
+        # Loading may read a large tokenizer.json or hit the hub; concurrent callers share it
+        _SERVICES["tokenizer"] = asyncio.ensure_future(
+            asyncio.to_thread(load_tokenizer, get_llm_embedding_config().tokenizer)
+        )
+    return await _SERVICES["tokenizer"]
+
+
+def _start_pipeline(task_id: str, spec: Optional[Dict[str, Any]] = None) -> None:
+    """Create the pipeline for a task and run it in the background."""
+    db_service, llm_service, config = _get_services()
+    pipeline = IngestionPipeline(
+        task_id,
+        embed_fn=llm_service.get_embeddings,
+        store_fn=lambda rows: db_service.insert_many(config.table, rows),
+        config=config,
+        max_tokens=get_llm_embedding_config().context_window,
+    )
+    PENDING_VECTORIZE_REQUESTS[task_id] = pipeline.progress
+    # Let the pipeline update the stored entry: status changes are indexed and its
+    # progress counters keep the task from expiring while it runs
+    pipeline.progress = PENDING_VECTORIZE_REQUESTS[task_id]
+
+    async def run():
+        try:
+            pipeline.tokenizer = await _get_tokenizer()
+            await pipeline.run(spec)
+        except Exception as e:
+            error_msg = f"Error in vectorization task: {str(e)}"
+            logger.error(error_msg)
+            pipeline.progress.update({"status": "error", "error": error_msg})
+
+    task = asyncio.create_task(run())
+    _RUNNING.add(task)
+    task.add_done_callback(_RUNNING.discard)
+
+
+def _normalize_content(
+    task_id: str, content: Union[str, List[Dict[str, Any]]], metadata: Optional[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Turn tool input into documents with ids that stay stable across a resume."""
+    if isinstance(content, str):
+        return [{"id": f"{task_id}-0", "content": content, "metadata": metadata or {}}]
+    return [
+        {**item, "id": str(item.get("id") or f"{task_id}-{idx}")}
+        for idx, item in enumerate(content)
+        if item.get("content")
+    ]
+
+
+async def vectorize_and_store_tool(
     content: Union[str, List[Dict[str, Any]]],
     source_name: str,
     source_url: Optional[str] = None,
@@ -185,12 +137,14 @@ def vectorize_and_store_tool(
     """
     Tool for vectorizing text content and storing it in the database.
 
-    This tool initiates a background task to process text content, generate
-    vector embeddings, and store both in the database for later retrieval.
+    This tool starts a background ingestion pipeline that chunks and cleans
+    the content, embeds the chunks in batches and bulk inserts them with
+    their vectors. Progress per stage is available from check_vectorize_status.
 
     Args:
         content: Text content to vectorize - either a string or a list of
-                content objects with "content" field and optional "metadata"
+                content objects with "content" field and optional "id",
+                "title" and "metadata"
         source_name: Name of the source (e.g., "Documentation", "GitHub Repo")
         source_url: URL of the content source
         chunk_size: Size of text chunks in tokens
@@ -208,29 +162,15 @@ def vectorize_and_store_tool(
 
     # Create a task ID
     task_id = str(uuid.uuid4())
-
-    # Initialize the task in the pending requests
-    PENDING_VECTORIZE_REQUESTS[task_id] = {
-        "task_id": task_id,
-        "status": "pending",
+    spec = {
+        "items": _normalize_content(task_id, content, metadata),
         "source_name": source_name,
-        "started_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "source_url": source_url,
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "metadata": metadata or {},
     }
-
-    # Start the processing in a background thread
-    threading.Thread(
-        target=_process_vectorization,
-        args=(
-            task_id,
-            content,
-            source_name,
-            source_url,
-            chunk_size,
-            chunk_overlap,
-            metadata,
-        ),
-        daemon=True,
-    ).start()
+    _start_pipeline(task_id, spec)
 
     # Return immediately with the task ID
     return {
@@ -241,6 +181,21 @@ def vectorize_and_store_tool(
     }
 
 
+def resume_vectorize_tasks() -> List[str]:
+    """
+    Resume tasks interrupted by a crash or shutdown; call once at startup.
+
+    Returns:
+        List[str]: Ids of the resumed tasks
+    """
+    _, _, config = _get_services()
+    task_ids = [t for t in pending_task_ids(config) if t not in PENDING_VECTORIZE_REQUESTS]
+    for task_id in task_ids:
+        logger.debug(f"Resuming vectorization task {task_id}")
+        _start_pipeline(task_id)
+    return task_ids
+
+
 def check_vectorize_status(task_id: str) -> Dict[str, Any]:
     """
     Check the status of a vectorization task.
@@ -254,9 +209,9 @@ def check_vectorize_status(task_id: str) -> Dict[str, Any]:
     if task_id not in PENDING_VECTORIZE_REQUESTS:
         return {"status": "error", "error": f"No task found with ID {task_id}"}
 
-    result = PENDING_VECTORIZE_REQUESTS[task_id]
-
-    # If the task is completed and we want to keep memory usage down,
-    # we could remove it from the dictionary after a certain time period
+    # Snapshot, so callers never see counters change under them
+    result = dict(PENDING_VECTORIZE_REQUESTS[task_id])
+    result["stages"] = {name: dict(stage) for name, stage in result.get("stages", {}).items()}
+    result["errors"] = list(result.get("errors", []))
 
     return result
@@ -8,14 +8,24 @@ import hashlib
 import json
 import logging
 import os
+import re
 import time
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
+DIGEST_SIZE = 32  # SHA-256 digest bytes per index entry
+VECTOR_ITEMSIZE = np.dtype(np.float32).itemsize
+
 
 def generate_mock_embedding(text: str, model: str = "mock-embedding-model") -> List[float]:
     """Generate a mock embedding vector for demonstration purposes."""
@@ -41,52 +51,233 @@ def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     return max(min(similarity, 1.0), -1.0)
 
 
+class _ModelShard:
+    """
+    Append-only vector store for one model.
+
+    ``<slug>.f32`` holds raw float32 rows and ``<slug>.idx`` the 32-byte
+    SHA-256 digest of each row's text, in row order, so the index is rebuilt
+    from a single read and vectors are served straight from a memory map.
+    Vectors are written before their digest, so a crash mid-append leaves at
+    most an orphaned row that the next append overwrites.
+    """
+
+    def __init__(self, cache_dir: str, model: str):
+        slug = re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+        slug = f"{slug}-{hashlib.sha256(model.encode()).hexdigest()[:8]}"
+        base = os.path.join(cache_dir, slug)
+        self.model = model
+        self.vectors_path = f"{base}.f32"
+        self.index_path = f"{base}.idx"
+        self.meta_path = f"{base}.json"
+        self.lock_path = f"{base}.lock"
+        self.dim: Optional[int] = None
+        self.rows = 0
+        self.index: Dict[bytes, int] = {}
+        self._matrix: Optional[np.memmap] = None
+        self._index_ino: Optional[int] = None
+
+    @contextmanager
+    def locked(self, shared: bool = False):
+        """Hold an advisory file lock shared with other processes (POSIX only)."""
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def refresh(self) -> None:
+        """Pick up rows appended by other processes, or reload after a compaction."""
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self._index_ino:
+            self._reset()
+            self._index_ino = stat.st_ino
+        if stat.st_size // DIGEST_SIZE <= self.rows:
+            return
+        if self.dim is None:
+            with open(self.meta_path, "r") as f:
+                self.dim = int(json.load(f)["dim"])
+        with open(self.index_path, "rb") as f:
+            f.seek(self.rows * DIGEST_SIZE)
+            data = f.read()
+        vector_rows = os.path.getsize(self.vectors_path) // (self.dim * VECTOR_ITEMSIZE)
+        count = max(0, min(len(data) // DIGEST_SIZE, vector_rows - self.rows))
+        digests = [data[i : i + DIGEST_SIZE] for i in range(0, count * DIGEST_SIZE, DIGEST_SIZE)]
+        self.index.update(zip(digests, range(self.rows, self.rows + count)))
+        self.rows += count
+
+    def vector(self, row: int) -> np.ndarray:
+        """Return a copy of one row, remapping if the file has grown."""
+        if self._matrix is None or row >= self._matrix.shape[0]:
+            self._matrix = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r", shape=(self.rows, self.dim)
+            )
+        return np.array(self._matrix[row])
+
+    def append(self, digest: bytes, vector: np.ndarray) -> None:
+        """Append one row under the exclusive lock."""
+        with self.locked():
+            self.refresh()
+            if digest in self.index:
+                return
+            if self.dim is None:
+                self.dim = int(vector.shape[0])
+                with open(self.meta_path, "w") as f:
+                    json.dump({"model": self.model, "dim": self.dim}, f)
+            elif vector.shape[0] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dimensional vectors for {self.model}")
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(self.rows * self.dim * VECTOR_ITEMSIZE)
+                f.write(vector.astype(np.float32).tobytes())
+            with open(self.index_path, "ab") as f:
+                f.truncate(self.rows * DIGEST_SIZE)
+                f.write(digest)
+            self._index_ino = os.stat(self.index_path).st_ino
+            self.index[digest] = self.rows
+            self.rows += 1
+
+    def compact(self, max_rows: Optional[int] = None) -> int:
+        """
+        Rewrite the shard keeping each digest once, newest rows last.
+
+        Args:
+            max_rows: Keep only the most recently appended rows
+
+        Returns:
+            int: Number of rows kept
+        """
+        with self.locked():
+            self._reset()
+            self.refresh()
+            if not self.rows:
+                return 0
+            rows = sorted(self.index.values())
+            if max_rows is not None:
+                rows = rows[-max_rows:] if max_rows > 0 else []
+            digests = {row: digest for digest, row in self.index.items()}
+            matrix = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r", shape=(self.rows, self.dim)
+            )
+            np.asarray(matrix[rows], dtype=np.float32).tofile(f"{self.vectors_path}.tmp")
+            with open(f"{self.index_path}.tmp", "wb") as f:
+                f.write(b"".join(digests[row] for row in rows))
+            del matrix
+            # Vectors first: readers trust the index, which is swapped last
+            os.replace(f"{self.vectors_path}.tmp", self.vectors_path)
+            os.replace(f"{self.index_path}.tmp", self.index_path)
+            self._reset()
+            self.refresh()
+            return self.rows
+
+    def _reset(self) -> None:
+        self.rows = 0
+        self.index = {}
+        self._matrix = None
+        self._index_ino = None
+
+
 class EmbeddingCache:
-    """Simple cache for embeddings to avoid recomputing them."""
+    """
+    Persistent cache for embeddings to avoid recomputing them.
+
+    Each model gets a memory-mapped, append-only float32 matrix with a
+    digest index (see _ModelShard), so a warm start only reads the index.
+    Decoded vectors are kept in a bounded LRU, writers coordinate through a
+    file lock, and ``compact()`` (or ``python -m src.utils.embedding_utils
+    compact``) drops duplicate and old rows.
+    """
 
-    def __init__(self, cache_dir: str = ".embedding_cache"):
+    def __init__(self, cache_dir: str = ".embedding_cache", max_resident: int = 4096):
         self.cache_dir = cache_dir
         os.makedirs(cache_dir, exist_ok=True)
-        self.cache = {}
+        self.max_resident = max_resident
+        self.cache: "OrderedDict[Tuple[str, bytes], List[float]]" = OrderedDict()
+        self._shards: Dict[str, _ModelShard] = {}
 
-    def _get_cache_key(self, text: str, model: str) -> str:
-        return f"{model}_{hashlib.md5(text.encode()).hexdigest()}"
+    def _get_cache_key(self, text: str) -> bytes:
+        return hashlib.sha256(text.encode("utf-8")).digest()
 
-    def _get_cache_path(self, key: str) -> str:
-        return os.path.join(self.cache_dir, f"{key}.json")
+    def _shard(self, model: str) -> _ModelShard:
+        if model not in self._shards:
+            self._shards[model] = _ModelShard(self.cache_dir, model)
+        return self._shards[model]
+
+    def _remember(self, key: Tuple[str, bytes], embedding: List[float]) -> None:
+        self.cache[key] = embedding
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_resident:
+            self.cache.popitem(last=False)
 
     def get(self, text: str, model: str) -> Optional[List[float]]:
-        key = self._get_cache_key(text, model)
+        digest = self._get_cache_key(text)
+        key = (model, digest)
         if key in self.cache:
+            self.cache.move_to_end(key)
             return self.cache[key]
-        cache_path = self._get_cache_path(key)
-        if os.path.exists(cache_path):
-            try:
-                with open(cache_path, "r") as f:
-                    data = json.load(f)
-                    embedding = data.get("embedding")
-                    self.cache[key] = embedding
-                    return embedding
-            except Exception as e:
-                logger.warning(f"Failed to load cached embedding: {e}")
-        return None
+        try:
+            shard = self._shard(model)
+            # Under the lock a concurrent compaction cannot renumber rows mid-read
+            with shard.locked(shared=True):
+                shard.refresh()
+                row = shard.index.get(digest)
+                if row is None:
+                    return None
+                embedding = shard.vector(row).tolist()
+        except Exception as e:
+            logger.warning(f"Failed to load cached embedding: {e}")
+            return None
+        self._remember(key, embedding)
+        return embedding
 
     def put(self, text: str, model: str, embedding: List[float]) -> None:
-        key = self._get_cache_key(text, model)
-        self.cache[key] = embedding
-        cache_path = self._get_cache_path(key)
+        digest = self._get_cache_key(text)
+        self._remember((model, digest), embedding)
         try:
-            with open(cache_path, "w") as f:
-                data = {
-                    "text_sample": text[:100] + ("..." if len(text) > 100 else ""),
-                    "model": model,
-                    "embedding": embedding,
-                    "cached_at": datetime.utcnow().isoformat(),
-                }
-                json.dump(data, f)
+            self._shard(model).append(digest, np.asarray(embedding, dtype=np.float32))
         except Exception as e:
             logger.warning(f"Failed to cache embedding: {e}")
 
+    def compact(self, max_rows: Optional[int] = None) -> Dict[str, int]:
+        """
+        Compact every model stored in the cache directory.
+
+        Args:
+            max_rows: Per-model cap on rows kept (most recent first)
+
+        Returns:
+            Dict[str, int]: Rows kept per model
+        """
+        kept = {}
+        for name in sorted(os.listdir(self.cache_dir)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.cache_dir, name), "r") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            # Legacy per-vector files ({model}_{md5}.json) also carry a "model" key, but
+            # only hold a truncated text sample, so they cannot be keyed into a shard
+            if not isinstance(meta, dict) or "dim" not in meta or not meta.get("model"):
+                continue
+            model = meta["model"]
+            if model in kept:
+                continue
+            shard = self._shard(model)
+            if os.path.basename(shard.meta_path) != name or not (
+                os.path.exists(shard.vectors_path) and os.path.exists(shard.index_path)
+            ):
+                continue
+            kept[model] = shard.compact(max_rows)
+        self.cache.clear()
+        return kept
+
 
 embedding_cache = EmbeddingCache()
 
@@ -114,13 +305,107 @@ def batch_get_embeddings(
     return [get_embedding(text, model, use_cache) for text in texts]
 
 
+def normalize_rows(matrix: Union[np.ndarray, List[List[float]]]) -> np.ndarray:
+    """
+    Return a float32 copy of a (N, d) matrix with unit-length rows.
+
+    Normalize a corpus once and pass ``normalized=True`` to top_k_similar so
+    searches skip the per-row norms. All-zero rows stay zero.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_similar(
+    query_vector: Union[np.ndarray, List[float]],
+    matrix: Union[np.ndarray, List[List[float]]],
+    top_k: int = 5,
+    normalized: bool = False,
+    chunk_size: int = 65536,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the rows of a matrix most cosine-similar to a query.
+
+    Rows are scored ``chunk_size`` at a time with one matrix-vector product
+    per chunk, and the best ``top_k`` are selected with argpartition, so a
+    np.memmap larger than RAM is streamed from disk chunk by chunk.
+
+    Args:
+        query_vector: Query of dimension d
+        matrix: (N, d) vectors; ndarray, np.memmap or nested lists
+        top_k: Number of results
+        normalized: Whether the rows of matrix already have unit length
+        chunk_size: Rows scored per chunk
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Row indices and similarities, best first
+
+    Raises:
+        ValueError: If the query and matrix dimensions differ
+    """
+    if not isinstance(matrix, np.ndarray):
+        matrix = np.asarray(matrix, dtype=np.float32)
+    query = np.asarray(query_vector, dtype=np.float32).ravel()
+    if matrix.size == 0 or top_k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    if matrix.ndim != 2 or matrix.shape[1] != query.shape[0]:
+        raise ValueError(f"Vector dimensions don't match: {query.shape[0]} vs {matrix.shape[-1]}")
+    query_norm = np.linalg.norm(query)
+    if query_norm:
+        query = query / query_norm
+
+    best_rows = np.empty(0, dtype=np.int64)
+    best_scores = np.empty(0, dtype=np.float32)
+    for start in range(0, matrix.shape[0], chunk_size):
+        chunk = np.asarray(matrix[start : start + chunk_size], dtype=np.float32)
+        scores = chunk @ query
+        if not normalized:
+            norms = np.linalg.norm(chunk, axis=1)
+            scores = np.divide(scores, norms, out=np.zeros_like(scores), where=norms > 0)
+        if top_k < scores.shape[0]:
+            keep = np.argpartition(scores, -top_k)[-top_k:]
+        else:
+            keep = np.arange(scores.shape[0])
+        best_rows = np.concatenate([best_rows, keep + start])
+        best_scores = np.concatenate([best_scores, scores[keep]])
+        if best_scores.shape[0] > top_k:
+            keep = np.argpartition(best_scores, -top_k)[-top_k:]
+            best_rows, best_scores = best_rows[keep], best_scores[keep]
+
+    order = np.argsort(-best_scores, kind="stable")
+    return best_rows[order], np.clip(best_scores[order], -1.0, 1.0)
+
+
 def find_similar_vectors(
-    query_vector: List[float], vector_list: List[List[float]], top_k: int = 5
+    query_vector: List[float],
+    vector_list: Union[np.ndarray, List[List[float]]],
+    top_k: int = 5,
+    normalized: bool = False,
 ) -> List[Dict[str, Any]]:
-    """Find most similar vectors to query vector."""
-    results = [
-        {"index": i, "similarity": cosine_similarity(query_vector, vector)}
-        for i, vector in enumerate(vector_list)
-    ]
-    sorted_results = sorted(results, key=lambda x: x["similarity"], reverse=True)
-    return sorted_results[:top_k]
+    """Find most similar vectors to query vector (see top_k_similar)."""
+    rows, scores = top_k_similar(query_vector, vector_list, top_k, normalized)
+    return [{"index": int(row), "similarity": float(score)} for row, score in zip(rows, scores)]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m src.utils.embedding_utils compact``."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain the embedding cache")
+    parser.add_argument("command", choices=["compact"])
+    parser.add_argument("--cache-dir", default=".embedding_cache")
+    parser.add_argument("--max-rows", type=int, help="Rows to keep per model (newest first)")
+    args = parser.parse_args(argv)
+
+    kept = EmbeddingCache(args.cache_dir).compact(args.max_rows)
+    for model, rows in kept.items():
+        print(f"{model}: {rows} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
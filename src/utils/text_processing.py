@@ -9,11 +9,13 @@ This module provides functions for:
 """
 
 import logging
+import os
 import random
 import re
 import time
+from collections import deque
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple, Union
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -60,72 +62,222 @@ def estimate_token_count(text: str) -> int:
     return len(text) // 4
 
 
-def chunk_text_by_tokens(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[str]:
+class Tokenizer(Protocol):
+    """Anything that can report the character span of each token in a text."""
+
+    def offsets(self, text: str) -> List[Tuple[int, int]]:
+        """Return (start, end) character offsets of each token, in order."""
+        ...
+
+
+class RegexTokenizer:
+    """
+    Dependency-free tokenizer approximating subword vocabularies.
+
+    Short ASCII words are one token and longer ones one token per 8
+    letters; numbers are split every 3 digits, other scripts every 2
+    characters and punctuation is one token per character. Whitespace is
+    not a token. Offsets are exact but counts are only approximate: a real
+    WordPiece/BPE vocabulary splits rare words, code and URLs into more
+    tokens. Chunking therefore keeps APPROXIMATE_TOKEN_MARGIN below a hard
+    max_tokens cap when this tokenizer is used; load the embedding model's
+    own tokenizer (HuggingFaceTokenizer, llm.embeddings.tokenizer) for
+    exact counts.
     """
-    Split text into chunks based on estimated token count.
+
+    approximate = True  # Counts are estimates; see APPROXIMATE_TOKEN_MARGIN
+
+    _TOKEN_RE = re.compile(r"[A-Za-z]{1,8}|\d{1,3}|[^\W\d_A-Za-z]{1,2}|[^\s]")
+
+    def offsets(self, text: str) -> List[Tuple[int, int]]:
+        return [match.span() for match in self._TOKEN_RE.finditer(text)]
+
+
+class HuggingFaceTokenizer:
+    """Adapter for a `tokenizers` tokenizer, e.g. the embedding model's own."""
+
+    def __init__(self, name_or_path: str):
+        """
+        Load a tokenizer from a local tokenizer.json or the Hugging Face hub.
+
+        Args:
+            name_or_path: Path to tokenizer.json or a hub model id
+
+        Raises:
+            ImportError: If the tokenizers package is not installed
+        """
+        try:
+            from tokenizers import Tokenizer as HFTokenizer
+        except ImportError as e:
+            raise ImportError("HuggingFaceTokenizer requires the 'tokenizers' package") from e
+        if os.path.exists(name_or_path):
+            self._tokenizer = HFTokenizer.from_file(name_or_path)
+        else:
+            self._tokenizer = HFTokenizer.from_pretrained(name_or_path)
+
+    def offsets(self, text: str) -> List[Tuple[int, int]]:
+        encoding = self._tokenizer.encode(text, add_special_tokens=False)
+        return list(encoding.offsets)
+
+
+DEFAULT_TOKENIZER = RegexTokenizer()
+
+# Share of a hard token cap used when counts are approximate, leaving room for undercounts
+APPROXIMATE_TOKEN_MARGIN = 0.8
+
+
+def load_tokenizer(name_or_path: Optional[str] = None) -> Tokenizer:
+    """
+    Load an embedding model's tokenizer, falling back to RegexTokenizer.
 
     Args:
-        text: Input text to chunk
-        chunk_size: Target size of each chunk in tokens
-        chunk_overlap: Number of tokens to overlap between chunks
+        name_or_path: Path to tokenizer.json or a hub model id; None for the default
 
     Returns:
-        List of text chunks
+        HuggingFaceTokenizer if it could be loaded, otherwise DEFAULT_TOKENIZER
     """
-    if not text:
-        return []
+    if not name_or_path:
+        return DEFAULT_TOKENIZER
+    try:
+        return HuggingFaceTokenizer(name_or_path)
+    except Exception as e:
+        logger.warning(f"Could not load tokenizer {name_or_path}; counts are approximate: {e}")
+        return DEFAULT_TOKENIZER
 
-    # For demonstration, we'll use a simple paragraph-based chunking
-    # In a real implementation, you might want more sophisticated chunking
 
-    paragraphs = text.split("\n")
-    chunks = []
-    current_chunk = []
-    current_size = 0
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
 
-    for paragraph in paragraphs:
-        # Skip empty paragraphs
-        if not paragraph.strip():
-            continue
 
-        # Estimate tokens in this paragraph
-        para_tokens = estimate_token_count(paragraph)
+def count_tokens(text: str, tokenizer: Optional[Tokenizer] = None) -> int:
+    """
+    Count tokens in a text with a tokenizer (RegexTokenizer by default).
+
+    Args:
+        text: Input text
+        tokenizer: Optional tokenizer
+
+    Returns:
+        Token count
+    """
+    return len((tokenizer or DEFAULT_TOKENIZER).offsets(text))
 
-        # If adding this paragraph would exceed the chunk size,
-        # save the current chunk and start a new one
-        if current_size + para_tokens > chunk_size and current_chunk:
-            chunks.append("\n".join(current_chunk))
 
-            # Keep some paragraphs for overlap
-            overlap_size = 0
-            overlap_paragraphs = []
+def _split_oversized(unit: str, limit: int, tokenizer: Tokenizer) -> Iterator[Tuple[str, int]]:
+    """Split a paragraph over the limit on sentence boundaries, then on token offsets."""
+    for sentence in _SENTENCE_END_RE.split(unit):
+        spans = tokenizer.offsets(sentence)
+        if len(spans) <= limit:
+            if spans:
+                yield sentence, len(spans)
+            continue
+        for i in range(0, len(spans), limit):
+            window = spans[i : i + limit]
+            yield sentence[window[0][0] : window[-1][1]], len(window)
+
+
+def iter_text_chunks(
+    text: Union[str, Iterable[str]],
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    tokenizer: Optional[Tokenizer] = None,
+    max_tokens: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Lazily split text into chunks of at most chunk_size tokens.
 
-            # Work backwards through current_chunk to create overlap
-            for p in reversed(current_chunk):
-                p_tokens = estimate_token_count(p)
-                if overlap_size + p_tokens <= chunk_overlap:
-                    overlap_paragraphs.insert(0, p)
-                    overlap_size += p_tokens
-                else:
-                    break
+    Lines are packed into chunks whole; a line that alone exceeds the
+    budget is split on sentence boundaries and, failing that, on token
+    offsets. Consecutive chunks share trailing lines worth up to
+    chunk_overlap tokens; the overlap window slides forward, so each line
+    is added and dropped once and the whole pass is linear.
 
-            current_chunk = overlap_paragraphs
-            current_size = overlap_size
+    Args:
+        text: Text, or an iterable of lines (e.g. an open file) for streaming
+        chunk_size: Target size of each chunk in tokens
+        chunk_overlap: Number of tokens to overlap between chunks
+        tokenizer: Tokenizer used for counting (RegexTokenizer by default)
+        max_tokens: Hard cap, e.g. the embedding model's context window;
+            chunk_size is reduced to it so no chunk is truncated when embedded.
+            With an approximate tokenizer (such as the default) the cap is
+            scaled by APPROXIMATE_TOKEN_MARGIN, since its counts can run low
 
-        # Add the paragraph to the current chunk
-        current_chunk.append(paragraph)
-        current_size += para_tokens
+    Yields:
+        Text chunks in order
 
-    # Add the last chunk if it's not empty
-    if current_chunk:
-        chunks.append("\n".join(current_chunk))
+    Raises:
+        ValueError: If chunk_size is not positive
+    """
+    tokenizer = tokenizer or DEFAULT_TOKENIZER
+    if max_tokens is not None:
+        if getattr(tokenizer, "approximate", False):
+            max_tokens = max(1, int(max_tokens * APPROXIMATE_TOKEN_MARGIN))
+        chunk_size = min(chunk_size, max_tokens)
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    chunk_overlap = max(0, min(chunk_overlap, chunk_size - 1))
+    lines = text.split("\n") if isinstance(text, str) else text
+    sep_cost = count_tokens("\n", tokenizer)
+
+    window: Deque[Tuple[str, int]] = deque()
+    window_tokens = 0  # Tokens in window, including separators
+    pending = False  # Whether window holds lines not yet emitted
+
+    def units() -> Iterator[Tuple[str, int]]:
+        for line in lines:
+            line = line.rstrip("\r\n")
+            if not line.strip():
+                continue
+            tokens = count_tokens(line, tokenizer)
+            if tokens <= chunk_size:
+                yield line, tokens
+            else:
+                yield from _split_oversized(line, chunk_size, tokenizer)
+
+    for unit, tokens in units():
+        cost = tokens + (sep_cost if window else 0)
+        if window_tokens + cost > chunk_size and window:
+            if pending:
+                yield "\n".join(u for u, _ in window)
+                pending = False
+            # Slide: keep trailing lines within the overlap that leave room for this unit
+            while window and (
+                window_tokens > chunk_overlap or window_tokens + tokens + sep_cost > chunk_size
+            ):
+                _, dropped = window.popleft()
+                window_tokens -= dropped + (sep_cost if window else 0)
+            cost = tokens + (sep_cost if window else 0)
+        window.append((unit, tokens))
+        window_tokens += cost
+        pending = True
+
+    if pending:
+        yield "\n".join(u for u, _ in window)
+
+
+def chunk_text_by_tokens(
+    text: str,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    tokenizer: Optional[Tokenizer] = None,
+    max_tokens: Optional[int] = None,
+) -> List[str]:
+    """
+    Split text into chunks based on token count.
 
-    # If we end up with no chunks (e.g., all empty text),
-    # return the original text as a single chunk
-    if not chunks and text.strip():
-        chunks = [text]
+    Args:
+        text: Input text to chunk
+        chunk_size: Target size of each chunk in tokens
+        chunk_overlap: Number of tokens to overlap between chunks
+        tokenizer: Tokenizer used for counting (RegexTokenizer by default)
+        max_tokens: Hard cap such as the embedding model's context window
+            (with a safety margin if the tokenizer is approximate)
 
-    return chunks
+    Returns:
+        List of text chunks (see iter_text_chunks)
+    """
+    if not text:
+        return []
+    return list(iter_text_chunks(text, chunk_size, chunk_overlap, tokenizer, max_tokens))
 
 
 def generate_chunk_title(chunk: str, max_length: int = 60) -> str:
@@ -191,7 +343,7 @@ def generate_chunk_metadata(
         Dictionary with metadata for the chunk
     """
     # Calculate basic statistics
-    token_count = estimate_token_count(text)
+    token_count = count_tokens(text)
     char_count = len(text)
 
     # Create metadata dictionary
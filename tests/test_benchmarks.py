@@ -0,0 +1,38 @@
+"""
+Smoke tests for the benchmark suite and its in-process fakes.
+"""
+
+import pytest
+
+from benchmarks.run_benchmarks import compare, parse_args, run_suite
+
+
+@pytest.mark.asyncio
+async def test_suite_reports_percentiles_against_fakes():
+    """Scenarios run end to end against the fakes and report latency and stages."""
+    args = parse_args(
+        ["--requests", "12", "--concurrency", "3", "--sessions", "4", "--db-latency-ms", "1",
+         "--embed-latency-ms", "1", "--scenarios", "get_recent_sessions", "add_message"]
+    )  # fmt: skip
+    report = await run_suite(args)
+
+    results = {r["scenario"]: r for r in report["results"]}
+    assert set(results) == {"get_recent_sessions", "add_message"}
+    for result in results.values():
+        assert result["errors"] == 0, result["first_error"]
+        assert result["throughput_rps"] > 0
+        assert result["latency_ms"]["p50"] <= result["latency_ms"]["p99"]
+    assert "db_insert:ok" in results["add_message"]["stages"]
+    assert report["meta"]["fake_calls"]["ollama"]["embed"] == 12
+    assert report["meta"]["fake_calls"]["supabase"]["POST rpc/list_session_summaries"] == 12
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    """Slower p95 or lower throughput than the baseline is reported."""
+
+    def report(p95, rps):
+        return {"results": [{"scenario": "s", "latency_ms": {"p95": p95}, "throughput_rps": rps}]}
+
+    assert compare(report(10.0, 100.0), report(11.0, 95.0), threshold=0.15) == []
+    regressions = compare(report(10.0, 100.0), report(12.0, 80.0), threshold=0.15)
+    assert len(regressions) == 2 and regressions[0].startswith("s: p95")
@@ -0,0 +1,166 @@
+"""
+Tests for the async database backends and DBService delegation.
+
+These tests cover SQL generation for the asyncpg backend, backend selection
+from the environment, and DBService error wrapping over a mocked backend.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.config.database_config import DatabasePoolConfig
+from src.db.backends import (
+    AsyncpgBackend,
+    DBBackend,
+    SupabaseAsyncBackend,
+    build_delete,
+    build_insert,
+    build_rpc,
+    build_select,
+    build_update,
+    create_backend,
+    quote_identifier,
+)
+from src.db.sqlite_backend import SQLiteBackend
+from src.managers.db_manager import DBService
+from src.services.record_service import DatabaseRecordService
+
+
+@pytest.fixture
+def mock_backend():
+    """Create a mocked async backend."""
+    backend = MagicMock(spec=DBBackend)
+    backend.insert = AsyncMock(return_value=[{"id": 1}])
+    backend.select = AsyncMock(return_value=[{"id": 1}, {"id": 2}])
+    backend.update = AsyncMock(return_value=[{"id": 1, "name": "new"}])
+    backend.delete = AsyncMock(return_value=[])
+    backend.rpc = AsyncMock(return_value=[{"id": 3}])
+    backend.close = AsyncMock()
+    return backend
+
+
+def test_quote_identifier_rejects_injection():
+    """Identifiers must be plain names."""
+    assert quote_identifier("swarm_messages") == '"swarm_messages"'
+    with pytest.raises(ValueError):
+        quote_identifier("users; DROP TABLE users")
+
+
+def test_build_select_with_filters_order_and_limit():
+    """SELECT statements are parameterized in filter order."""
+    sql, args = build_select(
+        "swarm_messages",
+        columns="session_id, timestamp",
+        filters={"session_id": 7, "sender": "system"},
+        order_by="timestamp",
+        order_desc=True,
+        limit=1,
+    )
+    assert sql == (
+        'SELECT "session_id", "timestamp" FROM "swarm_messages" '
+        'WHERE "session_id" = $1 AND "sender" = $2 ORDER BY "timestamp" DESC LIMIT $3'
+    )
+    assert args == [7, "system", 1]
+
+
+def test_build_select_with_filter_operators():
+    """``(operator, value)`` filters map to the matching SQL comparison."""
+    sql, args = build_select(
+        "swarm_messages",
+        columns="id",
+        filters={"id": ("gt", 10), "content": ("ilike", "%cat%"), "sender": "user"},
+        order_by="id",
+    )
+    assert sql == (
+        'SELECT "id" FROM "swarm_messages" '
+        'WHERE "id" > $1 AND "content" ILIKE $2 AND "sender" = $3 ORDER BY "id" ASC'
+    )
+    assert args == [10, "%cat%", "user"]
+
+
+@pytest.mark.asyncio
+async def test_search_records_matches_case_insensitively(tmp_path):
+    """search_records runs an ILIKE filter through DBService and its backend."""
+    db_service = DBService(backend=SQLiteBackend(str(tmp_path / "search.db")))
+    await db_service.insert_many(
+        "swarm_messages",
+        [{"content": "Cats purr"}, {"content": "dogs bark"}, {"content": "a cat nap"}],
+    )
+    records = DatabaseRecordService(db_service)
+    try:
+        matches = await records.search_records("swarm_messages", "content", "CAT")
+        assert sorted(m["content"] for m in matches) == ["Cats purr", "a cat nap"]
+        assert len(await records.search_records("swarm_messages", "content", "a", limit=1)) == 1
+    finally:
+        await db_service.close()
+
+
+def test_build_insert_update_delete_rpc():
+    """Write statements return rows and number their parameters correctly."""
+    sql, args = build_insert("sessions", {"name": "a", "user_id": "dev"})
+    assert sql == 'INSERT INTO "sessions" ("name", "user_id") VALUES ($1, $2) RETURNING *'
+    assert args == ["a", "dev"]
+
+    sql, args = build_update("sessions", {"name": "b"}, {"id": 4})
+    assert sql == 'UPDATE "sessions" SET "name" = $1 WHERE "id" = $2 RETURNING *'
+    assert args == ["b", 4]
+
+    sql, args = build_delete("sessions", {"id": 4})
+    assert sql == 'DELETE FROM "sessions" WHERE "id" = $1 RETURNING *'
+    assert args == [4]
+
+    sql, args = build_rpc("match_documents", {"match_count": 5})
+    assert sql == 'SELECT * FROM "match_documents"("match_count" => $1)'
+    assert args == [5]
+
+
+def test_create_backend_from_environment(monkeypatch):
+    """DATABASE_URL selects asyncpg or SQLite; Supabase credentials select the async client."""
+    monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@localhost:5432/db")
+    assert isinstance(create_backend(), AsyncpgBackend)
+
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///data/local.db")
+    backend = create_backend()
+    assert isinstance(backend, SQLiteBackend)
+    assert backend.path == "data/local.db"
+
+    monkeypatch.delenv("DATABASE_URL")
+    monkeypatch.setenv("SUPABASE_URL", "http://localhost:54321")
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "key")
+    backend = create_backend(DatabasePoolConfig(pool_size=3))
+    assert isinstance(backend, SupabaseAsyncBackend)
+    assert backend.pool_config.pool_size == 3
+
+    monkeypatch.delenv("SUPABASE_URL")
+    with pytest.raises(ValueError):
+        create_backend()
+
+
+@pytest.mark.asyncio
+async def test_db_service_delegates_to_backend(mock_backend):
+    """DBService keeps its interface while awaiting the backend."""
+    db_service = DBService(backend=mock_backend)
+
+    assert await db_service.insert("swarm_messages", {"content": "hi"}) == {"id": 1}
+    assert len(await db_service.select("swarm_messages", limit=2)) == 2
+    assert await db_service.update("sessions", 1, {"name": "new"}) == {"id": 1, "name": "new"}
+    mock_backend.update.assert_awaited_once_with("sessions", {"name": "new"}, {"id": 1})
+    assert await db_service.rpc("match_documents", {}) == [{"id": 3}]
+
+    await db_service.close()
+    mock_backend.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_db_service_wraps_backend_errors(mock_backend):
+    """Backend failures, including timeouts, surface as RuntimeError."""
+    mock_backend.insert = AsyncMock(side_effect=TimeoutError("pool exhausted"))
+    db_service = DBService(backend=mock_backend)
+
+    with pytest.raises(RuntimeError, match="pool exhausted"):
+        await db_service.insert("swarm_messages", {"content": "hi"})
+
+    mock_backend.insert = AsyncMock(return_value=[])
+    with pytest.raises(RuntimeError, match="returned no data"):
+        await db_service.insert("swarm_messages", {"content": "hi"})
@@ -0,0 +1,208 @@
+"""
+Tests for resumable Drive transfers against a local stand-in of the Drive upload/media endpoints.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlparse
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+from googleapiclient.http import build_http
+
+from src.sub_graphs.personal_assistant_agent.src.tools.google import drive_transfer
+from src.sub_graphs.personal_assistant_agent.src.tools.google.drive_transfer import (
+    CHUNK_ALIGNMENT,
+    download_file,
+    upload_file,
+)
+
+
+class DriveEndpoint(BaseHTTPRequestHandler):
+    """Resumable uploads into server.uploaded; range downloads of server.content."""
+
+    def _reply(self, status, payload=None, headers=()):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_POST(self):
+        self.server.metadata = json.loads(self._body())
+        self.server.uploaded = bytearray()
+        location = f"http://127.0.0.1:{self.server.server_port}/session"
+        self._reply(200, headers=[("Location", location)])
+
+    def do_PUT(self):
+        data = self._body()
+        match = re.match(r"bytes (\d+)-(\d+)/(\d+)", self.headers["Content-Range"])
+        total = int(self.headers["Content-Range"].rsplit("/", 1)[1])
+        if match:
+            assert int(match.group(1)) == len(self.server.uploaded)
+            self.server.uploaded += data
+            self.server.chunks_received += 1
+        if len(self.server.uploaded) == total:
+            content = bytes(self.server.uploaded)
+            return self._reply(
+                200,
+                {
+                    "id": "f1",
+                    "name": self.server.metadata["name"],
+                    "size": str(total),
+                    "sha256Checksum": hashlib.sha256(content).hexdigest(),
+                },
+            )
+        self._reply(308, headers=[("Range", f"bytes=0-{len(self.server.uploaded) - 1}")])
+
+    def do_GET(self):
+        content = self.server.content
+        if "alt=media" not in urlparse(self.path).query:
+            if self.server.native:
+                return self._reply(
+                    200,
+                    {
+                        "id": "f1",
+                        "name": "Notes",
+                        "mimeType": "application/vnd.google-apps.document",
+                    },
+                )
+            return self._reply(
+                200,
+                {
+                    "id": "f1",
+                    "name": "big.bin",
+                    "size": str(len(content)),
+                    "sha256Checksum": hashlib.sha256(content).hexdigest(),
+                    "modifiedTime": "2026-10-16T09:00:00Z",
+                },
+            )
+        start, end = map(int, re.match(r"bytes=(\d+)-(\d+)", self.headers["Range"]).groups())
+        self.server.ranges.append(start)
+        part = content[start : end + 1] if start < self.server.served_bytes else b""
+        self.send_response(206)
+        self.send_header("Content-Length", str(len(part)))
+        self.end_headers()
+        self.wfile.write(part)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def drive(tmp_path, monkeypatch):
+    """Drive service whose requests go to a local HTTP server."""
+    monkeypatch.setattr(drive_transfer, "TRANSFER_STATE_DIR", str(tmp_path / "state"))
+    server = HTTPServer(("127.0.0.1", 0), DriveEndpoint)
+    server.uploaded, server.chunks_received, server.ranges = bytearray(), 0, []
+    server.native = False
+    server.content = os.urandom(3 * CHUNK_ALIGNMENT + 1000)
+    server.served_bytes = len(server.content)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    # Point every Drive URL, including the media upload ones, at the local server
+    document = discovery_cache.get_static_doc("drive", "v3").replace(
+        "https://www.googleapis.com/", f"http://127.0.0.1:{server.server_port}/"
+    )
+    service = build_from_document(document, http=build_http(), developerKey="test")
+    yield service, server
+    server.shutdown()
+    server.server_close()
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupt_after(bytes_done):
+    def progress(done, total):
+        if done >= bytes_done and done < total:
+            raise Interrupted()
+
+    return progress
+
+
+def test_interrupted_upload_resumes_without_resending_chunks(drive, tmp_path):
+    """The second call asks Drive for the received range and sends only the rest."""
+    service, server = drive
+    path = tmp_path / "big.bin"
+    path.write_bytes(server.content)
+
+    with pytest.raises(Interrupted):
+        upload_file(
+            str(path),
+            chunk_size=CHUNK_ALIGNMENT,
+            service=service,
+            progress=interrupt_after(CHUNK_ALIGNMENT),
+        )
+    assert len(server.uploaded) == CHUNK_ALIGNMENT
+
+    result = upload_file(str(path), chunk_size=CHUNK_ALIGNMENT, service=service)
+
+    assert result["resumed"] and result["verified"]
+    assert result["sha256"] == hashlib.sha256(server.content).hexdigest()
+    assert bytes(server.uploaded) == server.content
+    assert server.chunks_received == 4  # One per chunk, none resent
+    assert list((tmp_path / "state").iterdir()) == []
+
+
+def test_interrupted_download_continues_from_the_partial_file(drive, tmp_path):
+    """Bytes already on disk are not fetched again and the result is checksum-verified."""
+    service, server = drive
+    output = tmp_path / "out.bin"
+
+    with pytest.raises(Interrupted):
+        download_file(
+            "f1",
+            str(output),
+            chunk_size=CHUNK_ALIGNMENT,
+            service=service,
+            progress=interrupt_after(2 * CHUNK_ALIGNMENT),
+        )
+    assert not output.exists()
+
+    result = download_file("f1", str(output), chunk_size=CHUNK_ALIGNMENT, service=service)
+
+    assert result["resumed_from"] == 2 * CHUNK_ALIGNMENT
+    assert result["verified"]
+    assert output.read_bytes() == server.content
+    assert server.ranges == [0, CHUNK_ALIGNMENT, 2 * CHUNK_ALIGNMENT, 3 * CHUNK_ALIGNMENT]
+    assert not (tmp_path / "out.bin.part").exists()
+
+
+def test_google_native_files_are_rejected_instead_of_saved_empty(drive, tmp_path):
+    """A Google Doc has no size or media; the download fails rather than writing 0 bytes."""
+    service, server = drive
+    server.native = True
+    output = tmp_path / "notes.bin"
+
+    with pytest.raises(RuntimeError, match="google-apps.document"):
+        download_file("f1", str(output), service=service)
+
+    assert not output.exists() and not (tmp_path / "notes.bin.part").exists()
+    assert server.ranges == []
+
+
+def test_empty_range_responses_fail_instead_of_looping(drive, tmp_path):
+    """A 206 with no body before the end of the file raises rather than spinning forever."""
+    service, server = drive
+    server.served_bytes = CHUNK_ALIGNMENT
+
+    with pytest.raises(RuntimeError, match="no data"):
+        download_file("f1", str(tmp_path / "out.bin"), chunk_size=CHUNK_ALIGNMENT, service=service)
+
+    assert server.ranges == [0, CHUNK_ALIGNMENT]
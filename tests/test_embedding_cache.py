@@ -0,0 +1,142 @@
+"""
+Tests for the memory-mapped EmbeddingCache and vectorized similarity search.
+"""
+
+import json
+import multiprocessing
+import os
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from src.utils.embedding_utils import (
+    EmbeddingCache,
+    _ModelShard,
+    cosine_similarity,
+    find_similar_vectors,
+    main,
+    normalize_rows,
+    top_k_similar,
+)
+
+
+def vector(seed, dim=8):
+    """Deterministic float32-representable test vector."""
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32).tolist()
+
+
+def fill(cache_dir, start, count):
+    """Append vectors from a separate process."""
+    cache = EmbeddingCache(cache_dir)
+    for i in range(start, start + count):
+        cache.put(f"text {i}", "nomic", vector(i))
+
+
+def test_vectors_survive_restart_with_bounded_residency(tmp_path):
+    """A new instance reads vectors back from the matrix; residency stays bounded."""
+    cache = EmbeddingCache(str(tmp_path), max_resident=2)
+    for i in range(5):
+        cache.put(f"text {i}", "nomic", vector(i))
+    cache.put("other", "mxbai", vector(99, dim=4))
+    assert len(cache.cache) == 2
+
+    warm = EmbeddingCache(str(tmp_path), max_resident=2)
+    assert warm.get("text 3", "nomic") == vector(3)
+    assert warm.get("other", "mxbai") == vector(99, dim=4)
+    assert warm.get("other", "nomic") is None
+    assert warm.get("missing", "nomic") is None
+    assert sorted(p.suffix for p in tmp_path.iterdir()) == [
+        ".f32",
+        ".f32",
+        ".idx",
+        ".idx",
+        ".json",
+        ".json",
+        ".lock",
+        ".lock",
+    ]
+
+
+def test_processes_append_to_the_same_shard(tmp_path):
+    """Concurrent writers get distinct rows and readers see their appends."""
+    reader = EmbeddingCache(str(tmp_path))
+    reader.put("text 0", "nomic", vector(0))
+
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=fill, args=(str(tmp_path), 1 + 20 * n, 20)) for n in range(3)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+    assert all(proc.exitcode == 0 for proc in procs)
+
+    assert all(reader.get(f"text {i}", "nomic") == vector(i) for i in range(61))
+
+
+def test_compact_drops_duplicates_and_old_rows(tmp_path, capsys):
+    """Compaction rewrites the shard keeping the newest unique rows."""
+    cache = EmbeddingCache(str(tmp_path))
+    for i in range(10):
+        cache.put(f"text {i}", "nomic", vector(i))
+    shard = cache._shard("nomic")
+    # Simulate two processes racing to append the same text
+    with open(shard.vectors_path, "ab") as f:
+        f.write(np.asarray(vector(9), dtype=np.float32).tobytes())
+    with open(shard.index_path, "ab") as f:
+        f.write(cache._get_cache_key("text 9"))
+
+    assert main(["compact", "--cache-dir", str(tmp_path), "--max-rows", "4"]) == 0
+    assert "nomic: 4 rows" in capsys.readouterr().out
+    assert os.path.getsize(shard.vectors_path) == 4 * 8 * 4
+
+    cache = EmbeddingCache(str(tmp_path))
+    assert cache.get("text 5", "nomic") is None
+    assert [cache.get(f"text {i}", "nomic") for i in range(6, 10)] == [
+        vector(i) for i in range(6, 10)
+    ]
+
+
+def test_compact_skips_legacy_per_vector_files(tmp_path):
+    """Old {model}_{md5}.json files are ignored; each shard is compacted once."""
+    cache = EmbeddingCache(str(tmp_path))
+    for i in range(3):
+        cache.put(f"text {i}", "nomic", vector(i))
+    for i in range(5):
+        legacy = {"text_sample": f"old {i}", "model": "nomic", "embedding": vector(i)}
+        (tmp_path / f"nomic_{i:032x}.json").write_text(json.dumps(legacy))
+
+    compactions = []
+    shard_compact = _ModelShard.compact
+
+    def counting_compact(shard, max_rows=None):
+        compactions.append(shard.model)
+        return shard_compact(shard, max_rows)
+
+    with mock.patch.object(_ModelShard, "compact", counting_compact):
+        assert cache.compact() == {"nomic": 3}
+    assert compactions == ["nomic"]
+
+
+def test_top_k_similar_matches_brute_force_across_chunks(tmp_path):
+    """Chunked memmap scoring returns the same ranking as per-vector cosine."""
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((1000, 16)).astype(np.float32)
+    vectors[7] = 0.0
+    query = rng.standard_normal(16).astype(np.float32)
+    path = tmp_path / "vectors.f32"
+    normalize_rows(vectors).tofile(path)
+    matrix = np.memmap(path, dtype=np.float32, mode="r", shape=vectors.shape)
+
+    rows, scores = top_k_similar(query, matrix, top_k=10, normalized=True, chunk_size=64)
+
+    expected = sorted(
+        range(len(vectors)), key=lambda i: cosine_similarity(query, vectors[i]), reverse=True
+    )[:10]
+    assert rows.tolist() == expected
+    assert scores[0] == pytest.approx(cosine_similarity(query, vectors[expected[0]]), abs=1e-5)
+
+    results = find_similar_vectors(query.tolist(), vectors.tolist(), top_k=3)
+    assert [r["index"] for r in results] == expected[:3]
+    with pytest.raises(ValueError):
+        find_similar_vectors([1.0, 0.0], vectors)
@@ -0,0 +1,108 @@
+"""
+Tests for the background, deduplicating message embedding worker.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.config.database_config import MessageEmbeddingConfig
+from src.services.embedding_service import EmbeddingWorker
+from src.state.state_models import MessageRole
+
+
+@pytest.fixture
+def llm_service():
+    """Create a mocked LLM service that embeds each text as [len(text)]."""
+    service = MagicMock()
+    service.get_embeddings = AsyncMock(side_effect=lambda texts: [[float(len(t))] for t in texts])
+    return service
+
+
+@pytest.fixture
+def config():
+    """Embedding config with a short batching window."""
+    return MessageEmbeddingConfig(batch_size=8, flush_interval=0.05, workers=1)
+
+
+def test_role_policy_skips_system_and_tool(llm_service, config):
+    """System and tool messages are stored without embeddings by default."""
+    worker = EmbeddingWorker(llm_service, config=config)
+    assert worker.should_embed(MessageRole.USER)
+    assert worker.should_embed("assistant")
+    assert not worker.should_embed(MessageRole.SYSTEM)
+    assert not worker.should_embed("tool")
+
+
+@pytest.mark.asyncio
+async def test_duplicate_texts_share_one_batched_call(llm_service, config):
+    """Concurrent requests are batched and identical texts embedded once."""
+    worker = EmbeddingWorker(llm_service, config=config)
+    results = await asyncio.gather(worker.embed("hello"), worker.embed("hello"), worker.embed("hi"))
+    assert results == [[5.0], [5.0], [2.0]]
+    llm_service.get_embeddings.assert_awaited_once_with(["hello", "hi"])
+
+    # Cached afterwards: no further calls
+    assert await worker.embed("hello") == [5.0]
+    assert llm_service.get_embeddings.await_count == 1
+    await worker.close()
+
+
+@pytest.mark.asyncio
+async def test_short_embedding_response_fails_every_waiter(llm_service, config):
+    """A response with fewer vectors than texts fails the batch instead of hanging callers."""
+    llm_service.get_embeddings = AsyncMock(return_value=[[1.0]])
+    worker = EmbeddingWorker(llm_service, config=config)
+    results = await asyncio.wait_for(
+        asyncio.gather(worker.embed("a"), worker.embed("bb"), return_exceptions=True), 1
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert worker.stats["failed"] == 2
+    assert not worker._inflight
+    await worker.close()
+
+
+@pytest.mark.asyncio
+async def test_attach_and_backfill(llm_service, config):
+    """Queued rows receive the vector before persisting; stored rows are updated."""
+    db_service = MagicMock()
+    db_service.update = AsyncMock()
+    sink = AsyncMock()
+    worker = EmbeddingWorker(llm_service, db_service, config=config)
+
+    record = {"content": "abc"}
+    worker.attach(record, "abc", sink)
+    worker.backfill("swarm_messages", 42, "abcd")
+    await worker.close()
+
+    sink.assert_awaited_once_with({"content": "abc", "embedding_nomic": [3.0]})
+    db_service.update.assert_awaited_once_with("swarm_messages", 42, {"embedding_nomic": [4.0]})
+
+
+@pytest.mark.asyncio
+async def test_attach_persists_row_when_embedding_fails(llm_service, config):
+    """A failing embedding model never blocks persistence."""
+    llm_service.get_embeddings = AsyncMock(side_effect=RuntimeError("model missing"))
+    sink = AsyncMock()
+    worker = EmbeddingWorker(llm_service, config=config)
+    worker.attach({"content": "x"}, "x", sink)
+    await worker.close()
+    sink.assert_awaited_once_with({"content": "x"})
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_a_failed_batch(llm_service, config):
+    """Texts queued behind a failed batch are still embedded and close() returns."""
+    config.workers, config.batch_size = 1, 1
+    llm_service.get_embeddings = AsyncMock(side_effect=[RuntimeError("model busy"), [[2.0]]])
+    sink = AsyncMock()
+    worker = EmbeddingWorker(llm_service, config=config)
+
+    failing = asyncio.ensure_future(worker.embed("a"))
+    worker.attach({"content": "c"}, "c", sink)
+    await asyncio.wait_for(worker.close(), 1)
+
+    with pytest.raises(RuntimeError):
+        await failing
+    sink.assert_awaited_once_with({"content": "c", "embedding_nomic": [2.0]})
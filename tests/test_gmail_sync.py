@@ -0,0 +1,239 @@
+"""
+Tests for the incremental Gmail mirror (historyId sync into SQLite).
+"""
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from src.sub_graphs.personal_assistant_agent.src.tools.google.gmail_sync import GmailMirror
+
+
+class Call:
+    def __init__(self, fn):
+        self.fn = fn
+
+    def execute(self):
+        return self.fn()
+
+
+def not_found():
+    raise HttpError(httplib2.Response({"status": "404"}), b"Not Found")
+
+
+def fail(status):
+    raise HttpError(httplib2.Response({"status": str(status)}), b"{}")
+
+
+class Batch:
+    def __init__(self, callback):
+        self.callback = callback
+        self.calls = []
+
+    def add(self, request, request_id):
+        self.calls.append((request_id, request))
+
+    def execute(self):
+        for request_id, request in self.calls:
+            try:
+                self.callback(request_id, request.execute(), None)
+            except HttpError as e:
+                self.callback(request_id, None, e)
+
+
+class FakeGmail:
+    """In-memory mailbox with a history log, exposing the Gmail API calls the mirror uses."""
+
+    def __init__(self):
+        self.mailbox = {}
+        self.log = []
+        self.history_id = 100
+        self.oldest_history = 100
+        self.gets = 0
+        self.failures = {}  # Message ID -> HTTP status its get fails with
+
+    def _record(self, **changes):
+        self.history_id += 1
+        self.log.append({"id": str(self.history_id), **changes})
+
+    def add(self, message_id, subject, labels=("INBOX", "UNREAD")):
+        self._record(messagesAdded=[{"message": {"id": message_id, "labelIds": list(labels)}}])
+        self.mailbox[message_id] = {
+            "id": message_id,
+            "threadId": message_id,
+            "labelIds": list(labels),
+            "snippet": subject.lower(),
+            "internalDate": str(self.history_id),
+            "payload": {"headers": [{"name": "Subject", "value": subject}]},
+        }
+
+    def delete(self, message_id):
+        del self.mailbox[message_id]
+        self._record(messagesDeleted=[{"message": {"id": message_id}}])
+
+    def mark_read(self, message_id):
+        message = self.mailbox[message_id]
+        message["labelIds"].remove("UNREAD")
+        change = {"message": {"id": message_id, "labelIds": list(message["labelIds"])}}
+        self._record(labelsRemoved=[dict(change, labelIds=["UNREAD"])])
+
+    # --- API surface ---
+
+    def users(self):
+        return self
+
+    def getProfile(self, userId):
+        return Call(lambda: {"historyId": str(self.history_id)})
+
+    def messages(self):
+        gmail = self
+
+        class Messages:
+            def list(self, userId, maxResults, pageToken=None):
+                ids = sorted(gmail.mailbox, key=lambda i: -int(gmail.mailbox[i]["internalDate"]))
+                return Call(lambda: {"messages": [{"id": i} for i in ids[:maxResults]]})
+
+            def get(self, userId, id, format, metadataHeaders):
+                def fetch():
+                    gmail.gets += 1
+                    if id in gmail.failures:
+                        fail(gmail.failures[id])
+                    return gmail.mailbox[id] if id in gmail.mailbox else not_found()
+
+                return Call(fetch)
+
+        return Messages()
+
+    def labels(self):
+        gmail = self
+
+        class Labels:
+            def list(self, userId):
+                names = {label for m in gmail.mailbox.values() for label in m["labelIds"]}
+                return Call(lambda: {"labels": [{"id": n, "name": n} for n in sorted(names)]})
+
+            def get(self, userId, id):
+                def fetch():
+                    labelled = [m for m in gmail.mailbox.values() if id in m["labelIds"]]
+                    unread = [m for m in labelled if "UNREAD" in m["labelIds"]]
+                    return {"id": id, "messagesTotal": len(labelled), "messagesUnread": len(unread)}
+
+                return Call(fetch)
+
+        return Labels()
+
+    def history(self):
+        gmail = self
+
+        class History:
+            def list(self, userId, startHistoryId, historyTypes, pageToken=None):
+                def fetch():
+                    if int(startHistoryId) < gmail.oldest_history:
+                        not_found()
+                    records = [r for r in gmail.log if int(r["id"]) > int(startHistoryId)]
+                    return {"history": records, "historyId": str(gmail.history_id)}
+
+                return Call(fetch)
+
+        return History()
+
+    def new_batch_http_request(self, callback):
+        return Batch(callback)
+
+
+@pytest.fixture
+def gmail():
+    service = FakeGmail()
+    service.add("m1", "Lunch?")
+    service.add("m2", "Invoice")
+    service.add("m3", "Old news", labels=("INBOX",))
+    service.oldest_history = service.history_id
+    return service
+
+
+def test_first_sync_is_full_and_later_syncs_fetch_only_the_delta(gmail, tmp_path):
+    """After the initial mirror, only new messages are fetched; deletes and reads apply locally."""
+    mirror = GmailMirror(gmail, str(tmp_path / "mirror.db"))
+    assert mirror.sync()["mode"] == "full"
+    assert [m["subject"] for m in mirror.list_messages()] == ["Old news", "Invoice", "Lunch?"]
+    assert mirror.unread_count() == 2
+    assert gmail.gets == 3
+
+    gmail.add("m4", "Flight delayed")
+    gmail.delete("m2")
+    gmail.mark_read("m1")
+    result = mirror.sync()
+
+    assert result["mode"] == "incremental"
+    assert (result["added"], result["deleted"], result["relabeled"]) == (1, 1, 1)
+    assert gmail.gets == 4  # Only m4 was fetched
+    assert [m["id"] for m in mirror.list_messages()] == ["m4", "m3", "m1"]
+    assert [m["id"] for m in mirror.list_messages(unread_only=True)] == ["m4"]
+    assert mirror.unread_count() == 1
+    assert mirror.history_id == str(gmail.history_id)
+
+
+def test_expired_history_id_falls_back_to_a_full_resync(gmail, tmp_path):
+    """A 404 from history.list (expired historyId) rebuilds the mirror from the mailbox."""
+    path = str(tmp_path / "mirror.db")
+    GmailMirror(gmail, path).sync()
+
+    gmail.add("m4", "Flight delayed")
+    gmail.delete("m1")
+    gmail.oldest_history = gmail.history_id + 1  # Gmail no longer has the stored historyId
+
+    mirror = GmailMirror(gmail, path)  # Reopened: state comes from the SQLite file
+    assert mirror.sync()["mode"] == "full"
+    assert [m["id"] for m in mirror.list_messages()] == ["m4", "m3", "m2"]
+    assert mirror.stats["full_syncs"] == 1
+
+
+def test_unread_count_covers_messages_outside_the_mirror(gmail, tmp_path):
+    """The count comes from Gmail's label counts, not from the newest max_messages mirrored."""
+    mirror = GmailMirror(gmail, str(tmp_path / "mirror.db"), max_messages=1)
+    mirror.sync()
+    assert [m["id"] for m in mirror.list_messages()] == ["m3"]
+    assert mirror.unread_count() == 2
+
+    gmail.mark_read("m1")
+    mirror.sync()
+    assert mirror.unread_count() == 1
+    assert mirror.unread_count("UNREAD") == 1
+
+
+def test_incremental_syncs_keep_only_the_newest_max_messages(gmail, tmp_path):
+    """New messages push the oldest out of the mirror instead of growing it without bound."""
+    mirror = GmailMirror(gmail, str(tmp_path / "mirror.db"), max_messages=3)
+    mirror.sync()
+
+    gmail.add("m4", "Flight delayed")
+    gmail.add("m5", "Receipt")
+    assert mirror.sync()["trimmed"] == 2
+    assert [m["id"] for m in mirror.list_messages()] == ["m5", "m4", "m3"]
+    assert mirror.unread_count() == 4  # Still Gmail's own count
+
+
+def test_only_retryable_fetch_failures_hold_back_the_history_id(gmail, tmp_path, monkeypatch):
+    """A 503 is refetched on the next sync; a 403 would fail forever and is skipped."""
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+    mirror = GmailMirror(gmail, str(tmp_path / "mirror.db"))
+    mirror.sync()
+
+    gmail.add("m4", "Forbidden")
+    gmail.failures["m4"] = 403
+    mirror.sync()
+    assert mirror.history_id == str(gmail.history_id)
+
+    synced = mirror.history_id
+    gmail.add("m5", "Throttled")
+    gmail.failures["m5"] = 503
+    assert mirror.sync()["failed"].keys() == {"m5"}
+    assert mirror.history_id == synced
+
+    del gmail.failures["m5"]
+    mirror.sync()
+    assert mirror.history_id == str(gmail.history_id)
+    assert [m["id"] for m in mirror.list_messages()] == ["m5", "m3", "m2", "m1"]
@@ -0,0 +1,177 @@
+"""
+Tests for batched Gmail metadata fetches against a local stand-in of the batch endpoint.
+"""
+
+import json
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import MagicMock
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+
+import httplib2
+from googleapiclient.discovery import build
+
+from src.sub_graphs.personal_assistant_agent.src.tools.google import google_batch
+from src.sub_graphs.personal_assistant_agent.src.tools.google.google_batch import (
+    fetch_message_metadata,
+    fetch_thread_metadata,
+)
+
+
+class BatchEndpoint(BaseHTTPRequestHandler):
+    """Answers multipart batch requests using the server's respond(path, query) callback."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+        )
+        self.server.batches.append([])
+        parts = []
+        for part in message.iter_parts():
+            request_line = part.get_payload(decode=True).decode().split("\r\n", 1)[0]
+            url = urlparse(request_line.split(" ")[1])
+            query = parse_qs(url.query)
+            self.server.batches[-1].append((url.path, query))
+            status, payload = self.server.respond(url.path, query)
+            parts.append(
+                "--BOUNDARY\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{part['Content-ID'].strip('<>')}>\r\n\r\n"
+                f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n\r\n"
+                f"{json.dumps(payload)}\r\n"
+            )
+        response = ("".join(parts) + "--BOUNDARY--\r\n").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "multipart/mixed; boundary=BOUNDARY")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+def message_payload(message_id):
+    return {
+        "id": message_id,
+        "threadId": f"t-{message_id}",
+        "snippet": f"about {message_id}",
+        "payload": {
+            "headers": [
+                {"name": "Subject", "value": f"Subject {message_id}"},
+                {"name": "From", "value": "ada@example.com"},
+                {"name": "Date", "value": "Fri, 16 Oct 2026 09:00:00 +0000"},
+            ]
+        },
+    }
+
+
+@pytest.fixture
+def gmail():
+    """Gmail service whose batch requests go to a local HTTP server."""
+    server = HTTPServer(("127.0.0.1", 0), BatchEndpoint)
+    server.batches = []
+    server.respond = lambda path, query: (200, message_payload(path.rsplit("/", 1)[-1]))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_port}/"
+    service = build(
+        "gmail",
+        "v1",
+        http=httplib2.Http(),
+        developerKey="test",
+        static_discovery=True,
+        client_options={"api_endpoint": base},
+    )
+    yield service, server, f"{base}batch/gmail/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def test_metadata_is_fetched_in_batches_with_only_the_needed_headers(gmail):
+    """Five messages with batch_size=2 take three requests and keep the listing order."""
+    service, server, batch_uri = gmail
+    ids = [f"m{i}" for i in range(5)]
+
+    messages, errors = fetch_message_metadata(service, ids, batch_size=2, batch_uri=batch_uri)
+
+    assert errors == {}
+    assert [len(batch) for batch in server.batches] == [2, 2, 1]
+    assert [m["id"] for m in messages] == ids
+    assert messages[0]["subject"] == "Subject m0" and messages[0]["from"] == "ada@example.com"
+    assert messages[0]["date"].startswith("Fri, 16 Oct 2026")
+    path, query = server.batches[0][0]
+    assert path.endswith("/users/me/messages/m0")
+    assert query["format"] == ["metadata"]
+    assert query["metadataHeaders"] == ["Subject", "From", "Date"]
+
+
+def test_partial_failures_are_retried_or_reported(gmail, monkeypatch):
+    """A throttled part succeeds on retry; a missing message is reported, not fatal."""
+    service, server, batch_uri = gmail
+    monkeypatch.setattr(google_batch.time, "sleep", lambda seconds: None)
+    throttled = []
+
+    def respond(path, query):
+        message_id = path.rsplit("/", 1)[-1]
+        if message_id == "gone":
+            return 404, {"error": {"code": 404, "message": "Not Found"}}
+        if message_id == "busy" and not throttled:
+            throttled.append(message_id)
+            return 429, {"error": {"code": 429, "message": "Rate Limit Exceeded"}}
+        return 200, message_payload(message_id)
+
+    server.respond = respond
+    messages, errors = fetch_message_metadata(service, ["ok", "busy", "gone"], batch_uri=batch_uri)
+
+    assert [m["id"] for m in messages] == ["ok", "busy"]
+    assert list(errors) == ["gone"]
+    assert [len(batch) for batch in server.batches] == [3, 1]  # Only the 429 is retried
+
+
+def test_threads_are_summarized_by_their_first_message(gmail):
+    """Thread listings get the subject and sender of the thread's first message."""
+    service, server, batch_uri = gmail
+    server.respond = lambda path, query: (
+        200,
+        {"id": "t1", "snippet": "latest", "messages": [message_payload("a"), message_payload("b")]},
+    )
+
+    threads, errors = fetch_thread_metadata(service, ["t1"], batch_uri=batch_uri)
+
+    assert errors == {}
+    assert threads == [
+        {
+            "id": "t1",
+            "thread_id": "t1",
+            "subject": "Subject a",
+            "from": "ada@example.com",
+            "date": "Fri, 16 Oct 2026 09:00:00 +0000",
+            "snippet": "latest",
+            "message_count": 2,
+        }
+    ]
+
+
+def test_listings_stay_plain_lists_when_some_fetches_fail(monkeypatch):
+    """Messages that could not be fetched are left out; the result shape never changes."""
+    from src.sub_graphs.personal_assistant_agent.src.tools.google import google_api_tools
+
+    service = MagicMock()
+    service.users().messages().list().execute.return_value = {
+        "messages": [{"id": "ok"}, {"id": "gone"}]
+    }
+    monkeypatch.setattr(google_api_tools, "get_services", lambda: {"gmail": service})
+    monkeypatch.setattr(
+        google_api_tools,
+        "fetch_message_metadata",
+        lambda service, ids: ([{"id": "ok", "subject": "Hi"}], {"gone": "HTTP 404"}),
+    )
+
+    assert json.loads(google_api_tools.gmail_messages_list()) == [{"id": "ok", "subject": "Hi"}]
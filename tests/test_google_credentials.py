@@ -0,0 +1,88 @@
+"""
+Tests for the shared Google credential manager (single-flight and background token refresh).
+"""
+
+import pickle
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("google_auth_oauthlib")
+
+from google.oauth2.credentials import Credentials
+
+from src.sub_graphs.personal_assistant_agent.src.tools.google.credentials import CredentialManager
+
+
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@pytest.fixture
+def refreshes(monkeypatch):
+    """Count token refreshes; each takes 0.1s and yields a token valid for an hour."""
+    calls = []
+
+    def refresh(self, request):
+        calls.append(threading.current_thread().name)
+        time.sleep(0.1)
+        self.token = f"token-{len(calls)}"
+        self.expiry = utcnow() + timedelta(hours=1)
+
+    monkeypatch.setattr(Credentials, "refresh", refresh)
+    return calls
+
+
+def write_token(path, expires_in):
+    credentials = Credentials(token="token-0", refresh_token="refresh", client_id="c")
+    credentials.expiry = utcnow() + timedelta(seconds=expires_in)
+    with open(path, "wb") as token:
+        pickle.dump(credentials, token)
+
+
+def test_concurrent_callers_share_one_load_and_one_refresh(tmp_path, refreshes):
+    """Ten threads hitting an expired token cause one unpickle, one refresh and one write."""
+    token_path = tmp_path / "token.pickle"
+    write_token(token_path, expires_in=-60)
+    manager = CredentialManager(str(token_path), "unused.json")
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(manager.get(["scope"]))) for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    manager.close()
+
+    assert len(refreshes) == 1
+    assert manager.stats["loads"] == 1
+    assert all(credentials is results[0] for credentials in results)
+    assert results[0].token == "token-1"
+    with open(token_path, "rb") as token:
+        assert pickle.load(token).token == "token-1"
+    assert [p.name for p in tmp_path.iterdir()] == ["token.pickle"]  # No temp file left behind
+
+
+def test_tokens_near_expiry_are_refreshed_in_the_background(tmp_path, refreshes):
+    """A token inside the refresh margin is returned at once and refreshed off-thread."""
+    token_path = tmp_path / "token.pickle"
+    write_token(token_path, expires_in=600)
+    manager = CredentialManager(str(token_path), "unused.json", refresh_margin=900)
+
+    start = time.monotonic()
+    credentials = manager.get(["scope"])
+    assert time.monotonic() - start < 0.1
+    assert credentials.token == "token-0"
+
+    deadline = time.monotonic() + 2
+    while manager.stats["background_refreshes"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    manager.close()
+
+    assert refreshes and refreshes[0] != threading.current_thread().name
+    assert manager.get(["scope"]) is credentials
+    assert credentials.token == "token-1"
@@ -0,0 +1,150 @@
+"""
+Tests for the thread-pooled Google API executor.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+
+import httplib2
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpMockSequence
+
+from src.sub_graphs.personal_assistant_agent.src.tools.google import google_executor
+from src.sub_graphs.personal_assistant_agent.src.tools.google.google_executor import (
+    GoogleExecutor,
+    RetryingHttpRequest,
+    get_service,
+)
+
+
+def http_error(status):
+    return HttpError(httplib2.Response({"status": str(status)}), b"{}")
+
+
+@pytest.fixture
+def executor():
+    executor = GoogleExecutor(max_workers=2, max_retries=3, base_delay=0.01)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_throttled_calls_are_retried_and_other_errors_raised(executor):
+    """429/503 are retried with backoff; a 404 is raised on the first attempt."""
+    responses = [http_error(429), http_error(503), {"id": "evt1"}]
+
+    def flaky():
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    assert await executor.run(flaky) == {"id": "evt1"}
+    assert executor.stats["retries"] == 2
+
+    attempts = []
+
+    def missing():
+        attempts.append(1)
+        raise http_error(404)
+
+    with pytest.raises(HttpError):
+        await executor.run(missing)
+    assert len(attempts) == 1
+
+
+@pytest.mark.parametrize("method, retried", [("GET", True), ("POST", False)])
+def test_only_idempotent_requests_are_retried_automatically(method, retried):
+    """A 503 on a GET is retried; a POST (e.g. messages.send) is not replayed."""
+    http = HttpMockSequence([({"status": "503"}, b"{}"), ({"status": "200"}, b'{"id": "m1"}')])
+    request = RetryingHttpRequest(http, lambda resp, content: content, "http://x/", method=method)
+    request._sleep = lambda seconds: None
+
+    if retried:
+        assert request.execute() == b'{"id": "m1"}'
+    else:
+        with pytest.raises(HttpError):
+            request.execute()
+
+
+@pytest.mark.asyncio
+async def test_tool_functions_that_swallow_errors_keep_request_retries(executor):
+    """A tool returning its HttpError as a result still gets its request's own retries."""
+    http = HttpMockSequence([({"status": "503"}, b"{}"), ({"status": "200"}, b'{"ok": true}')])
+
+    def unread_count():
+        request = RetryingHttpRequest(http, lambda resp, content: content, "http://x/")
+        request._sleep = lambda seconds: None
+        try:
+            return {"success": True, "data": request.execute()}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    assert await executor.run(unread_count) == {"success": True, "data": b'{"ok": true}'}
+    assert executor.stats["retries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_executed_requests_are_retried_by_the_executor_only(executor):
+    """execute() sends each attempt once: a throttled GET is tried max_retries + 1 times."""
+    http = HttpMockSequence([({"status": "503"}, b"{}")] * 20)
+    request = RetryingHttpRequest(http, lambda resp, content: content, "http://x/")
+    request._sleep = lambda seconds: None
+
+    with pytest.raises(HttpError):
+        await executor.execute(request)
+    assert 20 - len(http._iterable) == executor.max_retries + 1
+
+
+@pytest.mark.asyncio
+async def test_blocking_calls_do_not_stall_the_event_loop(executor):
+    """Two 0.2s blocking calls overlap in the pool while the loop keeps ticking."""
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticking = asyncio.create_task(ticker())
+    start = time.monotonic()
+    await asyncio.gather(executor.run(time.sleep, 0.2), executor.run(time.sleep, 0.2))
+    elapsed = time.monotonic() - start
+    ticking.cancel()
+
+    assert elapsed < 0.35
+    assert ticks >= 10
+
+
+def test_services_are_built_once_per_thread_from_one_discovery_document(monkeypatch):
+    """A thread reuses its service; other threads get their own, from the same document."""
+    loads = []
+    static_doc = google_executor.discovery_cache.get_static_doc
+    monkeypatch.setattr(google_executor, "_documents", {})
+    monkeypatch.setattr(
+        google_executor.discovery_cache,
+        "get_static_doc",
+        lambda api, version: loads.append(api) or static_doc(api, version),
+    )
+    credentials = object()
+    monkeypatch.setattr(
+        google_executor.google_auth_httplib2, "AuthorizedHttp", lambda credentials, http: http
+    )
+
+    main = get_service("tasks", "v1", credentials=credentials)
+    assert get_service("tasks", "v1", credentials=credentials) is main
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(get_service("tasks", "v1", credentials)))
+    thread.start()
+    thread.join()
+
+    assert other[0] is not main
+    assert other[0]._http is not main._http
+    assert loads == ["tasks"]
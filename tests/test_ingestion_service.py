@@ -0,0 +1,189 @@
+"""
+Tests for the streaming clean/chunk/embed/store ingestion pipeline.
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from src.config.database_config import IngestionConfig
+from src.db.sqlite_backend import SQLiteBackend
+from src.managers.db_manager import DBService
+from src.services.ingestion_service import _STOP, IngestionPipeline, pending_task_ids
+
+
+@pytest_asyncio.fixture
+async def db_service(tmp_path):
+    """DBService over a throwaway SQLite database."""
+    service = DBService(backend=SQLiteBackend(str(tmp_path / "documents.db")))
+    yield service
+    await service.close()
+
+
+def make_spec(documents=6, paragraphs=10):
+    """Documents whose paragraphs each fill one small chunk."""
+    items = [
+        {
+            "id": f"doc-{d}",
+            "title": f"Doc {d}",
+            "content": "\n".join(f"Paragraph {p} of document {d}. " * 3 for p in range(paragraphs)),
+        }
+        for d in range(documents)
+    ]
+    return {"items": items, "source_name": "docs", "chunk_size": 30, "chunk_overlap": 0}
+
+
+async def fake_embed(texts):
+    """Deterministic one-dimensional vectors."""
+    return [[float(len(text))] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stores_every_chunk_with_stage_progress(db_service, tmp_path):
+    """All chunks are embedded and bulk inserted; checkpoint files are removed."""
+    config = IngestionConfig(
+        checkpoint_dir=str(tmp_path / "ckpt"), embed_batch_size=7, store_batch_size=11
+    )
+    store_calls = []
+
+    async def store(rows):
+        store_calls.append(len(rows))
+        return await db_service.insert_many("documents", rows)
+
+    pipeline = IngestionPipeline("task-1", fake_embed, store, config)
+    progress = await pipeline.run(make_spec())
+
+    rows = await db_service.select("documents")
+    assert progress["status"] == "completed"
+    assert progress["stages"]["clean"] == {"done": 6, "total": 6}
+    assert progress["stages"]["store"]["done"] == len(rows) == 60
+    assert max(store_calls) <= 11
+    assert {(r["document_id"], r["chunk_index"]) for r in rows} == {
+        (f"doc-{d}", c) for d in range(6) for c in range(10)
+    }
+    assert all(r["embedding_nomic"] and r["task_id"] == "task-1" for r in rows)
+    assert pending_task_ids(config) == []
+
+
+@pytest.mark.asyncio
+async def test_interrupted_task_resumes_without_duplicates(db_service, tmp_path):
+    """Chunks stored before a failure are skipped when the task is resumed."""
+    config = IngestionConfig(
+        checkpoint_dir=str(tmp_path / "ckpt"), store_batch_size=5, store_workers=1
+    )
+    calls = {"n": 0}
+
+    async def flaky_store(rows):
+        calls["n"] += 1
+        if calls["n"] > 3:
+            raise ConnectionError("database went away")
+        return await db_service.insert_many("documents", rows)
+
+    first = await IngestionPipeline("task-2", fake_embed, flaky_store, config).run(make_spec())
+    assert first["status"] == "completed_with_errors"
+    assert pending_task_ids(config) == ["task-2"]
+    stored_before = len(await db_service.select("documents"))
+    assert 0 < stored_before < 60
+
+    async def store(rows):
+        return await db_service.insert_many("documents", rows)
+
+    resumed = await IngestionPipeline("task-2", fake_embed, store, config).run()
+
+    rows = await db_service.select("documents")
+    assert resumed["status"] == "completed" and resumed["resumed"]
+    assert resumed["skipped_chunks"] == stored_before
+    assert len(rows) == len({(r["document_id"], r["chunk_index"]) for r in rows}) == 60
+    assert pending_task_ids(config) == []
+
+
+@pytest.mark.asyncio
+async def test_failed_tasks_are_resumed_at_most_once(db_service, tmp_path):
+    """Chunking errors never keep the checkpoint; store errors keep it for one resume only."""
+    config = IngestionConfig(checkpoint_dir=str(tmp_path / "ckpt"))
+
+    async def store(rows):
+        return await db_service.insert_many("documents", rows)
+
+    spec = make_spec(documents=2)
+    spec["items"][0]["content"] = 42  # Cannot be chunked, however often it is retried
+    chunked = await IngestionPipeline("task-3", fake_embed, store, config).run(spec)
+    assert chunked["status"] == "completed_with_errors" and not chunked["resumable"]
+    assert pending_task_ids(config) == []
+
+    async def broken_store(rows):
+        raise ConnectionError("database went away")
+
+    first = await IngestionPipeline("task-4", fake_embed, broken_store, config).run(make_spec())
+    assert first["resumable"] and pending_task_ids(config) == ["task-4"]
+
+    resumed = await IngestionPipeline("task-4", fake_embed, broken_store, config).run()
+    assert resumed["status"] == "completed_with_errors" and not resumed["resumable"]
+    assert pending_task_ids(config) == []
+
+
+@pytest.mark.asyncio
+async def test_batches_fill_from_a_trickling_stage(tmp_path):
+    """A stage waits up to flush_interval for more rows instead of sending batches of one."""
+    pipeline = IngestionPipeline(
+        "task-5", fake_embed, None, IngestionConfig(checkpoint_dir=str(tmp_path), flush_interval=1)
+    )
+    inbox = asyncio.Queue()
+
+    async def trickle():
+        for row in range(5):
+            await inbox.put(row)
+            await asyncio.sleep(0.01)
+        await inbox.put(_STOP)
+
+    producer = asyncio.create_task(trickle())
+    assert await pipeline._next_batch(inbox, 3) == ([0, 1, 2], False)
+    assert await pipeline._next_batch(inbox, 3) == ([3, 4], True)
+    await producer
+
+
+@pytest.mark.asyncio
+async def test_short_embedding_batches_are_reported_not_dropped(db_service, tmp_path):
+    """A batch with fewer vectors than chunks is an error, never a silent partial store."""
+    config = IngestionConfig(checkpoint_dir=str(tmp_path / "ckpt"), embed_batch_size=4)
+
+    async def short_embed(texts):
+        return (await fake_embed(texts))[:-1]
+
+    async def store(rows):
+        return await db_service.insert_many("documents", rows)
+
+    progress = await IngestionPipeline("task-6", short_embed, store, config).run(make_spec(1))
+    assert progress["status"] == "completed_with_errors"
+    assert progress["errors"] and all("vectors" in error for error in progress["errors"])
+    assert progress["stages"]["store"]["done"] == len(await db_service.select("documents")) == 0
+
+
+@pytest.mark.asyncio
+async def test_journal_and_worker_failures_end_the_task(db_service, tmp_path, monkeypatch):
+    """Journal write errors are recorded, and a dead worker cancels the rest instead of hanging."""
+    config = IngestionConfig(checkpoint_dir=str(tmp_path / "ckpt"), queue_size=2)
+
+    async def store(rows):
+        return await db_service.insert_many("documents", rows)
+
+    pipeline = IngestionPipeline("task-7", fake_embed, store, config)
+
+    def full_disk(batch):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(pipeline, "_journal", full_disk)
+    progress = await asyncio.wait_for(pipeline.run(make_spec()), timeout=5)
+    assert progress["status"] == "completed_with_errors" and not progress["resumable"]
+    assert progress["stages"]["store"]["done"] == 60
+    assert "No space left" in progress["errors"][0]
+
+    async def crash(inbox, outbox):
+        raise RuntimeError("worker crashed")
+
+    pipeline = IngestionPipeline("task-8", fake_embed, store, config)
+    monkeypatch.setattr(pipeline, "_store_worker", crash)
+    progress = await asyncio.wait_for(pipeline.run(make_spec()), timeout=5)
+    assert progress["status"] == "failed" and progress["resumable"]
+    assert "worker crashed" in progress["errors"][0]
@@ -0,0 +1,97 @@
+"""
+Tests for the LLM response cache and its use in LLMService.generate.
+"""
+
+import json
+
+import httpx
+import pytest
+
+from src.config.llm_config import LLMCacheConfig
+from src.services.llm_cache_service import LLMResponseCache
+from src.services.llm_service import LLMService
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_exact_hits_respect_scope_lru_and_ttl():
+    """Keys include model and parameters; entries are evicted by LRU and TTL."""
+    clock = FakeClock()
+    cache = LLMResponseCache(LLMCacheConfig(max_entries=2, ttl_seconds=60), clock=clock)
+    params = {"temperature": 0.1}
+
+    await cache.put("Summarize  the\ntools", "llama", "A", params, latency=2.0)
+    assert await cache.get("Summarize the tools", "llama", params) == "A"
+    assert await cache.get("Summarize the tools", "llama", {"temperature": 0.7}) is None
+    assert await cache.get("Summarize the tools", "mistral", params) is None
+
+    await cache.put("second", "llama", "B", params)
+    await cache.get("Summarize the tools", "llama", params)  # Now most recently used
+    await cache.put("third", "llama", "C", params)
+    assert await cache.get("second", "llama", params) is None
+
+    clock.now = 61
+    assert await cache.get("Summarize the tools", "llama", params) is None
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 4
+    assert stats["saved_latency"] == 4.0
+    assert stats["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_semantic_lookup_uses_similarity_threshold():
+    """Near-identical prompts share an answer; dissimilar ones miss."""
+    vectors = {"hello there": [1.0, 0.0], "hello there!": [0.99, 0.05], "goodbye": [0.0, 1.0]}
+
+    async def embed(text):
+        return vectors[text]
+
+    cache = LLMResponseCache(LLMCacheConfig(semantic_threshold=0.95), embed_fn=embed)
+    await cache.put("hello there", "llama", "Hi!", latency=1.5)
+
+    assert await cache.get("hello there!", "llama") == "Hi!"
+    assert await cache.get("goodbye", "llama") is None
+    stats = cache.get_stats()
+    assert stats["semantic_hits"] == 1
+    assert stats["saved_latency"] == 1.5
+
+
+@pytest.mark.asyncio
+async def test_generate_serves_repeated_prompts_from_cache():
+    """Only the first identical prompt reaches Ollama; failures are not cached."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        if requests[-1]["prompt"] == "broken":
+            return httpx.Response(500)
+        return httpx.Response(200, json={"response": "summary", "done": True})
+
+    service = LLMService()
+    original_client = service.client
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    await service.clear_cache()
+    try:
+        assert await service.generate("tools done") == "summary"
+        assert await service.generate("tools   done") == "summary"
+        assert await service.generate("tools done", use_cache=False) == "summary"
+        assert await service.generate("broken") == ""
+        assert await service.generate("broken") == ""
+    finally:
+        service.client = original_client
+
+    assert len(requests) == 4
+    stats = service.get_stats()
+    assert stats["enabled"] is True
+    assert stats["hits"] >= 1
@@ -0,0 +1,70 @@
+"""
+Tests for batched embeddings and startup warm-up in LLMService.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.config.llm_config import LLMEmbeddingConfig
+from src.services.llm_service import LLMService
+
+
+@pytest.fixture
+def llm_service():
+    """The LLMService singleton with its client and batching settings restored afterwards."""
+    service = LLMService()
+    original = service.client, service.embedding_config
+    yield service
+    service.client, service.embedding_config = original
+
+
+@pytest.mark.asyncio
+async def test_get_embeddings_batches_with_bounded_concurrency(llm_service):
+    """Chunks run at most max_concurrency at a time and results keep input order."""
+    in_flight = []
+    peak = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        assert request.url.path == "/api/embed"
+        in_flight.append(1)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.pop()
+        return httpx.Response(
+            200, json={"embeddings": [[float(text.split()[1])] for text in payload["input"]]}
+        )
+
+    llm_service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    llm_service.embedding_config = LLMEmbeddingConfig(batch_size=3, max_concurrency=2)
+
+    embeddings = await llm_service.get_embeddings([f"text {i}" for i in range(10)])
+
+    assert embeddings == [[float(i)] for i in range(10)]
+    assert len(peak) == 4
+    assert max(peak) == 2
+    assert await llm_service.get_embedding("text 7") == [7.0]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_pulls_missing_models_once(llm_service):
+    """Only models missing from /api/tags are pulled; each model is loaded."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path == "/api/tags":
+            return httpx.Response(200, json={"models": [{"name": "mistral:latest"}]})
+        if request.url.path == "/api/embed":
+            return httpx.Response(200, json={"embeddings": [[0.1]]})
+        return httpx.Response(200, json={"status": "success", "done": True})
+
+    llm_service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    ready = await llm_service.warm_up(["mistral"])
+
+    assert ready == {"mistral": True, "nomic-embed-text": True}
+    assert sorted(calls) == ["/api/embed", "/api/generate", "/api/pull", "/api/tags"]
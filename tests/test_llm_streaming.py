@@ -0,0 +1,89 @@
+"""
+Tests for streaming LLM output and incremental tool-call detection.
+"""
+
+import json
+
+import httpx
+import pytest
+
+from src.services.llm_service import LLMService
+from src.tools.tool_call_parser import ToolCallParser
+
+
+@pytest.fixture
+def llm_service():
+    """LLMService whose HTTP client replays a canned Ollama NDJSON stream."""
+    lines = [
+        {"response": "Hel", "done": False},
+        {"response": "lo", "done": False},
+        {"response": "", "done": True, "done_reason": "stop"},
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        assert request.url.path == "/api/generate"
+        assert payload["stream"] is True
+        assert payload["options"]["temperature"] == 0.2
+        body = "\n".join(json.dumps(line) for line in lines) + "\n"
+        return httpx.Response(200, content=body.encode())
+
+    service = LLMService()
+    original_client = service.client
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    yield service
+    service.client = original_client
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_ndjson_fragments(llm_service):
+    """Each non-empty response fragment is yielded in order."""
+    chunks = [chunk async for chunk in llm_service.stream("hi", temperature=0.2)]
+    assert chunks == ["Hel", "lo"]
+
+
+@pytest.mark.asyncio
+async def test_stream_and_generate_send_the_same_options():
+    """Without overrides, streamed and non-streamed turns use the configured options."""
+    payloads = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        payloads.append(payload)
+        if payload["stream"]:
+            return httpx.Response(200, content=b'{"response": "hi", "done": true}\n')
+        return httpx.Response(200, json={"response": "hi", "done": True})
+
+    service = LLMService()
+    original_client = service.client
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    try:
+        assert [chunk async for chunk in service.stream("hi")] == ["hi"]
+        assert await service.generate("hi", use_cache=False) == "hi"
+    finally:
+        service.client = original_client
+
+    streamed, generated = payloads
+    assert streamed["options"] == generated["options"] == service._generation_options()
+    assert set(streamed["options"]) == {"temperature", "num_ctx"}
+
+
+def test_parser_holds_back_tool_call_json():
+    """Text around a tool call is released; the call itself is captured, not shown."""
+    parser = ToolCallParser()
+    shown = ""
+    for chunk in ["Sure, checking ", "now `", '{"name": "valet", ', '"args": {}}` trailing']:
+        shown += parser.feed(chunk)
+    assert shown == "Sure, checking now  trailing"
+    assert [(call.name, call.args) for call in parser.calls] == [("valet", {})]
+    assert parser.flush() == ""
+
+
+def test_parser_releases_plain_backticks():
+    """Inline code and unterminated calls are eventually displayed as text."""
+    parser = ToolCallParser()
+    shown = parser.feed("use `")
+    shown += parser.feed("ls` here `{not closed")
+    shown += parser.flush()
+    assert shown == "use `ls` here `{not closed"
+    assert not parser.complete
@@ -0,0 +1,112 @@
+"""
+Tests for span latency instrumentation and the histogram registry.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.config.logging_config import MetricsConfig
+from src.db.sqlite_backend import SQLiteBackend
+from src.managers.db_manager import DBService
+from src.services.metrics_service import (
+    SPAN_METRIC,
+    MetricsRegistry,
+    get_metrics_registry,
+    get_request_id,
+    request_context,
+    span,
+    start_metrics_server,
+)
+
+
+@pytest.mark.asyncio
+async def test_spans_record_outcomes_and_propagate_request_ids():
+    """Spans land in labelled histograms; spawned tasks inherit the request ID."""
+    registry = MetricsRegistry(MetricsConfig(window=100))
+
+    async def child():
+        with span("tool_execution", registry, tool="valet"):
+            return get_request_id()
+
+    with request_context("req-1") as request_id:
+        with span("prompt_build", registry):
+            pass
+        assert await asyncio.create_task(child()) == request_id == "req-1"
+        with pytest.raises(ValueError):
+            with span("llm_call", registry):
+                raise ValueError("boom")
+    assert get_request_id() is None
+
+    assert registry.histogram(SPAN_METRIC, {"span": "prompt_build", "outcome": "ok"}).count == 1
+    assert registry.histogram(SPAN_METRIC, {"span": "llm_call", "outcome": "error"}).count == 1
+    tool = registry.histogram(
+        SPAN_METRIC, {"span": "tool_execution", "outcome": "ok", "tool": "valet"}
+    )
+    assert tool.count == 1
+
+    for value in range(1, 101):
+        registry.observe("latency", value / 1000)
+    summary = registry.snapshot()["latency"][0]
+    assert (summary["p50"], summary["p95"], summary["p99"]) == (0.05, 0.095, 0.099)
+
+    registry.config.enabled = False
+    registry.observe("latency", 1.0)
+    assert registry.histogram("latency").count == 100
+
+
+@pytest.mark.asyncio
+async def test_prometheus_and_json_endpoints(tmp_path):
+    """The HTTP endpoint serves cumulative buckets and the JSON snapshot."""
+    registry = MetricsRegistry(MetricsConfig(buckets=[0.01, 0.1]))
+    for value in (0.005, 0.05, 0.5):
+        registry.observe(SPAN_METRIC, value, {"span": "db_insert", "table": 'a"b'})
+
+    server = await start_metrics_server(0, registry=registry)
+    port = server.sockets[0].getsockname()[1]
+
+    async def fetch(path):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+        raw = await reader.read()
+        writer.close()
+        head, body = raw.split(b"\r\n\r\n", 1)
+        return head.split(b"\r\n")[0], body.decode()
+
+    try:
+        status, text = await fetch("/metrics")
+        assert status == b"HTTP/1.1 200 OK"
+        labels = 'span="db_insert",table="a\\"b"'
+        assert f'{SPAN_METRIC}_bucket{{{labels},le="0.01"}} 1' in text
+        assert f'{SPAN_METRIC}_bucket{{{labels},le="0.1"}} 2' in text
+        assert f'{SPAN_METRIC}_bucket{{{labels},le="+Inf"}} 3' in text
+        assert f"{SPAN_METRIC}_count{{{labels}}} 3" in text
+
+        status, body = await fetch("/metrics.json")
+        assert json.loads(body)[SPAN_METRIC][0]["count"] == 3
+        assert (await fetch("/nope"))[0] == b"HTTP/1.1 404 Not Found"
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    registry.dump_json(str(tmp_path / "out" / "metrics.json"))
+    assert json.loads((tmp_path / "out" / "metrics.json").read_text())[SPAN_METRIC]
+
+
+@pytest.mark.asyncio
+async def test_db_inserts_are_timed(tmp_path):
+    """DBService inserts are recorded per table in the process-wide registry."""
+    registry = get_metrics_registry()
+    registry.reset()
+    service = DBService(backend=SQLiteBackend(str(tmp_path / "metrics.db")))
+    try:
+        await service.insert_many(
+            "documents", [{"document_id": "d", "chunk_index": 0, "content": "x"}]
+        )
+    finally:
+        await service.close()
+    series = registry.histogram(
+        SPAN_METRIC, {"span": "db_insert_many", "outcome": "ok", "table": "documents"}
+    )
+    assert series is not None and series.count == 1
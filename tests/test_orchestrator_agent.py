@@ -5,6 +5,7 @@ These tests validate the orchestrator agent's ability to process messages,
 handle tools, and manage conversation state.
 """
 
+from types import SimpleNamespace
 from typing import Any, Dict, Optional
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -195,3 +196,37 @@ async def test_get_conversation_history(orchestrator_agent, mock_message_state):
     assert len(history) == 2
     assert history[0]["role"] == "user"
     assert history[1]["role"] == "assistant"
+
+
+@pytest.mark.asyncio
+async def test_stream_failure_after_text_is_not_returned_as_complete():
+    """A stream that breaks mid-reply raises instead of returning the cut-off text."""
+
+    async def broken_stream(prompt):
+        yield "Half an ans"
+        raise RuntimeError("connection reset")
+
+    agent = SimpleNamespace(
+        llm=SimpleNamespace(stream=broken_stream), query_llm=AsyncMock(return_value="full")
+    )
+    shown = []
+    with pytest.raises(RuntimeError, match="cut off"):
+        await OrchestratorAgent._stream_llm_response(agent, "prompt", shown.append)
+    assert shown == ["Half an ans"]
+    agent.query_llm.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_stream_failure_before_text_falls_back_to_a_full_query():
+    """A stream that fails before any text is retried as a non-streaming query."""
+
+    async def broken_stream(prompt):
+        raise RuntimeError("connection refused")
+        yield  # pragma: no cover
+
+    agent = SimpleNamespace(
+        llm=SimpleNamespace(stream=broken_stream), query_llm=AsyncMock(return_value="full")
+    )
+    shown = []
+    assert await OrchestratorAgent._stream_llm_response(agent, "prompt", shown.append) == "full"
+    assert shown == ["full"]
@@ -0,0 +1,91 @@
+"""
+Tests for the bounded request store behind PENDING_TOOL_REQUESTS and friends.
+"""
+
+import pytest
+
+import src.services.request_store_service as request_store_service
+from src.config.database_config import RequestStoreConfig
+from src.services.request_store_service import RequestStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable wall clock for TTL tests."""
+    now = [1000.0]
+    monkeypatch.setattr(request_store_service.time, "time", lambda: now[0])
+    return now
+
+
+def test_nested_status_updates_keep_the_index_current():
+    """Writing store[id]["status"] moves the request between status indexes."""
+    store = RequestStore("tools")
+    store["a"] = {"name": "search", "status": "in_progress"}
+    store["b"] = {"name": "search", "status": "in_progress"}
+
+    store["a"]["status"] = "completed"
+    store["b"].update(status="error", response={"message": "boom"})
+
+    assert store.ids_with_status("completed") == ["a"]
+    assert store.ids_with_status("error", "in_progress") == ["b"]
+    assert store.status_counts() == {"completed": 1, "error": 1}
+    del store["a"]
+    assert "a" not in store and store.ids_with_status("completed") == []
+
+
+def test_ttl_and_size_eviction_drop_finished_requests_first(clock):
+    """Stale requests expire; at capacity the oldest finished request goes before running ones."""
+    store = RequestStore("tools", RequestStoreConfig(max_entries=3, ttl_seconds=60))
+    store["old"] = {"status": "in_progress"}
+    clock[0] += 61
+    assert "old" not in store
+
+    store["running"] = {"status": "in_progress"}
+    store["done-1"] = {"status": "completed"}
+    store["done-2"] = {"status": "completed"}
+    store["running"]["status"] = "in_progress"  # Touch it so it is the most recent
+    store["new"] = {"status": "in_progress"}
+
+    assert sorted(store) == ["done-2", "new", "running"]
+    assert store.stats["evicted_ttl"] == 1 and store.stats["evicted_size"] == 1
+
+
+def test_nested_progress_updates_keep_a_running_request_alive(clock):
+    """A task that only bumps nested counters is not expired; one gone quiet still is."""
+    store = RequestStore("vectorize", RequestStoreConfig(ttl_seconds=60))
+    store["busy"] = {"status": "running", "stages": {"embed": {"done": 0}}}
+    store["quiet"] = {"status": "running", "stages": {"embed": {"done": 0}}}
+    stages = store["busy"]["stages"]
+
+    for _ in range(3):
+        clock[0] += 30
+        stages["embed"]["done"] += 10
+
+    assert "busy" in store and store["busy"]["stages"]["embed"]["done"] == 30
+    assert "quiet" not in store
+
+    # Copying an entry into a new one rebinds its nested dicts to the new entry
+    store["busy"] = {**store["busy"], "status": "completed"}
+    clock[0] += 50
+    store["busy"]["stages"]["embed"]["done"] += 1
+    clock[0] += 50
+    assert store.ids_with_status("completed") == ["busy"]
+
+
+def test_persisted_requests_survive_a_restart(tmp_path):
+    """With persist_path set, requests and their latest status are reloaded."""
+    config = RequestStoreConfig(persist_path=str(tmp_path / "requests.db"))
+    store = RequestStore("tools", config, persist=True)
+    store["a"] = {"name": "search", "status": "in_progress", "args": {"task": "find"}}
+    store["b"] = {"name": "search", "status": "in_progress"}
+    store["a"]["status"] = "completed"
+    store["a"]["response"] = {"message": "found"}
+    del store["b"]
+    store.close()
+
+    restored = RequestStore("tools", config, persist=True)
+    assert list(restored) == ["a"]
+    assert restored["a"]["response"] == {"message": "found"}
+    assert restored.ids_with_status("completed") == ["a"]
+    assert RequestStore("other", config, persist=True).stats["restored"] == 0
+    restored.close()
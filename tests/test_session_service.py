@@ -0,0 +1,83 @@
+"""
+Tests for SessionService session listing, run against the SQLite backend.
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from src.db.sqlite_backend import SQLiteBackend
+from src.managers.db_manager import DBService
+from src.services.session_service import SessionService
+
+
+@pytest_asyncio.fixture
+async def db_service(tmp_path):
+    """DBService over a throwaway SQLite database."""
+    service = DBService(backend=SQLiteBackend(str(tmp_path / "sessions.db")))
+    yield service
+    await service.close()
+
+
+async def add_session(db_service, title, user_id, minute_last):
+    """Create a session through SessionService and add one later message."""
+    session_id = int(await SessionService(db_service).create_session(user_id, name=title))
+    await db_service.insert_many(
+        "swarm_messages",
+        [
+            {
+                "session_id": session_id,
+                "content": "hello",
+                "metadata": {},
+                "user_id": user_id,
+                "timestamp": f"2999-01-01T10:{minute_last:02d}:00",
+                "sender": "user",
+                "target": "assistant",
+            },
+        ],
+    )
+    return session_id
+
+
+@pytest.mark.asyncio
+async def test_create_session_allocates_sequence_ids(db_service):
+    """Concurrent creates get distinct ids from the sessions table."""
+    service = SessionService(db_service)
+    ids = await asyncio.gather(*(service.create_session("developer") for _ in range(5)))
+    assert sorted(int(i) for i in ids) == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_get_recent_sessions_reads_session_rows(db_service):
+    """Titles, activity and message counts come from the sessions table."""
+    first = await add_session(db_service, "first", "developer", 30)
+    second = await add_session(db_service, "second", "developer", 10)
+    await add_session(db_service, "other user", "someone", 40)
+
+    sessions = await SessionService(db_service).get_recent_sessions(limit=10)
+
+    assert list(sessions) == [str(first), str(second)]
+    assert sessions[str(first)]["name"] == "first"
+    assert sessions[str(first)]["updated_at"].minute == 30
+    # Start message plus one user message, maintained by the insert trigger
+    assert sessions[str(first)]["message_count"] == 2
+    assert sessions[str(second)]["user_id"] == "developer"
+
+    session = await SessionService(db_service).get_session(second)
+    assert session["name"] == "second"
+
+
+@pytest.mark.asyncio
+async def test_list_session_summaries_keyset_pagination(db_service):
+    """Pages follow the (updated_at, id) cursor without overlap."""
+    created = [await add_session(db_service, f"s{i}", "developer", i) for i in range(1, 6)]
+    service = SessionService(db_service)
+
+    page, cursor = await service.list_session_summaries(limit=2)
+    seen = [s["id"] for s in page]
+    while cursor:
+        page, cursor = await service.list_session_summaries(limit=2, cursor=cursor)
+        seen.extend(s["id"] for s in page)
+
+    assert seen == list(reversed(created))
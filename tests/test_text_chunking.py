@@ -0,0 +1,92 @@
+"""
+Tests for token-budgeted text chunking.
+"""
+
+import io
+import re
+import time
+
+import pytest
+
+from src.utils.text_processing import (
+    DEFAULT_TOKENIZER,
+    chunk_text_by_tokens,
+    count_tokens,
+    iter_text_chunks,
+    load_tokenizer,
+)
+
+
+def make_text(paragraphs=40):
+    """Paragraphs of varying length, some far over a small budget."""
+    lines = []
+    for p in range(paragraphs):
+        sentences = " ".join(f"Sentence {s} of paragraph {p} is here." for s in range(1 + p % 7))
+        lines.append(sentences)
+    return "\n".join(lines)
+
+
+def test_chunks_stay_within_budget_and_overlap():
+    """No chunk exceeds chunk_size; neighbours share at most chunk_overlap tokens of lines."""
+    chunks = chunk_text_by_tokens(make_text(), chunk_size=40, chunk_overlap=12)
+
+    assert len(chunks) > 10
+    assert all(count_tokens(chunk) <= 40 for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        shared = [line for line in current.split("\n") if line in previous.split("\n")]
+        assert count_tokens("\n".join(shared)) <= 12
+    # Every sentence survives chunking
+    joined = " ".join(chunks)
+    assert all(f"Sentence 6 of paragraph {p} is here." in joined for p in range(6, 40, 7))
+
+
+def test_oversized_units_split_on_sentences_then_tokens():
+    """A long paragraph is split at sentence ends; an unbroken run at token offsets."""
+    paragraph = "First short sentence. " + "Second sentence is rather longer than that. " * 3
+    chunks = chunk_text_by_tokens(paragraph, chunk_size=12, chunk_overlap=0)
+    assert len(chunks) == 3
+    assert all(chunk.endswith("than that.") for chunk in chunks)
+    assert all(count_tokens(c) <= 12 for c in chunks)
+
+    blob = "x" * 400  # 50 tokens of 8 letters
+    pieces = chunk_text_by_tokens(blob, chunk_size=20, chunk_overlap=0)
+    assert [count_tokens(p) for p in pieces] == [20, 20, 10]
+    assert "".join(pieces) == blob
+
+    # max_tokens (the embedding context window) caps a larger chunk_size
+    assert all(count_tokens(p) <= 5 for p in chunk_text_by_tokens(blob, 1000, 0, max_tokens=5))
+
+
+class WordTokenizer:
+    """Exact tokenizer for the tests: one token per whitespace-separated word."""
+
+    def offsets(self, text):
+        return [m.span() for m in re.finditer(r"\S+", text)]
+
+
+def test_approximate_counts_keep_a_margin_below_the_hard_cap():
+    """The regex estimate stays 20% under max_tokens; an exact tokenizer may fill it."""
+    text = " ".join(["word"] * 100)
+    assert max(map(count_tokens, chunk_text_by_tokens(text, 1000, 0, max_tokens=50))) == 40
+
+    exact = WordTokenizer()
+    pieces = chunk_text_by_tokens(text, 1000, 0, tokenizer=exact, max_tokens=50)
+    assert [count_tokens(p, exact) for p in pieces] == [50, 50]
+
+    # An unloadable tokenizer falls back to the estimate instead of failing ingestion
+    assert load_tokenizer(None) is DEFAULT_TOKENIZER
+    assert load_tokenizer("/nonexistent/tokenizer.json") is DEFAULT_TOKENIZER
+
+
+def test_generator_streams_file_objects_in_linear_time():
+    """Streaming lines from a file gives the same chunks, and large inputs stay fast."""
+    text = make_text(2000)
+    assert list(iter_text_chunks(io.StringIO(text), 50, 20)) == chunk_text_by_tokens(text, 50, 20)
+
+    big = "\n".join(f"line {i} with a few words" for i in range(100_000))
+    started = time.perf_counter()
+    count = sum(1 for _ in iter_text_chunks(big, chunk_size=1000, chunk_overlap=900))
+    assert count > 100
+    assert time.perf_counter() - started < 10
+    with pytest.raises(ValueError):
+        chunk_text_by_tokens("text", chunk_size=0)
@@ -0,0 +1,56 @@
+"""
+Tests for the one-pass tool-call parser and registry validation.
+"""
+
+from src.tools.tool_call_parser import DEFAULT_PARAMETER_SCHEMA, ToolCallParser, validate_arguments
+
+
+def test_nested_braces_and_backticks_inside_strings():
+    """Braces and backticks inside JSON strings do not end the call early."""
+    text = (
+        'Running it: `{"name": "shell", "args": {"task": "run `ls {a,b}`", '
+        '"parameters": {"opts": {"all": true}}}}` done. Also `{"not": "a call"}`.'
+    )
+    calls, shown = ToolCallParser.parse(text)
+
+    assert len(calls) == 1
+    assert calls[0].name == "shell"
+    assert calls[0].args == {"task": "run `ls {a,b}`", "parameters": {"opts": {"all": True}}}
+    assert shown == 'Running it:  done. Also `{"not": "a call"}`.'
+
+
+def test_call_fires_on_its_closing_brace_while_streaming():
+    """A call is available before the rest of the response has arrived."""
+    parser = ToolCallParser()
+    parser.feed('First `{"name": "calendar", "args": {"task": "to')
+    assert parser.pop_calls() == []
+
+    parser.feed('day"}}')
+    fired = parser.pop_calls()
+    assert [call.name for call in fired] == ["calendar"]
+
+    parser.feed('` then `{"name": "email", "args": {"task": "unread"}}` and more text')
+    assert [call.name for call in parser.pop_calls()] == ["email"]
+    assert parser.pop_calls() == []
+
+
+def test_invalid_calls_are_reported_not_run():
+    """Unknown tools and calls missing required arguments carry an error."""
+
+    def validate(name, args):
+        if name != "search":
+            return f"Unknown tool '{name}'"
+        return validate_arguments(args, DEFAULT_PARAMETER_SCHEMA)
+
+    calls, _ = ToolCallParser.parse(
+        '`{"name": "serch", "args": {"task": "x"}}` '
+        '`{"name": "search", "args": {"query": "x"}}` '
+        '`{"name": "search", "args": {"task": "find notes"}}`',
+        validate,
+    )
+
+    assert [call.error for call in calls] == [
+        "Unknown tool 'serch'",
+        "missing required argument(s): task",
+        None,
+    ]
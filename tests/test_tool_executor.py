@@ -0,0 +1,100 @@
+"""
+Tests for concurrent tool execution (ToolExecutor and handle_tool_calls).
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.tools import orchestrator_tools
+from src.tools.orchestrator_tools import PENDING_TOOL_REQUESTS, ToolExecutor, handle_tool_calls
+
+
+class SlowTool:
+    """Tool that sleeps, recording how many of its calls overlap."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def execute(self, args):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return {"status": "success", "message": f"done: {args['task']}"}
+
+
+class FakeRegistry:
+    def __init__(self, tools):
+        self.tools = tools
+
+    def get_tool(self, name):
+        return self.tools.get(name)
+
+
+@pytest.fixture
+def tools(monkeypatch):
+    """Calendar and email tools with 0.2 s latency registered in place of the real registry."""
+    registered = {"calendar": SlowTool(0.2), "email": SlowTool(0.2), "stuck": SlowTool(10)}
+    monkeypatch.setattr(orchestrator_tools, "get_registry", lambda: FakeRegistry(registered))
+    monkeypatch.setattr(orchestrator_tools, "TOOL_DEFINITIONS", dict.fromkeys(registered, {}))
+    yield registered
+    PENDING_TOOL_REQUESTS.clear()
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_in_one_response_run_concurrently(tools):
+    """Two 200 ms tools finish in about 200 ms, not 400 ms, and results keep the response order."""
+    response = (
+        'Checking both. `{"name": "calendar", "args": {"task": "today"}}` and '
+        '`{"name": "email", "args": {"task": "unread"}}`'
+    )
+    started = time.perf_counter()
+    result = await handle_tool_calls(response)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.35
+    assert [r["name"] for r in result["execution_results"]] == ["calendar", "email"]
+    assert [r["result"]["message"] for r in result["execution_results"]] == [
+        "done: today",
+        "done: unread",
+    ]
+    assert all(
+        PENDING_TOOL_REQUESTS[r["request_id"]]["status"] == "success"
+        for r in result["execution_results"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_per_tool_limit_queues_extra_calls(tools):
+    """Calls beyond the per-tool limit wait for a free slot."""
+    executor = ToolExecutor(max_concurrent=10, max_concurrent_per_tool=2)
+    results = await asyncio.gather(
+        *(executor.run("calendar", {"task": f"day {i}"}) for i in range(4))
+    )
+
+    assert tools["calendar"].peak == 2
+    assert [r["status"] for r in results] == ["success"] * 4
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_cancellation_are_recorded(tools):
+    """Timed-out and cancelled calls return errors and update their pending requests."""
+    executor = ToolExecutor(timeout=0.05)
+    timed_out = await executor.run("stuck", {"task": "wait"}, request_id="slow")
+    assert timed_out["status"] == "error" and "timed out" in timed_out["message"]
+    assert PENDING_TOOL_REQUESTS["slow"]["status"] == "error"
+
+    executor = ToolExecutor(timeout=None)
+    call = asyncio.create_task(executor.run("stuck", {"task": "wait"}, request_id="gone"))
+    await asyncio.sleep(0.01)
+    assert executor.running() == ["gone"]
+    assert executor.cancel("gone")
+    assert (await call)["status"] == "cancelled"
+    assert PENDING_TOOL_REQUESTS["gone"]["status"] == "cancelled"
+    assert executor.running() == []
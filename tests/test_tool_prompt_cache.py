@@ -0,0 +1,75 @@
+"""
+Tests for the cached, relevance-filtered tool catalog prompt section.
+"""
+
+import pytest
+
+import src.tools.orchestrator_tools as orchestrator_tools
+from src.tools.registry.tool_registry import ToolRegistry, ToolWrapper
+
+
+def make_tool(name, description, capabilities):
+    """Create a tool function carrying registry metadata."""
+
+    def tool(task: str):
+        return task
+
+    tool.__name__ = f"{name}_tool"
+    tool.description = description
+    tool.capabilities = capabilities
+    return tool
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """A fresh registry wired into orchestrator_tools."""
+    registry = ToolRegistry(data_dir=str(tmp_path))
+    monkeypatch.setattr(orchestrator_tools, "get_registry", lambda: registry)
+    for name, description, caps in [
+        ("personal_assistant", "Email, calendar and task management", ["send email"]),
+        ("librarian", "Research documents and web pages", ["web search"]),
+        ("valet", "Household chores and reminders", ["reminders"]),
+    ]:
+        func = make_tool(name, description, caps)
+        registry.register_tool(
+            name, ToolWrapper(func), {"description": description, "capabilities": caps}
+        )
+    return registry
+
+
+@pytest.mark.asyncio
+async def test_catalog_is_cached_until_registry_changes(registry, monkeypatch):
+    """The section renders once per registry version."""
+    calls = []
+    render = orchestrator_tools._render_tool_entry
+    monkeypatch.setattr(
+        orchestrator_tools,
+        "_render_tool_entry",
+        lambda *args: calls.append(args[0]) or render(*args),
+    )
+
+    first = await orchestrator_tools.add_tools_to_prompt("base")
+    second = await orchestrator_tools.add_tools_to_prompt("base")
+    assert first == second
+    assert "## librarian" in first and first.startswith("base\n\n# AVAILABLE TOOLS")
+    assert len(calls) == 3
+
+    registry.unregister_tool("valet")
+    third = await orchestrator_tools.add_tools_to_prompt("base")
+    assert "## valet" not in third
+    assert len(calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_top_k_keeps_only_relevant_tools(registry):
+    """With a small top_k, the message decides which tools are included."""
+    prompt = await orchestrator_tools.add_tools_to_prompt(
+        "base", message="please send an email to my calendar contacts", top_k=1
+    )
+    assert "## personal_assistant" in prompt
+    assert "## librarian" not in prompt
+    assert "IMPORTANT: When using tools" in prompt
+
+    # Small catalogs are included whole
+    full = await orchestrator_tools.add_tools_to_prompt("base", message="hello", top_k=8)
+    assert "## valet" in full and "## librarian" in full
@@ -0,0 +1,181 @@
+"""
+Tests for the local IVF vector index and its match_documents drop-in.
+"""
+
+import time
+
+import numpy as np
+import pytest
+import pytest_asyncio
+
+from src.config.database_config import VectorIndexConfig
+from src.db.sqlite_backend import SQLiteBackend
+from src.db.vector_index import LocalVectorStore, VectorIndex
+from src.managers.db_manager import DBService
+from src.services.record_service import DatabaseRecordService
+
+
+@pytest.fixture
+def clustered():
+    """Vectors drawn around 20 random directions."""
+    rng = np.random.default_rng(1)
+    centers = rng.standard_normal((20, 32))
+    vectors = centers[rng.integers(0, 20, 3000)] + 0.3 * rng.standard_normal((3000, 32))
+    return vectors.astype(np.float32), rng
+
+
+def test_trained_index_recall_updates_and_persistence(clustered, tmp_path):
+    """IVF search finds the exact neighbours; adds, deletes and reloads stay consistent."""
+    vectors, rng = clustered
+    index = VectorIndex(VectorIndexConfig(train_threshold=1000, nprobe=16))
+    index.add(list(range(3000)), vectors, [{"user_id": f"u{i % 3}"} for i in range(3000)])
+    assert index.trained and len(index) == 3000
+
+    exact = VectorIndex(VectorIndexConfig(train_threshold=10**6))
+    exact.add(list(range(3000)), vectors)
+    queries = vectors[rng.integers(0, 3000, 50)] + 0.1 * rng.standard_normal((50, 32))
+    recall = np.mean(
+        [
+            len({m[0] for m in index.search(q, 10)} & {m[0] for m in exact.search(q, 10)}) / 10
+            for q in queries
+        ]
+    )
+    assert recall >= 0.9
+
+    assert index.search(vectors[5], 1)[0][0] == 5
+    index.delete([5])
+    assert 5 not in {m[0] for m in index.search(vectors[5], 10)}
+    index.add([5], vectors[6:7], [{"user_id": "u9"}])
+    assert index.search(vectors[6], 2, filters={"user_id": "u9"})[0][0] == 5
+
+    index.save(str(tmp_path / "t.emb"))
+    loaded = VectorIndex.load(str(tmp_path / "t.emb"), index.config)
+    assert len(loaded) == 3000 and loaded.trained
+    query = vectors[42]
+    assert loaded.search(query, 5) == index.search(query, 5)
+
+
+@pytest_asyncio.fixture
+async def db_service(tmp_path):
+    """DBService over a SQLite database with a few embedded messages."""
+    service = DBService(backend=SQLiteBackend(str(tmp_path / "messages.db")))
+    rows = [
+        {
+            "session_id": 1,
+            "content": "cats",
+            "metadata": {"topic": "pets"},
+            "embedding_nomic": [1.0, 0.0],
+        },
+        {
+            "session_id": 1,
+            "content": "dogs",
+            "metadata": {"topic": "pets"},
+            "embedding_nomic": [0.8, 0.6],
+        },
+        {
+            "session_id": 2,
+            "content": "taxes",
+            "metadata": {"topic": "money"},
+            "embedding_nomic": [0.0, 1.0],
+        },
+        {"session_id": 2, "content": "no vector", "metadata": {}},
+    ]
+    await service.insert_many("swarm_messages", rows)
+    yield service
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_rebuild_and_match_documents_drop_in(db_service, tmp_path):
+    """vector_search answers from a rebuilt local index with RPC-shaped rows."""
+    store = LocalVectorStore(
+        VectorIndexConfig(
+            path=str(tmp_path / "index"), row_columns=["session_id", "content", "metadata"]
+        )
+    )
+    assert await store.rebuild(db_service, "swarm_messages") == 3
+
+    records = DatabaseRecordService(db_service, vector_store=LocalVectorStore(store.config))
+    matches = await records.vector_search("swarm_messages", [1.0, 0.1], match_threshold=0.5)
+    assert [m["content"] for m in matches] == ["cats", "dogs"]
+    assert matches[0]["similarity"] == pytest.approx(0.995, abs=1e-3)
+
+    filtered = await records.vector_search(
+        "swarm_messages", [1.0, 0.1], match_threshold=0.0, filters={"topic": "money"}
+    )
+    assert [m["content"] for m in filtered] == ["taxes"]
+    by_content = await records.vector_search(
+        "swarm_messages", [1.0, 0.1], match_threshold=0.0, filters={"content": "dogs"}
+    )
+    assert [m["session_id"] for m in by_content] == [1]
+
+
+@pytest.mark.asyncio
+async def test_rebuild_pages_through_the_table_by_id(db_service, tmp_path):
+    """Rebuild reads id-ordered pages of only the needed columns until a short page."""
+    store = LocalVectorStore(VectorIndexConfig(path=str(tmp_path / "index"), rebuild_page_size=2))
+    select = db_service.select
+    calls = []
+
+    async def recording_select(table_name, **kwargs):
+        calls.append(kwargs)
+        return await select(table_name, **kwargs)
+
+    db_service.select = recording_select
+    assert await store.rebuild(db_service, "swarm_messages") == 3
+
+    assert [call["filters"] for call in calls] == [None, {"id": ("gt", 2)}, {"id": ("gt", 4)}]
+    assert {call["columns"] for call in calls} == {"id, embedding_nomic, content, metadata"}
+    assert all(call["order_by"] == "id" and call["limit"] == 2 for call in calls)
+    assert set(store.get_index("swarm_messages")._rows[0]) == {"id", "content", "metadata"}
+
+
+@pytest.mark.asyncio
+async def test_writes_keep_an_attached_store_current(db_service, tmp_path):
+    """Rows inserted, updated and deleted through DBService are reflected without a rebuild."""
+    store = LocalVectorStore(VectorIndexConfig(path=str(tmp_path / "index")))
+    db_service.vector_store = store
+    records = DatabaseRecordService(db_service, vector_store=store)
+
+    row = await db_service.insert(
+        "swarm_messages", {"session_id": 3, "content": "fish", "embedding_nomic": [0.6, 0.8]}
+    )
+    await db_service.insert_many(
+        "swarm_messages", [{"session_id": 3, "content": "birds", "embedding_nomic": [1.0, 0.0]}]
+    )
+    await db_service.flush_index()
+    matches = await records.vector_search("swarm_messages", [0.6, 0.8], match_threshold=0.9)
+    assert [m["content"] for m in matches] == ["fish"]
+
+    await db_service.update("swarm_messages", row["id"], {"embedding_nomic": [0.0, 1.0]})
+    await db_service.flush_index()
+    matches = await records.vector_search("swarm_messages", [0.0, 1.0], match_threshold=0.9)
+    assert [m["id"] for m in matches] == [row["id"]]
+
+    await db_service.delete("swarm_messages", {"id": row["id"]})
+    await db_service.flush_index()
+    assert await records.vector_search("swarm_messages", [0.0, 1.0], match_threshold=0.9) == []
+    assert len(store.get_index("swarm_messages")) == 1
+
+
+@pytest.mark.asyncio
+async def test_indexing_runs_off_the_write_path(db_service, tmp_path):
+    """A slow index update (e.g. k-means training) neither delays the write nor the loop."""
+    store = LocalVectorStore(VectorIndexConfig(path=str(tmp_path / "index")))
+    add_records = store.add_records
+
+    def slow_add_records(*args):
+        time.sleep(0.3)
+        return add_records(*args)
+
+    store.add_records = slow_add_records
+    db_service.vector_store = store
+
+    start = time.monotonic()
+    await db_service.insert(
+        "swarm_messages", {"session_id": 3, "content": "fish", "embedding_nomic": [0.6, 0.8]}
+    )
+    assert time.monotonic() - start < 0.2
+
+    await db_service.close()
+    assert len(store.get_index("swarm_messages")) == 1
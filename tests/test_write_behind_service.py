@@ -0,0 +1,94 @@
+"""
+Tests for the write-behind swarm_messages persistence queue.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.config.database_config import WriteBehindConfig
+from src.db.backends import build_insert_many
+from src.services.write_behind_service import WriteBehindQueue
+
+
+@pytest.fixture
+def db_service():
+    """Create a mocked database service."""
+    service = MagicMock()
+    service.insert_many = AsyncMock(return_value=[])
+    return service
+
+
+def make_config(tmp_path, **overrides):
+    """Build a write-behind config that spills into a temporary directory."""
+    values = {
+        "batch_size": 3,
+        "flush_interval": 0.05,
+        "max_queue_size": 10,
+        "spill_path": str(tmp_path / "spill.jsonl"),
+    }
+    values.update(overrides)
+    return WriteBehindConfig(**values)
+
+
+def test_build_insert_many_uses_default_for_missing_columns():
+    """Rows with different keys share one statement; absent columns use DEFAULT."""
+    sql, args = build_insert_many(
+        "swarm_messages", [{"content": "a", "sender": "user"}, {"content": "b"}]
+    )
+    assert sql == (
+        'INSERT INTO "swarm_messages" ("content", "sender") '
+        "VALUES ($1, $2), ($3, DEFAULT) RETURNING *"
+    )
+    assert args == ["a", "user", "b"]
+
+
+@pytest.mark.asyncio
+async def test_rows_are_coalesced_into_batches(db_service, tmp_path):
+    """Rows flush in batch_size groups, and the remainder flushes on close."""
+    queue = WriteBehindQueue(db_service, config=make_config(tmp_path))
+    for i in range(7):
+        await queue.enqueue({"content": str(i)})
+    await queue.close()
+
+    sizes = [len(call.args[1]) for call in db_service.insert_many.await_args_list]
+    assert sum(sizes) == 7
+    assert max(sizes) <= 3
+    assert queue.stats["flushed"] == 7
+    with pytest.raises(RuntimeError):
+        await queue.enqueue({"content": "late"})
+
+
+@pytest.mark.asyncio
+async def test_interval_flushes_partial_batch(db_service, tmp_path):
+    """A partial batch is written once the flush interval elapses."""
+    queue = WriteBehindQueue(db_service, config=make_config(tmp_path))
+    await queue.enqueue({"content": "only"})
+    await asyncio.wait_for(queue.flush(), timeout=1)
+    db_service.insert_many.assert_awaited_once_with("swarm_messages", [{"content": "only"}])
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_spills_and_replays(db_service, tmp_path):
+    """Rows survive a database outage via the spill file and are replayed later."""
+    config = make_config(tmp_path)
+    db_service.insert_many = AsyncMock(side_effect=RuntimeError("db down"))
+    queue = WriteBehindQueue(db_service, config=config)
+    await queue.enqueue({"content": "a"})
+    await queue.enqueue({"content": "b"})
+    await queue.close()
+
+    spill = tmp_path / "spill.jsonl"
+    assert [json.loads(line)["content"] for line in spill.read_text().splitlines()] == ["a", "b"]
+
+    db_service.insert_many = AsyncMock(return_value=[])
+    queue = WriteBehindQueue(db_service, config=config)
+    queue.start()
+    await queue.close()
+    db_service.insert_many.assert_awaited_once_with(
+        "swarm_messages", [{"content": "a"}, {"content": "b"}]
+    )
+    assert not spill.exists()